@@ -9,14 +9,25 @@ import asyncio.exceptions as asyncioexceptions
 import contextlib
 import logging
 import os
+from collections import deque
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
-from typing import TYPE_CHECKING, TypedDict, TypeVar
+from typing import TYPE_CHECKING, Any, TypedDict, TypeVar
 
 import httpcore
 import httpx
+import voluptuous as vol
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.core import CALLBACK_TYPE, SupportsResponse, callback
+from homeassistant.exceptions import (
+    ConfigEntryAuthFailed,
+    ConfigEntryNotReady,
+    HomeAssistantError,
+    ServiceValidationError,
+)
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 from loguru import logger
@@ -24,28 +35,43 @@ from pydantic import ValidationError
 
 from .const import (
     CONF_AUTO_DISABLED_STATUS_REFRESH,
+    CONF_BACKFILL_WINDOW_DAYS,
     CONF_BRAND,
+    CONF_DAILY_WAKE_BUDGET,
     CONF_ENABLE_STATUS_REFRESH,
     CONF_FAILED_WAKE_THRESHOLD,
     CONF_IDLE_WAKE_HOURS,
+    CONF_LOCATION_HISTORY_DAYS,
     CONF_MAX_CACHE_AGE_MINUTES,
     CONF_METRIC_VALUES,
     CONF_POLLING_INTERVAL_MINUTES,
     CONF_POST_COUNT_PER_STOP,
+    CONF_PRE_DEPARTURE_REFRESH,
+    CONF_REFRESH_POLICY,
     CONF_RETAIN_ON_TRANSIENT_FAILURE,
+    CONF_SHARED_CACHE_URL,
+    CONF_WAKE_SUCCESS_FLOOR,
     DEFAULT_AUTO_DISABLED_STATUS_REFRESH,
+    DEFAULT_BACKFILL_WINDOW_DAYS,
+    DEFAULT_DAILY_WAKE_BUDGET,
     DEFAULT_ENABLE_STATUS_REFRESH,
     DEFAULT_FAILED_WAKE_THRESHOLD,
     DEFAULT_IDLE_WAKE_HOURS,
+    DEFAULT_LOCATION_HISTORY_DAYS,
     DEFAULT_MAX_CACHE_AGE_MINUTES,
     DEFAULT_POLLING_INTERVAL_MINUTES,
     DEFAULT_POST_COUNT_PER_STOP,
+    DEFAULT_PRE_DEPARTURE_REFRESH,
+    DEFAULT_REFRESH_POLICY,
     DEFAULT_RETAIN_ON_TRANSIENT_FAILURE,
+    DEFAULT_SHARED_CACHE_URL,
+    DEFAULT_WAKE_SUCCESS_FLOOR,
     DOMAIN,
     PLATFORMS,
     STARTUP_MESSAGE,
 )
 from .refresh_strategy import (
+    PRE_DEPARTURE_LEAD,
     CycleSnapshot,
     RefreshAction,
     RefreshDecision,
@@ -54,6 +80,7 @@ from .refresh_strategy import (
     VinState,
     decide,
     on_occurrence_advanced,
+    on_post_attempt,
     on_post_layer1_failure,
     on_post_layer1_success,
     on_wake_failed,
@@ -63,11 +90,12 @@ _LOGGER = logging.getLogger(__name__)
 
 # Default wake-poll budget in seconds. Used when POST_THEN_GET fires from a
 # non-service trigger (just_stopped, just_stopped_followup, idle_wake) -
-# i.e. the budget the strategy itself owns. Service-call triggers carry
+# i.e. the budget the strategy itself owns - until the car's own wake
+# latency is learned (see wake_latency.py). Service-call triggers carry
 # their own user-supplied timeout via pending_service_calls and override
 # this default. Empirically the modem wakes within ~10-25s after a POST,
-# so 25s is enough for ~3 polls at 10s spacing without burning extra
-# requests against the gateway.
+# so 25s is enough for ~3 polls without burning extra requests against
+# the gateway.
 STRATEGY_DEFAULT_WAKE_TIMEOUT_S = 25
 
 # Per-cycle wall-clock budgets that keep a single Toyota-side outage from
@@ -82,6 +110,24 @@ STRATEGY_DEFAULT_WAKE_TIMEOUT_S = 25
 STATUS_FETCH_BUDGET_S = 20
 SUMMARY_FETCH_BUDGET_S = 12
 
+# The account-level coordinator only re-reads the roster (itself cached for
+# ROSTER_TTL) and renews the token; car data is refreshed by the per-VIN
+# coordinators at the configured polling interval.
+ACCOUNT_REFRESH_INTERVAL = timedelta(hours=1)
+# A failing car's polling interval doubles per failure up to this multiple of
+# the configured interval, and snaps back on the next success.
+VIN_BACKOFF_MAX_FACTOR = 4
+# After a car's new location enters a zone, its next refresh comes this soon
+# instead of a polling interval later: that refresh sees the odometer stand
+# still and fires the just-stopped wake while the driver is still at the car.
+ARRIVAL_REFRESH_INTERVAL = timedelta(minutes=1)
+# A car's next refresh is brought forward to this long after its expected
+# auto-report (see report_cadence.py), once the report has reached Toyota.
+REPORT_SETTLE_DELAY = timedelta(minutes=1)
+# Cycles per car kept for the diagnostics' strategy trace: three days at the
+# default six-minute interval, enough to replay a few trips and idle nights.
+CYCLE_TRACE_LENGTH = 720
+
 
 def loguru_to_hass(message: str) -> None:
     """Forward Loguru logs to standard Python logger used by HACS."""
@@ -103,21 +149,77 @@ logger.remove()
 logger.configure(handlers=[{"sink": loguru_to_hass}])
 
 # These imports must be after Loguru configuration to properly intercept logging
-from pytoyoda.client import MyT  # noqa: E402
 from pytoyoda.exceptions import (  # noqa: E402
     ToyotaApiError,
     ToyotaInternalError,
     ToyotaLoginError,
 )
 
+from .aggregation import LocalPeriodSummaries  # noqa: E402
+from .auth import (  # noqa: E402
+    TOKEN_STORAGE_VERSION,
+    ToyotaAuthManager,
+    token_store_key,
+)
+from .backfill import (  # noqa: E402
+    BACKFILL_STORAGE_VERSION,
+    TripHistoryBackfill,
+    backfill_store_key,
+)
+from .cache_backend import (  # noqa: E402
+    CacheBackend,
+    MemoryCacheBackend,
+    create_cache_backend,
+)
+from .charging_session import ChargingSessions  # noqa: E402
+from .export import (  # noqa: E402
+    EXPORT_FORMATS,
+    EXPORT_KINDS,
+    async_export_records,
+    async_write_export,
+    default_export_filename,
+    export_path,
+)
+from .fetch_broker import SharedFetch, async_get_fetch_broker  # noqa: E402
+from .geofence import GeofenceEngine  # noqa: E402
+from .learned_state import (  # noqa: E402
+    LEARNED_STATE_STORAGE_VERSION,
+    LearnedState,
+    learned_state_store_key,
+)
+from .location_history import (  # noqa: E402
+    LOCATION_HISTORY_STORAGE_VERSION,
+    LocationHistory,
+    location_history_store_key,
+)
+from .roster import FleetRoster  # noqa: E402
+from .statistics_import import TripStatisticsImporter  # noqa: E402
+from .strategy_simulator import TraceCycle  # noqa: E402
+from .targeted_refresh import TargetedRefreshes  # noqa: E402
+from .telemetry_ring import (  # noqa: E402
+    TELEMETRY_STORAGE_VERSION,
+    TelemetryHistory,
+    telemetry_store_key,
+)
+from .transport import async_get_transport  # noqa: E402
+from .trip_store import (  # noqa: E402
+    QUERY_GROUPS,
+    QUERY_SOURCES,
+    TripCollector,
+    TripStore,
+    trip_db_path,
+)
+
 if TYPE_CHECKING:
-    from collections.abc import Awaitable
+    from collections.abc import AsyncIterator, Awaitable
 
     from homeassistant.config_entries import ConfigEntry
-    from homeassistant.core import HomeAssistant, ServiceCall
+    from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
     from pytoyoda.models.summary import Summary
     from pytoyoda.models.vehicle import Vehicle
 
+    from .aggregation import PeriodAggregate
+
 _T = TypeVar("_T")
 
 
@@ -125,9 +227,10 @@ class StatisticsData(TypedDict):
     """Representing Statistics data."""
 
     day: Summary | None
-    week: Summary | None
-    month: Summary | None
-    year: Summary | None
+    # Aggregated locally from the trip store once it covers the period.
+    week: Summary | PeriodAggregate | None
+    month: Summary | PeriodAggregate | None
+    year: Summary | PeriodAggregate | None
 
 
 class VehicleData(TypedDict):
@@ -174,15 +277,64 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
     )
     os.chdir(hass.config.config_dir)
 
-    client = MyT(
+    # Every entry (and the config flow) borrows the same pooled HTTP client,
+    # so several accounts share keep-alive connections to the Toyota hosts.
+    transport = async_get_transport(hass)
+    transport.async_acquire(entry.entry_id)
+    entry.async_on_unload(partial(transport.async_release, entry.entry_id))
+    # A car on several accounts is fetched (and woken) by one entry at a
+    # time; the others adopt its result. See fetch_broker.py.
+    fetch_broker = async_get_fetch_broker(hass)
+    fetch_broker.async_acquire(entry.entry_id)
+    entry.async_on_unload(partial(fetch_broker.async_release, entry.entry_id))
+    # ... and, through a shared cache, by one Home Assistant instance at a time.
+    cache_backend: CacheBackend
+    try:
+        cache_backend = create_cache_backend(
+            hass, entry.options.get(CONF_SHARED_CACHE_URL, DEFAULT_SHARED_CACHE_URL)
+        )
+    except ValueError as ex:
+        _LOGGER.warning("Ignoring the shared cache URL: %s", ex)
+        cache_backend = MemoryCacheBackend()
+    entry.async_on_unload(cache_backend.async_close)
+
+    client = transport.create_client(
         username=email,
         password=password,
         use_metric=metric_values,
         brand=brand_code,
     )
 
+    # Restores persisted tokens and only runs the OAuth flow if they can't
+    # be renewed. Also single-flights every later renewal for this account.
+    auth = ToyotaAuthManager(hass, entry.entry_id, client)
+    # get_vehicles() runs on startup, once per ROSTER_TTL, or after a VIN-level
+    # 404; every other cycle reuses the same Vehicle objects.
+    roster = FleetRoster(client)
+    # Local SQLite copy of fetched trips and daily summaries, answering
+    # toyota.query_trips without calling Toyota.
+    trip_store = TripStore(trip_db_path(hass, entry.entry_id))
+    await hass.async_add_executor_job(trip_store.open)
+
+    async def _close_trip_store() -> None:
+        # async_on_unload awaits coroutines only, not the executor's future.
+        await hass.async_add_executor_job(trip_store.close)
+
+    entry.async_on_unload(_close_trip_store)
+    trip_collector = TripCollector(hass, trip_store)
+    # Writes completed days of trip summaries into long-term statistics (and
+    # the daily table of the trip store).
+    statistics_importer = TripStatisticsImporter(
+        hass, metric_values=metric_values, trip_store=trip_store
+    )
+    # Current week/month/year from the trip store's days, so only the day
+    # summary is fetched once the store covers those periods.
+    local_summaries = LocalPeriodSummaries(
+        hass, trip_store, metric_values=metric_values
+    )
+
     try:
-        await client.login()
+        await auth.async_login()
     except ToyotaLoginError as ex:
         raise ConfigEntryAuthFailed(ex) from ex
     except (httpx.ConnectTimeout, httpcore.ConnectTimeout) as ex:
@@ -230,6 +382,23 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
     post_count_per_stop: int = entry.options.get(
         CONF_POST_COUNT_PER_STOP, DEFAULT_POST_COUNT_PER_STOP
     )
+    refresh_policy: str = entry.options.get(CONF_REFRESH_POLICY, DEFAULT_REFRESH_POLICY)
+    daily_wake_budget: int = int(
+        entry.options.get(CONF_DAILY_WAKE_BUDGET, DEFAULT_DAILY_WAKE_BUDGET)
+    )
+    wake_success_floor: float = (
+        float(entry.options.get(CONF_WAKE_SUCCESS_FLOOR, DEFAULT_WAKE_SUCCESS_FLOOR))
+        / 100
+    )
+    pre_departure_refresh: bool = entry.options.get(
+        CONF_PRE_DEPARTURE_REFRESH, DEFAULT_PRE_DEPARTURE_REFRESH
+    )
+    backfill_window_days: int = int(
+        entry.options.get(CONF_BACKFILL_WINDOW_DAYS, DEFAULT_BACKFILL_WINDOW_DAYS)
+    )
+    location_history_days: int = int(
+        entry.options.get(CONF_LOCATION_HISTORY_DAYS, DEFAULT_LOCATION_HISTORY_DAYS)
+    )
     # Persist per-VIN state in hass.data so it survives config entry reload
     # (options flow triggers a reload, which would otherwise recreate these as
     # empty and wipe both the retain cache and the diag sensor history). Scoped
@@ -259,26 +428,33 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
         "consecutive_post_rejections_per_vin",
         "soft_disabled_per_vin",
         "remaining_post_cycles_per_vin",
+        "recent_post_attempts_per_vin",
         "last_status_refresh_state_per_vin",
         "last_status_refresh_trigger_per_vin",
         # Parsed RemoteStatusResponseModel from the most recent successful
-        # /status fetch (GET_ONLY OR POST_THEN_GET). Re-injected into the
-        # Vehicle's _endpoint_data on SERVE_FROM_CACHE cycles, since each
-        # coordinator cycle gets a fresh Vehicle from get_vehicles() with
-        # empty _endpoint_data. Without this, lock/door/window/hood sensors
-        # flip back to "unknown" between Toyota fetches.
+        # /status fetch (GET_ONLY OR POST_THEN_GET). The fleet roster reuses
+        # Vehicle objects across cycles, but a config entry reload builds a
+        # new roster whose Vehicles start with empty _endpoint_data; this is
+        # re-injected on SERVE_FROM_CACHE cycles so lock/door/window/hood
+        # sensors don't flip back to "unknown" until the next Toyota fetch.
         "last_status_response_per_vin",
     ):
         diag_bucket.setdefault(new_key, {})
-    # Pending service-call requests, keyed by VIN. The service handler sets a
-    # value here and reload-triggers the coordinator; the next cycle picks it
-    # up via the strategy's user_service_call_pending input. The dict value is
+    # Pending service-call requests, keyed by VIN. TargetedRefreshes sets a
+    # value here and starts a refresh of just that car; whichever of it or the
+    # car's scheduled refresh gets to it first picks it up via the strategy's
+    # user_service_call_pending input. The dict value is
     # the user-supplied wake-poll budget in seconds (services.yaml exposes
     # `timeout_seconds`, default 60); non-service triggers (just_stopped,
-    # idle_wake, ...) fall through to STRATEGY_DEFAULT_WAKE_TIMEOUT_S below.
+    # idle_wake, ...) use the car's learned wake-poll schedule instead.
     pending_service_calls: dict[str, int] = diag_bucket.setdefault(
         "pending_service_calls", {}
     )
+    # Each car's recent cycles as strategy_simulator traces, so a diagnostics
+    # download can be replayed against other StrategyOptions offline.
+    cycle_traces: dict[str, deque[TraceCycle]] = diag_bucket.setdefault(
+        "cycle_traces_per_vin", {}
+    )
     last_good_per_vin: dict[str, VehicleData] = diag_bucket["last_good_per_vin"]
     last_fetch_time_per_vin: dict[str, datetime] = diag_bucket[
         "last_fetch_time_per_vin"
@@ -295,12 +471,79 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
         ((ToyotaLoginError,), "login error"),
     ]
 
+    # Failures a single car's refresh can hit without implying anything about
+    # the rest of the fleet. Caught by that car's own coordinator, which
+    # serves its retained data or goes unavailable on its own.
+    per_vehicle_errors: tuple[type[BaseException], ...] = (
+        ToyotaApiError,
+        ToyotaInternalError,
+        httpx.ConnectTimeout,
+        httpcore.ConnectTimeout,
+        asyncioexceptions.CancelledError,
+        asyncioexceptions.TimeoutError,
+        httpx.ReadTimeout,
+        ValidationError,
+        TypeError,
+    )
+
+    # One DataUpdateCoordinator per VIN, each with its own schedule, backoff,
+    # last_update_success and listeners, so every car refreshes at its own
+    # cadence and a failing car never takes its siblings down with it.
+    polling_interval = timedelta(minutes=polling_interval_minutes)
+    vin_coordinators: dict[str, DataUpdateCoordinator[VehicleData]] = {}
+    # Each car coordinator's _sync_fleet_data listener, removed with the car.
+    fleet_listener_unsubs: dict[str, CALLBACK_TYPE] = {}
+    # One lock per VIN, held for the whole of _refresh_one_vehicle, so a
+    # service call never runs on top of that car's scheduled refresh.
+    vin_locks: dict[str, asyncio.Lock] = {}
+
+    def _account_busy() -> bool:
+        """Return whether any car refresh or service call is in flight."""
+        return (
+            any(lock.locked() for lock in vin_locks.values()) or targeted_refreshes.busy
+        )
+
+    @callback
+    def _backfill_progressed(vin: str) -> None:
+        # Pushes the progress sensor without waiting for the car's next cycle.
+        vin_coordinator = vin_coordinators.get(vin)
+        if vin_coordinator is not None:
+            vin_coordinator.async_update_listeners()
+
+    # Walks older trip history into the same statistics, one window per quiet
+    # refresh cycle, resuming from its checkpoint after a restart.
+    backfill = TripHistoryBackfill(
+        hass,
+        entry.entry_id,
+        statistics_importer,
+        window_days=backfill_window_days,
+        is_busy=_account_busy,
+        on_progress=_backfill_progressed,
+    )
+    await backfill.async_load()
+    # Parked positions per car, answering toyota.location_history.
+    location_history = LocationHistory(
+        hass, entry.entry_id, retention_days=location_history_days
+    )
+    await location_history.async_load()
+    # Per-car models learned from our own requests (wake latency, ...).
+    learned_state = LearnedState(hass, entry.entry_id)
+    await learned_state.async_load()
+    # toyota_zone_enter / toyota_zone_exit from each committed location.
+    geofence = GeofenceEngine(hass)
+    entry.async_on_unload(geofence.async_start())
+    # Plug-in cars' charging sessions: refresh spacing and live estimates.
+    charging_sessions = ChargingSessions()
+    # Recent distinct dashboard readings per car, for the rate sensors.
+    telemetry = TelemetryHistory(hass, entry.entry_id, metric=metric_values)
+    await telemetry.async_load()
+
     def _error_code(exc: BaseException) -> str:
         """Derive a short error-code string for the last_error sensor."""
         msg = str(exc)
         # Toyota 429s embed the status code in the ToyotaApiError message:
         # "Request Failed. 429, {...}." Extract it when present.
-        for code in ("429", "500", "502", "503", "504"):
+        for code in ("404", "429", "500", "502", "503", "504"):
             if f"Request Failed. {code}," in msg:
                 return f"HTTP {code}"
         for exc_types, label in exception_code_map:
@@ -342,8 +585,23 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
             code = _error_code(ex)
             vin_tail = f"...{vin[-6:]}" if vin else "<no-vin>"
             _LOGGER.warning("Toyota %s on %s for vin=%s", code, endpoint_name, vin_tail)
+            if vin:
+                # Checked here because callers swallow a failed GET or
+                # endpoint update, and a 404 must still reach the roster.
+                _check_vin_not_found(vin, ex)
             raise
 
+    def _check_vin_not_found(vin: str, ex: BaseException) -> None:
+        """Re-read the roster now if the account no longer knows ``vin``.
+
+        A 404 means the car was sold or moved to another account; waiting for
+        the next account cycle would keep serving it from cache.
+        """
+        if roster.note_error(vin, ex):
+            entry.async_create_background_task(
+                hass, coordinator.async_request_refresh(), f"{DOMAIN} roster refresh"
+            )
+
     def _build_vin_state(vin: str) -> VinState:
         """Read the per-VIN diag dicts into a VinState snapshot for decide()."""
         return VinState(
@@ -366,11 +624,14 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
             remaining_post_cycles=diag_bucket["remaining_post_cycles_per_vin"].get(
                 vin, 0
             ),
+            recent_post_attempts=list(
+                diag_bucket["recent_post_attempts_per_vin"].get(vin, ())
+            ),
             has_cached_response=vin in last_good_per_vin,
         )
 
     def _persist_vin_state(vin: str, state: VinState) -> None:
-        """Mirror VinState back into the diag bucket dicts."""
+        """Mirror VinState back into the diag bucket dicts and learned models."""
         diag_bucket["last_odometer_km_per_vin"][vin] = state.last_odometer_km
         diag_bucket["was_moving_last_cycle_per_vin"][vin] = state.was_moving_last_cycle
         diag_bucket["last_status_occurrence_date_per_vin"][vin] = (
@@ -386,6 +647,78 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
         )
         diag_bucket["soft_disabled_per_vin"][vin] = state.soft_disabled
         diag_bucket["remaining_post_cycles_per_vin"][vin] = state.remaining_post_cycles
+        diag_bucket["recent_post_attempts_per_vin"][vin] = state.recent_post_attempts
+        learned_state.observe_movement(
+            vin, dt_util.now(), moving=state.was_moving_last_cycle
+        )
+
+    def _wake_success(vin: str | None, now: datetime) -> dict[RefreshTrigger, float]:
+        """Return the car's predicted wake success for the triggers it gates."""
+        if not vin or wake_success_floor <= 0:
+            return {}
+        model = learned_state.wake_success(vin)
+        return {
+            trigger: model.predict(trigger, now)
+            for trigger in (
+                RefreshTrigger.JUST_STOPPED,
+                RefreshTrigger.IDLE_WAKE,
+                RefreshTrigger.PRE_DEPARTURE,
+            )
+        }
+
+    def _departure(
+        vin: str | None, now: datetime
+    ) -> tuple[datetime | None, float | None]:
+        """Return the car's next likely departure and its chance of one soon."""
+        if not vin or not pre_departure_refresh:
+            return None, None
+        model = learned_state.departures(vin)
+        return model.next_departure(now), model.departure_probability(now)
+
+    def _expected_report_at(vin: str | None, now: datetime) -> datetime | None:
+        """Return the car's probable newest auto-report, from its cadence."""
+        if not vin:
+            return None
+        return learned_state.report_cadence(vin).expected_report_at(now)
+
+    def _record_cycle(
+        vin: str,
+        now: datetime,
+        odometer_km: float | None,
+        state: VinState,
+        service_pending: bool,  # noqa: FBT001
+    ) -> None:
+        """Append this cycle to the car's diagnostics trace."""
+        # We never see the car's own reports or lock changes, only the
+        # newest occurrence read; it stands in for both.
+        occurrence = state.last_status_occurrence_date
+        cycle_traces.setdefault(vin, deque(maxlen=CYCLE_TRACE_LENGTH)).append(
+            TraceCycle(
+                at=now,
+                odometer_km=odometer_km,
+                car_report_at=occurrence,
+                state_changed_at=occurrence,
+                service_call=service_pending,
+            )
+        )
+
+    def _parked_since_last_fetch(
+        vin: str, vehicle: Vehicle, odometer_km: float | None
+    ) -> bool:
+        """Return whether the car's cached location is still where it is parked.
+
+        Toyota only updates the location once the car is parked, so with the
+        odometer unchanged this cycle AND last cycle (the fetch during the
+        cycle that saw it move may predate the stop) the cached location
+        can't have changed. An unknown odometer or an empty cache (first
+        cycle, or a fresh roster after a reload) always fetches.
+        """
+        return (
+            odometer_km is not None
+            and diag_bucket["last_odometer_km_per_vin"].get(vin) == odometer_km
+            and not diag_bucket["was_moving_last_cycle_per_vin"].get(vin, False)
+            and "location" in vehicle._endpoint_data  # noqa: SLF001
+        )
 
     def _strategy_options() -> StrategyOptions:
         return StrategyOptions(
@@ -395,20 +728,28 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
             failed_wake_threshold=failed_wake_threshold,
             max_cache_age_minutes=max_cache_age_minutes,
             post_count_per_stop=post_count_per_stop,
+            policy=refresh_policy,
+            daily_wake_budget=daily_wake_budget,
+            wake_success_floor=wake_success_floor,
+            pre_departure=pre_departure_refresh,
         )
 
     async def _execute_post_then_get(
         vehicle: Vehicle,
         vin: str,
         state: VinState,
-        timeout_s: int = STRATEGY_DEFAULT_WAKE_TIMEOUT_S,
+        trigger: RefreshTrigger,
+        timeout_s: int | None = None,
     ) -> None:
         """Issue POST /refresh-status, then poll GET /status until cache advances.
 
-        Polls until ``occurrence_date`` advances or ``timeout_s`` seconds expire.
-        Defaults to STRATEGY_DEFAULT_WAKE_TIMEOUT_S for non-service triggers;
-        service-call triggers pass through the user-supplied
-        ``timeout_seconds`` from services.yaml. Mutates state in place per the
+        Polls until ``occurrence_date`` advances or the last poll of the car's
+        schedule has run. The schedule comes from the car's learned wake
+        latency (first poll at its median, last at its 95th percentile;
+        STRATEGY_DEFAULT_WAKE_TIMEOUT_S until enough wakes are known).
+        Service-call triggers pass ``timeout_s``, the user-supplied
+        ``timeout_seconds`` from services.yaml, as the last poll instead.
+        Mutates state in place per the
         caller contract in refresh_strategy.py. Pytoyoda's controller already
         retries 429/5xx with exponential backoff, so this loop only iterates
         if the gateway returned 200 with a stale occurrence_date (legitimate
@@ -418,7 +759,8 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
         post_response = await _call_tagged(
             "refresh_status", vin, vehicle.refresh_status()
         )
-        state.last_post_attempt_at = dt_util.now()
+        posted_at = dt_util.now()
+        on_post_attempt(state, posted_at)
 
         # Layer 1: gateway-level acceptance. payload.return_code "000000" =
         # accepted; anything else = vehicle does not support refresh-status.
@@ -453,11 +795,15 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
             return
         on_post_layer1_success(state)
 
-        # Layer 2: poll for occurrence_date advancement.
-        deadline = dt_util.now() + timedelta(seconds=timeout_s)
+        # Layer 2: poll for occurrence_date advancement on the car's schedule.
+        offsets = learned_state.wake_latency(vin).poll_offsets(
+            STRATEGY_DEFAULT_WAKE_TIMEOUT_S, budget_s=timeout_s
+        )
         previous_occurrence = state.last_status_occurrence_date
-        while dt_util.now() < deadline:
-            await asyncio.sleep(10)
+        for offset in offsets:
+            delay = offset - (dt_util.now() - posted_at).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
             try:
                 await _call_tagged(
                     "post_status_poll", vin, vehicle.update(only=["status"])
@@ -481,8 +827,22 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
                 state.last_status_fetch_at = dt_util.now()
                 if previous_occurrence is None or occ > previous_occurrence:
                     on_occurrence_advanced(state, occ)
+                    learned_state.record_report(vin, occ, woken=occ >= posted_at)
+                    # The report's own timestamp is the wake latency; the
+                    # poll only bounds it. A report older than the POST was
+                    # not our wake's, so it teaches nothing.
+                    if occ >= posted_at:
+                        elapsed = (dt_util.now() - posted_at).total_seconds()
+                        learned_state.record_wake(
+                            vin, min((occ - posted_at).total_seconds(), elapsed)
+                        )
+                    learned_state.record_wake_outcome(
+                        vin, trigger, posted_at, success=True
+                    )
                     return
-        # Loop expired without advancement.
+        # Schedule ran out without advancement.
+        learned_state.record_wake(vin, offsets[-1], timed_out=True)
+        learned_state.record_wake_outcome(vin, trigger, posted_at, success=False)
         on_wake_failed(state, opts)
         if state.soft_disabled:
             _LOGGER.warning(
@@ -497,7 +857,7 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
         vin: str,
         state: VinState,
         decision: RefreshDecision,
-        wake_timeout_s: int = STRATEGY_DEFAULT_WAKE_TIMEOUT_S,
+        wake_timeout_s: int | None = None,
     ) -> None:
         """Execute the per-action /status path for one VIN.
 
@@ -507,14 +867,17 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
 
         ``wake_timeout_s`` is forwarded to :func:`_execute_post_then_get` for
         the SERVICE_CALL trigger (carrying the user-supplied timeout from
-        services.yaml). All other triggers fall through to the default.
+        services.yaml). All other triggers pass None: the car's learned poll
+        schedule.
         """
         if decision.action is RefreshAction.POST_THEN_GET:
             if decision.trigger is RefreshTrigger.JUST_STOPPED:
                 state.remaining_post_cycles = max(0, post_count_per_stop - 1)
             elif decision.trigger is RefreshTrigger.JUST_STOPPED_FOLLOWUP:
                 state.remaining_post_cycles = max(0, state.remaining_post_cycles - 1)
-            await _execute_post_then_get(vehicle, vin, state, wake_timeout_s)
+            await _execute_post_then_get(
+                vehicle, vin, state, decision.trigger, wake_timeout_s
+            )
         elif decision.action is RefreshAction.GET_ONLY:
             await _execute_get_only(vehicle, vin, state)
         elif decision.action is RefreshAction.HARD_DISABLED:
@@ -553,15 +916,17 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
                     or occ > state.last_status_occurrence_date
                 ):
                     on_occurrence_advanced(state, occ)
+                    learned_state.record_report(vin, occ)
 
     def _persist_status_for_cache(vehicle: Vehicle, vin: str) -> None:
         """Mirror this cycle's /status response into the diag-bucket cache.
 
         If the cycle fetched /status, snapshot it for future SERVE_FROM_CACHE
-        cycles. If it didn't (POST flow skipped, or cache-only this cycle),
-        re-inject the previously cached response into this cycle's fresh
-        Vehicle so lock/door/window sensors keep their last-known values
-        instead of falling to "unknown".
+        cycles. If it didn't and the Vehicle has no /status of its own (first
+        cycle after a reload built a new roster), re-inject the previously
+        cached response so lock/door/window sensors keep their last-known
+        values instead of falling to "unknown". Roster-reused Vehicles keep
+        their own /status between cycles, so this is a no-op for them.
         """
         cached_status = vehicle._endpoint_data.get("status")  # noqa: SLF001
         if cached_status is not None:
@@ -571,6 +936,99 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
         if cached is not None:
             vehicle._endpoint_data["status"] = cached  # noqa: SLF001
 
+    async def _update_endpoints(
+        vehicle: Vehicle, label: str, deadline: float, **selection: list[str]
+    ) -> None:
+        """Run ``vehicle.update(skip=/only=...)`` against a shared deadline.
+
+        On timeout the TimeoutError propagates to the car's coordinator,
+        which serves cache or goes unavailable - same degrade path as any
+        other transient Toyota failure. A climate-settings (or other
+        endpoint) HTTP 500 surfaces here as a ToyotaApiError/
+        ToyotaInternalError - swallow it so a single bad endpoint doesn't
+        fail the whole refresh; the rest of the snapshot still builds from
+        the previous cycle's data.
+        """
+        vin = vehicle.vin
+        try:
+            async with asyncio.timeout_at(deadline):
+                await _call_tagged(label, vin, vehicle.update(**selection))
+        except (ToyotaApiError, ToyotaInternalError) as ex:
+            _LOGGER.warning(
+                "%s partial failure for vin=...%s (%s), continuing",
+                label,
+                (vin or "")[-6:],
+                _error_code(ex),
+            )
+
+    async def _fetch_statistics(vehicle: Vehicle, vin: str) -> StatisticsData | None:
+        """Fetch the day/week/month/year summaries, degrading to last-known."""
+
+        # Serialised to avoid Toyota burst rate-limit. Firing these four
+        # summary calls in an asyncio.gather within the same event-loop
+        # tick reliably trips a 429 with {"description": "Unauthorized"}
+        # response bodies. See pytoyoda/ha_toyota#282.
+        async def _fetch_summaries() -> StatisticsData:
+            day = await _call_tagged(
+                "day_summary", vin, vehicle.get_current_day_summary()
+            )
+            # Periods the trip store covers through yesterday are summed
+            # locally (plus today's summary); the rest still cost a call.
+            local = await local_summaries.async_current(vin, dt_util.now().date(), day)
+            return StatisticsData(
+                day=day,
+                week=local["week"]
+                if "week" in local
+                else await _call_tagged(
+                    "week_summary", vin, vehicle.get_current_week_summary()
+                ),
+                month=local["month"]
+                if "month" in local
+                else await _call_tagged(
+                    "month_summary", vin, vehicle.get_current_month_summary()
+                ),
+                year=local["year"]
+                if "year" in local
+                else await _call_tagged(
+                    "year_summary", vin, vehicle.get_current_year_summary()
+                ),
+            )
+
+        # Summaries are secondary telemetry: bound the whole block and
+        # degrade gracefully rather than letting a /v1/trips outage block
+        # setup or stub out the whole car. On timeout/API-error we hold the
+        # last-known statistics (or None) and still return this cycle's
+        # fresh status data. wait_for cancels the inner coro on timeout,
+        # which _call_tagged surfaces as a per-endpoint "cancelled" log.
+        try:
+            return await asyncio.wait_for(_fetch_summaries(), SUMMARY_FETCH_BUDGET_S)
+        except (
+            asyncioexceptions.TimeoutError,
+            ToyotaApiError,
+            ToyotaInternalError,
+            httpx.ConnectTimeout,
+            httpcore.ConnectTimeout,
+            httpx.ReadTimeout,
+            ValidationError,
+        ) as ex:
+            # Degrade on ANY transient summary failure (matches the family
+            # the per-vehicle handler treats as recoverable). NOT
+            # CancelledError: a real outer cancel must propagate, and
+            # wait_for already surfaces its own timeout as TimeoutError.
+            cached_stats = (
+                last_good_per_vin[vin]["statistics"]
+                if vin in last_good_per_vin
+                else None
+            )
+            _LOGGER.warning(
+                "Toyota summary fetch for vin=...%s degraded (%s); "
+                "holding %s statistics",
+                vin[-6:],
+                _error_code(ex),
+                "last-known" if cached_stats is not None else "no",
+            )
+            return cached_stats
+
     async def _refresh_one_vehicle(vehicle: Vehicle) -> VehicleData:
         """Fetch one vehicle's full data.
 
@@ -579,35 +1037,31 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
         so per-endpoint failure distribution is visible in the log.
 
         Smart-refresh strategy (see refresh_strategy.py) gates whether we
-        issue a POST /refresh-status and how we fetch /status. The strategy
-        is consulted AFTER vehicle.update() runs so it can see this cycle's
-        odometer for movement detection.
+        issue a POST /refresh-status and how we fetch /status. The fetch is
+        pipelined so the strategy doesn't wait for the whole endpoint sweep:
+
+        1. /telemetry alone, which carries the odometer the strategy needs
+           for movement detection.
+        2. The strategy decides, then three lanes run concurrently: the
+           /status path (wake POST + poll, GET, or cache), the summaries,
+           and every remaining endpoint. The account's RequestPacer (see
+           rate_limit.py) spaces the lanes' requests so the gateway never
+           sees a burst.
         """
         vin = vehicle.vin
-
-        # Phase 1: fetch every endpoint EXCEPT /status. The strategy decides
-        # the /status path below; calling it inside vehicle.update() risks a
-        # 429+APIGW-403 from a stale cache that we can avoid entirely by
-        # POSTing first OR by serving from cache. Note: vehicle.update() also
-        # populates _endpoint_data["telemetry"], which we read for odometer.
-        # Bounded so a slow/flaky non-status endpoint can't stall first_refresh
-        # past HA's setup budget. On timeout the TimeoutError propagates to the
-        # caller's per-vehicle handler, which serves cache or a stub - same
-        # degrade path as any other transient Toyota failure. A climate-settings
-        # (or other endpoint) HTTP 500 surfaces here as a ToyotaApiError/
-        # ToyotaInternalError - swallow it so a single bad endpoint doesn't fail
-        # the whole refresh; the rest of the snapshot still builds from cache.
-        try:
-            await asyncio.wait_for(
-                _call_tagged("vehicle.update", vin, vehicle.update(skip=["status"])),
-                STATUS_FETCH_BUDGET_S,
-            )
-        except (ToyotaApiError, ToyotaInternalError) as ex:
-            _LOGGER.warning(
-                "vehicle.update partial failure for vin=...%s (%s), continuing",
-                (vin or "")[-6:],
-                _error_code(ex),
-            )
+        loop = asyncio.get_running_loop()
+        # One budget for all non-status endpoints, as when they were a single
+        # vehicle.update(): a slow/flaky endpoint can't stall first_refresh
+        # past HA's setup budget.
+        endpoints_deadline = loop.time() + STATUS_FETCH_BUDGET_S
+
+        # Phase 1: /telemetry only. /status is never part of the endpoint
+        # sweep: calling it inside vehicle.update() risks a 429+APIGW-403
+        # from a stale cache that we can avoid entirely by POSTing first OR
+        # by serving from cache.
+        await _update_endpoints(
+            vehicle, "telemetry", endpoints_deadline, only=["telemetry"]
+        )
 
         # Build snapshot for the strategy.
         current_odometer_km: float | None = None
@@ -620,129 +1074,105 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
         except (AttributeError, TypeError, ValueError):
             current_odometer_km = None
 
-        state = _build_vin_state(vin) if vin else VinState()
-        # pending_service_calls maps VIN to the user-supplied wake timeout
-        # in seconds. Presence in the dict means "service call pending"; the
-        # value is forwarded to _execute_post_then_get for the wake budget.
-        service_timeout = pending_service_calls.pop(vin, None) if vin else None
-        service_pending = service_timeout is not None
-        decision = decide(
-            CycleSnapshot(
-                now=dt_util.now(),
-                current_odometer_km=current_odometer_km,
-                state=state,
-                options=_strategy_options(),
-                user_service_call_pending=service_pending,
-            )
-        )
-        _LOGGER.debug(
-            "smart_strategy vin=...%s action=%s trigger=%s service_pending=%s "
-            "soft_disabled=%s pending_keys=%s",
-            (vin or "")[-6:],
-            decision.action.value,
-            decision.trigger.value,
-            service_pending,
-            state.soft_disabled,
-            list(pending_service_calls.keys()),
+        # Phase 2: the endpoints the strategy doesn't need, and the
+        # summaries, start now and overlap with the /status path below.
+        skip = ["status", "telemetry"]
+        location_skipped = vin is not None and _parked_since_last_fetch(
+            vin, vehicle, current_odometer_km
         )
-
-        # Phase 2: enact the /status decision.
-        if vin:
-            wake_timeout_s = (
-                service_timeout
-                if service_timeout is not None
-                else STRATEGY_DEFAULT_WAKE_TIMEOUT_S
+        if location_skipped:
+            skip.append("location")
+        location_history.note_fetch(skipped=location_skipped)
+        lanes: list[asyncio.Task[Any]] = [
+            loop.create_task(
+                _update_endpoints(
+                    vehicle, "vehicle.update", endpoints_deadline, skip=skip
+                )
             )
-            await _enact_decision(vehicle, vin, state, decision, wake_timeout_s)
+        ]
+        if vin is not None:
+            lanes.append(loop.create_task(_fetch_statistics(vehicle, vin)))
 
-        if vin:
-            _persist_status_for_cache(vehicle, vin)
+        try:
+            state = _build_vin_state(vin) if vin else VinState()
+            # pending_service_calls maps VIN to the user-supplied wake timeout
+            # in seconds. Presence in the dict means "service call pending";
+            # the value is forwarded to _execute_post_then_get for the wake
+            # budget.
+            service_timeout = pending_service_calls.pop(vin, None) if vin else None
+            service_pending = service_timeout is not None
+            snapshot_now = dt_util.now()
+            departure_at, departure_likelihood = _departure(vin, snapshot_now)
+            decision = decide(
+                CycleSnapshot(
+                    now=snapshot_now,
+                    current_odometer_km=current_odometer_km,
+                    state=state,
+                    options=_strategy_options(),
+                    user_service_call_pending=service_pending,
+                    expected_report_at=_expected_report_at(vin, snapshot_now),
+                    wake_success=_wake_success(vin, snapshot_now),
+                    departure_at=departure_at,
+                    departure_likelihood=departure_likelihood,
+                )
+            )
+            _LOGGER.debug(
+                "smart_strategy vin=...%s action=%s trigger=%s service_pending=%s "
+                "soft_disabled=%s pending_keys=%s",
+                (vin or "")[-6:],
+                decision.action.value,
+                decision.trigger.value,
+                service_pending,
+                state.soft_disabled,
+                list(pending_service_calls.keys()),
+            )
 
-        # Movement / sensor state.
-        car_currently_moving = (
-            state.last_odometer_km is not None
-            and current_odometer_km is not None
-            and current_odometer_km != state.last_odometer_km
-        )
-        state.last_odometer_km = current_odometer_km
-        state.was_moving_last_cycle = car_currently_moving
+            # Phase 3: enact the /status decision.
+            if vin:
+                await _enact_decision(vehicle, vin, state, decision, service_timeout)
+                _persist_status_for_cache(vehicle, vin)
 
-        # Persist diagnostic state-name for the sensor + commit the rest.
-        if vin:
-            diag_bucket["last_status_refresh_state_per_vin"][vin] = (
-                decision.refresh_state.value
-            )
-            diag_bucket["last_status_refresh_trigger_per_vin"][vin] = (
-                decision.trigger.value
+            # Movement / sensor state.
+            car_currently_moving = (
+                state.last_odometer_km is not None
+                and current_odometer_km is not None
+                and current_odometer_km != state.last_odometer_km
             )
-            _persist_vin_state(vin, state)
+            state.last_odometer_km = current_odometer_km
+            state.was_moving_last_cycle = car_currently_moving
 
-        statistics: StatisticsData | None = None
-        if vin is not None:
-            # Serialised to avoid Toyota burst rate-limit. Firing these four
-            # summary calls in an asyncio.gather within the same event-loop
-            # tick reliably trips a 429 with {"description": "Unauthorized"}
-            # response bodies. See pytoyoda/ha_toyota#282.
-            async def _fetch_summaries() -> StatisticsData:
-                return StatisticsData(
-                    day=await _call_tagged(
-                        "day_summary", vin, vehicle.get_current_day_summary()
-                    ),
-                    week=await _call_tagged(
-                        "week_summary", vin, vehicle.get_current_week_summary()
-                    ),
-                    month=await _call_tagged(
-                        "month_summary", vin, vehicle.get_current_month_summary()
-                    ),
-                    year=await _call_tagged(
-                        "year_summary", vin, vehicle.get_current_year_summary()
-                    ),
+            # Persist diagnostic state-name for the sensor + commit the rest.
+            if vin:
+                diag_bucket["last_status_refresh_state_per_vin"][vin] = (
+                    decision.refresh_state.value
                 )
-
-            # Summaries are secondary telemetry: bound the whole block and
-            # degrade gracefully rather than letting a /v1/trips outage block
-            # setup or stub out the whole car. On timeout/API-error we hold the
-            # last-known statistics (or None) and still return this cycle's
-            # fresh status data. wait_for cancels the inner coro on timeout,
-            # which _call_tagged surfaces as a per-endpoint "cancelled" log.
-            try:
-                statistics = await asyncio.wait_for(
-                    _fetch_summaries(), SUMMARY_FETCH_BUDGET_S
+                diag_bucket["last_status_refresh_trigger_per_vin"][vin] = (
+                    decision.trigger.value
                 )
-            except (
-                asyncioexceptions.TimeoutError,
-                ToyotaApiError,
-                ToyotaInternalError,
-                httpx.ConnectTimeout,
-                httpcore.ConnectTimeout,
-                httpx.ReadTimeout,
-                ValidationError,
-            ) as ex:
-                # Degrade on ANY transient summary failure (matches the family
-                # the per-vehicle handler treats as recoverable). NOT
-                # CancelledError: a real outer cancel must propagate, and
-                # wait_for already surfaces its own timeout as TimeoutError.
-                cached_stats = (
-                    last_good_per_vin[vin]["statistics"]
-                    if vin in last_good_per_vin
-                    else None
-                )
-                _LOGGER.warning(
-                    "Toyota summary fetch for vin=...%s degraded (%s); "
-                    "holding %s statistics",
-                    vin[-6:],
-                    _error_code(ex),
-                    "last-known" if cached_stats is not None else "no",
+                _persist_vin_state(vin, state)
+                _record_cycle(
+                    vin, snapshot_now, current_odometer_km, state, service_pending
                 )
-                statistics = cached_stats
+
+            # Gather in order; the endpoint lane's TimeoutError (or a status
+            # path failure above) fails the car, like the sequential fetch.
+            results = [await lane for lane in lanes]
+        except BaseException:
+            for lane in lanes:
+                lane.cancel()
+            raise
+        if vin is not None and not location_skipped:
+            location_history.record(vin, vehicle.location)
+        statistics: StatisticsData | None = results[1] if vin is not None else None
+
         now = dt_util.now()
         # NB: do NOT update last_fetch_time_per_vin here. We need commit
-        # semantics matching coordinator.data: if a later vehicle in the loop
-        # fails and we raise UpdateFailed, this vehicle's data is not visible
+        # semantics matching the car coordinator's data: if anything after
+        # this point fails and we raise UpdateFailed, this data is not visible
         # to sensors - so its fetch timestamp must also not be visible, or
         # users see the inconsistent "entity unavailable AND last fetch
-        # 3 minutes ago" state. The caller updates last_fetch_time_per_vin
-        # only after the whole refresh has committed.
+        # 3 minutes ago" state. _async_update_vin updates
+        # last_fetch_time_per_vin only once the refresh has committed.
         err = last_error_per_vin.get(vehicle.vin) if vehicle.vin else None
         return VehicleData(
             data=vehicle,
@@ -754,23 +1184,321 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
             is_cached=False,
         )
 
-    async def async_get_vehicle_data() -> list[VehicleData] | None:  # noqa: C901, PLR0912
-        """Fetch vehicle data from Toyota API, per-car error handling.
+    def _vin_lock(vin: str) -> asyncio.Lock:
+        lock = vin_locks.get(vin)
+        if lock is None:
+            lock = vin_locks[vin] = asyncio.Lock()
+        return lock
+
+    def _record_vehicle_failure(vin: str, ex: BaseException) -> str:
+        """Log a per-vehicle refresh failure and stamp the last_error dicts."""
+        code = _error_code(ex)
+        last_error_per_vin[vin] = (dt_util.now(), code)
+        _LOGGER.warning("Toyota refresh failed for vin=...%s (%s)", vin[-6:], code)
+        _check_vin_not_found(vin, ex)
+        return code
+
+    def _vehicle_for(vin: str) -> Vehicle | None:
+        """Return the roster's Vehicle, or the one from the last good fetch."""
+        vehicle = roster.get(vin)
+        if vehicle is None and vin in last_good_per_vin:
+            vehicle = last_good_per_vin[vin]["data"]
+        return vehicle
+
+    def _back_off(vin_coordinator: DataUpdateCoordinator[VehicleData]) -> None:
+        """Double one car's polling interval after a failure, up to the cap."""
+        current = vin_coordinator.update_interval or polling_interval
+        vin_coordinator.update_interval = min(
+            current * 2, polling_interval * VIN_BACKOFF_MAX_FACTOR
+        )
 
-        Branch count is intentional: each except-arm maps to a distinct
-        recovery policy (retain-cache vs propagate UpdateFailed) for either
-        the fleet-level get_vehicles call or the per-vehicle refresh. Folding
-        them into a helper would obscure the recovery semantics.
+    async def _async_update_vin(vin: str) -> VehicleData:
+        """Refresh one car; the update method of that car's coordinator.
+
+        A failure only touches this car. With retain_on_transient and an
+        earlier good fetch the cached data is served, otherwise UpdateFailed
+        makes this car's entities (and no other car's) unavailable. Either
+        way the car's polling interval backs off until its next success.
         """
-        # Step 1: get the vehicle list. This is account-level; if it fails
-        # we have no per-vehicle recovery path, but we CAN serve stale
-        # fleet data if any exists.
+        vin_coordinator = vin_coordinators[vin]
+        vehicle = _vehicle_for(vin)
+        if vehicle is None:
+            msg = f"Toyota vin=...{vin[-6:]} is no longer on the account"
+            raise UpdateFailed(msg)
         try:
-            vehicles = await asyncio.wait_for(client.get_vehicles(), 15)
-        except ToyotaLoginError:
+            # Renew the token up front if it would expire mid-refresh.
+            await auth.async_ensure_fresh()
+            async with _vin_lock(vin):
+                vehicle_data = await _refresh_via_broker(vin, vehicle, vin_coordinator)
+        except ToyotaLoginError as ex:
+            _record_vehicle_failure(vin, ex)
+            msg = f"Toyota login error: {ex}"
+            raise UpdateFailed(msg) from ex
+        except per_vehicle_errors as ex:
+            code = _record_vehicle_failure(vin, ex)
+            _back_off(vin_coordinator)
+            if retain_on_transient and vin in last_good_per_vin:
+                # retain=ON + cache available: serve stale cached data.
+                return _build_vehicle_data_from_cache(vin)
+            msg = f"Toyota refresh failed for vin=...{vin[-6:]}: {code}"
+            raise UpdateFailed(msg) from ex
+
+        _observe_charging(vin, vehicle)
+        _record_telemetry(vin, vehicle)
+        vin_coordinator.update_interval = charging_sessions.poll_interval(
+            vin, dt_util.now(), polling_interval
+        )
+        location = vehicle.location
+        if location is not None and geofence.evaluate(
+            vin, location.latitude, location.longitude
+        ):
+            vin_coordinator.update_interval = ARRIVAL_REFRESH_INTERVAL
+        _time_refresh_to_next_report(vin, vin_coordinator)
+        _time_refresh_to_departure(vin, vin_coordinator)
+        last_good_per_vin[vin] = vehicle_data
+        # Committed together with the coordinator's data, so the timestamp
+        # sensor never claims a fetch that the data sensors don't show.
+        last_fetch_time_per_vin[vin] = vehicle_data["last_successful_fetch"]
+        # No-op once the car's statistics are imported through yesterday.
+        statistics_importer.async_schedule(entry, vehicle)
+        # Next window of older history, once the import above is current.
+        backfill.async_schedule(entry, vehicle)
+        # New trips into the local trip store, at most hourly.
+        trip_collector.async_schedule(entry, vehicle)
+        return vehicle_data
+
+    async def _refresh_via_broker(
+        vin: str, vehicle: Vehicle, vin_coordinator: DataUpdateCoordinator[VehicleData]
+    ) -> VehicleData:
+        """Refresh the car, or adopt another entry's fetch of it.
+
+        Another entry's (or instance's) fetch counts while it is younger
+        than this car's polling interval. A pending service call always
+        fetches.
+        """
+        window = vin_coordinator.update_interval or polling_interval
+        async with fetch_broker.async_claim(
+            vin,
+            entry.entry_id,
+            window=window,
+            force=vin in pending_service_calls,
+            backend=cache_backend,
+        ) as shared:
+            if shared is not None:
+                return await _adopt_shared_fetch(vehicle, vin, shared)
+            vehicle_data = await _refresh_one_vehicle(vehicle)
+            published = SharedFetch(
+                entry_id=entry.entry_id,
+                fetched_at=vehicle_data["last_successful_fetch"] or dt_util.now(),
+                endpoint_data=dict(vehicle._endpoint_data),  # noqa: SLF001
+                statistics=vehicle_data["statistics"],
+                metric_values=metric_values,
+                state=_build_vin_state(vin),
+            )
+            fetch_broker.publish(vin, published)
+            await fetch_broker.async_share(vin, published, cache_backend, ttl=window)
+            return vehicle_data
+
+    async def _adopt_shared_fetch(
+        vehicle: Vehicle, vin: str, shared: SharedFetch
+    ) -> VehicleData:
+        """Serve another entry's fetch of the car as this entry's refresh.
+
+        The endpoint responses go into this entry's own Vehicle and the
+        strategy state is mirrored, so should this entry fetch the car
+        itself later it knows when the car was last read and woken. The
+        summaries are reused when both entries use the same units and run
+        in this instance; otherwise this entry fetches its own (no wake, no
+        endpoint sweep).
+        """
+        vehicle._endpoint_data.update(shared.endpoint_data)  # noqa: SLF001
+        _persist_status_for_cache(vehicle, vin)
+        _persist_vin_state(vin, shared.state)
+        if shared.metric_values == metric_values and not shared.remote:
+            statistics = shared.statistics
+        else:
+            statistics = await _fetch_statistics(vehicle, vin)
+        err = last_error_per_vin.get(vin)
+        return VehicleData(
+            data=vehicle,
+            statistics=statistics,
+            metric_values=metric_values,
+            last_successful_fetch=shared.fetched_at,
+            last_error_time=err[0] if err else None,
+            last_error_code=err[1] if err else None,
+            is_cached=False,
+        )
+
+    def _observe_charging(vin: str, vehicle: Vehicle) -> None:
+        """Feed the car's electric status into its charging session."""
+        electric = vehicle._endpoint_data.get("electric_status")  # noqa: SLF001
+        payload = getattr(electric, "payload", None)
+        if payload is None:
+            return
+        remaining = payload.remaining_charge_time
+        read_at = payload.last_update_timestamp
+        charging_sessions.observe(
+            vin,
+            dt_util.now(),
+            status=payload.charging_status,
+            level=payload.battery_level,
+            remaining=None if remaining is None else timedelta(minutes=remaining),
+            # A timestamp without a zone can't be placed; the fetch time does.
+            read_at=read_at if read_at is not None and read_at.tzinfo else None,
+        )
+
+    def _record_telemetry(vin: str, vehicle: Vehicle) -> None:
+        """Add the car's dashboard readings to its telemetry ring."""
+        dashboard = vehicle.dashboard
+        if dashboard is None:
+            return
+        # The range stored is the one that goes with the car's main level.
+        electric = vehicle.type == "electric"
+        telemetry.record(
+            vin,
+            dt_util.now(),
+            odometer=dashboard.odometer,
+            fuel=dashboard.fuel_level,
+            battery=dashboard.battery_level,
+            range_=dashboard.battery_range if electric else dashboard.fuel_range,
+        )
+
+    def _time_refresh_to_next_report(
+        vin: str, vin_coordinator: DataUpdateCoordinator[VehicleData]
+    ) -> None:
+        """Bring the car's next refresh forward to just after its next report.
+
+        Only when that refresh would GET anyway: the cache is due by then
+        and the regular interval would read the report later.
+        """
+        now = dt_util.now()
+        next_report = learned_state.report_cadence(vin).next_report_at(now)
+        fetched_at = diag_bucket["last_status_fetch_at_per_vin"].get(vin)
+        if next_report is None or fetched_at is None:
+            return
+        due_at = next_report + REPORT_SETTLE_DELAY
+        if due_at - fetched_at <= timedelta(minutes=max_cache_age_minutes):
+            return
+        interval = vin_coordinator.update_interval
+        if interval is not None and due_at - now < interval:
+            vin_coordinator.update_interval = max(
+                due_at - now, ARRIVAL_REFRESH_INTERVAL
+            )
+
+    def _time_refresh_to_departure(
+        vin: str, vin_coordinator: DataUpdateCoordinator[VehicleData]
+    ) -> None:
+        """Bring the car's next refresh forward into its pre-departure lead.
+
+        The regular interval could step over the lead before a likely
+        departure; the strategy reads the car on the first cycle inside it.
+        """
+        if not pre_departure_refresh:
+            return
+        now = dt_util.now()
+        departure_at = learned_state.departures(vin).next_departure(now)
+        if departure_at is None:
+            return
+        due_at = departure_at - PRE_DEPARTURE_LEAD
+        interval = vin_coordinator.update_interval
+        if due_at > now and interval is not None and due_at - now < interval:
+            vin_coordinator.update_interval = max(
+                due_at - now, ARRIVAL_REFRESH_INTERVAL
+            )
+
+    def _fleet_data() -> list[VehicleData]:
+        """Aggregate the per-VIN coordinators' data in roster order.
+
+        A car whose coordinator has never succeeded gets a stub entry so
+        platform setup still creates its entities; they read unavailable
+        until the car's own coordinator succeeds.
+        """
+        fleet: list[VehicleData] = []
+        for vin, vin_coordinator in vin_coordinators.items():
+            if vin_coordinator.data is not None:
+                fleet.append(vin_coordinator.data)
+                continue
+            err = last_error_per_vin.get(vin)
+            fleet.append(
+                VehicleData(
+                    data=_vehicle_for(vin),  # type: ignore[typeddict-item]
+                    statistics=None,
+                    metric_values=metric_values,
+                    last_successful_fetch=None,
+                    last_error_time=err[0] if err else None,
+                    last_error_code=err[1] if err else None,
+                    is_cached=False,
+                )
+            )
+        return fleet
+
+    @callback
+    def _sync_fleet_data() -> None:
+        """Keep the account coordinator's aggregate in step with the cars.
+
+        Plain assignment rather than async_set_updated_data(): entities
+        listen to their own car's coordinator, and notifying here would
+        also reset the account coordinator's schedule.
+        """
+        coordinator.data = _fleet_data()
+
+    def _add_vin_coordinator(vin: str) -> None:
+        vin_coordinator: DataUpdateCoordinator[VehicleData] = DataUpdateCoordinator(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=f"{DOMAIN} ...{vin[-6:]}",
+            update_method=partial(_async_update_vin, vin),
+            update_interval=polling_interval,
+        )
+        # Attach the per-VIN diagnostic dicts so diagnostic sensors can read
+        # them even when the car's data is stale after UpdateFailed. The
+        # dicts are updated in the failure path BEFORE UpdateFailed fires, so
+        # they carry the freshest error/timestamp info irrespective of the
+        # retain_on_transient toggle. Diag sensors bind via
+        # getattr(coordinator, "_diag_last_fetch_per_vin" / ...).
+        vin_coordinator._diag_last_fetch_per_vin = last_fetch_time_per_vin  # noqa: SLF001
+        vin_coordinator._diag_last_error_per_vin = last_error_per_vin  # noqa: SLF001
+        vin_coordinator._diag_status_occurrence_per_vin = diag_bucket[  # noqa: SLF001
+            "last_status_occurrence_date_per_vin"
+        ]
+        vin_coordinator._diag_status_refresh_state_per_vin = diag_bucket[  # noqa: SLF001
+            "last_status_refresh_state_per_vin"
+        ]
+        vin_coordinator._diag_backfill_progress_per_vin = backfill.progress  # noqa: SLF001
+        vin_coordinator._charging_sessions = charging_sessions  # noqa: SLF001
+        vin_coordinator._telemetry = telemetry  # noqa: SLF001
+        # Also keeps the car's coordinator scheduled before (and regardless
+        # of) its entities subscribing.
+        fleet_listener_unsubs[vin] = vin_coordinator.async_add_listener(
+            _sync_fleet_data
+        )
+        vin_coordinators[vin] = vin_coordinator
+
+    @callback
+    def _remove_fleet_listeners() -> None:
+        for unsub in fleet_listener_unsubs.values():
+            unsub()
+        fleet_listener_unsubs.clear()
+
+    entry.async_on_unload(_remove_fleet_listeners)
+
+    async def async_update_fleet() -> list[VehicleData]:
+        """Account-level update: auth, roster and the per-VIN coordinators.
+
+        Fetches no car data itself except the first refresh of a car that
+        just joined (startup or a roster change), run for all new cars in
+        parallel so platform setup has data for every car it creates
+        entities for.
+        """
+        try:
+            await auth.async_ensure_fresh()
+            vehicles = await asyncio.wait_for(roster.async_get(dt_util.now()), 15)
+        except ToyotaLoginError as ex:
             # Credentials invalid - not transient, surface as auth error.
             _LOGGER.exception("Toyota login error")
-            return None
+            msg = f"Toyota login error: {ex}"
+            raise UpdateFailed(msg) from ex
         except (
             ToyotaApiError,
             httpx.ConnectTimeout,
@@ -778,135 +1506,96 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
             asyncioexceptions.CancelledError,
             asyncioexceptions.TimeoutError,
             httpx.ReadTimeout,
+            ValidationError,
         ) as ex:
-            code = _error_code(ex)
+            code = (
+                "validation error"
+                if isinstance(ex, ValidationError)
+                else _error_code(ex)
+            )
             now = dt_util.now()
             for vin in last_good_per_vin:
                 last_error_per_vin[vin] = (now, code)
-            if retain_on_transient and last_good_per_vin:
+            if roster.vehicles:
                 _LOGGER.warning(
-                    "Toyota get_vehicles failed (%s); using cached fleet data", code
+                    "Toyota get_vehicles failed (%s); keeping cached roster", code
                 )
-                return [
-                    _build_vehicle_data_from_cache(vin) for vin in last_good_per_vin
-                ]
-            msg = f"Toyota get_vehicles failed: {ex}"
-            raise UpdateFailed(msg) from ex
-        except ValidationError:
-            _LOGGER.exception("Toyota validation error on get_vehicles")
-            code = "validation error"
-            now = dt_util.now()
-            for vin in last_good_per_vin:
-                last_error_per_vin[vin] = (now, code)
-            if retain_on_transient and last_good_per_vin:
-                return [
-                    _build_vehicle_data_from_cache(vin) for vin in last_good_per_vin
-                ]
-            return None
-
-        # Step 2: fetch each vehicle's data independently, so a failure on
-        # one does not drop the others. Per-vehicle error recovery honors
-        # the retain-on-transient toggle.
-        vehicle_informations: list[VehicleData] = []
-        for vehicle in vehicles or []:
-            if not vehicle or vehicle.vin is None:
-                continue
-            vin = vehicle.vin
-            try:
-                vehicle_data = await _refresh_one_vehicle(vehicle)
-                last_good_per_vin[vin] = vehicle_data
-                vehicle_informations.append(vehicle_data)
-            except (
-                ToyotaApiError,
-                ToyotaInternalError,
-                httpx.ConnectTimeout,
-                httpcore.ConnectTimeout,
-                asyncioexceptions.CancelledError,
-                asyncioexceptions.TimeoutError,
-                httpx.ReadTimeout,
-                ValidationError,
-                TypeError,
-            ) as ex:
-                code = _error_code(ex)
-                last_error_per_vin[vin] = (dt_util.now(), code)
+                vehicles = roster.vehicles
+            elif retain_on_transient and last_good_per_vin:
+                # No roster yet (first cycle after a reload), but the cached
+                # fleet data carries usable Vehicle objects.
                 _LOGGER.warning(
-                    "Toyota refresh failed for vin=...%s (%s)", vin[-6:], code
+                    "Toyota get_vehicles failed (%s); using cached fleet data", code
                 )
-                if retain_on_transient and vin in last_good_per_vin:
-                    # retain=ON + cache available: serve stale cached data.
-                    vehicle_informations.append(_build_vehicle_data_from_cache(vin))
-                else:
-                    # retain=OFF OR retain=ON with no cache yet: emit a stub
-                    # VehicleData. The Vehicle object came from get_vehicles()
-                    # so it has identity (vin, alias, device info) but no
-                    # endpoint data because vehicle.update() failed. Data
-                    # sensors read through a ToyotaBaseEntity.available
-                    # override that checks last_successful_fetch, so stubs
-                    # render as unavailable without raising UpdateFailed for
-                    # the whole refresh. Siblings that succeeded this cycle
-                    # keep their fresh data - per-vehicle fault isolation.
-                    vehicle_informations.append(
-                        VehicleData(
-                            data=vehicle,
-                            statistics=None,
-                            metric_values=metric_values,
-                            last_successful_fetch=None,
-                            last_error_time=dt_util.now(),
-                            last_error_code=code,
-                            is_cached=False,
-                        )
-                    )
+                vehicles = [vd["data"] for vd in last_good_per_vin.values()]
+            else:
+                msg = f"Toyota get_vehicles failed: {ex}"
+                raise UpdateFailed(msg) from ex
+
+        current_vins = [v.vin for v in vehicles if v and v.vin is not None]
+        for vin in vin_coordinators.keys() - set(current_vins):
+            # Its entities go away with the reload _check_fleet_membership
+            # schedules; its coordinator stops polling now.
+            fleet_listener_unsubs.pop(vin)()
+            await vin_coordinators.pop(vin).async_shutdown()
+        added = [vin for vin in current_vins if vin not in vin_coordinators]
+        for vin in added:
+            _add_vin_coordinator(vin)
+        if added:
+            await asyncio.gather(
+                *(vin_coordinators[vin].async_refresh() for vin in added)
+            )
 
+        fleet = _fleet_data()
         # If nothing useful to serve (no fresh fetch anywhere, no cache either),
-        # match upstream behaviour: raise UpdateFailed so the coordinator flips
-        # last_update_success=False and all data sensors become unavailable.
-        # Diag sensors stay visible via their own always_available override.
-        any_served = any(
-            vd.get("is_cached") or vd.get("last_successful_fetch") is not None
-            for vd in vehicle_informations
-        )
-        if not any_served:
+        # match upstream behaviour: raise UpdateFailed, which on first refresh
+        # becomes ConfigEntryNotReady so HA retries setup with backoff.
+        if not any(
+            vd["is_cached"] or vd["last_successful_fetch"] is not None for vd in fleet
+        ):
             msg = "Toyota refresh failed for all vehicles"
             raise UpdateFailed(msg)
+        return fleet
 
-        # Commit per-VIN fetch timestamps now that the refresh has survived
-        # all exception paths. This is the only place last_fetch_time_per_vin
-        # is written to keep it consistent with coordinator.data: both are
-        # updated iff the whole refresh succeeds. Cached entries (from the
-        # retain=ON path) carry None last_successful_fetch and are skipped.
-        for vd in vehicle_informations:
-            if vd.get("is_cached"):
-                continue
-            vin = vd["data"].vin if vd.get("data") else None
-            fetched = vd.get("last_successful_fetch")
-            if vin and fetched is not None:
-                last_fetch_time_per_vin[vin] = fetched
-
-        _LOGGER.debug(vehicle_informations)
-        return vehicle_informations
-
+    # Account-level coordinator. Its data is the aggregated fleet list that
+    # platform setup enumerates; entities bind to their car's coordinator
+    # (see ToyotaBaseEntity) so one car's refresh never wakes the listeners
+    # of another.
     coordinator = DataUpdateCoordinator(
         hass,
         _LOGGER,
+        config_entry=entry,
         name=DOMAIN,
-        update_method=async_get_vehicle_data,
-        update_interval=timedelta(minutes=polling_interval_minutes),
+        update_method=async_update_fleet,
+        update_interval=ACCOUNT_REFRESH_INTERVAL,
+    )
+    # A service call (or a button press) for a car whose targeted refresh is
+    # still running joins it.
+    targeted_refreshes = TargetedRefreshes(
+        coordinators=vin_coordinators,
+        lock_for=_vin_lock,
+        pending=pending_service_calls,
+        request_fleet_refresh=coordinator.async_request_refresh,
+        create_task=partial(entry.async_create_background_task, hass),
     )
 
-    # Attach the per-VIN diagnostic dicts to the coordinator so sensors can read
-    # them even when coordinator.data is stale after UpdateFailed. The dicts are
-    # updated in the refresh function's exception handlers BEFORE UpdateFailed
-    # fires, so they carry the freshest error/timestamp info irrespective of
-    # the retain_on_transient toggle. Diag sensors bind via
-    # getattr(coordinator, "_diag_last_fetch_per_vin" / "_diag_last_error_per_vin").
-    coordinator._diag_last_fetch_per_vin = last_fetch_time_per_vin  # noqa: SLF001
-    coordinator._diag_last_error_per_vin = last_error_per_vin  # noqa: SLF001
-    coordinator._diag_status_occurrence_per_vin = diag_bucket[  # noqa: SLF001
-        "last_status_occurrence_date_per_vin"
-    ]
-    coordinator._diag_status_refresh_state_per_vin = diag_bucket[  # noqa: SLF001
-        "last_status_refresh_state_per_vin"
-    ]
+    coordinator._vin_coordinators = vin_coordinators  # noqa: SLF001
+    coordinator._auth_manager = auth  # noqa: SLF001
+    coordinator._roster = roster  # noqa: SLF001
+    coordinator._pacer = client._api.controller.pacer  # noqa: SLF001
+    coordinator._statistics_importer = statistics_importer  # noqa: SLF001
+    coordinator._backfill = backfill  # noqa: SLF001
+    coordinator._trip_store = trip_store  # noqa: SLF001
+    coordinator._trip_collector = trip_collector  # noqa: SLF001
+    coordinator._local_summaries = local_summaries  # noqa: SLF001
+    coordinator._location_history = location_history  # noqa: SLF001
+    coordinator._learned_state = learned_state  # noqa: SLF001
+    coordinator._cache_backend = cache_backend  # noqa: SLF001
+    coordinator._geofence = geofence  # noqa: SLF001
+    coordinator._charging_sessions = charging_sessions  # noqa: SLF001
+    coordinator._telemetry = telemetry  # noqa: SLF001
+    # Entry point for toyota.refresh_vehicle_status (see the service handler).
+    coordinator._refresh_vins = targeted_refreshes.async_start  # noqa: SLF001
 
     await coordinator.async_config_entry_first_refresh()
 
@@ -914,6 +1603,18 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Platforms create entities once, so a car joining or leaving the
+    # account needs a reload to add or drop its device.
+    setup_vins = set(vin_coordinators)
+
+    @callback
+    def _check_fleet_membership() -> None:
+        if set(vin_coordinators) != setup_vins:
+            _LOGGER.info("Toyota fleet changed; reloading %s", entry.title)
+            hass.config_entries.async_schedule_reload(entry.entry_id)
+
+    entry.async_on_unload(coordinator.async_add_listener(_check_fleet_membership))
+
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     await _async_register_services(hass)
@@ -923,6 +1624,39 @@ async def async_setup_entry(  # pylint: disable=too-many-statements # noqa: PLR0
 
 SERVICE_REFRESH_VEHICLE_STATUS = "refresh_vehicle_status"
 ATTR_TIMEOUT_SECONDS = "timeout_seconds"
+SERVICE_QUERY_TRIPS = "query_trips"
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+QUERY_TRIPS_SCHEMA = vol.Schema(
+    {
+        vol.Required("device_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("weekdays", default=[]): vol.All(
+            cv.ensure_list, [vol.In(WEEKDAYS)]
+        ),
+        vol.Optional("group_by", default="none"): vol.In(QUERY_GROUPS),
+        vol.Optional("source", default="trips"): vol.In(QUERY_SOURCES),
+    }
+)
+SERVICE_LOCATION_HISTORY = "location_history"
+LOCATION_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required("device_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+    }
+)
+SERVICE_EXPORT_DATA = "export_data"
+EXPORT_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required("device_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("filename"): cv.string,
+        vol.Optional("format", default="ndjson"): vol.In(EXPORT_FORMATS),
+        vol.Optional("include", default=list(EXPORT_KINDS)): vol.All(
+            cv.ensure_list, [vol.In(EXPORT_KINDS)]
+        ),
+    }
+)
 
 
 def _resolve_devices_to_vins_per_entry(
@@ -957,14 +1691,19 @@ def _resolve_devices_to_vins_per_entry(
     return per_entry_vins
 
 
-async def _async_register_services(hass: HomeAssistant) -> None:
-    """Register the toyota.refresh_vehicle_status service exactly once.
+async def _async_register_services(hass: HomeAssistant) -> None:  # noqa: C901, PLR0915
+    """Register the integration's services exactly once.
 
     Service handlers resolve their target devices to VINs via the device
-    registry, set a per-VIN flag in each entry's diag bucket, and trigger
-    an immediate coordinator refresh. The smart strategy then picks up
-    user_service_call_pending=True on the next cycle (within seconds), so
-    the wake POST happens out-of-band of the normal polling cadence.
+    registry and start a targeted refresh of only those VINs in each entry:
+    a per-VIN pending flag is set in the diag bucket, the smart strategy
+    picks up user_service_call_pending=True for that car, and only that car's
+    coordinator refreshes; the rest of the fleet keeps its own schedule.
+    Calls for a VIN whose targeted refresh is still running join it.
+
+    toyota.query_trips and toyota.location_history answer from each entry's
+    local trip store and location history only; toyota.export_data streams
+    those and the cars' telemetry and strategy traces to a file.
     """
     if hass.services.has_service(DOMAIN, SERVICE_REFRESH_VEHICLE_STATUS):
         return
@@ -990,25 +1729,150 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         )
         per_entry_vins = _resolve_devices_to_vins_per_entry(hass, device_ids)
         for entry_id, vins in per_entry_vins.items():
-            entry_diag = hass.data[DOMAIN].get(f"{entry_id}_diag")
-            if entry_diag is None:
-                continue
-            pending = entry_diag.setdefault("pending_service_calls", {})
-            for vin in vins:
-                pending[vin] = timeout_seconds
             coord = hass.data[DOMAIN].get(entry_id)
-            if coord is not None:
-                # Schedule an immediate refresh; the strategy will read the
-                # pending flag and POST. We don't await here because the
-                # refresh chain can take ~25s (poll loop) and HA service
-                # calls block the calling automation by default.
-                hass.async_create_task(coord.async_request_refresh())
+            refresh_vins = getattr(coord, "_refresh_vins", None)
+            if refresh_vins is None:
+                continue
+            # Starts a background refresh of just these cars; the strategy
+            # reads the pending flag and POSTs. Not awaited because the wake
+            # poll can take ~25s+ and HA service calls block the calling
+            # automation by default.
+            refresh_vins(vins, timeout_seconds)
+
+    def _local(value: datetime) -> datetime:
+        # Naive datetimes from the UI are in the configured time zone.
+        if value.tzinfo is None:
+            return value.replace(tzinfo=dt_util.get_default_time_zone())
+        return value
+
+    async def _handle_query_trips(call: ServiceCall) -> ServiceResponse:
+        start = _local(call.data["start"])
+        end = _local(call.data["end"]) if "end" in call.data else dt_util.now()
+        if start >= end:
+            msg = "query_trips: start must be before end"
+            raise ServiceValidationError(msg)
+        if call.data["source"] == "days" and call.data["group_by"] == "hour":
+            msg = "query_trips: daily summaries cannot be grouped by hour"
+            raise ServiceValidationError(msg)
+        weekdays = [WEEKDAYS.index(day) for day in call.data["weekdays"]]
+        vehicles: list[dict[str, Any]] = []
+        per_entry_vins = _resolve_devices_to_vins_per_entry(
+            hass, call.data["device_id"]
+        )
+        for entry_id, vins in per_entry_vins.items():
+            store: TripStore | None = getattr(
+                hass.data[DOMAIN].get(entry_id), "_trip_store", None
+            )
+            if store is None:
+                continue
+            for vin in dict.fromkeys(vins):
+                result = await hass.async_add_executor_job(
+                    partial(
+                        store.query,
+                        vin,
+                        start,
+                        end,
+                        weekdays=weekdays,
+                        group_by=call.data["group_by"],
+                        source=call.data["source"],
+                    )
+                )
+                coverage = await hass.async_add_executor_job(store.coverage, vin)
+                vehicles.append(
+                    {"vin": vin, **result, "coverage": coverage[call.data["source"]]}
+                )
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "vehicles": vehicles,
+        }
+
+    async def _handle_location_history(call: ServiceCall) -> ServiceResponse:
+        start = _local(call.data["start"]) if "start" in call.data else None
+        end = _local(call.data["end"]) if "end" in call.data else None
+        if start is not None and end is not None and start >= end:
+            msg = "location_history: start must be before end"
+            raise ServiceValidationError(msg)
+        vehicles: list[dict[str, Any]] = []
+        per_entry_vins = _resolve_devices_to_vins_per_entry(
+            hass, call.data["device_id"]
+        )
+        for entry_id, vins in per_entry_vins.items():
+            history: LocationHistory | None = getattr(
+                hass.data[DOMAIN].get(entry_id), "_location_history", None
+            )
+            if history is None:
+                continue
+            vehicles.extend(
+                {"vin": vin, "points": history.points(vin, start, end)}
+                for vin in dict.fromkeys(vins)
+            )
+        return {"vehicles": vehicles}
+
+    async def _handle_export_data(call: ServiceCall) -> ServiceResponse:
+        fmt = call.data["format"]
+        try:
+            path = export_path(
+                hass, call.data.get("filename") or default_export_filename(fmt)
+            )
+        except ValueError as ex:
+            msg = f"export_data: {ex}"
+            raise ServiceValidationError(msg) from ex
+        per_entry_vins = _resolve_devices_to_vins_per_entry(
+            hass, call.data["device_id"]
+        )
+
+        async def _records() -> AsyncIterator[dict[str, Any]]:
+            for entry_id, vins in per_entry_vins.items():
+                coord = hass.data[DOMAIN].get(entry_id)
+                diag_bucket = hass.data[DOMAIN].get(f"{entry_id}_diag", {})
+                async for record in async_export_records(
+                    hass,
+                    dict.fromkeys(vins),
+                    kinds=call.data["include"],
+                    telemetry=getattr(coord, "_telemetry", None),
+                    location_history=getattr(coord, "_location_history", None),
+                    cycle_traces=diag_bucket.get("cycle_traces_per_vin"),
+                    trip_store=getattr(coord, "_trip_store", None),
+                ):
+                    yield record
+
+        try:
+            count = await async_write_export(
+                hass, path, _records(), compress=fmt == "gzip"
+            )
+        except OSError as ex:
+            msg = f"export_data: cannot write {path}: {ex}"
+            raise HomeAssistantError(msg) from ex
+        _LOGGER.info("toyota.export_data wrote %d records to %s", count, path)
+        return {"path": str(path), "records": count}
 
     hass.services.async_register(
         DOMAIN,
         SERVICE_REFRESH_VEHICLE_STATUS,
         _handle_refresh_vehicle_status,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_TRIPS,
+        _handle_query_trips,
+        schema=QUERY_TRIPS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_LOCATION_HISTORY,
+        _handle_location_history,
+        schema=LOCATION_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_DATA,
+        _handle_export_data,
+        schema=EXPORT_DATA_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
 
 
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
@@ -1024,3 +1888,27 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the entry's persisted tokens, checkpoints, trips, locations and models."""
+    await Store(
+        hass, TOKEN_STORAGE_VERSION, token_store_key(entry.entry_id)
+    ).async_remove()
+    await Store(
+        hass, BACKFILL_STORAGE_VERSION, backfill_store_key(entry.entry_id)
+    ).async_remove()
+    await Store(
+        hass,
+        LOCATION_HISTORY_STORAGE_VERSION,
+        location_history_store_key(entry.entry_id),
+    ).async_remove()
+    await Store(
+        hass, LEARNED_STATE_STORAGE_VERSION, learned_state_store_key(entry.entry_id)
+    ).async_remove()
+    await Store(
+        hass, TELEMETRY_STORAGE_VERSION, telemetry_store_key(entry.entry_id)
+    ).async_remove()
+    db_path = trip_db_path(hass, entry.entry_id)
+    for path in (db_path, Path(f"{db_path}-wal"), Path(f"{db_path}-shm")):
+        await hass.async_add_executor_job(partial(path.unlink, missing_ok=True))
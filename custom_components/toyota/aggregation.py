@@ -0,0 +1,362 @@
+"""Week/month/year trip aggregates computed from stored daily summaries.
+
+The statistics sensors used to cost four ``/v1/trips`` calls per refresh:
+the current day, week, month and year summaries. The week, month and year
+are just sums over days the trip store already holds, so once the store
+covers a period it is aggregated locally and only the current day is
+fetched.
+
+``DailyColumns`` keeps one car's days in compact ``array`` columns (an
+ordinal per day plus one float column per metric). Period sums are
+vectorised reductions over slices located by binary search: differences of
+one NumPy prefix sum per column when NumPy is importable, ``math.fsum``
+over the same slices otherwise. ``Calendar`` describes where weeks, months and years
+start, so ISO weeks, Sunday weeks and billing-style months (e.g. the 15th
+to the 14th) are all one ``period_bounds`` call away.
+
+``PeriodAggregate`` exposes the same attributes as a pytoyoda ``Summary``,
+so ``format_statistics_attributes`` and the statistics sensors take either.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with Home Assistant
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from homeassistant.core import HomeAssistant
+    from pytoyoda.models.summary import Summary
+
+    from .trip_store import TripStore
+
+_LOGGER = logging.getLogger(__name__)
+
+Period = Literal["day", "week", "month", "year"]
+_N = TypeVar("_N", float, timedelta)
+
+# Float columns of DailyColumns, in DayRow terms.
+COLUMNS = ("distance", "duration_s", "ev_distance", "ev_duration_s", "fuel_consumed")
+
+
+@dataclass(frozen=True, slots=True)
+class Calendar:
+    """Where periods start.
+
+    ``week_start`` is a ``date.weekday()`` (0 = Monday, as ISO weeks and
+    pytoyoda's current-week summary use). ``month_start_day`` (1-28) moves
+    month boundaries, ``year_start_month`` moves the start of the year.
+    """
+
+    week_start: int = 0
+    month_start_day: int = 1
+    year_start_month: int = 1
+
+
+ISO_CALENDAR = Calendar()
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return day.replace(year=index // 12, month=index % 12 + 1)
+
+
+def period_bounds(
+    day: date, period: Period, calendar: Calendar = ISO_CALENDAR
+) -> tuple[date, date]:
+    """Return the first and last day of the period containing ``day``."""
+    if period == "day":
+        return day, day
+    if period == "week":
+        start = day - timedelta(days=(day.weekday() - calendar.week_start) % 7)
+        return start, start + timedelta(days=6)
+    if period == "month":
+        start = day.replace(day=calendar.month_start_day)
+        if day.day < calendar.month_start_day:
+            start = _add_months(start, -1)
+        return start, _add_months(start, 1) - timedelta(days=1)
+    if period == "year":
+        start = date(day.year, calendar.year_start_month, calendar.month_start_day)
+        if day < start:
+            start = _add_months(start, -12)
+        return start, _add_months(start, 12) - timedelta(days=1)
+    msg = f"Unknown period {period!r}"
+    raise ValueError(msg)
+
+
+@dataclass(frozen=True, slots=True)
+class PeriodAggregate:
+    """Totals of one period, shaped like a pytoyoda ``Summary``."""
+
+    from_date: date
+    to_date: date
+    distance: float | None
+    duration: timedelta | None
+    ev_distance: float | None
+    ev_duration: timedelta | None
+    fuel_consumed: float
+    countries: list[str] | None
+    metric: bool = True
+
+    @property
+    def average_speed(self) -> float | None:
+        """Distance over driving time, in the distance unit per hour."""
+        if not self.distance or not self.duration:
+            return None
+        return self.distance / (self.duration.total_seconds() / 3600)
+
+    @property
+    def average_fuel_consumed(self) -> float:
+        """L/100 km when metric, otherwise miles per gallon."""
+        if not self.fuel_consumed or not self.distance:
+            return 0.0
+        if self.metric:
+            return round(self.fuel_consumed / self.distance * 100, 3)
+        return round(self.distance / self.fuel_consumed, 3)
+
+    def plus(self, summary: Summary | None) -> PeriodAggregate:
+        """Return the aggregate with one more (e.g. today's) summary added."""
+        if summary is None:
+            return self
+        countries = list(self.countries or [])
+        countries.extend(c for c in summary.countries or [] if c not in countries)
+        return replace(
+            self,
+            to_date=max(self.to_date, summary.to_date),
+            distance=_add(self.distance, summary.distance),
+            duration=_add(self.duration, summary.duration),
+            ev_distance=_add(self.ev_distance, summary.ev_distance),
+            ev_duration=_add(self.ev_duration, summary.ev_duration),
+            fuel_consumed=round(self.fuel_consumed + (summary.fuel_consumed or 0), 3),
+            countries=countries or None,
+        )
+
+
+def _add(a: _N | None, b: _N | None) -> _N | None:  # noqa: UP047
+    if a is None:
+        return b
+    return a if b is None else a + b
+
+
+class DailyColumns:
+    """One car's daily summaries as sorted, array-backed columns."""
+
+    __slots__ = ("_countries", "_days", "_values")
+
+    def __init__(self) -> None:
+        """Create empty columns."""
+        self._days = array("l")
+        self._values = {name: array("d") for name in COLUMNS}
+        # Sparse: most days are driven in a single country and the API
+        # rarely reports countries at all.
+        self._countries: dict[int, tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of stored days."""
+        return len(self._days)
+
+    def append(
+        self, day: date, countries: Sequence[str] = (), **values: float | None
+    ) -> None:
+        """Add a day after every day already stored; missing values are 0."""
+        ordinal = day.toordinal()
+        if self._days and ordinal <= self._days[-1]:
+            msg = "Days must be appended in ascending order"
+            raise ValueError(msg)
+        self._days.append(ordinal)
+        for name, column in self._values.items():
+            column.append(values.get(name) or 0.0)
+        if countries:
+            self._countries[ordinal] = tuple(countries)
+
+    def _sums(self, bounds: Sequence[tuple[int, int]]) -> dict[str, list[float]]:
+        """Sum every column over each ``[lo, hi)`` index range."""
+        if np is not None and bounds:
+            starts = np.fromiter((lo for lo, _ in bounds), dtype=np.intp)
+            ends = np.fromiter((hi for _, hi in bounds), dtype=np.intp)
+            sums: dict[str, list[float]] = {}
+            for name, column in self._values.items():
+                # One prefix sum per column answers every range at once;
+                # frombuffer views the array without copying it.
+                cumulative = np.concatenate(
+                    ([0.0], np.cumsum(np.frombuffer(column, dtype=np.float64)))
+                )
+                sums[name] = (cumulative[ends] - cumulative[starts]).tolist()
+            return sums
+        return {
+            name: [math.fsum(column[lo:hi]) for lo, hi in bounds]
+            for name, column in self._values.items()
+        }
+
+    def _range(self, start: date, end: date) -> tuple[int, int]:
+        return (
+            bisect_left(self._days, start.toordinal()),
+            bisect_right(self._days, end.toordinal()),
+        )
+
+    def _aggregate(
+        self,
+        period: tuple[date, date],
+        index: tuple[int, int],
+        sums: dict[str, float],
+        *,
+        metric: bool,
+    ) -> PeriodAggregate:
+        start, end = period
+        lo, hi = index
+        countries: list[str] = []
+        if self._countries:
+            for ordinal in self._days[lo:hi]:
+                countries.extend(
+                    c for c in self._countries.get(ordinal, ()) if c not in countries
+                )
+        return PeriodAggregate(
+            from_date=start,
+            to_date=end,
+            distance=round(sums["distance"], 3) or None,
+            duration=timedelta(seconds=sums["duration_s"]) or None,
+            ev_distance=round(sums["ev_distance"], 3) or None,
+            ev_duration=timedelta(seconds=sums["ev_duration_s"]) or None,
+            fuel_consumed=round(sums["fuel_consumed"], 3),
+            countries=countries or None,
+            metric=metric,
+        )
+
+    def totals(
+        self, start: date, end: date, *, metric: bool = True
+    ) -> PeriodAggregate | None:
+        """Aggregate the days in ``[start, end]``; None if none are stored."""
+        lo, hi = self._range(start, end)
+        if lo >= hi:
+            return None
+        sums = {name: values[0] for name, values in self._sums([(lo, hi)]).items()}
+        return self._aggregate((start, end), (lo, hi), sums, metric=metric)
+
+    def period_totals(
+        self,
+        period: Period,
+        calendar: Calendar = ISO_CALENDAR,
+        *,
+        metric: bool = True,
+    ) -> list[PeriodAggregate]:
+        """Aggregate every period that has stored days, oldest first."""
+        if not self._days:
+            return []
+        periods: list[tuple[date, date]] = []
+        last = date.fromordinal(self._days[-1])
+        start, end = period_bounds(date.fromordinal(self._days[0]), period, calendar)
+        while start <= last:
+            periods.append((start, end))
+            start, end = period_bounds(end + timedelta(days=1), period, calendar)
+        bounds = [self._range(start, end) for start, end in periods]
+        sums = self._sums(bounds)
+        return [
+            self._aggregate(
+                periods[i],
+                index,
+                {name: values[i] for name, values in sums.items()},
+                metric=metric,
+            )
+            for i, index in enumerate(bounds)
+            if index[0] < index[1]
+        ]
+
+
+class LocalPeriodSummaries:
+    """Serve the current week/month/year of a car from its trip store.
+
+    A period is served locally only when the store's contiguous coverage
+    reaches from the period's first day through yesterday; otherwise the
+    caller keeps fetching it from Toyota. Columns are reloaded only when
+    the store has recorded new days for the car.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        store: TripStore,
+        *,
+        metric_values: bool,
+        calendar: Calendar = ISO_CALENDAR,
+    ) -> None:
+        """Initialise an empty cache over the entry's trip store."""
+        self._hass = hass
+        self._store = store
+        self._metric_values = metric_values
+        self._calendar = calendar
+        # vin -> (store generation, columns, covered span)
+        self._cache: dict[str, tuple[int, DailyColumns, tuple[date, date] | None]] = {}
+        self._stats: Counter[str] = Counter()
+
+    async def async_current(
+        self,
+        vin: str,
+        today: date,
+        today_summary: Summary | None,
+        periods: Iterable[Period] = ("week", "month", "year"),
+    ) -> dict[Period, PeriodAggregate | None]:
+        """Return the periods (containing ``today``) that can be served locally.
+
+        A period missing from the result must be fetched from Toyota. A
+        period mapped to None is covered but had no trips.
+        """
+        generation = self._store.generation(vin)
+        cached = self._cache.get(vin)
+        if cached is None or cached[0] != generation:
+            columns, span = await self._hass.async_add_executor_job(
+                self._store.daily_columns, vin
+            )
+            cached = self._cache[vin] = (generation, columns, span)
+        _, columns, span = cached
+
+        yesterday = today - timedelta(days=1)
+        result: dict[Period, PeriodAggregate | None] = {}
+        for period in periods:
+            start, _ = period_bounds(today, period, self._calendar)
+            if start < today and (
+                span is None or span[0] > start or span[1] < yesterday
+            ):
+                self._stats["remote"] += 1
+                continue
+            self._stats["local"] += 1
+            aggregate = columns.totals(start, yesterday, metric=self._metric_values)
+            if aggregate is None:
+                if today_summary is None:
+                    result[period] = None
+                    continue
+                aggregate = PeriodAggregate(
+                    from_date=start,
+                    to_date=start,
+                    distance=None,
+                    duration=None,
+                    ev_distance=None,
+                    ev_duration=None,
+                    fuel_consumed=0.0,
+                    countries=None,
+                    metric=self._metric_values,
+                )
+            result[period] = aggregate.plus(today_summary)
+        return result
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return local/remote period counters for the diagnostics download."""
+        return {
+            "numpy": np is not None,
+            "coverage": {
+                f"...{vin[-6:]}": [day.isoformat() for day in span] if span else None
+                for vin, (_, _, span) in self._cache.items()
+            },
+            **dict(self._stats),
+        }
@@ -0,0 +1,158 @@
+"""Single-flight authentication and token persistence for one Toyota account.
+
+pytoyoda renews the access token lazily: the first request that finds it
+expired logs in again. With parallel refreshes, wake tasks and climate
+polling, several coroutines hit expiry at the same moment and each start an
+OAuth round-trip. ``PooledController`` (transport.py) serialises those
+behind one lock; this manager adds the two things the controller can't do
+on its own:
+
+- Proactive renewal. ``async_ensure_fresh`` is called before every
+  coordinator cycle and renews when the token would expire within
+  ``TOKEN_RENEW_MARGIN``, so expiry never lands in the middle of a sweep.
+- Persistence. Tokens are written to ``.storage`` whenever pytoyoda stores
+  new ones and restored on setup, so a restart reuses the refresh token
+  instead of repeating the full username/password flow.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from pytoyoda.controller import Controller, TokenInfo
+from pytoyoda.exceptions import ToyotaLoginError
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from pytoyoda.client import MyT
+
+    from .transport import PooledController
+
+_LOGGER = logging.getLogger(__name__)
+
+TOKEN_STORAGE_VERSION = 1
+# Renew when less than this is left. Comfortably longer than a worst-case
+# fleet sweep (status + summaries + a service-call wake poll per car).
+TOKEN_RENEW_MARGIN = timedelta(minutes=10)
+TOKEN_SAVE_DELAY_S = 1
+
+
+def token_store_key(entry_id: str) -> str:
+    """Return the ``.storage`` key holding one entry's tokens."""
+    return f"{DOMAIN}.{entry_id}.tokens"
+
+
+class ToyotaAuthManager:
+    """Own login, proactive renewal and token persistence for one MyT client."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, client: MyT) -> None:
+        """Bind the manager to the client's pooled controller."""
+        self._controller: PooledController = client._api.controller  # noqa: SLF001
+        self._store: Store[dict[str, Any]] = Store(
+            hass, TOKEN_STORAGE_VERSION, token_store_key(entry_id), private=True
+        )
+        self._restored = False
+        self._controller.token_listener = self._on_token_updated
+
+    @property
+    def expiration(self) -> datetime | None:
+        """Return when the current access token expires."""
+        return self._controller._token_expiration  # noqa: SLF001
+
+    def _expires_within(self, margin: timedelta) -> bool:
+        expiration = self.expiration
+        return expiration is None or expiration - dt_util.utcnow() <= margin
+
+    async def async_restore(self) -> None:
+        """Seed the controller with tokens persisted by a previous run."""
+        data = await self._store.async_load()
+        controller = self._controller
+        if not data or data.get("username") != controller._username:  # noqa: SLF001
+            return
+        expiration = dt_util.parse_datetime(data.get("expiration") or "")
+        if expiration is None or not data.get("refresh_token"):
+            return
+        token_info = TokenInfo(
+            access_token=data["access_token"],
+            refresh_token=data["refresh_token"],
+            uuid=data["uuid"],
+            expiration=expiration,
+        )
+        controller._token_info = token_info  # noqa: SLF001
+        Controller._TOKEN_CACHE[controller._username] = token_info  # noqa: SLF001
+        self._restored = True
+
+    async def async_login(self) -> None:
+        """Restore persisted tokens, then log in only if they can't be used.
+
+        An expired access token with a valid refresh token is renewed through
+        the refresh grant; the full OAuth flow runs only when that fails.
+        """
+        await self.async_restore()
+        async with self._controller.auth_lock:
+            if self._expires_within(TOKEN_RENEW_MARGIN):
+                await self._async_renew()
+
+    async def async_ensure_fresh(self, margin: timedelta = TOKEN_RENEW_MARGIN) -> None:
+        """Renew ahead of expiry so a cycle never stalls on re-authentication."""
+        if not self._expires_within(margin):
+            return
+        controller = self._controller
+        if controller.auth_lock.locked():
+            controller.auth_stats["coalesced"] += 1
+        async with controller.auth_lock:
+            # Someone else may have renewed while we waited for the lock.
+            if not self._expires_within(margin):
+                return
+            controller.auth_stats["proactive_renewals"] += 1
+            await self._async_renew()
+
+    async def _async_renew(self) -> None:
+        """Refresh-token grant first, full authentication as the fallback.
+
+        Caller must hold ``auth_lock``.
+        """
+        controller = self._controller
+        controller.auth_stats["renewals"] += 1
+        if controller._refresh_token:  # noqa: SLF001
+            try:
+                await controller._refresh_tokens()  # noqa: SLF001
+            except ToyotaLoginError:
+                _LOGGER.debug("Toyota token refresh rejected, logging in again")
+            else:
+                return
+        controller.auth_stats["full_logins"] += 1
+        await controller._authenticate()  # noqa: SLF001
+
+    def _on_token_updated(self, token_info: TokenInfo) -> None:
+        """Persist new tokens (debounced; runs inside the event loop)."""
+        username = self._controller._username  # noqa: SLF001
+        self._store.async_delay_save(
+            lambda: {
+                "username": username,
+                "access_token": token_info.access_token,
+                "refresh_token": token_info.refresh_token,
+                "uuid": token_info.uuid,
+                "expiration": token_info.expiration.isoformat(),
+            },
+            TOKEN_SAVE_DELAY_S,
+        )
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return token-lifecycle counters (never the tokens themselves)."""
+        expiration = self.expiration
+        return {
+            "restored_from_storage": self._restored,
+            "expires_in_s": (
+                int((expiration - dt_util.utcnow()).total_seconds())
+                if expiration is not None
+                else None
+            ),
+            **dict(self._controller.auth_stats),
+        }
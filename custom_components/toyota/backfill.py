@@ -0,0 +1,304 @@
+"""Background backfill of historical trip statistics.
+
+``TripStatisticsImporter`` only reaches ``IMPORT_INITIAL_DAYS`` back and then
+moves forward one day at a time. Older history would take a burst of
+``/v1/trips`` calls, which Toyota throttles hard, so this module walks it
+backwards instead: one window of ``window_days`` per step, at most one step
+per car refresh, and only while no refresh or service call is running.
+
+Each step writes the window's days *before* the oldest row already in the
+database. Only differences between ``sum`` values matter to the recorder,
+so the older rows continue the series downwards from the oldest row's
+starting sum (going negative is fine) and the rows the importer writes
+later are left untouched.
+
+Progress is checkpointed per VIN in ``.storage``, so a restart resumes from
+the oldest day written rather than starting over.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import date, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+import httpcore
+import httpx
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from pydantic import ValidationError
+from pytoyoda.exceptions import ToyotaApiError, ToyotaInternalError
+from pytoyoda.models.summary import SummaryType
+
+from .const import DOMAIN
+from .statistics_import import DAILY_METRICS, IMPORT_INITIAL_DAYS, statistic_id
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from pytoyoda.models.summary import Summary
+    from pytoyoda.models.vehicle import Vehicle
+
+    from .statistics_import import TripStatisticsImporter
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKFILL_STORAGE_VERSION = 1
+BACKFILL_SAVE_DELAY_S = 10
+# Wait after the refresh that scheduled a step, so the step lands between
+# cycles instead of right behind the refresh's own requests.
+BACKFILL_IDLE_DELAY_S = 30
+# Never reach further back than this, even without a date of first use.
+BACKFILL_MAX_YEARS = 10
+# Stop once this many consecutive days returned no trips: either the car
+# wasn't driven yet or Toyota's trip retention ends there.
+BACKFILL_MAX_EMPTY_DAYS = 180
+
+
+def backfill_store_key(entry_id: str) -> str:
+    """Return the ``.storage`` key holding one entry's backfill checkpoints."""
+    return f"{DOMAIN}.{entry_id}.backfill"
+
+
+def backward_rows(
+    summaries: Iterable[Summary],
+    value_fn: Callable[[Summary], float | None],
+    *,
+    before: date,
+    sum_before: float,
+) -> tuple[list[tuple[date, float, float]], float]:
+    """Turn daily summaries older than ``before`` into ``(day, state, sum)`` rows.
+
+    ``sum_before`` is the running sum just before ``before`` (the oldest
+    row's ``sum - state``). Rows are returned in date order together with
+    the running sum before the oldest of them, which is the ``sum_before``
+    of the next, older window.
+    """
+    rows: list[tuple[date, float, float]] = []
+    running = sum_before
+    for summary in sorted(summaries, key=lambda s: s.from_date, reverse=True):
+        day = summary.from_date
+        if day >= before:
+            continue
+        value = value_fn(summary) or 0.0
+        rows.append((day, value, running))
+        running = round(running - value, 3)
+    rows.reverse()
+    return rows, running
+
+
+class TripHistoryBackfill:
+    """Walk one account's trip history backwards into long-term statistics."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        importer: TripStatisticsImporter,
+        *,
+        window_days: int,
+        is_busy: Callable[[], bool],
+        on_progress: Callable[[str], None],
+    ) -> None:
+        """Initialise the backfill; ``async_load`` restores the checkpoints."""
+        self._hass = hass
+        self._importer = importer
+        self._window_days = window_days
+        self._is_busy = is_busy
+        self._on_progress = on_progress
+        self._store: Store[dict[str, Any]] = Store(
+            hass, BACKFILL_STORAGE_VERSION, backfill_store_key(entry_id)
+        )
+        # Checkpoint per VIN: oldest_day written (ISO date), sums (running sum
+        # before oldest_day per metric), days_covered, calls, empty_days, done.
+        self.progress: dict[str, dict[str, Any]] = {}
+        # One step at a time for the whole account.
+        self._task: asyncio.Task[None] | None = None
+        self._stats: Counter[str] = Counter()
+
+    async def async_load(self) -> None:
+        """Restore the checkpoints of a previous run."""
+        data = await self._store.async_load()
+        if data:
+            self.progress.update(data.get("vehicles", {}))
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"vehicles": self.progress}
+
+    @callback
+    def async_schedule(self, entry: ConfigEntry, vehicle: Vehicle) -> None:
+        """Run the car's next backfill step in the background, if one is due.
+
+        Waits for the importer to be current, so the backfill always starts
+        from the importer's oldest row and never races its first import.
+        """
+        vin = vehicle.vin
+        if (
+            vin is None
+            or self._window_days <= 0
+            or "recorder" not in self._hass.config.components
+            or self.progress.get(vin, {}).get("done")
+        ):
+            return
+        if self._task is not None and not self._task.done():
+            return
+        yesterday = dt_util.now().date() - timedelta(days=1)
+        if self._importer.imported_through(vin) != yesterday:
+            return
+        self._task = entry.async_create_background_task(
+            self._hass,
+            self._async_step_when_idle(vehicle),
+            f"{DOMAIN} trip history backfill ...{vin[-6:]}",
+        )
+
+    async def _async_step_when_idle(self, vehicle: Vehicle) -> None:
+        await asyncio.sleep(BACKFILL_IDLE_DELAY_S)
+        if self._is_busy():
+            # The car's next successful refresh schedules it again.
+            self._stats["deferred"] += 1
+            return
+        await self.async_step(vehicle)
+
+    async def async_step(self, vehicle: Vehicle) -> None:
+        """Backfill one window of the car's history and checkpoint it."""
+        vin = vehicle.vin
+        if vin is None:
+            return
+        metrics = [m for m in DAILY_METRICS if m.capability_check(vehicle)]
+        checkpoint = self.progress.get(vin)
+        if checkpoint is None:
+            checkpoint = await self._async_anchor(vin, [m.key for m in metrics])
+            self.progress[vin] = checkpoint
+
+        oldest = date.fromisoformat(checkpoint["oldest_day"])
+        floor = self._floor(vehicle)
+        to_day = oldest - timedelta(days=1)
+        from_day = max(to_day - timedelta(days=self._window_days - 1), floor)
+        if from_day > to_day:
+            self._finish(vin, checkpoint)
+            return
+
+        try:
+            summaries = await vehicle.get_summary(
+                from_day, to_day, summary_type=SummaryType.DAILY
+            )
+        except (
+            ToyotaApiError,
+            ToyotaInternalError,
+            httpx.ConnectTimeout,
+            httpcore.ConnectTimeout,
+            httpx.ReadTimeout,
+            TimeoutError,
+            ValidationError,
+        ) as ex:
+            # The checkpoint is unchanged; the next step retries the window.
+            checkpoint["calls"] += 1
+            self._stats["failures"] += 1
+            _LOGGER.debug(
+                "Toyota history backfill for vin=...%s failed (%s)",
+                vin[-6:],
+                type(ex).__name__,
+            )
+            self._save(vin)
+            return
+
+        await self._importer.async_record_days(vin, summaries, (from_day, to_day))
+        sums: dict[str, float] = checkpoint["sums"]
+        for metric in metrics:
+            rows, sums[metric.key] = backward_rows(
+                summaries,
+                metric.value_fn,
+                before=oldest,
+                sum_before=sums.get(metric.key, 0.0),
+            )
+            if rows:
+                self._importer.add_statistics(vehicle, metric, rows)
+
+        days = (to_day - from_day).days + 1
+        checkpoint["calls"] += 1
+        checkpoint["oldest_day"] = from_day.isoformat()
+        checkpoint["days_covered"] += days
+        checkpoint["empty_days"] = 0 if summaries else checkpoint["empty_days"] + days
+        self._stats["windows"] += 1
+        if from_day <= floor or checkpoint["empty_days"] >= BACKFILL_MAX_EMPTY_DAYS:
+            self._finish(vin, checkpoint)
+            return
+        self._save(vin)
+
+    async def _async_anchor(self, vin: str, keys: list[str]) -> dict[str, Any]:
+        """Build a car's first checkpoint from the oldest imported rows."""
+        stat_ids = {statistic_id(vin, key): key for key in keys}
+        result = await get_instance(self._hass).async_add_executor_job(
+            partial(
+                statistics_during_period,
+                self._hass,
+                dt_util.utc_from_timestamp(0),
+                None,
+                set(stat_ids),
+                "hour",
+                None,
+                {"state", "sum"},
+            )
+        )
+        # Without rows the importer has been current (and found no trips)
+        # since its initial window.
+        oldest = dt_util.now().date() - timedelta(days=IMPORT_INITIAL_DAYS)
+        sums = dict.fromkeys(keys, 0.0)
+        for stat_id, rows in result.items():
+            if not rows or stat_id not in stat_ids:
+                continue
+            row = rows[0]
+            start = dt_util.as_local(dt_util.utc_from_timestamp(row["start"]))
+            oldest = min(oldest, start.date())
+            sums[stat_ids[stat_id]] = round(
+                (row.get("sum") or 0.0) - (row.get("state") or 0.0), 3
+            )
+        return {
+            "oldest_day": oldest.isoformat(),
+            "sums": sums,
+            "days_covered": 0,
+            "calls": 0,
+            "empty_days": 0,
+            "done": False,
+        }
+
+    def _floor(self, vehicle: Vehicle) -> date:
+        """Return the oldest day worth asking Toyota about."""
+        floor = dt_util.now().date() - timedelta(days=365 * BACKFILL_MAX_YEARS)
+        first_use = getattr(vehicle._vehicle_info, "date_of_first_use", None)  # noqa: SLF001
+        if isinstance(first_use, date):
+            floor = max(floor, first_use)
+        return floor
+
+    def _finish(self, vin: str, checkpoint: dict[str, Any]) -> None:
+        checkpoint["done"] = True
+        _LOGGER.info(
+            "Toyota history backfill for vin=...%s complete back to %s (%d calls)",
+            vin[-6:],
+            checkpoint["oldest_day"],
+            checkpoint["calls"],
+        )
+        self._save(vin)
+
+    def _save(self, vin: str) -> None:
+        self._store.async_delay_save(self._data_to_save, BACKFILL_SAVE_DELAY_S)
+        self._on_progress(vin)
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return backfill progress for the diagnostics download."""
+        return {
+            "window_days": self._window_days,
+            "vehicles": {
+                f"...{vin[-6:]}": {k: v for k, v in checkpoint.items() if k != "sums"}
+                for vin, checkpoint in self.progress.items()
+            },
+            **dict(self._stats),
+        }
@@ -0,0 +1,477 @@
+"""Shared response cache for Home Assistant instances using one Toyota account.
+
+Two Home Assistant installations (production and staging, say) configured
+with the same account each fetch and wake every car, doubling the account's
+request rate into Toyota's 429s. The fetch broker (fetch_broker.py) already
+lets entries of one instance share a car's fetch; a cache backend extends
+that across instances. The instance holding a car's lease fetches and
+writes the result; the others read it.
+
+A backend is a small key/value store with per-key TTLs and a set-if-absent,
+chosen per entry with the ``shared_cache_url`` option:
+
+* empty (default): ``MemoryCacheBackend``, private to the entry, so
+  nothing is shared beyond what the fetch broker does in-process;
+* ``file:///path/to/dir``: ``FileCacheBackend``, one JSON file per key in
+  a directory every instance can reach (a shared volume);
+* ``redis://[:password@]host[:port][/db]`` (``rediss://`` for TLS):
+  ``RespCacheBackend``, any server speaking the Redis protocol. The client
+  is a minimal RESP implementation on asyncio streams using GET, SET (PX,
+  NX) and DEL only, so no extra dependency is needed.
+
+Leases are a key set-if-absent with the lease TTL and the owner's token as
+value, released by deleting the key if it still holds that token. Release
+is a read and a delete, not one atomic step; a lease that expires in
+between may be deleted for its next owner, which costs at most one
+duplicate fetch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar, Protocol
+from urllib.parse import quote, unquote, urlsplit
+
+from homeassistant.util.ssl import get_default_context
+
+if TYPE_CHECKING:
+    import ssl
+    from datetime import timedelta
+
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Every key is stored under this prefix, so the store can be shared with
+# other applications.
+CACHE_KEY_PREFIX = "toyota:"
+RESP_DEFAULT_PORT = 6379
+# Connect plus one command; a slower store is treated as down.
+RESP_TIMEOUT_S = 5
+
+# A decoded RESP reply.
+_Reply = str | int | list[Any] | None
+
+
+class CacheBackendError(Exception):
+    """The cache store refused a command."""
+
+
+# Errors a backend may raise; the fetch broker falls back to fetching.
+CACHE_BACKEND_ERRORS = (CacheBackendError, OSError, TimeoutError)
+
+
+class CacheBackend(Protocol):
+    """Key/value store with per-key TTLs shared by the instances."""
+
+    # False for a store no other instance can see.
+    shared: ClassVar[bool]
+
+    async def async_get(self, key: str) -> str | None:
+        """Return the key's value, or None if absent or expired."""
+
+    async def async_set(
+        self, key: str, value: str, ttl: timedelta, *, only_if_absent: bool = False
+    ) -> bool:
+        """Store the value for ``ttl``; return False if ``only_if_absent`` lost."""
+
+    async def async_delete(self, key: str) -> None:
+        """Remove the key."""
+
+    async def async_close(self) -> None:
+        """Release the backend's connections."""
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the backend's counters for the diagnostics download."""
+
+
+class MemoryCacheBackend:
+    """Process-local store; the default when nothing is shared."""
+
+    shared: ClassVar[bool] = False
+
+    def __init__(self) -> None:
+        """Create an empty store."""
+        # key -> (value, expires at in monotonic seconds)
+        self._data: dict[str, tuple[str, float]] = {}
+
+    async def async_get(self, key: str) -> str | None:
+        """Return the key's value, or None if absent or expired."""
+        item = self._data.get(key)
+        if item is None or item[1] <= time.monotonic():
+            return None
+        return item[0]
+
+    async def async_set(
+        self, key: str, value: str, ttl: timedelta, *, only_if_absent: bool = False
+    ) -> bool:
+        """Store the value for ``ttl``; return False if ``only_if_absent`` lost."""
+        if only_if_absent and await self.async_get(key) is not None:
+            return False
+        self._data[key] = (value, time.monotonic() + ttl.total_seconds())
+        return True
+
+    async def async_delete(self, key: str) -> None:
+        """Remove the key."""
+        self._data.pop(key, None)
+
+    async def async_close(self) -> None:
+        """Drop the stored values."""
+        self._data.clear()
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the backend kind and its key count."""
+        return {"backend": "memory", "keys": len(self._data)}
+
+
+class FileCacheBackend:
+    """One JSON file per key in a directory shared by the instances.
+
+    Expiry uses the wall clock, so the instances' clocks should agree to
+    within a few seconds. Files are written under a temporary name and
+    moved into place, so a reader never sees half a value.
+    """
+
+    shared: ClassVar[bool] = True
+
+    def __init__(self, hass: HomeAssistant, directory: Path) -> None:
+        """Use ``directory``, created on the first write."""
+        self._hass = hass
+        self._directory = directory
+        self._stats: Counter[str] = Counter()
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{quote(CACHE_KEY_PREFIX + key, safe='')}.json"
+
+    def _read(self, key: str) -> str | None:
+        try:
+            text = self._path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        return self._value(text)
+
+    def _value(self, text: str) -> str | None:
+        """Return the value a file holds, None if expired or unreadable."""
+        try:
+            item = json.loads(text)
+            if item["expires_at"] <= time.time():
+                return None
+            value = item["value"]
+        except (ValueError, KeyError, TypeError):
+            # Truncated or edited by hand: a miss, as a bad RESP payload is.
+            self._stats["unreadable"] += 1
+            return None
+        return value if isinstance(value, str) else None
+
+    def _write(
+        self, key: str, value: str, ttl_s: float, *, only_if_absent: bool
+    ) -> bool:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        temp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        temp.write_text(
+            json.dumps({"value": value, "expires_at": time.time() + ttl_s}),
+            encoding="utf-8",
+        )
+        try:
+            if not only_if_absent:
+                temp.replace(path)
+                return True
+            # A second try follows the eviction of an expired value.
+            for _attempt in range(2):
+                try:
+                    # A hard link fails if the key exists: the atomic "if absent".
+                    os.link(temp, path)
+                except FileExistsError:
+                    if not self._evict_expired(path):
+                        return False
+                else:
+                    return True
+            return False
+        finally:
+            temp.unlink(missing_ok=True)
+
+    def _evict_expired(self, path: Path) -> bool:
+        """Remove ``path`` if it holds an expired value; return whether it's gone.
+
+        Two instances that both read the expired value must not each unlink
+        it, or the slower one removes the lease the faster one just linked.
+        The file is moved to a tombstone of this call's own instead, which
+        only one instance can do for a given file, and put back if what it
+        moved is not the expired value it read.
+        """
+        try:
+            seen = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return True
+        if self._value(seen) is not None:
+            return False
+        tomb = path.with_name(f".{path.name}.{uuid.uuid4().hex}.dead")
+        try:
+            path.replace(tomb)
+        except FileNotFoundError:
+            # Another instance evicted it first.
+            return True
+        try:
+            if tomb.read_text(encoding="utf-8") == seen:
+                return True
+            # A value written since the read: restore it unless a newer one
+            # has already taken the key.
+            with contextlib.suppress(FileExistsError):
+                os.link(tomb, path)
+            return False
+        finally:
+            tomb.unlink(missing_ok=True)
+
+    async def async_get(self, key: str) -> str | None:
+        """Return the key's value, or None if absent or expired."""
+        self._stats["reads"] += 1
+        return await self._hass.async_add_executor_job(self._read, key)
+
+    async def async_set(
+        self, key: str, value: str, ttl: timedelta, *, only_if_absent: bool = False
+    ) -> bool:
+        """Store the value for ``ttl``; return False if ``only_if_absent`` lost."""
+        self._stats["writes"] += 1
+        return await self._hass.async_add_executor_job(
+            partial(
+                self._write,
+                key,
+                value,
+                ttl.total_seconds(),
+                only_if_absent=only_if_absent,
+            )
+        )
+
+    async def async_delete(self, key: str) -> None:
+        """Remove the key."""
+        await self._hass.async_add_executor_job(
+            partial(self._path(key).unlink, missing_ok=True)
+        )
+
+    async def async_close(self) -> None:
+        """Nothing to release; the files outlive the entry on purpose."""
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the backend kind and its request counters."""
+        return {"backend": "file", **dict(self._stats)}
+
+
+class RespCacheBackend:
+    """Minimal Redis-protocol client over one asyncio stream.
+
+    Commands are serialised on the connection. A network error or timeout
+    drops the connection; the next command reconnects.
+    """
+
+    shared: ClassVar[bool] = True
+
+    def __init__(
+        self,
+        host: str,
+        port: int = RESP_DEFAULT_PORT,
+        *,
+        password: str | None = None,
+        db: int = 0,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        """Configure the server; the connection opens on the first command."""
+        self._host = host
+        self._port = port
+        self._password = password
+        self._db = db
+        self._ssl_context = ssl_context
+        self._stream: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None = None
+        self._lock = asyncio.Lock()
+        self._stats: Counter[str] = Counter()
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        self._stats["connections"] += 1
+        stream = await asyncio.open_connection(
+            self._host, self._port, ssl=self._ssl_context
+        )
+        try:
+            if self._password:
+                await _round_trip(stream, "AUTH", self._password)
+            if self._db:
+                await _round_trip(stream, "SELECT", str(self._db))
+        except BaseException:
+            await _close(stream[1])
+            raise
+        return stream
+
+    async def _command(self, *args: str) -> _Reply:
+        async with self._lock:
+            self._stats["commands"] += 1
+            try:
+                async with asyncio.timeout(RESP_TIMEOUT_S):
+                    if self._stream is None:
+                        self._stream = await self._connect()
+                    return await _round_trip(self._stream, *args)
+            except CacheBackendError:
+                self._stats["errors"] += 1
+                raise
+            except BaseException as err:
+                # The reply stream is out of step (or gone): start afresh. A
+                # cancel between sending and reading also leaves a reply
+                # unread, which the next command would take for its own.
+                if isinstance(err, OSError | TimeoutError):
+                    self._stats["errors"] += 1
+                await self._disconnect()
+                raise
+
+    async def _disconnect(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            await _close(stream[1])
+
+    async def async_get(self, key: str) -> str | None:
+        """Return the key's value, or None if absent or expired."""
+        reply = await self._command("GET", CACHE_KEY_PREFIX + key)
+        return reply if isinstance(reply, str) else None
+
+    async def async_set(
+        self, key: str, value: str, ttl: timedelta, *, only_if_absent: bool = False
+    ) -> bool:
+        """Store the value for ``ttl``; return False if ``only_if_absent`` lost."""
+        args = ["SET", CACHE_KEY_PREFIX + key, value, "PX"]
+        args.append(str(max(1, round(ttl.total_seconds() * 1000))))
+        if only_if_absent:
+            args.append("NX")
+        return await self._command(*args) is not None
+
+    async def async_delete(self, key: str) -> None:
+        """Remove the key."""
+        await self._command("DEL", CACHE_KEY_PREFIX + key)
+
+    async def async_close(self) -> None:
+        """Close the connection."""
+        async with self._lock:
+            await self._disconnect()
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the backend kind and its request counters."""
+        return {
+            "backend": "resp",
+            "tls": self._ssl_context is not None,
+            "connected": self._stream is not None,
+            **dict(self._stats),
+        }
+
+
+async def _round_trip(
+    stream: tuple[asyncio.StreamReader, asyncio.StreamWriter], *args: str
+) -> _Reply:
+    """Send one command and read its reply."""
+    reader, writer = stream
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg.encode()
+        parts.append(b"$%d\r\n%b\r\n" % (len(data), data))
+    writer.write(b"".join(parts))
+    await writer.drain()
+    return await _read_reply(reader)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> _Reply:
+    try:
+        line = await reader.readuntil(b"\r\n")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise CacheBackendError(rest.decode())
+        if kind not in (b":", b"$", b"*"):
+            msg = f"unexpected reply from cache server: {line[:32]!r}"
+            raise ConnectionError(msg)
+        number = int(rest)
+        if kind == b":":
+            return number
+        if number < 0:
+            return None
+        if kind == b"$":
+            return (await reader.readexactly(number + 2))[:-2].decode()
+        return [await _read_reply(reader) for _ in range(number)]
+    except asyncio.IncompleteReadError as err:
+        msg = "cache server closed the connection"
+        raise ConnectionError(msg) from err
+    except ValueError as err:
+        # A malformed length: the stream can no longer be trusted.
+        msg = f"malformed reply from cache server: {err}"
+        raise ConnectionError(msg) from err
+
+
+async def _close(writer: asyncio.StreamWriter) -> None:
+    writer.close()
+    with contextlib.suppress(OSError):
+        await writer.wait_closed()
+
+
+def validate_cache_url(url: str) -> None:
+    """Check a ``shared_cache_url`` option without building its backend.
+
+    Raises ValueError for a URL no backend understands.
+    """
+    if not url.strip():
+        return
+    parts = urlsplit(url.strip())
+    if parts.scheme == "file":
+        if not parts.path:
+            msg = "file cache URL needs a directory"
+            raise ValueError(msg)
+        return
+    if parts.scheme in ("redis", "rediss"):
+        if not parts.hostname:
+            msg = "redis cache URL needs a host"
+            raise ValueError(msg)
+        db = parts.path.strip("/")
+        if db and not db.isdigit():
+            msg = f"redis database must be a number, not {db!r}"
+            raise ValueError(msg)
+        # Raises ValueError for a port that isn't a number in range.
+        _ = parts.port
+        return
+    msg = f"unsupported cache URL scheme {parts.scheme!r}"
+    raise ValueError(msg)
+
+
+def create_cache_backend(hass: HomeAssistant, url: str) -> CacheBackend:
+    """Return the backend a ``shared_cache_url`` option names.
+
+    Raises ValueError for a URL no backend understands.
+    """
+    validate_cache_url(url)
+    if not url.strip():
+        return MemoryCacheBackend()
+    parts = urlsplit(url.strip())
+    if parts.scheme == "file":
+        return FileCacheBackend(hass, Path(hass.config.path(unquote(parts.path))))
+    return RespCacheBackend(
+        parts.hostname or "",
+        parts.port or RESP_DEFAULT_PORT,
+        password=unquote(parts.password) if parts.password else None,
+        db=int(parts.path.strip("/") or 0),
+        ssl_context=get_default_context() if parts.scheme == "rediss" else None,
+    )
+
+
+async def async_acquire_lease(
+    backend: CacheBackend, key: str, owner: str, ttl: timedelta
+) -> bool:
+    """Take the lease ``key`` for ``owner`` unless someone else holds it."""
+    return await backend.async_set(key, owner, ttl, only_if_absent=True)
+
+
+async def async_release_lease(backend: CacheBackend, key: str, owner: str) -> None:
+    """Give back ``owner``'s lease ``key``; a lease lost to expiry is left alone."""
+    if await backend.async_get(key) == owner:
+        await backend.async_delete(key)
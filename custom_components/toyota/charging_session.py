@@ -0,0 +1,203 @@
+"""Charging sessions of plug-in cars, followed between refreshes.
+
+A plug-in car's charge level and remaining charge time come from its
+electric status, read on every refresh at the polling interval whether or
+not the car is charging. During a session that is both too often and too
+rarely: the level climbs in a near-straight line for most of it, yet the
+interesting moments (did it start, is it done) fall between two polls.
+
+``ChargingSessions`` follows each car's sessions from the electric status
+of every refresh. A session starts on the first refresh that reads the car
+charging and ends on the first that doesn't. From its reads it estimates
+the charge rate and the expected end, and with those:
+
+* ``poll_interval`` spaces the car's refreshes densely
+  (``CHARGE_EDGE_INTERVAL``) for ``CHARGE_EDGE_WINDOW`` after the start and
+  before the expected end, and sparsely (``CHARGE_MIDSESSION_FACTOR``
+  times the polling interval) in between. A two-hour charge at the default
+  six-minute interval costs about half the refreshes it used to.
+* ``estimate`` extrapolates the level and the remaining time to any moment
+  between refreshes, for sensors that move while the car charges.
+
+The rate is measured from the session's first and newest reads once the
+level has risen by ``MIN_RATE_RISE``; until then it is taken from Toyota's
+remaining time, assuming a charge to 100 %. Extrapolation stops at 100 %
+and ``MAX_EXTRAPOLATION`` after the newest read.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+CHARGE_EDGE_INTERVAL = timedelta(minutes=2)
+CHARGE_EDGE_WINDOW = timedelta(minutes=10)
+CHARGE_MIDSESSION_FACTOR = 4
+# Percentage points the level must rise before the rate is measured from it.
+MIN_RATE_RISE = 2.0
+MAX_EXTRAPOLATION = timedelta(hours=1)
+FULL_LEVEL = 100.0
+# How often the estimate sensors are written while a car charges.
+ESTIMATE_INTERVAL = timedelta(minutes=1)
+
+_HOUR = timedelta(hours=1)
+
+
+@dataclass(slots=True)
+class ChargingSession:
+    """One car's charging session, from its first to its newest read."""
+
+    started_at: datetime
+    first_level: float | None
+    first_read_at: datetime
+    level: float | None
+    read_at: datetime
+    # Toyota's remaining time at read_at.
+    remaining: timedelta | None
+    refreshes: int = 1
+
+    @property
+    def rate(self) -> float | None:
+        """Return the charge rate in percentage points per hour."""
+        if self.level is not None and self.first_level is not None:
+            rise = self.level - self.first_level
+            if rise >= MIN_RATE_RISE and self.read_at > self.first_read_at:
+                return rise / ((self.read_at - self.first_read_at) / _HOUR)
+        if self.level is not None and self.remaining:
+            return (FULL_LEVEL - self.level) / (self.remaining / _HOUR)
+        return None
+
+    @property
+    def ends_at(self) -> datetime | None:
+        """Return when the session is expected to end."""
+        if self.remaining is not None:
+            return self.read_at + self.remaining
+        rate = self.rate
+        if self.level is None or not rate:
+            return None
+        return self.read_at + _HOUR * ((FULL_LEVEL - self.level) / rate)
+
+
+@dataclass(frozen=True, slots=True)
+class ChargeEstimate:
+    """A charging car's level and remaining time at one moment."""
+
+    level: float | None
+    remaining: timedelta | None
+    ends_at: datetime | None
+
+
+def is_charging(status: str | None) -> bool:
+    """Return whether a ``charging_status`` reads as charging."""
+    return status is not None and status.lower() == "charging"
+
+
+class ChargingSessions:
+    """The charging sessions of one entry's cars."""
+
+    def __init__(self) -> None:
+        """Start with no car charging."""
+        self._sessions: dict[str, ChargingSession] = {}
+        self._stats: Counter[str] = Counter()
+
+    def observe(  # noqa: PLR0913
+        self,
+        vin: str,
+        now: datetime,
+        *,
+        status: str | None,
+        level: float | None,
+        remaining: timedelta | None,
+        read_at: datetime | None = None,
+    ) -> None:
+        """Take one refresh's electric status (``read_at``: when the car sent it).
+
+        A read older than the session's newest (a cached status) only
+        counts as the car still charging.
+        """
+        session = self._sessions.get(vin)
+        if not is_charging(status):
+            if session is not None:
+                del self._sessions[vin]
+                self._stats["sessions"] += 1
+            return
+        read_at = read_at or now
+        if session is None:
+            self._sessions[vin] = ChargingSession(
+                started_at=now,
+                first_level=level,
+                first_read_at=read_at,
+                level=level,
+                read_at=read_at,
+                remaining=remaining,
+            )
+            return
+        session.refreshes += 1
+        if read_at <= session.read_at:
+            return
+        if session.first_level is None:
+            session.first_level, session.first_read_at = level, read_at
+        session.level, session.read_at, session.remaining = level, read_at, remaining
+
+    def session(self, vin: str) -> ChargingSession | None:
+        """Return the car's current session, None when it is not charging."""
+        return self._sessions.get(vin)
+
+    def poll_interval(
+        self, vin: str, now: datetime, polling_interval: timedelta
+    ) -> timedelta:
+        """Return how soon to refresh the car (``polling_interval`` if idle)."""
+        session = self._sessions.get(vin)
+        if session is None:
+            return polling_interval
+        if now - session.started_at < CHARGE_EDGE_WINDOW:
+            return min(CHARGE_EDGE_INTERVAL, polling_interval)
+        sparse = polling_interval * CHARGE_MIDSESSION_FACTOR
+        ends_at = session.ends_at
+        if ends_at is None:
+            return polling_interval
+        # Sparse mid-session, but never past the start of the end window.
+        until_edge = ends_at - CHARGE_EDGE_WINDOW - now
+        if until_edge <= timedelta(0):
+            return min(CHARGE_EDGE_INTERVAL, polling_interval)
+        return max(min(sparse, until_edge), CHARGE_EDGE_INTERVAL)
+
+    def estimate(self, vin: str, now: datetime) -> ChargeEstimate | None:
+        """Return the car's level and remaining time at ``now``, if charging."""
+        session = self._sessions.get(vin)
+        if session is None:
+            return None
+        elapsed = min(max(now - session.read_at, timedelta(0)), MAX_EXTRAPOLATION)
+        level = session.level
+        rate = session.rate
+        if level is not None and rate:
+            level = min(FULL_LEVEL, max(level, level + rate * (elapsed / _HOUR)))
+        ends_at = session.ends_at
+        remaining = (
+            None
+            if ends_at is None
+            else max(ends_at - (session.read_at + elapsed), timedelta(0))
+        )
+        return ChargeEstimate(level=level, remaining=remaining, ends_at=ends_at)
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return each charging car's session and the finished-session count."""
+        return {
+            "charging": {
+                f"...{vin[-6:]}": {
+                    "started_at": session.started_at.isoformat(),
+                    "level": session.level,
+                    "rate_per_hour": (
+                        None if session.rate is None else round(session.rate, 2)
+                    ),
+                    "ends_at": (
+                        session.ends_at.isoformat() if session.ends_at else None
+                    ),
+                    "refreshes": session.refreshes,
+                }
+                for vin, session in self._sessions.items()
+            },
+            **dict(self._stats),
+        }
@@ -2,12 +2,8 @@
 
 # pylint: disable=W0212, W0511
 
-import asyncio
 import logging
-import os
-from collections.abc import Generator, Mapping
-from contextlib import contextmanager
-from pathlib import Path
+from collections.abc import Mapping
 from typing import Any
 
 import voluptuous as vol
@@ -15,29 +11,45 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
-from pytoyoda.client import MyT
 from pytoyoda.exceptions import ToyotaInvalidUsernameError, ToyotaLoginError
 
+from .cache_backend import validate_cache_url
 from .const import (
     CONF_AUTO_DISABLED_STATUS_REFRESH,
+    CONF_BACKFILL_WINDOW_DAYS,
     CONF_BRAND,
+    CONF_DAILY_WAKE_BUDGET,
     CONF_ENABLE_STATUS_REFRESH,
     CONF_FAILED_WAKE_THRESHOLD,
     CONF_IDLE_WAKE_HOURS,
+    CONF_LOCATION_HISTORY_DAYS,
     CONF_MAX_CACHE_AGE_MINUTES,
     CONF_METRIC_VALUES,
     CONF_POLLING_INTERVAL_MINUTES,
     CONF_POST_COUNT_PER_STOP,
+    CONF_PRE_DEPARTURE_REFRESH,
+    CONF_REFRESH_POLICY,
     CONF_RETAIN_ON_TRANSIENT_FAILURE,
+    CONF_SHARED_CACHE_URL,
+    CONF_WAKE_SUCCESS_FLOOR,
+    DEFAULT_BACKFILL_WINDOW_DAYS,
+    DEFAULT_DAILY_WAKE_BUDGET,
     DEFAULT_ENABLE_STATUS_REFRESH,
     DEFAULT_FAILED_WAKE_THRESHOLD,
     DEFAULT_IDLE_WAKE_HOURS,
+    DEFAULT_LOCATION_HISTORY_DAYS,
     DEFAULT_MAX_CACHE_AGE_MINUTES,
     DEFAULT_POLLING_INTERVAL_MINUTES,
     DEFAULT_POST_COUNT_PER_STOP,
+    DEFAULT_PRE_DEPARTURE_REFRESH,
+    DEFAULT_REFRESH_POLICY,
     DEFAULT_RETAIN_ON_TRANSIENT_FAILURE,
+    DEFAULT_SHARED_CACHE_URL,
+    DEFAULT_WAKE_SUCCESS_FLOOR,
     DOMAIN,
+    REFRESH_POLICY_OPTIONS,
 )
+from .transport import async_get_transport
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,18 +65,6 @@ BRAND_API_MAP = {
 }
 
 
-@contextmanager
-def _writable_cwd(path: str) -> Generator[None]:
-    """Temporarily change cwd so pytoyoda/hishel can create its cache."""
-    (Path(path) / ".cache" / "hishel").mkdir(parents=True, exist_ok=True)
-    old_cwd = Path.cwd()
-    os.chdir(path)
-    try:
-        yield
-    finally:
-        os.chdir(old_cwd)
-
-
 class ToyotaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # pylint: disable=W0223
     """Handle a config flow for Toyota Connected Services."""
 
@@ -106,51 +106,57 @@ class ToyotaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # pylint: dis
                 "Testing login for %s (brand code: %s)", self._brand, brand_code
             )
 
-            client = MyT(
-                username=user_input[CONF_EMAIL],
-                password=user_input[CONF_PASSWORD],
-                brand=brand_code,  # Pass brand code to API client
-            )
-
-            await self.async_set_unique_id(unique_id)
-            if not self._reauth_entry:
-                self._abort_if_unique_id_configured()
-            config_dir = self.hass.config.config_dir
-
-            def _login() -> None:
-                with _writable_cwd(config_dir):
-                    asyncio.run(client.login())
-
+            # Borrow the integration-wide pooled client so the login test
+            # warms the same connections the config entry will use. The flow
+            # holds it only for the test, so an aborted or failed flow on a
+            # first install doesn't keep the pool open until HA stops.
+            transport = async_get_transport(self.hass)
+            transport.async_acquire(self.flow_id)
             try:
-                await self.hass.async_add_executor_job(_login)
-            except ToyotaLoginError:
-                errors["base"] = "invalid_auth"
-                _LOGGER.exception("Toyota login error: Invalid auth")
-            except ToyotaInvalidUsernameError:
-                errors["base"] = "invalid_username"
-                _LOGGER.exception("Toyota login error: Invalid username")
-            except Exception:  # pylint: disable=broad-except
-                errors["base"] = "unknown"
-                _LOGGER.exception("An unknown error occurred during login request.")
-            else:
+                client = transport.create_client(
+                    username=user_input[CONF_EMAIL],
+                    password=user_input[CONF_PASSWORD],
+                    brand=brand_code,  # Pass brand code to API client
+                )
+
+                await self.async_set_unique_id(unique_id)
                 if not self._reauth_entry:
-                    entry_title = (
-                        f"{BRAND_OPTIONS[self._brand]} - {user_input[CONF_EMAIL]}",
-                    )
-                    return self.async_create_entry(
-                        title=entry_title,
+                    self._abort_if_unique_id_configured()
+
+                try:
+                    await client.login()
+                except ToyotaLoginError:
+                    errors["base"] = "invalid_auth"
+                    _LOGGER.exception("Toyota login error: Invalid auth")
+                except ToyotaInvalidUsernameError:
+                    errors["base"] = "invalid_username"
+                    _LOGGER.exception("Toyota login error: Invalid username")
+                except Exception:  # pylint: disable=broad-except
+                    errors["base"] = "unknown"
+                    _LOGGER.exception("An unknown error occurred during login request.")
+                else:
+                    if not self._reauth_entry:
+                        entry_title = (
+                            f"{BRAND_OPTIONS[self._brand]} - {user_input[CONF_EMAIL]}",
+                        )
+                        return self.async_create_entry(
+                            title=entry_title,
+                            data=user_input,
+                        )
+                    self.hass.config_entries.async_update_entry(
+                        self._reauth_entry,
                         data=user_input,
+                        unique_id=unique_id,
                     )
-                self.hass.config_entries.async_update_entry(
-                    self._reauth_entry,
-                    data=user_input,
-                    unique_id=unique_id,
-                )
-                # Reload the config entry otherwise devices will remain unavailable
-                self.hass.async_create_task(
-                    self.hass.config_entries.async_reload(self._reauth_entry.entry_id)
-                )
-                return self.async_abort(reason="reauth_successful")
+                    # Reload the config entry otherwise devices will remain unavailable
+                    self.hass.async_create_task(
+                        self.hass.config_entries.async_reload(
+                            self._reauth_entry.entry_id
+                        )
+                    )
+                    return self.async_abort(reason="reauth_successful")
+            finally:
+                await transport.async_release(self.flow_id)
 
         return self.async_show_form(
             step_id="user",
@@ -198,7 +204,15 @@ class ToyotaOptionsFlow(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
+        errors: dict[str, str] = {}
         if user_input is not None:
+            try:
+                validate_cache_url(
+                    user_input.get(CONF_SHARED_CACHE_URL, DEFAULT_SHARED_CACHE_URL)
+                )
+            except ValueError:
+                errors[CONF_SHARED_CACHE_URL] = "invalid_cache_url"
+        if user_input is not None and not errors:
             # Side-effect: re-enabling smart refresh clears the auto-disable
             # flag. The user took explicit action to override the auto-disable
             # decision, so we trust them.
@@ -212,7 +226,8 @@ class ToyotaOptionsFlow(config_entries.OptionsFlow):
                 user_input[CONF_AUTO_DISABLED_STATUS_REFRESH] = False
             return self.async_create_entry(title="", data=user_input)
 
-        opts = self.config_entry.options
+        # On an error the form keeps what the user entered.
+        opts = {**self.config_entry.options, **(user_input or {})}
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema(
@@ -286,6 +301,74 @@ class ToyotaOptionsFlow(config_entries.OptionsFlow):
                             min=1, max=5, step=1, mode=selector.NumberSelectorMode.BOX
                         )
                     ),
+                    vol.Required(
+                        CONF_REFRESH_POLICY,
+                        default=opts.get(CONF_REFRESH_POLICY, DEFAULT_REFRESH_POLICY),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=REFRESH_POLICY_OPTIONS,
+                            translation_key=CONF_REFRESH_POLICY,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_DAILY_WAKE_BUDGET,
+                        default=opts.get(
+                            CONF_DAILY_WAKE_BUDGET, DEFAULT_DAILY_WAKE_BUDGET
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=1, max=24, step=1, mode=selector.NumberSelectorMode.BOX
+                        )
+                    ),
+                    vol.Required(
+                        CONF_WAKE_SUCCESS_FLOOR,
+                        default=opts.get(
+                            CONF_WAKE_SUCCESS_FLOOR, DEFAULT_WAKE_SUCCESS_FLOOR
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=90,
+                            step=5,
+                            unit_of_measurement="%",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_PRE_DEPARTURE_REFRESH,
+                        default=opts.get(
+                            CONF_PRE_DEPARTURE_REFRESH, DEFAULT_PRE_DEPARTURE_REFRESH
+                        ),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        CONF_BACKFILL_WINDOW_DAYS,
+                        default=opts.get(
+                            CONF_BACKFILL_WINDOW_DAYS,
+                            DEFAULT_BACKFILL_WINDOW_DAYS,
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0, max=90, step=1, mode=selector.NumberSelectorMode.BOX
+                        )
+                    ),
+                    vol.Required(
+                        CONF_LOCATION_HISTORY_DAYS,
+                        default=opts.get(
+                            CONF_LOCATION_HISTORY_DAYS,
+                            DEFAULT_LOCATION_HISTORY_DAYS,
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0, max=90, step=1, mode=selector.NumberSelectorMode.BOX
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_SHARED_CACHE_URL,
+                        default=opts.get(
+                            CONF_SHARED_CACHE_URL, DEFAULT_SHARED_CACHE_URL
+                        ),
+                    ): selector.TextSelector(),
                 }
             ),
+            errors=errors,
         )
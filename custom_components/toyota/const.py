@@ -56,6 +56,42 @@ DEFAULT_POLLING_INTERVAL_MINUTES = 6
 # fresh modem reports; the followup POST's poll loop picks them up.
 CONF_POST_COUNT_PER_STOP = "post_count_per_stop"
 DEFAULT_POST_COUNT_PER_STOP = 2
+# Which refresh_strategy.POLICIES entry decides when to wake the car.
+# "default" is the Addendum 4 tree; see the README for the others.
+CONF_REFRESH_POLICY = "refresh_policy"
+DEFAULT_REFRESH_POLICY = "default"
+REFRESH_POLICY_OPTIONS = ["default", "quota", "time_of_day", "aggressive"]
+# Wake POSTs per car in any 24 hours under the "quota" policy.
+CONF_DAILY_WAKE_BUDGET = "daily_wake_budget"
+DEFAULT_DAILY_WAKE_BUDGET = 6
+# Percent: wake POSTs the car's learned record predicts to succeed less often
+# than this are skipped (wake_success.py). 0 keeps the plain failed-wake
+# soft-disable instead.
+CONF_WAKE_SUCCESS_FLOOR = "wake_success_floor"
+DEFAULT_WAKE_SUCCESS_FLOOR = 0
+# Read each car shortly before its learned departure times and skip idle
+# wakes while no departure is likely (departure_model.py).
+CONF_PRE_DEPARTURE_REFRESH = "pre_departure_refresh"
+DEFAULT_PRE_DEPARTURE_REFRESH = False
+# Days of trip history requested per backfill call (one /v1/trips request).
+# The backfill walks back from the oldest imported statistic one window per
+# idle refresh cycle. 0 disables it.
+CONF_BACKFILL_WINDOW_DAYS = "backfill_window_days"
+DEFAULT_BACKFILL_WINDOW_DAYS = 30
+# Days of parked locations kept per car for toyota.location_history. 0 turns
+# the history off (and deletes what was recorded).
+CONF_LOCATION_HISTORY_DAYS = "location_history_days"
+DEFAULT_LOCATION_HISTORY_DAYS = 7
+# Where fetches are shared with other Home Assistant instances using the same
+# account: "" (nothing shared), file:///dir or redis://host:port/db. See
+# cache_backend.py.
+CONF_SHARED_CACHE_URL = "shared_cache_url"
+DEFAULT_SHARED_CACHE_URL = ""
+
+# EVENTS
+# Fired when a car's newly reported location enters / leaves a zone.* entity.
+EVENT_ZONE_ENTER = f"{DOMAIN}_zone_enter"
+EVENT_ZONE_EXIT = f"{DOMAIN}_zone_exit"
 
 # DEFAULTS
 DEFAULT_LOCALE = "en-gb"
@@ -72,6 +108,10 @@ PERIODE_START = "periode_start"
 STATISTICS = "statistics"
 WARNING = "warning"
 
+# SHARED hass.data[DOMAIN] KEYS (integration-wide, not per config entry)
+TRANSPORT = "transport"
+FETCH_BROKER = "fetch_broker"
+
 # ICONS
 ICON_BATTERY = "mdi:car-battery"
 ICON_CAR = "mdi:car-info"
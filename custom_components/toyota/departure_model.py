@@ -0,0 +1,167 @@
+"""Per-car departure times, learned by weekday and hour.
+
+The strategy only sees a drive once the odometer has moved, so the first
+cycle of every drive shows the status from before it. Most cars leave at
+similar times each week (the commute, the school run). ``DepartureModel``
+counts one car's departures per hour of the week (168 slots) and turns
+them into the chance that the car leaves in a given slot. With that, the
+strategy reads the car once shortly before a likely departure, and skips
+idle wakes while no departure is likely soon.
+
+A departure is a cycle that sees the car moving after one that saw it
+parked. Counts are time-decayed (halving every ``DEPARTURE_HALF_LIFE``) so
+a changed routine takes over within weeks. A slot's probability divides
+its decayed count by the decayed number of weeks the car has been
+observed, so a car watched for three weeks that left on two Mondays at 7
+has a Monday 7:00 probability of about two thirds. Nothing is predicted
+before ``MIN_DEPARTURE_HISTORY`` of observation.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from typing import Any
+
+SLOTS_PER_WEEK = 7 * 24
+DEPARTURE_HALF_LIFE = timedelta(weeks=4)
+MIN_DEPARTURE_HISTORY = timedelta(weeks=2)
+# A slot at least this likely to see a departure gets a pre-departure read.
+DEPARTURE_LIKELY = 0.5
+# How far ahead departures are looked for.
+DEPARTURE_HORIZON = timedelta(days=1)
+# Window over which departure_probability() judges "departure soon" for the
+# idle-wake gate.
+DEPARTURE_LOOKAHEAD = timedelta(hours=4)
+
+_HOUR = timedelta(hours=1)
+_WEEK = timedelta(weeks=1)
+
+
+def _slot(at: datetime) -> int:
+    """Return the hour-of-week slot of a local time (Monday 0:00 is 0)."""
+    return at.weekday() * 24 + at.hour
+
+
+class DepartureModel:
+    """Decayed departure counts of one car per hour of the week."""
+
+    __slots__ = ("_counts", "_moving", "_observed_since", "_updated_at")
+
+    def __init__(self) -> None:
+        """Create a model that has observed nothing."""
+        self._counts = [0.0] * SLOTS_PER_WEEK
+        # When the counts were last decayed.
+        self._updated_at: datetime | None = None
+        self._observed_since: datetime | None = None
+        self._moving = False
+
+    def _decay(self, now: datetime) -> None:
+        if self._updated_at is not None and now > self._updated_at:
+            factor = 0.5 ** ((now - self._updated_at) / DEPARTURE_HALF_LIFE)
+            self._counts = [count * factor for count in self._counts]
+        self._updated_at = now
+
+    def observe(self, now: datetime, *, moving: bool) -> bool:
+        """Record one cycle's movement; return whether it was a departure."""
+        if self._observed_since is None:
+            self._observed_since = now
+        departed = moving and not self._moving
+        self._moving = moving
+        if departed:
+            self._decay(now)
+            self._counts[_slot(now)] += 1
+        return departed
+
+    def _weeks_observed(self, now: datetime) -> float | None:
+        """Return the decayed number of weeks observed, None if too few."""
+        since = self._observed_since
+        if since is None or now - since < MIN_DEPARTURE_HISTORY:
+            return None
+        # Each week's occurrence of a slot weighs what a departure in it
+        # would weigh today: the integral of the decay over the history.
+        weeks = (now - since) / _WEEK
+        rate = math.log(2) * (_WEEK / DEPARTURE_HALF_LIFE)
+        return (1 - math.exp(-rate * weeks)) / rate
+
+    def slot_probability(self, at: datetime, now: datetime) -> float | None:
+        """Return the chance the car leaves in the hour containing ``at``."""
+        weeks = self._weeks_observed(now)
+        if weeks is None:
+            return None
+        count = self._counts[_slot(at)]
+        if self._updated_at is not None and now > self._updated_at:
+            count *= 0.5 ** ((now - self._updated_at) / DEPARTURE_HALF_LIFE)
+        return min(1.0, count / weeks)
+
+    def next_departure(self, now: datetime) -> datetime | None:
+        """Return the start of the next likely departure hour after ``now``."""
+        if self._weeks_observed(now) is None:
+            return None
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        for step in range(1, int(DEPARTURE_HORIZON / _HOUR) + 1):
+            start = hour + step * _HOUR
+            probability = self.slot_probability(start, now)
+            if probability is not None and probability >= DEPARTURE_LIKELY:
+                return start
+        return None
+
+    def departure_probability(
+        self, now: datetime, window: timedelta = DEPARTURE_LOOKAHEAD
+    ) -> float | None:
+        """Return the chance the car leaves within ``window`` of ``now``."""
+        if self._weeks_observed(now) is None:
+            return None
+        stay = 1.0
+        start, end = now, now + window
+        while start < end:
+            hour_end = start.replace(minute=0, second=0, microsecond=0) + _HOUR
+            share = (min(hour_end, end) - start) / _HOUR
+            stay *= 1 - share * (self.slot_probability(start, now) or 0.0)
+            start = hour_end
+        return 1 - stay
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable form for ``.storage``."""
+        return {
+            "counts": [round(count, 4) for count in self._counts],
+            "updated_at": self._updated_at.isoformat() if self._updated_at else None,
+            "observed_since": (
+                self._observed_since.isoformat() if self._observed_since else None
+            ),
+            "moving": self._moving,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DepartureModel:
+        """Restore a model saved by ``as_dict``."""
+        counts = [float(count) for count in data["counts"]]
+        if len(counts) != SLOTS_PER_WEEK:
+            msg = f"expected {SLOTS_PER_WEEK} slots, got {len(counts)}"
+            raise ValueError(msg)
+        model = cls()
+        model._counts = counts
+        updated_at = data.get("updated_at")
+        model._updated_at = datetime.fromisoformat(updated_at) if updated_at else None
+        since = data.get("observed_since")
+        model._observed_since = datetime.fromisoformat(since) if since else None
+        model._moving = bool(data.get("moving", False))
+        return model
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the departure count and the busiest slots."""
+        busiest = sorted(
+            range(SLOTS_PER_WEEK), key=self._counts.__getitem__, reverse=True
+        )[:3]
+        return {
+            "departures": round(sum(self._counts), 2),
+            "observed_since": (
+                self._observed_since.isoformat() if self._observed_since else None
+            ),
+            # "weekday-hour" (Monday is 0) of the three most frequent slots.
+            "busiest_slots": [
+                f"{slot // 24}-{slot % 24:02d}"
+                for slot in busiest
+                if self._counts[slot]
+            ],
+        }
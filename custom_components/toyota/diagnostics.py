@@ -0,0 +1,87 @@
+"""Diagnostics support for Toyota Connected Services."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+
+from .const import CONF_SHARED_CACHE_URL, DOMAIN, FETCH_BROKER, TRANSPORT
+from .strategy_simulator import trace_to_json
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+# The entry title and unique_id both embed the account e-mail address.
+# The shared cache URL may carry the cache server's password.
+TO_REDACT = {
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    CONF_SHARED_CACHE_URL,
+    "title",
+    "unique_id",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    domain_data = hass.data.get(DOMAIN, {})
+    transport = domain_data.get(TRANSPORT)
+    fetch_broker = domain_data.get(FETCH_BROKER)
+    coordinator = domain_data.get(entry.entry_id)
+    auth = getattr(coordinator, "_auth_manager", None)
+    roster = getattr(coordinator, "_roster", None)
+    pacer = getattr(coordinator, "_pacer", None)
+    importer = getattr(coordinator, "_statistics_importer", None)
+    backfill = getattr(coordinator, "_backfill", None)
+    trip_collector = getattr(coordinator, "_trip_collector", None)
+    local_summaries = getattr(coordinator, "_local_summaries", None)
+    location_history = getattr(coordinator, "_location_history", None)
+    geofence = getattr(coordinator, "_geofence", None)
+    charging_sessions = getattr(coordinator, "_charging_sessions", None)
+    learned_state = getattr(coordinator, "_learned_state", None)
+    telemetry = getattr(coordinator, "_telemetry", None)
+    cache_backend = getattr(coordinator, "_cache_backend", None)
+    diag_bucket = domain_data.get(f"{entry.entry_id}_diag", {})
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "transport": transport.diagnostics() if transport is not None else None,
+        "fetch_broker": (
+            fetch_broker.diagnostics() if fetch_broker is not None else None
+        ),
+        "cache_backend": (
+            cache_backend.diagnostics() if cache_backend is not None else None
+        ),
+        "auth": auth.diagnostics() if auth is not None else None,
+        "roster": roster.diagnostics() if roster is not None else None,
+        "pacer": pacer.diagnostics() if pacer is not None else None,
+        "statistics_import": importer.diagnostics() if importer is not None else None,
+        "backfill": backfill.diagnostics() if backfill is not None else None,
+        "trip_sync": (
+            trip_collector.diagnostics() if trip_collector is not None else None
+        ),
+        "local_summaries": (
+            local_summaries.diagnostics() if local_summaries is not None else None
+        ),
+        "location_history": (
+            location_history.diagnostics() if location_history is not None else None
+        ),
+        "geofence": geofence.diagnostics() if geofence is not None else None,
+        "charging_sessions": (
+            charging_sessions.diagnostics() if charging_sessions is not None else None
+        ),
+        "learned_state": (
+            learned_state.diagnostics() if learned_state is not None else None
+        ),
+        "telemetry": telemetry.diagnostics() if telemetry is not None else None,
+        # One NDJSON-ready record per cycle; strategy_simulator.load_trace
+        # reads a car's list back for offline replays.
+        "cycle_traces": {
+            f"...{vin[-6:]}": [trace_to_json(cycle) for cycle in cycles]
+            for vin, cycles in diag_bucket.get("cycle_traces_per_vin", {}).items()
+        },
+    }
@@ -22,7 +22,13 @@ if TYPE_CHECKING:
 
 
 class ToyotaBaseEntity(CoordinatorEntity):
-    """Defines a base Toyota entity."""
+    """Defines a base Toyota entity.
+
+    Platforms pass the account-level coordinator and the vehicle's index into
+    its aggregated data; the entity then binds to that vehicle's own
+    coordinator, so it follows only its car's refresh schedule and
+    availability.
+    """
 
     _attr_has_entity_name = True
 
@@ -34,15 +40,17 @@ class ToyotaBaseEntity(CoordinatorEntity):
         description: EntityDescription,
     ) -> None:
         """Initialize the Toyota entity."""
-        super().__init__(coordinator)  # type: ignore[reportArgumentType, arg-type]
+        vehicle_data = coordinator.data[vehicle_index]
+        vin_coordinator: DataUpdateCoordinator[VehicleData] = (
+            coordinator._vin_coordinators[vehicle_data["data"].vin]  # noqa: SLF001
+        )
+        super().__init__(vin_coordinator)  # type: ignore[reportArgumentType, arg-type]
 
         self.index = vehicle_index
         self.entity_description = description
-        self.vehicle: Vehicle = coordinator.data[self.index]["data"]
-        self.statistics: StatisticsData | None = coordinator.data[self.index][
-            "statistics"
-        ]
-        self.metric_values: bool = coordinator.data[self.index]["metric_values"]
+        self.vehicle: Vehicle = vehicle_data["data"]
+        self.statistics: StatisticsData | None = vehicle_data["statistics"]
+        self.metric_values: bool = vehicle_data["metric_values"]
 
         self._attr_unique_id = (
             f"{entry_id}_{self.vehicle.vin}/{self.entity_description.key}"
@@ -58,32 +66,25 @@ class ToyotaBaseEntity(CoordinatorEntity):
 
     @property
     def available(self) -> bool:
-        """Per-vehicle availability with fault isolation.
-
-        The coordinator must be healthy AND this vehicle's data must be
-        either fresh (non-None ``last_successful_fetch``) or a retain-cache
-        entry. Stubs (refresh failed for this vehicle specifically, no cache
-        to serve) read as unavailable even when the coordinator itself
-        succeeded because some sibling vehicle DID refresh fine. This is
-        per-vehicle fault isolation: a 429 on one car does not hide the other
-        car's data. ToyotaCoordinatorStateSensor (diagnostic sensors)
+        """Per-vehicle availability.
+
+        Driven by this vehicle's own coordinator: it is unavailable while
+        the car's last refresh failed with nothing retained to serve, or
+        before its first refresh succeeded. Other cars on the account don't
+        affect it. ToyotaCoordinatorStateSensor (diagnostic sensors)
         overrides this back to True - those must stay visible exactly when
         their vehicle fails, to explain why.
         """
-        if not super().available:
-            return False
-        try:
-            vd = self.coordinator.data[self.index]
-        except (IndexError, TypeError):
-            return False
-        return vd.get("is_cached") or vd.get("last_successful_fetch") is not None
+        return super().available and self.coordinator.data is not None
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self.vehicle = self.coordinator.data[self.index]["data"]
-        self.statistics = self.coordinator.data[self.index]["statistics"]
-        self.metric_values = self.coordinator.data[self.index]["metric_values"]
+        vehicle_data: VehicleData | None = self.coordinator.data
+        if vehicle_data is not None:
+            self.vehicle = vehicle_data["data"]
+            self.statistics = vehicle_data["statistics"]
+            self.metric_values = vehicle_data["metric_values"]
         super()._handle_coordinator_update()
 
     async def async_added_to_hass(self) -> None:
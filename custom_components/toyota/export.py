@@ -0,0 +1,179 @@
+"""Streaming export of an entry's locally kept data, for toyota.export_data.
+
+The integration accumulates more than its entities show: each car's recent
+dashboard readings (telemetry_ring.py), parked locations, strategy traces
+and the trip database. ``async_export_records`` walks them as one async
+stream of JSON-ready records, one kind after another per car:
+
+* ``snapshot``: a telemetry ring sample (odometer, fuel, battery, range).
+* ``location``: a parked location.
+* ``trace``: one refresh cycle in ``strategy_simulator`` trace form.
+* ``trip`` / ``day``: rows of the trip database, in pages of
+  ``TRIP_PAGE_ROWS`` read through the executor.
+
+``async_write_export`` turns the stream into NDJSON (optionally gzipped).
+Lines are gathered into ``EXPORT_CHUNK_BYTES`` chunks that are written in
+the executor, so at most a trip page and a chunk are held at a time and the
+event loop never waits on the disk. The file is written next to its target
+and renamed into place once complete.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO
+
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .strategy_simulator import trace_to_json
+
+if TYPE_CHECKING:
+    from collections import deque
+    from collections.abc import AsyncIterator, Collection, Iterable, Iterator
+
+    from homeassistant.core import HomeAssistant
+
+    from .location_history import LocationHistory
+    from .strategy_simulator import TraceCycle
+    from .telemetry_ring import TelemetryHistory
+    from .trip_store import TripStore
+
+EXPORT_FORMATS = ("ndjson", "gzip")
+EXPORT_KINDS = ("snapshots", "locations", "traces", "trips", "days")
+EXPORT_DIR = f"{DOMAIN}_exports"
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+_SNAPSHOT_FIELDS = ("odometer", "fuel", "battery", "range")
+
+
+def export_path(hass: HomeAssistant, filename: str) -> Path:
+    """Return where an export named ``filename`` is written.
+
+    Raises:
+        ValueError: ``filename`` is not a plain file name.
+
+    """
+    if not filename or Path(filename).name != filename or filename.startswith("."):
+        msg = f"{filename!r} is not a plain file name"
+        raise ValueError(msg)
+    return Path(hass.config.path(EXPORT_DIR, filename))
+
+
+def default_export_filename(fmt: str) -> str:
+    """Return a timestamped file name for an export in ``fmt``."""
+    stamp = dt_util.now().strftime("%Y%m%d-%H%M%S")
+    suffix = ".ndjson.gz" if fmt == "gzip" else ".ndjson"
+    return f"{DOMAIN}_export_{stamp}{suffix}"
+
+
+async def async_export_records(  # noqa: PLR0913
+    hass: HomeAssistant,
+    vins: Iterable[str],
+    *,
+    kinds: Collection[str] = EXPORT_KINDS,
+    telemetry: TelemetryHistory | None = None,
+    location_history: LocationHistory | None = None,
+    cycle_traces: dict[str, deque[TraceCycle]] | None = None,
+    trip_store: TripStore | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield the cars' stored data as export records, car by car."""
+    for vin in vins:
+        for record in _memory_records(
+            vin, kinds, telemetry, location_history, cycle_traces
+        ):
+            yield record
+        if trip_store is None:
+            continue
+        for source, kind, key in (
+            ("trips", "trip", "start_ts"),
+            ("days", "day", "local_day"),
+        ):
+            if source not in kinds:
+                continue
+            after = None
+            while rows := await hass.async_add_executor_job(
+                trip_store.page, vin, source, after
+            ):
+                for row in rows:
+                    yield {"type": kind, "vin": vin, **row}
+                after = rows[-1][key]
+
+
+def _memory_records(
+    vin: str,
+    kinds: Collection[str],
+    telemetry: TelemetryHistory | None,
+    location_history: LocationHistory | None,
+    cycle_traces: dict[str, deque[TraceCycle]] | None,
+) -> Iterator[dict[str, Any]]:
+    """Yield the car's in-memory records.
+
+    Each source is copied before its first record: refreshes keep running
+    while the consumer awaits the disk.
+    """
+    if "snapshots" in kinds and telemetry is not None:
+        ring = telemetry.ring(vin)
+        for at, *values in ring.samples() if ring is not None else ():
+            yield {
+                "type": "snapshot",
+                "vin": vin,
+                "at": dt_util.utc_from_timestamp(at).isoformat() if at else None,
+                **dict(zip(_SNAPSHOT_FIELDS, values, strict=True)),
+            }
+    if "locations" in kinds and location_history is not None:
+        for point in location_history.points(vin):
+            yield {"type": "location", "vin": vin, **point}
+    if "traces" in kinds and cycle_traces is not None:
+        for cycle in list(cycle_traces.get(vin, ())):
+            yield {"type": "trace", "vin": vin, **trace_to_json(cycle)}
+
+
+def _open(path: Path, *, compress: bool) -> TextIO:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8")
+    return path.open("w", encoding="utf-8")
+
+
+def _finish(handle: TextIO, part: Path, path: Path) -> None:
+    handle.close()
+    part.replace(path)
+
+
+def _abandon(handle: TextIO, part: Path) -> None:
+    handle.close()
+    part.unlink(missing_ok=True)
+
+
+async def async_write_export(
+    hass: HomeAssistant,
+    path: Path,
+    records: AsyncIterator[dict[str, Any]],
+    *,
+    compress: bool = False,
+) -> int:
+    """Write ``records`` to ``path`` as NDJSON; return the number written."""
+    part = path.with_name(f"{path.name}.part")
+    handle = await hass.async_add_executor_job(lambda: _open(part, compress=compress))
+    count = 0
+    try:
+        chunk: list[str] = []
+        size = 0
+        async for record in records:
+            line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+            chunk.append(line)
+            size += len(line)
+            count += 1
+            if size >= EXPORT_CHUNK_BYTES:
+                await hass.async_add_executor_job(handle.write, "".join(chunk))
+                chunk, size = [], 0
+        if chunk:
+            await hass.async_add_executor_job(handle.write, "".join(chunk))
+    except BaseException:
+        await hass.async_add_executor_job(_abandon, handle, part)
+        raise
+    await hass.async_add_executor_job(_finish, handle, part, path)
+    return count
@@ -0,0 +1,366 @@
+"""Integration-wide sharing of one car's fetches between config entries.
+
+A household often adds the same car to two Toyota accounts, one per
+driver. Each config entry then refreshes that VIN on its own: the
+endpoint sweep, the summaries and any wake POST, so the gateway sees the
+car's traffic twice and the modem is woken twice.
+
+``VinFetchBroker`` lives in ``hass.data[DOMAIN][FETCH_BROKER]`` and is
+shared by every entry, reference-counted by entry like the transport. Per
+VIN it holds a lock and the newest fetch any entry published. An entry
+whose car coordinator comes due claims the VIN:
+
+* another entry fetched the car within the window: the claim yields that
+  fetch, which the entry adopts instead of calling Toyota;
+* another entry's fetch is in flight: the claim waits for it and then
+  yields it;
+* otherwise the claim yields None and holds the VIN's lock while the
+  entry runs its full refresh (strategy and wakes included) and publishes
+  the result.
+
+So at most one entry wakes a given car per window. A pending service call
+claims with ``force``: the user asked this entry for fresh data.
+
+With a shared cache backend (cache_backend.py) the same happens between
+Home Assistant instances. A claim that finds no fetch in-process reads the
+backend next; failing that it takes the car's lease there and fetches, or
+waits for the lease holder's result. Fetches travel through the backend as
+JSON: the endpoint responses and the strategy state, without the
+summaries, which the reading instance fetches itself. A backend that fails
+is treated as empty, so the entry fetches as it would without one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import logging
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+from pydantic import BaseModel
+
+from .cache_backend import (
+    CACHE_BACKEND_ERRORS,
+    async_acquire_lease,
+    async_release_lease,
+)
+from .const import DOMAIN, FETCH_BROKER
+from .refresh_strategy import VinState
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    from homeassistant.core import HomeAssistant
+
+    from . import StatisticsData
+    from .cache_backend import CacheBackend
+
+_LOGGER = logging.getLogger(__name__)
+
+# How long an instance may hold a car's lease. Covers a full refresh with
+# the longest wake poll; a crashed holder blocks the others no longer.
+SHARED_LEASE_TTL = timedelta(minutes=3)
+# How often an instance waiting on another's lease looks for its result.
+SHARED_LEASE_POLL_S = 2.0
+# VinState fields holding datetimes, converted to and from ISO strings.
+_STATE_TIMES = frozenset(
+    {"last_status_occurrence_date", "last_status_fetch_at", "last_post_attempt_at"}
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SharedFetch:
+    """One entry's completed refresh of a car, as other entries adopt it."""
+
+    entry_id: str
+    fetched_at: datetime
+    # The Vehicle's parsed endpoint responses, copied into the adopting
+    # entry's own Vehicle so its entities read them as usual.
+    endpoint_data: dict[str, Any]
+    statistics: StatisticsData | None
+    # Summaries are converted to the fetching entry's units.
+    metric_values: bool
+    # The strategy state after the fetch, so an adopting entry that takes
+    # over the car later knows when it was last read and woken.
+    state: VinState
+    # Read from another instance through the cache backend; carries no
+    # statistics.
+    remote: bool = False
+
+
+def shared_fetch_to_json(shared: SharedFetch, instance: str) -> str:
+    """Serialise a fetch for the cache backend."""
+    state = asdict(shared.state)
+    for name in _STATE_TIMES:
+        if state[name] is not None:
+            state[name] = state[name].isoformat()
+    state["recent_post_attempts"] = [
+        at.isoformat() for at in state["recent_post_attempts"]
+    ]
+    endpoint_data = {
+        name: {
+            "model": f"{type(model).__module__}.{type(model).__qualname__}",
+            "data": model.model_dump(mode="json", by_alias=True),
+        }
+        for name, model in shared.endpoint_data.items()
+        if isinstance(model, BaseModel)
+    }
+    return json.dumps(
+        {
+            "instance": instance,
+            "fetched_at": shared.fetched_at.isoformat(),
+            "metric_values": shared.metric_values,
+            "endpoint_data": endpoint_data,
+            "state": state,
+        }
+    )
+
+
+def _load_model(path: str, data: dict[str, Any]) -> BaseModel:
+    """Rebuild a pytoyoda response model; other classes are refused."""
+    module_name, _, class_name = path.rpartition(".")
+    if not module_name.startswith("pytoyoda.models."):
+        msg = f"not a pytoyoda model: {path}"
+        raise ValueError(msg)
+    # pytoyoda's models are imported with the client; this is a lookup.
+    model_cls = getattr(importlib.import_module(module_name), class_name, None)
+    if not isinstance(model_cls, type) or not issubclass(model_cls, BaseModel):
+        msg = f"not a pytoyoda model: {path}"
+        raise TypeError(msg)
+    return model_cls.model_validate(data)
+
+
+def shared_fetch_from_json(raw: str) -> tuple[str, SharedFetch]:
+    """Return the writing instance and the fetch ``shared_fetch_to_json`` wrote.
+
+    Raises ValueError, KeyError or TypeError for a value it cannot read.
+    """
+    data = json.loads(raw)
+    state = dict(data["state"])
+    for name in _STATE_TIMES:
+        if state.get(name) is not None:
+            state[name] = datetime.fromisoformat(state[name])
+    state["recent_post_attempts"] = [
+        datetime.fromisoformat(at) for at in state.get("recent_post_attempts", ())
+    ]
+    return data["instance"], SharedFetch(
+        entry_id="",
+        fetched_at=datetime.fromisoformat(data["fetched_at"]),
+        endpoint_data={
+            name: _load_model(item["model"], item["data"])
+            for name, item in data["endpoint_data"].items()
+        },
+        statistics=None,
+        metric_values=bool(data["metric_values"]),
+        state=VinState(**state),
+        remote=True,
+    )
+
+
+class VinFetchBroker:
+    """Reference-counted per-VIN locks and latest fetches of all entries."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise an empty broker."""
+        self._hass = hass
+        self._entries: set[str] = set()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._latest: dict[str, SharedFetch] = {}
+        self._stats: Counter[str] = Counter()
+        # Tells this instance's values in a shared backend from the others'.
+        self._instance = uuid.uuid4().hex
+
+    @callback
+    def async_acquire(self, entry_id: str) -> None:
+        """Register a config entry as a user of the broker."""
+        self._entries.add(entry_id)
+
+    @callback
+    def async_release(self, entry_id: str) -> None:
+        """Drop a config entry and its fetches; the last one removes the broker."""
+        self._entries.discard(entry_id)
+        for vin in [v for v, f in self._latest.items() if f.entry_id == entry_id]:
+            del self._latest[vin]
+        if self._entries:
+            return
+        if self._hass.data.get(DOMAIN, {}).get(FETCH_BROKER) is self:
+            self._hass.data[DOMAIN].pop(FETCH_BROKER)
+
+    def _fresh(self, vin: str, entry_id: str, window: timedelta) -> SharedFetch | None:
+        """Return another entry's fetch of the car within ``window``, if any."""
+        shared = self._latest.get(vin)
+        if shared is None or shared.entry_id == entry_id:
+            return None
+        if dt_util.now() - shared.fetched_at > window:
+            return None
+        return shared
+
+    @asynccontextmanager
+    async def async_claim(
+        self,
+        vin: str,
+        entry_id: str,
+        *,
+        window: timedelta,
+        force: bool = False,
+        backend: CacheBackend | None = None,
+    ) -> AsyncGenerator[SharedFetch | None]:
+        """Yield another entry's recent fetch of the car, or None to fetch.
+
+        On None the caller holds the car's lock (and its lease in a shared
+        ``backend``) until the block exits and should ``publish`` its
+        result; a failed fetch publishes nothing, so a waiting entry then
+        fetches for itself.
+        """
+        shared = None if force else self._fresh(vin, entry_id, window)
+        if shared is not None:
+            self._stats["shared"] += 1
+            yield shared
+            return
+        lock = self._locks.get(vin)
+        if lock is None:
+            lock = self._locks[vin] = asyncio.Lock()
+        if lock.locked():
+            self._stats["waited"] += 1
+        async with lock:
+            # The fetch we waited for may be the one we can use.
+            shared = None if force else self._fresh(vin, entry_id, window)
+            if shared is not None:
+                self._stats["shared"] += 1
+                yield shared
+                return
+            async with self._async_claim_remote(
+                vin, window, force=force, backend=backend
+            ) as shared:
+                self._stats["shared_remote" if shared is not None else "fetched"] += 1
+                yield shared
+
+    @asynccontextmanager
+    async def _async_claim_remote(
+        self,
+        vin: str,
+        window: timedelta,
+        *,
+        force: bool,
+        backend: CacheBackend | None,
+    ) -> AsyncGenerator[SharedFetch | None]:
+        """Yield another instance's fetch of the car, or None holding its lease."""
+        if backend is None or not backend.shared:
+            yield None
+            return
+        lease = f"lease:{vin}"
+        leased = False
+        shared: SharedFetch | None = None
+        try:
+            if not force:
+                shared = await self._async_read_remote(vin, window, backend)
+            if shared is None:
+                leased = await async_acquire_lease(
+                    backend, lease, self._instance, SHARED_LEASE_TTL
+                )
+                if not leased and not force:
+                    self._stats["waited_remote"] += 1
+                    shared = await self._async_wait_remote(vin, window, backend)
+        except CACHE_BACKEND_ERRORS as err:
+            self._stats["backend_errors"] += 1
+            _LOGGER.debug("Shared cache unavailable for vin=...%s: %s", vin[-6:], err)
+        if shared is not None:
+            yield shared
+            return
+        try:
+            yield None
+        finally:
+            if leased:
+                try:
+                    await async_release_lease(backend, lease, self._instance)
+                except CACHE_BACKEND_ERRORS:
+                    # The lease expires on its own.
+                    self._stats["backend_errors"] += 1
+
+    async def _async_read_remote(
+        self, vin: str, window: timedelta, backend: CacheBackend
+    ) -> SharedFetch | None:
+        """Return another instance's fetch of the car within ``window``."""
+        raw = await backend.async_get(f"fetch:{vin}")
+        if raw is None:
+            return None
+        try:
+            instance, shared = shared_fetch_from_json(raw)
+        except (KeyError, TypeError, ValueError):
+            self._stats["unreadable"] += 1
+            return None
+        if instance == self._instance or dt_util.now() - shared.fetched_at > window:
+            return None
+        return shared
+
+    async def _async_wait_remote(
+        self, vin: str, window: timedelta, backend: CacheBackend
+    ) -> SharedFetch | None:
+        """Wait for the lease holder's fetch; None if it gives up or expires."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SHARED_LEASE_TTL.total_seconds()
+        while loop.time() < deadline:
+            await asyncio.sleep(SHARED_LEASE_POLL_S)
+            shared = await self._async_read_remote(vin, window, backend)
+            if shared is not None:
+                return shared
+            if await backend.async_get(f"lease:{vin}") is None:
+                return None
+        return None
+
+    @callback
+    def publish(self, vin: str, shared: SharedFetch) -> None:
+        """Offer a completed fetch of the car to the other entries."""
+        if shared.entry_id in self._entries:
+            self._latest[vin] = shared
+
+    async def async_share(
+        self, vin: str, shared: SharedFetch, backend: CacheBackend, *, ttl: timedelta
+    ) -> None:
+        """Write a published fetch to a shared backend for other instances."""
+        if not backend.shared:
+            return
+        try:
+            await backend.async_set(
+                f"fetch:{vin}", shared_fetch_to_json(shared, self._instance), ttl
+            )
+        except CACHE_BACKEND_ERRORS as err:
+            self._stats["backend_errors"] += 1
+            _LOGGER.debug("Shared cache unavailable for vin=...%s: %s", vin[-6:], err)
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return how often a fetch was shared instead of repeated."""
+        now = dt_util.now()
+        return {
+            "entries": len(self._entries),
+            "fetched": self._stats["fetched"],
+            "shared": self._stats["shared"],
+            "waited": self._stats["waited"],
+            "shared_remote": self._stats["shared_remote"],
+            "waited_remote": self._stats["waited_remote"],
+            "unreadable": self._stats["unreadable"],
+            "backend_errors": self._stats["backend_errors"],
+            # Age in seconds of the newest fetch of each car.
+            "fetch_age_s": {
+                f"...{vin[-6:]}": round((now - shared.fetched_at).total_seconds())
+                for vin, shared in self._latest.items()
+            },
+        }
+
+
+@callback
+def async_get_fetch_broker(hass: HomeAssistant) -> VinFetchBroker:
+    """Return the integration-wide fetch broker, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    broker: VinFetchBroker | None = domain_data.get(FETCH_BROKER)
+    if broker is None:
+        broker = domain_data[FETCH_BROKER] = VinFetchBroker(hass)
+    return broker
@@ -0,0 +1,183 @@
+"""Zone enter/exit events evaluated as soon as a car reports a new location.
+
+Home Assistant only re-evaluates a ``device_tracker``'s zone when its state
+is written, and automations then wait for the zone state to change. The
+engine here checks every committed location against Home Assistant's
+``zone.*`` entities itself and fires ``toyota_zone_enter`` /
+``toyota_zone_exit`` on the bus in the same refresh.
+
+``ZoneIndex`` keeps the zones sorted by latitude. A lookup bisects to the
+zones whose centre lies within the largest radius of the point's latitude,
+then measures the exact distance to just those, so a location costs
+O(log n + k) however many zones are configured. The index is rebuilt
+lazily after any zone is added, changed or removed.
+"""
+
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import ATTR_LATITUDE, ATTR_LONGITUDE
+from homeassistant.core import callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import TrackStates, async_track_state_change_filtered
+from homeassistant.util import location as location_util
+
+from .const import DOMAIN, EVENT_ZONE_ENTER, EVENT_ZONE_EXIT
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from homeassistant.core import Event, EventStateChangedData, HomeAssistant, State
+
+_LOGGER = logging.getLogger(__name__)
+
+# Metres per degree of latitude (mean Earth radius). A degree of longitude
+# is shorter, so a latitude band of radius / this always holds the circle.
+METRES_PER_DEGREE = 111_195.0
+
+
+@dataclass(frozen=True, slots=True)
+class Zone:
+    """A circular zone: ``radius`` metres around its centre."""
+
+    entity_id: str
+    latitude: float
+    longitude: float
+    radius: float
+
+    @classmethod
+    def from_state(cls, state: State) -> Zone | None:
+        """Build a zone from a ``zone.*`` state; None if it has no position."""
+        attributes = state.attributes
+        try:
+            return cls(
+                entity_id=state.entity_id,
+                latitude=float(attributes[ATTR_LATITUDE]),
+                longitude=float(attributes[ATTR_LONGITUDE]),
+                radius=float(attributes.get("radius", 0)),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+class ZoneIndex:
+    """Zones sorted by latitude for band lookups."""
+
+    __slots__ = ("_latitudes", "_max_band", "_zones")
+
+    def __init__(self, zones: Iterable[Zone]) -> None:
+        """Index ``zones``."""
+        self._zones = sorted(zones, key=lambda zone: zone.latitude)
+        self._latitudes = [zone.latitude for zone in self._zones]
+        self._max_band = max(
+            (zone.radius / METRES_PER_DEGREE for zone in self._zones), default=0.0
+        )
+
+    def __len__(self) -> int:
+        """Return the number of indexed zones."""
+        return len(self._zones)
+
+    def containing(self, latitude: float, longitude: float) -> list[Zone]:
+        """Return the zones containing the point, smallest first."""
+        lo = bisect_left(self._latitudes, latitude - self._max_band)
+        hi = bisect_right(self._latitudes, latitude + self._max_band)
+        inside: list[Zone] = []
+        for zone in self._zones[lo:hi]:
+            distance = location_util.distance(
+                latitude, longitude, zone.latitude, zone.longitude
+            )
+            if distance is not None and distance <= zone.radius:
+                inside.append(zone)
+        inside.sort(key=lambda zone: zone.radius)
+        return inside
+
+
+class GeofenceEngine:
+    """Track which zones each car is in and fire events on changes."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise without an index; it is built on first use."""
+        self._hass = hass
+        self._index: ZoneIndex | None = None
+        # vin -> zone entity_ids the car is in. A car's first evaluation
+        # (after a restart too) only seeds this, so no stale enter fires.
+        self._inside: dict[str, set[str]] = {}
+        self._stats: Counter[str] = Counter()
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Rebuild the index whenever a zone changes; return the unsubscriber."""
+        tracker = async_track_state_change_filtered(
+            self._hass,
+            TrackStates(all_states=False, entities=set(), domains={"zone"}),
+            self._zones_changed,
+        )
+        return tracker.async_remove
+
+    @callback
+    def _zones_changed(self, _event: Event[EventStateChangedData]) -> None:
+        self._index = None
+
+    def _zone_index(self) -> ZoneIndex:
+        if self._index is None:
+            zones = (Zone.from_state(s) for s in self._hass.states.async_all("zone"))
+            self._index = ZoneIndex(zone for zone in zones if zone is not None)
+            self._stats["index_builds"] += 1
+        return self._index
+
+    @callback
+    def evaluate(
+        self, vin: str, latitude: float | None, longitude: float | None
+    ) -> bool:
+        """Check a car's location; fire events and return whether it entered a zone."""
+        if latitude is None or longitude is None:
+            return False
+        zones = {
+            zone.entity_id
+            for zone in self._zone_index().containing(latitude, longitude)
+        }
+        self._stats["evaluations"] += 1
+        previous = self._inside.get(vin)
+        self._inside[vin] = zones
+        if previous is None:
+            return False
+        exited = previous - zones
+        entered = zones - previous
+        if not entered and not exited:
+            return False
+        device = dr.async_get(self._hass).async_get_device(identifiers={(DOMAIN, vin)})
+        # The device identifies the car; events, like logs, never carry the
+        # full VIN.
+        base = {
+            "device_id": device.id if device else None,
+            ATTR_LATITUDE: latitude,
+            ATTR_LONGITUDE: longitude,
+        }
+        for zone_id in sorted(exited):
+            self._hass.bus.async_fire(EVENT_ZONE_EXIT, {**base, "zone": zone_id})
+        for zone_id in sorted(entered):
+            self._hass.bus.async_fire(EVENT_ZONE_ENTER, {**base, "zone": zone_id})
+        self._stats["enter"] += len(entered)
+        self._stats["exit"] += len(exited)
+        _LOGGER.debug(
+            "Toyota vin=...%s entered %s, exited %s",
+            vin[-6:],
+            sorted(entered),
+            sorted(exited),
+        )
+        return bool(entered)
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return zone memberships and counters for the diagnostics download."""
+        return {
+            "zones": len(self._index) if self._index is not None else None,
+            "vehicles": {
+                f"...{vin[-6:]}": sorted(zones) for vin, zones in self._inside.items()
+            },
+            **dict(self._stats),
+        }
@@ -0,0 +1,171 @@
+"""Per-car models learned from an entry's own requests, kept across restarts.
+
+The refresh strategy's fixed thresholds (how long to poll after a wake,
+when a GET will find Toyota's cache warm, whether a wake will work, when
+the car leaves) fit the typical car. ``LearnedState`` holds what the
+integration has observed of each of this entry's cars and persists it in
+one ``.storage`` file per entry, so a restart or reload does not forget it.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .departure_model import DepartureModel
+from .report_cadence import ReportCadence
+from .wake_latency import WakeLatencyHistogram
+from .wake_success import WakeSuccessModel
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+LEARNED_STATE_STORAGE_VERSION = 1
+LEARNED_STATE_SAVE_DELAY_S = 60
+
+
+def learned_state_store_key(entry_id: str) -> str:
+    """Return the ``.storage`` key holding one entry's learned models."""
+    return f"{DOMAIN}.{entry_id}.learned_state"
+
+
+class LearnedState:
+    """One entry's per-car learned models and their persistence."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialise empty models; ``async_load`` restores saved ones."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, LEARNED_STATE_STORAGE_VERSION, learned_state_store_key(entry_id)
+        )
+        self._wake_latency: dict[str, WakeLatencyHistogram] = {}
+        self._report_cadence: dict[str, ReportCadence] = {}
+        self._wake_success: dict[str, WakeSuccessModel] = {}
+        self._departures: dict[str, DepartureModel] = {}
+        self._stats: Counter[str] = Counter()
+
+    async def async_load(self) -> None:
+        """Restore the models of a previous run."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        for vin, models in data.get("vehicles", {}).items():
+            # Models are restored one by one: a car keeps what still reads.
+            for name, model_cls, models_by_vin in self._models():
+                if name not in models:
+                    continue
+                try:
+                    models_by_vin[vin] = model_cls.from_dict(models[name])
+                except (KeyError, TypeError, ValueError):
+                    _LOGGER.debug(
+                        "Discarding unreadable %s for vin=...%s", name, vin[-6:]
+                    )
+
+    def _models(self) -> tuple[tuple[str, Any, dict[str, Any]], ...]:
+        """Return (storage name, class, models by VIN) of every model kind."""
+        return (
+            ("wake_latency", WakeLatencyHistogram, self._wake_latency),
+            ("report_cadence", ReportCadence, self._report_cadence),
+            ("wake_success", WakeSuccessModel, self._wake_success),
+            ("departures", DepartureModel, self._departures),
+        )
+
+    def _data_to_save(self) -> dict[str, Any]:
+        vehicles: dict[str, dict[str, Any]] = {}
+        for name, _cls, models_by_vin in self._models():
+            for vin, model in models_by_vin.items():
+                vehicles.setdefault(vin, {})[name] = model.as_dict()
+        return {"vehicles": vehicles}
+
+    def _schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, LEARNED_STATE_SAVE_DELAY_S)
+
+    def wake_latency(self, vin: str) -> WakeLatencyHistogram:
+        """Return the car's wake latency histogram (empty if never woken)."""
+        histogram = self._wake_latency.get(vin)
+        if histogram is None:
+            histogram = self._wake_latency[vin] = WakeLatencyHistogram()
+        return histogram
+
+    @callback
+    def record_wake(
+        self, vin: str, latency_s: float, *, timed_out: bool = False
+    ) -> None:
+        """Record how long a wake took (or that it outlasted ``latency_s``)."""
+        self.wake_latency(vin).record(latency_s, timed_out=timed_out)
+        self._stats["wake_timeouts" if timed_out else "wakes"] += 1
+        self._schedule_save()
+
+    def report_cadence(self, vin: str) -> ReportCadence:
+        """Return the car's report cadence estimator (empty if never read)."""
+        cadence = self._report_cadence.get(vin)
+        if cadence is None:
+            cadence = self._report_cadence[vin] = ReportCadence()
+        return cadence
+
+    @callback
+    def record_report(
+        self, vin: str, occurrence: datetime, *, woken: bool = False
+    ) -> None:
+        """Record a status report read from Toyota (``woken``: after our POST)."""
+        if self.report_cadence(vin).observe(occurrence, woken=woken):
+            self._stats["reports"] += 1
+            self._schedule_save()
+
+    def wake_success(self, vin: str) -> WakeSuccessModel:
+        """Return the car's wake success model (the prior if never woken)."""
+        model = self._wake_success.get(vin)
+        if model is None:
+            model = self._wake_success[vin] = WakeSuccessModel()
+        return model
+
+    @callback
+    def record_wake_outcome(
+        self, vin: str, trigger: str, sent_at: datetime, *, success: bool
+    ) -> None:
+        """Record whether a wake POST sent at ``sent_at`` made the car report."""
+        self.wake_success(vin).record(trigger, sent_at, success=success)
+        self._schedule_save()
+
+    def departures(self, vin: str) -> DepartureModel:
+        """Return the car's departure model (empty if never observed)."""
+        model = self._departures.get(vin)
+        if model is None:
+            model = self._departures[vin] = DepartureModel()
+        return model
+
+    @callback
+    def note_moving(self, vin: str, now: datetime) -> None:
+        """Tell the car's models it is driving."""
+        self.report_cadence(vin).note_moving()
+        self.wake_success(vin).note_moving(now)
+
+    @callback
+    def observe_movement(self, vin: str, now: datetime, *, moving: bool) -> None:
+        """Record one cycle's movement of the car (``now``: local time)."""
+        # A new model is saved at once: its observation start is the history
+        # its probabilities are measured against.
+        new = vin not in self._departures
+        if self.departures(vin).observe(now, moving=moving):
+            self._stats["departures"] += 1
+            self._schedule_save()
+        elif new:
+            self._schedule_save()
+        if moving:
+            self.note_moving(vin, now)
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return each car's learned models for the diagnostics download."""
+        vehicles: dict[str, dict[str, Any]] = {}
+        for name, _cls, models_by_vin in self._models():
+            for vin, model in models_by_vin.items():
+                vehicles.setdefault(f"...{vin[-6:]}", {})[name] = model.diagnostics()
+        return {"vehicles": vehicles, **dict(self._stats)}
@@ -0,0 +1,270 @@
+"""Per-car history of parked locations.
+
+Toyota's ``/v1/location`` only reports where the car was last parked, and
+only changes after the car has moved. Each position that differs from the
+previous one is appended to a per-VIN ``LocationTrack`` so recent stops
+(and the path between them) can be drawn without asking Toyota again.
+
+A track stores its points delta-encoded: the absolute first point, then
+per point the seconds since the previous point and the latitude/longitude
+change in 1e-5 degree steps (about 1 m). Consecutive stops are usually a
+few km apart, so the deltas stay small in memory and in ``.storage``.
+Tracks are bounded both by the retention period and by
+``LOCATION_HISTORY_MAX_POINTS``; the oldest points are dropped first.
+"""
+
+from __future__ import annotations
+
+import logging
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+    from pytoyoda.models.location import Location
+
+_LOGGER = logging.getLogger(__name__)
+
+LOCATION_HISTORY_STORAGE_VERSION = 1
+LOCATION_HISTORY_SAVE_DELAY_S = 30
+# Even a car parked dozens of times a day stays well under this within
+# the longest retention the options allow.
+LOCATION_HISTORY_MAX_POINTS = 4096
+# 1e-5 degrees: ~1.1 m of latitude, finer than the API's GPS fixes.
+COORDINATE_SCALE = 100_000
+
+
+def location_history_store_key(entry_id: str) -> str:
+    """Return the ``.storage`` key holding one entry's location tracks."""
+    return f"{DOMAIN}.{entry_id}.location_history"
+
+
+class LocationTrack:
+    """Bounded, delta-encoded sequence of ``(timestamp, lat, lon)`` points."""
+
+    __slots__ = ("_dlat", "_dlon", "_dt", "_last", "_origin")
+
+    def __init__(self) -> None:
+        """Create an empty track."""
+        # Absolute (timestamp, lat, lon) the first delta is relative to.
+        self._origin: tuple[int, int, int] = (0, 0, 0)
+        self._dt = array("l")
+        self._dlat = array("l")
+        self._dlon = array("l")
+        # Absolute newest point, so appends don't decode the track.
+        self._last: tuple[int, int, int] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of stored points."""
+        return len(self._dt)
+
+    @property
+    def last_timestamp(self) -> int | None:
+        """Return the newest point's Unix timestamp."""
+        return self._last[0] if self._last else None
+
+    def append(self, timestamp: float, latitude: float, longitude: float) -> bool:
+        """Add a point after the newest one; return False if it adds nothing.
+
+        Points not newer than the newest one, or at the same (scaled)
+        position, are ignored: the API repeats the last parked location
+        until the car moves.
+        """
+        point = (
+            int(timestamp),
+            round(latitude * COORDINATE_SCALE),
+            round(longitude * COORDINATE_SCALE),
+        )
+        previous = self._last
+        if previous is None:
+            self._origin = previous = point
+        elif point[0] <= previous[0] or point[1:] == previous[1:]:
+            return False
+        self._dt.append(point[0] - previous[0])
+        self._dlat.append(point[1] - previous[1])
+        self._dlon.append(point[2] - previous[2])
+        self._last = point
+        if len(self._dt) > LOCATION_HISTORY_MAX_POINTS:
+            self._drop(len(self._dt) - LOCATION_HISTORY_MAX_POINTS)
+        return True
+
+    def _drop(self, count: int) -> None:
+        """Drop the ``count`` oldest points, folding their deltas into the origin."""
+        ts, lat, lon = self._origin
+        self._origin = (
+            ts + sum(self._dt[:count]),
+            lat + sum(self._dlat[:count]),
+            lon + sum(self._dlon[:count]),
+        )
+        del self._dt[:count], self._dlat[:count], self._dlon[:count]
+
+    def trim(self, oldest: float) -> None:
+        """Drop points older than ``oldest``, always keeping the newest one."""
+        ts = self._origin[0]
+        count = 0
+        for delta in self._dt[:-1]:
+            ts += delta
+            if ts >= oldest:
+                break
+            count += 1
+        if count:
+            self._drop(count)
+
+    def points(
+        self, start: float | None = None, end: float | None = None
+    ) -> list[tuple[int, float, float]]:
+        """Decode the points with ``start <= timestamp < end``, oldest first."""
+        ts, lat, lon = self._origin
+        result: list[tuple[int, float, float]] = []
+        for dt, dlat, dlon in zip(self._dt, self._dlat, self._dlon, strict=True):
+            ts, lat, lon = ts + dt, lat + dlat, lon + dlon
+            if start is not None and ts < start:
+                continue
+            if end is not None and ts >= end:
+                break
+            result.append((ts, lat / COORDINATE_SCALE, lon / COORDINATE_SCALE))
+        return result
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the encoded track for ``.storage``."""
+        return {
+            "origin": list(self._origin),
+            "dt": self._dt.tolist(),
+            "dlat": self._dlat.tolist(),
+            "dlon": self._dlon.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LocationTrack:
+        """Rebuild a track saved by ``as_dict``."""
+        track = cls()
+        track._origin = tuple(data["origin"])  # type: ignore[assignment]
+        track._dt.extend(data["dt"])
+        track._dlat.extend(data["dlat"])
+        track._dlon.extend(data["dlon"])
+        if track._dt:
+            track._last = (
+                track._origin[0] + sum(track._dt),
+                track._origin[1] + sum(track._dlat),
+                track._origin[2] + sum(track._dlon),
+            )
+        return track
+
+
+class LocationHistory:
+    """Keep one account's location tracks and persist them per entry."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, *, retention_days: int
+    ) -> None:
+        """Initialise empty tracks; ``async_load`` restores saved ones."""
+        self._hass = hass
+        self._retention_s = retention_days * 86400
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            LOCATION_HISTORY_STORAGE_VERSION,
+            location_history_store_key(entry_id),
+        )
+        self._tracks: dict[str, LocationTrack] = {}
+        self._stats: Counter[str] = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether positions are recorded at all."""
+        return self._retention_s > 0
+
+    async def async_load(self) -> None:
+        """Restore the tracks of a previous run, or delete them if disabled."""
+        if not self.enabled:
+            # Turning the history off also forgets the recorded positions.
+            await self._store.async_remove()
+            return
+        data = await self._store.async_load()
+        if not data:
+            return
+        oldest = dt_util.utcnow().timestamp() - self._retention_s
+        for vin, encoded in data.get("vehicles", {}).items():
+            try:
+                track = LocationTrack.from_dict(encoded)
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning(
+                    "Discarding unreadable location history for vin=...%s", vin[-6:]
+                )
+                continue
+            # The retention may have been shortened since the save.
+            track.trim(oldest)
+            self._tracks[vin] = track
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "vehicles": {vin: track.as_dict() for vin, track in self._tracks.items()}
+        }
+
+    @callback
+    def note_fetch(self, *, skipped: bool) -> None:
+        """Count a location fetch made or skipped, for diagnostics."""
+        self._stats["fetches_skipped" if skipped else "fetches"] += 1
+
+    @callback
+    def record(self, vin: str, location: Location | None) -> bool:
+        """Append the car's reported location if it moved; return whether it did."""
+        if not self.enabled or location is None:
+            return False
+        latitude, longitude = location.latitude, location.longitude
+        if latitude is None or longitude is None:
+            return False
+        acquired = location.timestamp or dt_util.utcnow()
+        track = self._tracks.get(vin)
+        if track is None:
+            track = self._tracks[vin] = LocationTrack()
+        if not track.append(acquired.timestamp(), latitude, longitude):
+            return False
+        track.trim(dt_util.utcnow().timestamp() - self._retention_s)
+        self._stats["points"] += 1
+        self._store.async_delay_save(self._data_to_save, LOCATION_HISTORY_SAVE_DELAY_S)
+        return True
+
+    def points(
+        self, vin: str, start: datetime | None = None, end: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        """Return the car's stored points in ``[start, end)``, oldest first."""
+        track = self._tracks.get(vin)
+        if track is None:
+            return []
+        return [
+            {
+                "time": dt_util.utc_from_timestamp(ts).isoformat(),
+                "latitude": lat,
+                "longitude": lon,
+            }
+            for ts, lat, lon in track.points(
+                start.timestamp() if start else None, end.timestamp() if end else None
+            )
+        ]
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return track sizes and fetch counters for the diagnostics download."""
+        return {
+            "retention_days": self._retention_s // 86400,
+            "vehicles": {
+                f"...{vin[-6:]}": {
+                    "points": len(track),
+                    "newest": (
+                        dt_util.utc_from_timestamp(track.last_timestamp).isoformat()
+                        if track.last_timestamp is not None
+                        else None
+                    ),
+                }
+                for vin, track in self._tracks.items()
+            },
+            **dict(self._stats),
+        }
@@ -0,0 +1,470 @@
+"""Columnar evaluation of the refresh decision tree for many VINs at once.
+
+``decide()`` takes one ``CycleSnapshot`` per VIN. A fleet tool or an
+offline sweep that decides hundreds of cars per cycle spends most of that
+walking dataclasses. ``decide_batch()`` takes the same inputs as columns
+(built directly, or once with ``FleetColumns.from_snapshots``),
+one row per VIN sharing one ``now`` and one ``StrategyOptions``, and
+returns the action, trigger and refresh-state of every row in one pass.
+
+Timestamps are int64 microseconds since the Unix epoch with ``NO_TIME``
+for None, so every age comparison is as exact as the scalar tree's
+timedelta arithmetic; odometers are float64 with NaN for None. With numpy
+the tree runs as array expressions for the four built-in policies. A
+policy registered elsewhere in POLICIES, or a missing numpy, falls back to
+calling ``decide()`` row by row, so the results never differ.
+
+Pure module, like refresh_strategy: no hass, no I/O, no clock.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from .refresh_strategy import (
+    AGGRESSIVE_IDLE_WAKE_HOURS,
+    IDLE_WAKE_DEPARTURE_FLOOR,
+    PRE_DEPARTURE_LEAD,
+    QUIET_CACHE_AGE_FACTOR,
+    REPORT_DEFER_FACTOR,
+    WAKE_BUDGET_WINDOW,
+    AggressivePolicy,
+    CycleSnapshot,
+    DefaultPolicy,
+    QuotaPolicy,
+    RefreshAction,
+    RefreshDecision,
+    RefreshState,
+    RefreshTrigger,
+    StrategyOptions,
+    TimeOfDayPolicy,
+    VinState,
+    decide,
+    hard_disable_decision,
+    in_quiet_hours,
+    policy_for,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with Home Assistant
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+# Codes of the output columns: ACTIONS[code] is the RefreshAction, etc.
+ACTIONS: tuple[RefreshAction, ...] = tuple(RefreshAction)
+TRIGGERS: tuple[RefreshTrigger, ...] = tuple(RefreshTrigger)
+REFRESH_STATES: tuple[RefreshState, ...] = tuple(RefreshState)
+
+# A timestamp column's None.
+NO_TIME = -(2**63)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_US = timedelta(microseconds=1)
+_HOUR_US = 3_600_000_000
+_MINUTE_US = 60_000_000
+# decide()'s cache age when nothing was ever fetched.
+_NEVER_FETCHED_AGE_US = timedelta(days=365) // _US
+
+_A = {action: code for code, action in enumerate(ACTIONS)}
+_T = {trigger: code for code, trigger in enumerate(TRIGGERS)}
+_S = {state: code for code, state in enumerate(REFRESH_STATES)}
+
+
+def to_us(value: datetime | None) -> int:
+    """Return an aware datetime as epoch microseconds, None as NO_TIME."""
+    return NO_TIME if value is None else (value - _EPOCH) // _US
+
+
+def from_us(value: int) -> datetime | None:
+    """Invert ``to_us``."""
+    return None if value == NO_TIME else _EPOCH + value * _US
+
+
+@dataclass(slots=True)
+class FleetColumns:
+    """Every VIN's decide() inputs as parallel columns, one row per VIN.
+
+    Columns are numpy arrays when numpy is available, lists otherwise.
+    ``recent_posts`` is the number of POST attempts inside the quota window
+    at the batch's ``now``, the one thing the quota policy reads from
+    ``VinState.recent_post_attempts``.
+    """
+
+    current_odometer_km: Any
+    last_odometer_km: Any
+    was_moving_last_cycle: Any
+    last_status_occurrence_date: Any
+    last_status_fetch_at: Any
+    last_post_attempt_at: Any
+    soft_disabled: Any
+    remaining_post_cycles: Any
+    recent_posts: Any
+    user_service_call_pending: Any
+    expected_report_at: Any
+    # Predicted wake success per gated trigger; NaN where none was given.
+    just_stopped_success: Any
+    idle_wake_success: Any
+    pre_departure_success: Any
+    departure_at: Any
+    # Chance of a departure within the lookahead; NaN where unknown.
+    departure_likelihood: Any
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.current_odometer_km)
+
+    @classmethod
+    def from_snapshots(cls, snapshots: Sequence[CycleSnapshot]) -> FleetColumns:
+        """Build the columns from per-VIN snapshots (their options are ignored)."""
+
+        def odometer(value: float | None) -> float:
+            return math.nan if value is None else float(value)
+
+        states = [snap.state for snap in snapshots]
+        columns = {
+            "current_odometer_km": [
+                odometer(snap.current_odometer_km) for snap in snapshots
+            ],
+            "last_odometer_km": [odometer(s.last_odometer_km) for s in states],
+            "was_moving_last_cycle": [s.was_moving_last_cycle for s in states],
+            "last_status_occurrence_date": [
+                to_us(s.last_status_occurrence_date) for s in states
+            ],
+            "last_status_fetch_at": [to_us(s.last_status_fetch_at) for s in states],
+            "last_post_attempt_at": [to_us(s.last_post_attempt_at) for s in states],
+            "soft_disabled": [s.soft_disabled for s in states],
+            "remaining_post_cycles": [s.remaining_post_cycles for s in states],
+            "recent_posts": [
+                sum(
+                    1
+                    for at in snap.state.recent_post_attempts
+                    if snap.now - at < WAKE_BUDGET_WINDOW
+                )
+                for snap in snapshots
+            ],
+            "user_service_call_pending": [
+                snap.user_service_call_pending for snap in snapshots
+            ],
+            "expected_report_at": [
+                to_us(snap.expected_report_at) for snap in snapshots
+            ],
+            "just_stopped_success": [
+                snap.wake_success.get(RefreshTrigger.JUST_STOPPED, math.nan)
+                for snap in snapshots
+            ],
+            "idle_wake_success": [
+                snap.wake_success.get(RefreshTrigger.IDLE_WAKE, math.nan)
+                for snap in snapshots
+            ],
+            "pre_departure_success": [
+                snap.wake_success.get(RefreshTrigger.PRE_DEPARTURE, math.nan)
+                for snap in snapshots
+            ],
+            "departure_at": [to_us(snap.departure_at) for snap in snapshots],
+            "departure_likelihood": [
+                math.nan
+                if snap.departure_likelihood is None
+                else snap.departure_likelihood
+                for snap in snapshots
+            ],
+        }
+        if np is not None:
+            dtypes = {
+                "current_odometer_km": np.float64,
+                "last_odometer_km": np.float64,
+                "was_moving_last_cycle": np.bool_,
+                "soft_disabled": np.bool_,
+                "user_service_call_pending": np.bool_,
+                "just_stopped_success": np.float64,
+                "idle_wake_success": np.float64,
+                "pre_departure_success": np.float64,
+                "departure_likelihood": np.float64,
+            }
+            columns = {
+                name: np.asarray(values, dtype=dtypes.get(name, np.int64))
+                for name, values in columns.items()
+            }
+        return cls(**columns)
+
+    def wake_success(self, row: int) -> dict[RefreshTrigger, float]:
+        """Return one row's predicted wake success per trigger."""
+        return {
+            trigger: float(column[row])
+            for trigger, column in (
+                (RefreshTrigger.JUST_STOPPED, self.just_stopped_success),
+                (RefreshTrigger.IDLE_WAKE, self.idle_wake_success),
+                (RefreshTrigger.PRE_DEPARTURE, self.pre_departure_success),
+            )
+            if not math.isnan(column[row])
+        }
+
+    def vin_state(self, row: int, now: datetime) -> VinState:
+        """Rebuild one row's VinState (recent posts as ``now``, oldest first)."""
+        last_odometer = float(self.last_odometer_km[row])
+        return VinState(
+            last_odometer_km=None if math.isnan(last_odometer) else last_odometer,
+            was_moving_last_cycle=bool(self.was_moving_last_cycle[row]),
+            last_status_occurrence_date=from_us(
+                int(self.last_status_occurrence_date[row])
+            ),
+            last_status_fetch_at=from_us(int(self.last_status_fetch_at[row])),
+            last_post_attempt_at=from_us(int(self.last_post_attempt_at[row])),
+            soft_disabled=bool(self.soft_disabled[row]),
+            remaining_post_cycles=int(self.remaining_post_cycles[row]),
+            recent_post_attempts=[now] * int(self.recent_posts[row]),
+        )
+
+    def departure_likelihood_at(self, row: int) -> float | None:
+        """Return one row's departure likelihood, None where unknown."""
+        likelihood = float(self.departure_likelihood[row])
+        return None if math.isnan(likelihood) else likelihood
+
+
+@dataclass(slots=True)
+class BatchDecision:
+    """Code columns indexing ACTIONS, TRIGGERS and REFRESH_STATES."""
+
+    actions: Any
+    triggers: Any
+    refresh_states: Any
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.actions)
+
+    def decision(self, row: int) -> RefreshDecision:
+        """Return one row as the RefreshDecision decide() would have made."""
+        return RefreshDecision(
+            action=ACTIONS[int(self.actions[row])],
+            trigger=TRIGGERS[int(self.triggers[row])],
+            refresh_state=REFRESH_STATES[int(self.refresh_states[row])],
+        )
+
+
+def decide_batch(
+    columns: FleetColumns, now: datetime, options: StrategyOptions
+) -> BatchDecision:
+    """Decide every row of ``columns`` as ``decide()`` would, in one pass."""
+    hard = hard_disable_decision(options)
+    if hard is not None:
+        rows = len(columns)
+        return BatchDecision(
+            actions=_filled(rows, _A[hard.action]),
+            triggers=_filled(rows, _T[hard.trigger]),
+            refresh_states=_filled(rows, _S[hard.refresh_state]),
+        )
+    if np is None or type(policy_for(options)) not in _VECTORISED:
+        return _decide_rows(columns, now, options)
+    return _decide_arrays(columns, now, options)
+
+
+def _filled(rows: int, code: int) -> np.ndarray | list[int]:
+    if np is None:
+        return [code] * rows
+    return np.full(rows, code, dtype=np.int8)
+
+
+def _decide_rows(
+    columns: FleetColumns, now: datetime, options: StrategyOptions
+) -> BatchDecision:
+    """Fall back to the scalar tree, one snapshot per row."""
+    actions: list[int] = []
+    triggers: list[int] = []
+    refresh_states: list[int] = []
+    for row in range(len(columns)):
+        odometer = float(columns.current_odometer_km[row])
+        decision = decide(
+            CycleSnapshot(
+                now=now,
+                current_odometer_km=None if math.isnan(odometer) else odometer,
+                state=columns.vin_state(row, now),
+                options=options,
+                user_service_call_pending=bool(columns.user_service_call_pending[row]),
+                expected_report_at=from_us(int(columns.expected_report_at[row])),
+                wake_success=columns.wake_success(row),
+                departure_at=from_us(int(columns.departure_at[row])),
+                departure_likelihood=columns.departure_likelihood_at(row),
+            )
+        )
+        actions.append(_A[decision.action])
+        triggers.append(_T[decision.trigger])
+        refresh_states.append(_S[decision.refresh_state])
+    if np is None:
+        return BatchDecision(actions, triggers, refresh_states)
+    return BatchDecision(
+        np.asarray(actions, dtype=np.int8),
+        np.asarray(triggers, dtype=np.int8),
+        np.asarray(refresh_states, dtype=np.int8),
+    )
+
+
+def _departure_masks(
+    c: FleetColumns, now_us: int, options: StrategyOptions
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the rows due a pre-departure read and those unlikely to leave."""
+    if not options.pre_departure:
+        none = np.zeros(len(c), dtype=np.bool_)
+        return none, none
+    # A row without a departure gets now, which is never before it;
+    # NO_TIME itself would wrap around when the lead is subtracted.
+    departure_at = np.where(c.departure_at == NO_TIME, now_us, c.departure_at)
+    lead_start = departure_at - PRE_DEPARTURE_LEAD // _US
+    # NO_TIME sorts before every time: never fetched / posted passes.
+    due = (
+        (lead_start <= now_us)
+        & (now_us < departure_at)
+        & (c.last_status_fetch_at < lead_start)
+        & (c.last_post_attempt_at < lead_start)
+    )
+    # NaN (unknown) compares False: the idle wake goes out.
+    return due, c.departure_likelihood < IDLE_WAKE_DEPARTURE_FLOOR
+
+
+def _decide_arrays(
+    c: FleetColumns, now: datetime, options: StrategyOptions
+) -> BatchDecision:
+    """Run decide() and the built-in policies as array expressions."""
+    policy = type(policy_for(options))
+    now_us = to_us(now)
+
+    moving = (
+        ~np.isnan(c.last_odometer_km)
+        & ~np.isnan(c.current_odometer_km)
+        & (c.current_odometer_km != c.last_odometer_km)
+    )
+    just_stopped = c.was_moving_last_cycle & ~moving
+    since_post = now_us - c.last_post_attempt_at
+    never_posted = c.last_post_attempt_at == NO_TIME
+
+    pre_departure, departure_unlikely = _departure_masks(c, now_us, options)
+    report_since_read = (c.expected_report_at != NO_TIME) & (
+        (c.last_status_fetch_at == NO_TIME)
+        | (c.expected_report_at > c.last_status_fetch_at)
+    )
+
+    def idle_due(hours: int) -> np.ndarray:
+        return (never_posted | (since_post >= hours * _HOUR_US)) & ~departure_unlikely
+
+    # _resolve_post_trigger's precedence chain; np.select takes the first
+    # condition that holds.
+    chain = [
+        c.user_service_call_pending,
+        c.remaining_post_cycles > 0,
+        just_stopped,
+        moving,
+        pre_departure,
+        idle_due(options.idle_wake_hours)
+        if options.idle_wake_hours > 0
+        else np.zeros(len(c), dtype=np.bool_),
+    ]
+    trigger = np.select(
+        chain,
+        [
+            _T[RefreshTrigger.SERVICE_CALL],
+            _T[RefreshTrigger.JUST_STOPPED_FOLLOWUP],
+            _T[RefreshTrigger.JUST_STOPPED],
+            _T[RefreshTrigger.CURRENTLY_MOVING],
+            _T[RefreshTrigger.PRE_DEPARTURE],
+            _T[RefreshTrigger.IDLE_WAKE],
+        ],
+        _T[RefreshTrigger.NONE],
+    ).astype(np.int8)
+    post = np.select(
+        chain, [True, True, True, False, ~report_since_read, True], default=False
+    ).astype(np.bool_)
+
+    max_age_us = options.max_cache_age_minutes * _MINUTE_US
+    wake = (
+        (trigger == _T[RefreshTrigger.JUST_STOPPED])
+        | (trigger == _T[RefreshTrigger.IDLE_WAKE])
+        | (trigger == _T[RefreshTrigger.PRE_DEPARTURE])
+    )
+    if policy is QuotaPolicy:
+        cost = np.where(
+            trigger == _T[RefreshTrigger.JUST_STOPPED],
+            options.post_count_per_stop,
+            1,
+        )
+        post &= ~(wake & (c.recent_posts + cost > options.daily_wake_budget))
+    elif policy is TimeOfDayPolicy:
+        if in_quiet_hours(now, options):
+            post &= ~wake
+            max_age_us *= QUIET_CACHE_AGE_FACTOR
+    elif policy is AggressivePolicy:
+        extra = (trigger == _T[RefreshTrigger.NONE]) & idle_due(
+            options.idle_wake_hours or AGGRESSIVE_IDLE_WAKE_HOURS
+        )
+        post |= extra
+        trigger[extra] = _T[RefreshTrigger.IDLE_WAKE]
+    if options.wake_success_floor > 0:
+        predicted = np.where(
+            trigger == _T[RefreshTrigger.JUST_STOPPED],
+            c.just_stopped_success,
+            np.where(
+                trigger == _T[RefreshTrigger.IDLE_WAKE],
+                c.idle_wake_success,
+                np.where(
+                    trigger == _T[RefreshTrigger.PRE_DEPARTURE],
+                    c.pre_departure_success,
+                    np.nan,
+                ),
+            ),
+        )
+        # NaN (no prediction) compares False: the wake goes out.
+        post &= ~(predicted < options.wake_success_floor)
+    # The predictor replaces soft-disable, as in decide().
+    soft_disabled = c.soft_disabled & (options.wake_success_floor <= 0)
+    post &= ~soft_disabled
+
+    cache_age = np.where(
+        c.last_status_fetch_at == NO_TIME,
+        _NEVER_FETCHED_AGE_US,
+        now_us - c.last_status_fetch_at,
+    )
+    if policy is AggressivePolicy:
+        # timedelta / 2 rounds half to even, as the scalar policy does.
+        half = timedelta(microseconds=max_age_us) / 2 // _US
+        max_age = np.where(moving, 0, half)
+    else:
+        max_age = np.full(len(c), max_age_us, dtype=np.int64)
+    stale = cache_age > max_age
+    stale &= ~(
+        (c.expected_report_at != NO_TIME)
+        & (c.last_status_fetch_at != NO_TIME)
+        & (c.expected_report_at <= c.last_status_fetch_at)
+        & (cache_age <= max_age * REPORT_DEFER_FACTOR)
+    )
+    empty = c.last_status_occurrence_date == NO_TIME
+    get = (
+        just_stopped
+        | post
+        | stale
+        | empty
+        | (trigger == _T[RefreshTrigger.PRE_DEPARTURE])
+    )
+
+    untriggered_get = ~post & get & (trigger == _T[RefreshTrigger.NONE])
+    trigger[untriggered_get & empty] = _T[RefreshTrigger.CACHE_EMPTY]
+    trigger[untriggered_get & ~empty & stale] = _T[RefreshTrigger.CACHE_STALE]
+
+    action = np.where(
+        post,
+        _A[RefreshAction.POST_THEN_GET],
+        np.where(get, _A[RefreshAction.GET_ONLY], _A[RefreshAction.SERVE_FROM_CACHE]),
+    ).astype(np.int8)
+    refresh_state = np.where(
+        soft_disabled,
+        _S[RefreshState.SOFT_DISABLED_UNREACHABLE],
+        _S[RefreshState.ACTIVE],
+    ).astype(np.int8)
+    return BatchDecision(action, trigger, refresh_state)
+
+
+# Policies _decide_arrays implements; anything else goes row by row.
+_VECTORISED = frozenset({DefaultPolicy, QuotaPolicy, TimeOfDayPolicy, AggressivePolicy})
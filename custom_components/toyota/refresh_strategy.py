@@ -25,12 +25,12 @@ in the caller so retain-vs-propagate failure semantics stay there.
       state.was_moving_last_cycle = (movement detected this cycle)
 
   - When action == POST_THEN_GET:
-      state.last_post_attempt_at = now
+      on_post_attempt(state, now)
       if decision.trigger is JUST_STOPPED:
           state.remaining_post_cycles = options.post_count_per_stop - 1
       elif decision.trigger is JUST_STOPPED_FOLLOWUP:
           state.remaining_post_cycles = max(0, state.remaining_post_cycles - 1)
-      # SERVICE_CALL / IDLE_WAKE do not touch remaining_post_cycles.
+      # SERVICE_CALL / IDLE_WAKE / PRE_DEPARTURE do not touch remaining_post_cycles.
       On Layer 1 result: call on_post_layer1_failure() or
         on_post_layer1_success().
       On poll-loop outcome:
@@ -48,18 +48,40 @@ in the caller so retain-vs-propagate failure semantics stay there.
   - When action == HARD_DISABLED:
       Caller falls through to legacy path (bare vehicle.update()).
       No new state mutations.
+
+Policies: when and why to POST, and how old the cache may get, come from
+the RefreshPolicy named by ``StrategyOptions.policy`` (see POLICIES).
+The hard-disable, soft-disable and GET plumbing around them is shared, so
+every policy honours the same caller contract.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import StrEnum
+from typing import Protocol
 
 # Number of consecutive Layer 1 (gateway-rejected) wake POSTs that auto-disables
 # refresh-status for the entire config entry. Per remediation-plan Addendum 4.
 _AUTO_DISABLE_REJECTION_THRESHOLD = 2
 
+# Window the quota policy counts wake POSTs over.
+WAKE_BUDGET_WINDOW = timedelta(days=1)
+# The time-of-day policy lets the cache age this much longer in quiet hours.
+QUIET_CACHE_AGE_FACTOR = 4
+# Idle-wake period of the aggressive policy when idle_wake_hours is 0.
+AGGRESSIVE_IDLE_WAKE_HOURS = 4
+# A stale-cache GET waits for the car's expected auto-report at most until
+# the cache is this many times older than allowed; a wrong cadence estimate
+# then costs a late GET, never a missing one.
+REPORT_DEFER_FACTOR = 4
+# How long before a likely departure the pre-departure read goes out.
+PRE_DEPARTURE_LEAD = timedelta(minutes=15)
+# Idle wakes are skipped while the car is less likely than this to leave
+# within the departure model's lookahead (pre_departure on).
+IDLE_WAKE_DEPARTURE_FLOOR = 0.1
+
 
 class RefreshAction(StrEnum):
     """What this cycle should do for one VIN."""
@@ -106,6 +128,18 @@ class RefreshTrigger(StrEnum):
     IDLE_WAKE = "idle_wake"
     CACHE_STALE = "cache_stale"
     CACHE_EMPTY = "cache_empty"
+    PRE_DEPARTURE = "pre_departure"
+
+
+# Wake triggers the success predictor may veto; service calls (the user
+# asked) and stop followups (the car was just awake) always go out.
+_PREDICTED_TRIGGERS = frozenset(
+    {
+        RefreshTrigger.JUST_STOPPED,
+        RefreshTrigger.IDLE_WAKE,
+        RefreshTrigger.PRE_DEPARTURE,
+    }
+)
 
 
 # ----------------------------------------------------------------------------
@@ -129,6 +163,21 @@ class StrategyOptions:
     # immediately following cycles. Cycle-count based (not wall-clock) so that
     # the behaviour is consistent regardless of polling interval.
     post_count_per_stop: int = 2
+    # Key into POLICIES; unknown names fall back to the default tree.
+    policy: str = "default"
+    # Quota policy: wake POSTs per car in any 24 hours (service calls are
+    # counted but never refused).
+    daily_wake_budget: int = 6
+    # Time-of-day policy: local hours [start, end) without automatic wakes.
+    quiet_hours_start: int = 22
+    quiet_hours_end: int = 7
+    # Skip just_stopped / idle_wake POSTs predicted to succeed less often
+    # than this (wake_success.py). 0 disables the predictor and keeps the
+    # failed_wake_threshold soft-disable instead.
+    wake_success_floor: float = 0.0
+    # Read the car once shortly before its learned departure times, and
+    # skip idle wakes while no departure is likely (departure_model.py).
+    pre_departure: bool = False
 
 
 @dataclass
@@ -153,6 +202,9 @@ class VinState:
     # by the caller after each followup POST. > 0 -> next cycle fires another
     # POST trigger=just_stopped_followup. Clears naturally to 0.
     remaining_post_cycles: int = 0
+    # POST attempts within the last WAKE_BUDGET_WINDOW, oldest first.
+    # Maintained by on_post_attempt(); read by the quota policy.
+    recent_post_attempts: list[datetime] = field(default_factory=list)
 
     # Whether last_good_response is non-None - used to short-circuit
     # SERVE_FROM_CACHE when there's nothing to serve.
@@ -168,6 +220,17 @@ class CycleSnapshot:
     state: VinState
     options: StrategyOptions
     user_service_call_pending: bool = False
+    # Newest auto-report the car has probably made by now, from its learned
+    # report cadence (report_cadence.py); None when not known.
+    expected_report_at: datetime | None = None
+    # Predicted success of a wake POST sent now, per trigger; a trigger
+    # without an entry is assumed to succeed.
+    wake_success: dict[RefreshTrigger, float] = field(default_factory=dict)
+    # Start of the car's next likely departure hour, and the chance it
+    # leaves within the model's lookahead, from its departure model
+    # (departure_model.py); None when not known or pre_departure is off.
+    departure_at: datetime | None = None
+    departure_likelihood: float | None = None
 
 
 # ----------------------------------------------------------------------------
@@ -191,7 +254,7 @@ class RefreshDecision:
 # ----------------------------------------------------------------------------
 
 
-def _hard_disable_decision(opts: StrategyOptions) -> RefreshDecision | None:
+def hard_disable_decision(opts: StrategyOptions) -> RefreshDecision | None:
     """Return a HARD_DISABLED decision if either disable flag is set, else None."""
     if not opts.enable_status_refresh:
         return RefreshDecision(
@@ -217,12 +280,11 @@ def _resolve_post_trigger(
     """Pick whether this cycle should POST and the diagnostic trigger label.
 
     Order of precedence is significant: explicit user requests beat in-flight
-    stop followups beat fresh stop detection beat idle-wake. Movement is the
-    fallback "informational" trigger when none of the above fire.
+    stop followups beat fresh stop detection beat a pre-departure read beat
+    idle-wake. Movement is the fallback "informational" trigger when none
+    of the first three fire.
     """
     state = snapshot.state
-    opts = snapshot.options
-    now = snapshot.now
 
     if snapshot.user_service_call_pending:
         return True, RefreshTrigger.SERVICE_CALL
@@ -232,12 +294,244 @@ def _resolve_post_trigger(
         return True, RefreshTrigger.JUST_STOPPED
     if car_currently_moving:
         return False, RefreshTrigger.CURRENTLY_MOVING
-    if opts.idle_wake_hours > 0 and (
-        state.last_post_attempt_at is None
-        or (now - state.last_post_attempt_at) >= timedelta(hours=opts.idle_wake_hours)
-    ):
-        return True, RefreshTrigger.IDLE_WAKE
-    return False, RefreshTrigger.NONE
+    if _pre_departure_due(snapshot):
+        # A GET does when the car has probably reported since our last
+        # read; otherwise only a wake gets a status newer than that read.
+        return not _report_since_last_read(snapshot), RefreshTrigger.PRE_DEPARTURE
+    idle_wake = _idle_wake_due(snapshot, snapshot.options.idle_wake_hours)
+    return idle_wake, RefreshTrigger.IDLE_WAKE if idle_wake else RefreshTrigger.NONE
+
+
+def _idle_wake_due(snapshot: CycleSnapshot, hours: int) -> bool:
+    """Return whether an idle wake every ``hours`` (0: never) is due."""
+    last_post = snapshot.state.last_post_attempt_at
+    return (
+        hours > 0
+        and (last_post is None or snapshot.now - last_post >= timedelta(hours=hours))
+        and not _departure_unlikely(snapshot)
+    )
+
+
+def _pre_departure_due(snapshot: CycleSnapshot) -> bool:
+    """Return whether this cycle is the car's read before a likely departure.
+
+    That is: inside the PRE_DEPARTURE_LEAD before departure_at, with no
+    GET or wake since the lead began, so one departure gets one read.
+    """
+    departure_at = snapshot.departure_at
+    if not snapshot.options.pre_departure or departure_at is None:
+        return False
+    start = departure_at - PRE_DEPARTURE_LEAD
+    if not start <= snapshot.now < departure_at:
+        return False
+    state = snapshot.state
+    reads = (state.last_status_fetch_at, state.last_post_attempt_at)
+    return all(at is None or at < start for at in reads)
+
+
+def _report_since_last_read(snapshot: CycleSnapshot) -> bool:
+    """Return whether the car has probably auto-reported since our last GET."""
+    expected = snapshot.expected_report_at
+    fetched = snapshot.state.last_status_fetch_at
+    return expected is not None and (fetched is None or expected > fetched)
+
+
+def _departure_unlikely(snapshot: CycleSnapshot) -> bool:
+    """Return whether an idle wake should wait for a likelier departure."""
+    likelihood = snapshot.departure_likelihood
+    return (
+        snapshot.options.pre_departure
+        and likelihood is not None
+        and likelihood < IDLE_WAKE_DEPARTURE_FLOOR
+    )
+
+
+# ----------------------------------------------------------------------------
+# Policies. A policy picks the POST trigger and the acceptable cache age;
+# decide() wraps it with the shared disable / GET logic below.
+# ----------------------------------------------------------------------------
+
+
+class RefreshPolicy(Protocol):
+    """When to wake the car and how stale the cached status may get."""
+
+    def post_trigger(
+        self,
+        snapshot: CycleSnapshot,
+        *,
+        car_just_stopped: bool,
+        car_currently_moving: bool,
+    ) -> tuple[bool, RefreshTrigger]:
+        """Return whether to POST this cycle and the trigger label."""
+
+    def max_cache_age(
+        self, snapshot: CycleSnapshot, *, car_currently_moving: bool
+    ) -> timedelta:
+        """Return the cache age past which this cycle GETs /status."""
+
+
+class DefaultPolicy:
+    """The Addendum 4 precedence chain with the user's thresholds."""
+
+    def post_trigger(
+        self,
+        snapshot: CycleSnapshot,
+        *,
+        car_just_stopped: bool,
+        car_currently_moving: bool,
+    ) -> tuple[bool, RefreshTrigger]:
+        """Return the precedence chain's POST verdict."""
+        return _resolve_post_trigger(
+            snapshot,
+            car_just_stopped=car_just_stopped,
+            car_currently_moving=car_currently_moving,
+        )
+
+    def max_cache_age(
+        self,
+        snapshot: CycleSnapshot,
+        *,
+        car_currently_moving: bool,  # noqa: ARG002
+    ) -> timedelta:
+        """Return max_cache_age_minutes."""
+        return timedelta(minutes=snapshot.options.max_cache_age_minutes)
+
+
+class QuotaPolicy(DefaultPolicy):
+    """Default tree, capped at daily_wake_budget POSTs per car per 24 hours.
+
+    Only new wake episodes are gated. A stop is admitted only if all of
+    its post_count_per_stop POSTs fit the budget, so its followups never
+    need refusing; service calls always go through but use up budget.
+    """
+
+    def post_trigger(
+        self,
+        snapshot: CycleSnapshot,
+        *,
+        car_just_stopped: bool,
+        car_currently_moving: bool,
+    ) -> tuple[bool, RefreshTrigger]:
+        """Return the default verdict, refusing wakes over the budget."""
+        should_post, trigger = super().post_trigger(
+            snapshot,
+            car_just_stopped=car_just_stopped,
+            car_currently_moving=car_currently_moving,
+        )
+        if trigger not in (
+            RefreshTrigger.JUST_STOPPED,
+            RefreshTrigger.IDLE_WAKE,
+            RefreshTrigger.PRE_DEPARTURE,
+        ):
+            return should_post, trigger
+        opts = snapshot.options
+        cost = opts.post_count_per_stop if trigger is RefreshTrigger.JUST_STOPPED else 1
+        used = sum(
+            1
+            for at in snapshot.state.recent_post_attempts
+            if snapshot.now - at < WAKE_BUDGET_WINDOW
+        )
+        return should_post and used + cost <= opts.daily_wake_budget, trigger
+
+
+def in_quiet_hours(now: datetime, opts: StrategyOptions) -> bool:
+    """Return whether ``now`` falls in the options' quiet hours."""
+    start, end = opts.quiet_hours_start, opts.quiet_hours_end
+    if start <= end:
+        return start <= now.hour < end
+    return now.hour >= start or now.hour < end
+
+
+class TimeOfDayPolicy(DefaultPolicy):
+    """Default tree without automatic wakes during the quiet hours.
+
+    Stops, idle and pre-departure wakes inside [quiet_hours_start,
+    quiet_hours_end) don't POST, and the cache may age
+    QUIET_CACHE_AGE_FACTOR times longer.
+    Service calls and followups of a stop before the quiet hours still go.
+    """
+
+    def post_trigger(
+        self,
+        snapshot: CycleSnapshot,
+        *,
+        car_just_stopped: bool,
+        car_currently_moving: bool,
+    ) -> tuple[bool, RefreshTrigger]:
+        """Return the default verdict, refusing automatic wakes at night."""
+        should_post, trigger = super().post_trigger(
+            snapshot,
+            car_just_stopped=car_just_stopped,
+            car_currently_moving=car_currently_moving,
+        )
+        if trigger in (
+            RefreshTrigger.JUST_STOPPED,
+            RefreshTrigger.IDLE_WAKE,
+            RefreshTrigger.PRE_DEPARTURE,
+        ) and in_quiet_hours(snapshot.now, snapshot.options):
+            return False, trigger
+        return should_post, trigger
+
+    def max_cache_age(
+        self, snapshot: CycleSnapshot, *, car_currently_moving: bool
+    ) -> timedelta:
+        """Return a longer cache age during the quiet hours."""
+        age = super().max_cache_age(snapshot, car_currently_moving=car_currently_moving)
+        if in_quiet_hours(snapshot.now, snapshot.options):
+            return age * QUIET_CACHE_AGE_FACTOR
+        return age
+
+
+class AggressivePolicy(DefaultPolicy):
+    """Freshness first: GET every cycle while driving, wake idle cars often.
+
+    While the car moves its own reports keep Toyota's cache warm, so those
+    GETs rarely 429. Parked, the cache may age half as long as configured
+    and the car is woken every idle_wake_hours (or
+    AGGRESSIVE_IDLE_WAKE_HOURS when that is 0).
+    """
+
+    def post_trigger(
+        self,
+        snapshot: CycleSnapshot,
+        *,
+        car_just_stopped: bool,
+        car_currently_moving: bool,
+    ) -> tuple[bool, RefreshTrigger]:
+        """Return the default verdict, with an idle wake when none is set."""
+        should_post, trigger = super().post_trigger(
+            snapshot,
+            car_just_stopped=car_just_stopped,
+            car_currently_moving=car_currently_moving,
+        )
+        hours = snapshot.options.idle_wake_hours or AGGRESSIVE_IDLE_WAKE_HOURS
+        if trigger is RefreshTrigger.NONE and _idle_wake_due(snapshot, hours):
+            return True, RefreshTrigger.IDLE_WAKE
+        return should_post, trigger
+
+    def max_cache_age(
+        self, snapshot: CycleSnapshot, *, car_currently_moving: bool
+    ) -> timedelta:
+        """Return zero while moving, half the configured age otherwise."""
+        if car_currently_moving:
+            return timedelta(0)
+        return (
+            super().max_cache_age(snapshot, car_currently_moving=car_currently_moving)
+            / 2
+        )
+
+
+POLICIES: dict[str, RefreshPolicy] = {
+    "default": DefaultPolicy(),
+    "quota": QuotaPolicy(),
+    "time_of_day": TimeOfDayPolicy(),
+    "aggressive": AggressivePolicy(),
+}
+
+
+def policy_for(options: StrategyOptions) -> RefreshPolicy:
+    """Return the options' policy, or the default one for an unknown name."""
+    return POLICIES.get(options.policy, POLICIES["default"])
 
 
 def decide(snapshot: CycleSnapshot) -> RefreshDecision:
@@ -249,8 +543,9 @@ def decide(snapshot: CycleSnapshot) -> RefreshDecision:
     opts = snapshot.options
     state = snapshot.state
     now = snapshot.now
+    policy = policy_for(opts)
 
-    hard = _hard_disable_decision(opts)
+    hard = hard_disable_decision(opts)
     if hard is not None:
         return hard
 
@@ -263,15 +558,27 @@ def decide(snapshot: CycleSnapshot) -> RefreshDecision:
     )
     car_just_stopped = state.was_moving_last_cycle and not car_currently_moving
 
-    should_post, trigger = _resolve_post_trigger(
+    should_post, trigger = policy.post_trigger(
         snapshot,
         car_just_stopped=car_just_stopped,
         car_currently_moving=car_currently_moving,
     )
 
+    # A wake the car's own record says will probably fail is skipped; the
+    # GET logic below still runs, so a stop is read if the cache is warm.
+    if (
+        should_post
+        and opts.wake_success_floor > 0
+        and trigger in _PREDICTED_TRIGGERS
+        and snapshot.wake_success.get(trigger, 1.0) < opts.wake_success_floor
+    ):
+        should_post = False
+
     # Soft-disable suppresses POST (still allows GET so we can detect external
-    # cache repopulation) but keeps the trigger label for diagnostics.
-    soft_disabled = state.soft_disabled
+    # cache repopulation) but keeps the trigger label for diagnostics. The
+    # wake-success predictor replaces it: a flag left from before it was
+    # switched on is ignored (and cleared by the next failed wake).
+    soft_disabled = state.soft_disabled and opts.wake_success_floor <= 0
     if soft_disabled:
         should_post = False
 
@@ -281,13 +588,31 @@ def decide(snapshot: CycleSnapshot) -> RefreshDecision:
         if state.last_status_fetch_at
         else timedelta(days=365)
     )
-    cache_stale = cache_age > timedelta(minutes=opts.max_cache_age_minutes)
+    max_age = policy.max_cache_age(snapshot, car_currently_moving=car_currently_moving)
+    cache_stale = cache_age > max_age
+    # Until the car has probably reported since our last read, Toyota's
+    # cache holds nothing newer and a GET would 429: wait for the report.
+    if (
+        cache_stale
+        and snapshot.expected_report_at is not None
+        and state.last_status_fetch_at is not None
+        and snapshot.expected_report_at <= state.last_status_fetch_at
+        and cache_age <= max_age * REPORT_DEFER_FACTOR
+    ):
+        cache_stale = False
     cache_empty = state.last_status_occurrence_date is None
 
     # NB: car_currently_moving is intentionally NOT in this OR-chain. During a
     # drive we can serve the pre-drive lock state from cache; refreshing only
     # when actually stale avoids ~40 useless /status calls on a long trip.
-    should_get = car_just_stopped or should_post or cache_stale or cache_empty
+    # A pre-departure read GETs even when its wake was skipped or not needed.
+    should_get = (
+        car_just_stopped
+        or should_post
+        or cache_stale
+        or cache_empty
+        or trigger is RefreshTrigger.PRE_DEPARTURE
+    )
 
     refresh_state = (
         RefreshState.SOFT_DISABLED_UNREACHABLE if soft_disabled else RefreshState.ACTIVE
@@ -326,6 +651,15 @@ def decide(snapshot: CycleSnapshot) -> RefreshDecision:
 # ----------------------------------------------------------------------------
 
 
+def on_post_attempt(state: VinState, now: datetime) -> None:
+    """Record a POST /refresh-status attempt, whatever its outcome."""
+    state.last_post_attempt_at = now
+    state.recent_post_attempts = [
+        at for at in state.recent_post_attempts if now - at < WAKE_BUDGET_WINDOW
+    ]
+    state.recent_post_attempts.append(now)
+
+
 def on_post_layer1_failure(state: VinState, _options: StrategyOptions) -> bool:
     """Record a non-000000 returnCode from POST.
 
@@ -346,11 +680,16 @@ def on_post_layer1_success(state: VinState) -> None:
 def on_wake_failed(state: VinState, options: StrategyOptions) -> None:
     """Record that POST polling expired without occurrence_date advancement.
 
-    Per Addendum 4 step 11c: at threshold, soft-disable this VIN.
+    Per Addendum 4 step 11c: at threshold, soft-disable this VIN - unless
+    the wake-success predictor is on (wake_success_floor > 0), which then
+    throttles the car's wakes instead of switching them off (and lifts a
+    soft-disable set before it was turned on).
     Caller should clear just_stopped_followup_due_at; that's separate state.
     """
     state.consecutive_failed_wakes += 1
-    if state.consecutive_failed_wakes >= options.failed_wake_threshold:
+    if options.wake_success_floor > 0:
+        state.soft_disabled = False
+    elif state.consecutive_failed_wakes >= options.failed_wake_threshold:
         state.soft_disabled = True
 
 
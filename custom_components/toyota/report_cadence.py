@@ -0,0 +1,135 @@
+"""Per-car auto-report cadence, inferred from observed occurrence dates.
+
+A parked car still reports its status to Toyota now and then on its own,
+and each report warms Toyota's status cache for a while. Between reports
+a plain GET mostly hits a cold cache and is answered 429. Many cars
+report on a fixed timer, so the times of their reports fall on a grid.
+
+``ReportCadence`` keeps the intervals between one car's consecutive auto
+reports (the ``occurrence_date`` of each status that advanced without a
+wake of ours) and estimates that grid's period. We only see the newest
+report at each GET, so an interval can span several periods. The period
+is taken from the shortest cluster of intervals, and the estimate is only
+trusted once most intervals are close to a whole multiple of it. Driving
+and our own wakes start a new series: a drive reports on its own
+schedule, and a woken car is assumed to restart its timer.
+
+With a trusted period, ``expected_report_at`` gives the newest report
+the car has probably made by ``now``. The strategy defers stale-cache
+GETs until that report is newer than our last read, and the coordinator
+schedules the car's next refresh just after the following report.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Any
+
+# Intervals kept per car (newest last).
+MAX_REPORT_INTERVALS = 32
+# Fewer intervals than this give no estimate.
+MIN_REPORT_INTERVALS = 4
+# Reports closer together than this are one event, not a timer.
+MIN_REPORT_INTERVAL_S = 300.0
+# Intervals within this factor of the shortest one form the base cluster.
+BASE_CLUSTER_FACTOR = 1.5
+# An interval fits the period if it is within this fraction of a multiple.
+MULTIPLE_TOLERANCE = 0.2
+# Share of intervals that must fit for the period to be trusted.
+MIN_FIT_SHARE = 0.75
+
+
+class ReportCadence:
+    """One car's recent auto-report intervals and the period they imply."""
+
+    __slots__ = ("_anchor", "_interrupted", "_intervals")
+
+    def __init__(self) -> None:
+        """Create an estimator that has seen no report."""
+        # Newest report seen, of any kind; predictions count from it.
+        self._anchor: datetime | None = None
+        self._intervals: list[float] = []
+        # Set when the car drove since the anchor: the next interval is not
+        # a parked timer's.
+        self._interrupted = False
+
+    def observe(self, occurrence: datetime, *, woken: bool = False) -> bool:
+        """Record a newer report; ``woken`` if our wake POST caused it.
+
+        Returns whether the report was newer than the last one seen.
+        """
+        anchor = self._anchor
+        if anchor is not None and occurrence <= anchor:
+            return False
+        if anchor is not None and not woken and not self._interrupted:
+            interval = (occurrence - anchor).total_seconds()
+            if interval >= MIN_REPORT_INTERVAL_S:
+                self._intervals.append(interval)
+                del self._intervals[:-MAX_REPORT_INTERVALS]
+        self._anchor = occurrence
+        self._interrupted = False
+        return True
+
+    def note_moving(self) -> None:
+        """Mark that the car drove; the running interval is discarded."""
+        self._interrupted = True
+
+    def period(self) -> timedelta | None:
+        """Return the trusted report period, or None."""
+        intervals = self._intervals
+        if len(intervals) < MIN_REPORT_INTERVALS:
+            return None
+        shortest = min(intervals)
+        base = median(i for i in intervals if i <= shortest * BASE_CLUSTER_FACTOR)
+        fitting = 0
+        for interval in intervals:
+            multiple = interval / base
+            if abs(multiple - round(multiple)) <= MULTIPLE_TOLERANCE:
+                fitting += 1
+        if fitting < MIN_FIT_SHARE * len(intervals):
+            return None
+        return timedelta(seconds=base)
+
+    def expected_report_at(self, now: datetime) -> datetime | None:
+        """Return the newest report the car has probably made by ``now``."""
+        period = self.period()
+        if period is None or self._anchor is None or now < self._anchor:
+            return None
+        return self._anchor + period * math.floor((now - self._anchor) / period)
+
+    def next_report_at(self, now: datetime) -> datetime | None:
+        """Return when the car will probably report next after ``now``."""
+        latest = self.expected_report_at(now)
+        period = self.period()
+        if latest is None or period is None:
+            return None
+        return latest + period
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable form for ``.storage``."""
+        return {
+            "anchor": self._anchor.isoformat() if self._anchor else None,
+            "intervals": [round(interval) for interval in self._intervals],
+            "interrupted": self._interrupted,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ReportCadence:
+        """Restore an estimator saved by ``as_dict``."""
+        cadence = cls()
+        anchor = data.get("anchor")
+        cadence._anchor = datetime.fromisoformat(anchor) if anchor else None
+        cadence._intervals = [float(i) for i in data["intervals"]]
+        del cadence._intervals[:-MAX_REPORT_INTERVALS]
+        cadence._interrupted = bool(data.get("interrupted", False))
+        return cadence
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the interval count and the trusted period."""
+        period = self.period()
+        return {
+            "intervals": len(self._intervals),
+            "period_s": period.total_seconds() if period is not None else None,
+        }
@@ -0,0 +1,129 @@
+"""Cached fleet roster for one Toyota account.
+
+``client.get_vehicles()`` is an account-level round-trip that used to open
+every coordinator cycle, and it returns brand-new ``Vehicle`` objects with
+an empty ``_endpoint_data`` each time. The list of cars on an account
+changes perhaps once a year, so the roster is fetched on startup, after
+``ROSTER_TTL``, or when a VIN-level 404 suggests a car was removed, and the
+same ``Vehicle`` objects are reused in between. Reuse keeps the endpoint
+data of the previous cycle in place, which is what lets skipped endpoints
+(``vehicle.update(skip=[...])``) keep serving their last-known value.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+
+from pytoyoda.exceptions import ToyotaApiError
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from pytoyoda.client import MyT
+    from pytoyoda.models.vehicle import Vehicle
+
+_LOGGER = logging.getLogger(__name__)
+
+ROSTER_TTL = timedelta(hours=24)
+
+
+def is_vin_not_found(exc: BaseException) -> bool:
+    """Return whether ``exc`` is Toyota's 404 for a VIN-level endpoint."""
+    # pytoyoda keeps the status code only in the message text.
+    return isinstance(exc, ToyotaApiError) and "Request Failed. 404," in str(exc)
+
+
+class FleetRoster:
+    """Vehicles of one account, refreshed lazily."""
+
+    def __init__(self, client: MyT, ttl: timedelta = ROSTER_TTL) -> None:
+        """Initialise an empty roster; the first ``async_get`` fetches it."""
+        self._client = client
+        self._ttl = ttl
+        self._vehicles: dict[str, Vehicle] = {}
+        self.fetched_at: datetime | None = None
+        self._invalidated_reason: str | None = "startup"
+        self._stats: Counter[str] = Counter()
+
+    @property
+    def vehicles(self) -> list[Vehicle]:
+        """Return the cached vehicles without touching the network."""
+        return list(self._vehicles.values())
+
+    def get(self, vin: str) -> Vehicle | None:
+        """Return the cached vehicle for a VIN, if any."""
+        return self._vehicles.get(vin)
+
+    def invalidate(self, reason: str) -> None:
+        """Force a re-fetch on the next ``async_get``."""
+        if self._invalidated_reason is None:
+            _LOGGER.debug("Toyota fleet roster invalidated (%s)", reason)
+        self._invalidated_reason = reason
+
+    def note_error(self, vin: str, exc: BaseException) -> bool:
+        """Invalidate the roster if ``exc`` says the account lost ``vin``.
+
+        Any VIN-level call may be the one that 404s, including a GET whose
+        error is otherwise swallowed. Return True only for the first such
+        error since the last fetch, so the caller schedules one re-read.
+        """
+        if not is_vin_not_found(exc):
+            return False
+        first = self._invalidated_reason is None
+        self.invalidate(f"404 for vin=...{vin[-6:]}")
+        return first
+
+    def needs_refresh(self, now: datetime) -> bool:
+        """Return whether the next ``async_get`` will call the API."""
+        return (
+            self._invalidated_reason is not None
+            or self.fetched_at is None
+            or now - self.fetched_at >= self._ttl
+        )
+
+    async def async_get(self, now: datetime) -> list[Vehicle]:
+        """Return the roster, calling ``get_vehicles`` only when it is due.
+
+        On a re-fetch, endpoint data of cars that are still on the account is
+        carried over to their new ``Vehicle`` objects so sensors don't fall
+        back to "unknown" for the one cycle after the refresh.
+        """
+        if not self.needs_refresh(now):
+            self._stats["hits"] += 1
+            return self.vehicles
+        reason = self._invalidated_reason or "ttl"
+        fetched = await self._client.get_vehicles()
+        self._stats[f"fetches_{reason}"] += 1
+        vehicles: dict[str, Vehicle] = {}
+        for vehicle in fetched or []:
+            if not vehicle or vehicle.vin is None:
+                continue
+            previous = self._vehicles.get(vehicle.vin)
+            if previous is not None:
+                vehicle._endpoint_data = previous._endpoint_data  # noqa: SLF001
+            vehicles[vehicle.vin] = vehicle
+        added = vehicles.keys() - self._vehicles.keys()
+        removed = self._vehicles.keys() - vehicles.keys()
+        if self.fetched_at is not None and (added or removed):
+            _LOGGER.info(
+                "Toyota fleet roster changed: %d added, %d removed",
+                len(added),
+                len(removed),
+            )
+        self._vehicles = vehicles
+        self.fetched_at = now
+        self._invalidated_reason = None
+        return self.vehicles
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return roster cache counters for the diagnostics download."""
+        return {
+            "vehicles": len(self._vehicles),
+            "fetched_at": self.fetched_at.isoformat() if self.fetched_at else None,
+            "ttl_s": int(self._ttl.total_seconds()),
+            "pending_invalidation": self._invalidated_reason,
+            **dict(self._stats),
+        }
@@ -13,9 +13,13 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import PERCENTAGE, UnitOfLength
+from homeassistant.const import PERCENTAGE, UnitOfLength, UnitOfTime
+from homeassistant.core import callback
 from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
 
+from .charging_session import ESTIMATE_INTERVAL
 from .const import DOMAIN
 from .entity import ToyotaBaseEntity
 from .utils import (
@@ -28,15 +32,21 @@ from .utils import (
 
 if TYPE_CHECKING:
     from collections.abc import Callable
+    from datetime import datetime
 
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import StateType
     from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+    from pytoyoda.models.endpoints.vehicle_guid import VehicleGuidModel
+    from pytoyoda.models.summary import Summary
     from pytoyoda.models.vehicle import Vehicle
 
     from . import StatisticsData, VehicleData
+    from .aggregation import PeriodAggregate
+    from .charging_session import ChargeEstimate
+    from .telemetry_ring import TelemetryRates
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -74,6 +84,20 @@ class ToyotaSensorEntityDescription(SensorEntityDescription, frozen_or_thawed=Tr
     attributes_fn: Callable[[Vehicle], dict[str, Any] | None]
 
 
+class ToyotaChargeEstimateEntityDescription(
+    ToyotaSensorEntityDescription, frozen_or_thawed=True
+):
+    """Describes a sensor extrapolated while the car charges."""
+
+    estimate_fn: Callable[[ChargeEstimate], StateType]
+
+
+class ToyotaTelemetryEntityDescription(SensorEntityDescription, frozen_or_thawed=True):
+    """Describes a sensor derived from the car's telemetry ring."""
+
+    rate_fn: Callable[[TelemetryRates], StateType]
+
+
 class ToyotaStatisticsSensorEntityDescription(
     SensorEntityDescription, frozen_or_thawed=True
 ):
@@ -252,6 +276,67 @@ REMAINING_CHARGE_TIME_ENTITY_DESCRIPTION = ToyotaSensorEntityDescription(
     ),
     attributes_fn=lambda vehicle: None,  # noqa : ARG005
 )
+ESTIMATED_BATTERY_LEVEL_ENTITY_DESCRIPTION = ToyotaChargeEstimateEntityDescription(
+    key="estimated_battery_level",
+    translation_key="estimated_battery_level",
+    icon="mdi:battery-charging",
+    device_class=SensorDeviceClass.BATTERY,
+    state_class=SensorStateClass.MEASUREMENT,
+    suggested_display_precision=0,
+    value_fn=BATTERY_LEVEL_ENTITY_DESCRIPTION.value_fn,
+    estimate_fn=lambda estimate: (
+        None if estimate.level is None else round(estimate.level, 1)
+    ),
+    attributes_fn=lambda vehicle: None,  # noqa : ARG005
+)
+ESTIMATED_REMAINING_CHARGE_TIME_ENTITY_DESCRIPTION = (
+    ToyotaChargeEstimateEntityDescription(
+        key="estimated_remaining_charge_time",
+        translation_key="estimated_remaining_charge_time",
+        icon="mdi:battery-clock-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=REMAINING_CHARGE_TIME_ENTITY_DESCRIPTION.value_fn,
+        estimate_fn=lambda estimate: (
+            None
+            if estimate.remaining is None
+            else estimate.remaining.total_seconds() // 60
+        ),
+        attributes_fn=lambda vehicle: None,  # noqa : ARG005
+    )
+)
+CONSUMPTION_RATE_ENTITY_DESCRIPTION = ToyotaTelemetryEntityDescription(
+    key="consumption_rate",
+    translation_key="consumption_rate",
+    icon="mdi:chart-bell-curve-cumulative",
+    state_class=SensorStateClass.MEASUREMENT,
+    suggested_display_precision=1,
+    rate_fn=lambda rates: (
+        None if rates.consumption is None else round(rates.consumption, 2)
+    ),
+)
+RANGE_PER_PERCENT_ENTITY_DESCRIPTION = ToyotaTelemetryEntityDescription(
+    key="range_per_percent",
+    translation_key="range_per_percent",
+    icon="mdi:map-marker-distance",
+    state_class=SensorStateClass.MEASUREMENT,
+    suggested_display_precision=1,
+    rate_fn=lambda rates: (
+        None if rates.range_per_percent is None else round(rates.range_per_percent, 2)
+    ),
+)
+DISTANCE_TODAY_ENTITY_DESCRIPTION = ToyotaTelemetryEntityDescription(
+    key="distance_today",
+    translation_key="distance_today",
+    icon="mdi:map-marker-path",
+    device_class=SensorDeviceClass.DISTANCE,
+    state_class=SensorStateClass.TOTAL_INCREASING,
+    suggested_display_precision=1,
+    rate_fn=lambda rates: (
+        None if rates.distance_today is None else round(rates.distance_today, 1)
+    ),
+)
 
 STATISTICS_ENTITY_DESCRIPTIONS_DAILY = ToyotaStatisticsSensorEntityDescription(
     key="current_day_statistics",
@@ -397,6 +482,56 @@ def create_sensor_configurations(metric_values: bool) -> list[dict[str, Any]]:
             "native_unit": "min",
             "suggested_unit": "min",
         },
+        {
+            "description": ESTIMATED_BATTERY_LEVEL_ENTITY_DESCRIPTION,
+            "capability_check": lambda v: (
+                get_vehicle_capability(v, "econnect_vehicle_status_capable")
+                or v.type == "electric"
+            ),
+            "native_unit": PERCENTAGE,
+            "suggested_unit": None,
+        },
+        {
+            "description": ESTIMATED_REMAINING_CHARGE_TIME_ENTITY_DESCRIPTION,
+            "capability_check": lambda v: (
+                get_vehicle_capability(v, "econnect_vehicle_status_capable")
+                or v.type == "electric"
+            ),
+            "native_unit": "min",
+            "suggested_unit": "min",
+        },
+        {
+            "description": CONSUMPTION_RATE_ENTITY_DESCRIPTION,
+            "capability_check": lambda v: (
+                get_vehicle_capability(v, "telemetry_capable")
+                and (
+                    v.type == "electric"
+                    or get_vehicle_capability(v, "fuel_level_available")
+                )
+            ),
+            "native_unit": f"{PERCENTAGE}/100 {get_length_unit(metric_values)}",
+            "suggested_unit": None,
+        },
+        {
+            "description": RANGE_PER_PERCENT_ENTITY_DESCRIPTION,
+            "capability_check": lambda v: (
+                get_vehicle_capability(v, "telemetry_capable")
+                and (
+                    v.type == "electric"
+                    or get_vehicle_capability(v, "fuel_range_available")
+                )
+            ),
+            "native_unit": f"{get_length_unit(metric_values)}/{PERCENTAGE}",
+            "suggested_unit": None,
+        },
+        {
+            "description": DISTANCE_TODAY_ENTITY_DESCRIPTION,
+            "capability_check": lambda v: get_vehicle_capability(
+                v, "telemetry_capable"
+            ),
+            "native_unit": get_length_unit(metric_values),
+            "suggested_unit": get_length_unit(metric_values),
+        },
         {
             "description": STATISTICS_ENTITY_DESCRIPTIONS_DAILY,
             "capability_check": lambda v: True,  # noqa : ARG005
@@ -427,6 +562,12 @@ def create_sensor_configurations(metric_values: bool) -> list[dict[str, Any]]:
 class ToyotaSensor(ToyotaBaseEntity, SensorEntity):
     """Representation of a Toyota sensor."""
 
+    # The VIN sensor's capability maps are static per vehicle and large;
+    # keep them on the entity but out of the recorder database.
+    _unrecorded_attributes = frozenset(
+        {"Features", "Extended_capabilities", "Remote_service_capabilities"}
+    )
+
     vehicle: Vehicle
 
     def __init__(  # noqa: PLR0913
@@ -455,6 +596,122 @@ class ToyotaSensor(ToyotaBaseEntity, SensorEntity):
         return self.description.attributes_fn(self.vehicle)
 
 
+class ToyotaVinSensor(ToyotaSensor):
+    """The VIN sensor, whose attributes describe the car's capabilities."""
+
+    # (vehicle_info, attributes) of the last extra_state_attributes call. The
+    # roster reuses Vehicle objects (and so their _vehicle_info) between
+    # fetches, so an identity check is enough to skip the three model_dump()
+    # calls on every state write. Held by the entity, so it goes with it.
+    _attributes_memo: tuple[VehicleGuidModel, dict[str, Any] | None] | None = None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the attributes, rebuilt only for new vehicle info."""
+        vehicle_info = self.vehicle._vehicle_info  # noqa : SLF001
+        memo = self._attributes_memo
+        if memo is None or memo[0] is not vehicle_info:
+            memo = (vehicle_info, self.description.attributes_fn(self.vehicle))
+            self._attributes_memo = memo
+        return memo[1]
+
+
+class ToyotaChargeEstimateSensor(ToyotaSensor):
+    """Battery level or remaining charge time, extrapolated while charging.
+
+    Outside a charging session this is the car's last read value. While the
+    car charges it comes from the car's session (charging_session.py) and is
+    written every ESTIMATE_INTERVAL, so it moves between refreshes; each
+    refresh brings the session, and so the estimate, back to the car's read.
+    """
+
+    description: ToyotaChargeEstimateEntityDescription
+
+    def _estimate(self) -> ChargeEstimate | None:
+        vin = getattr(self.vehicle, "vin", None)
+        sessions = getattr(self.coordinator, "_charging_sessions", None)
+        if not vin or sessions is None:
+            return None
+        return sessions.estimate(vin, dt_util.now())
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the estimate while charging, the read value otherwise."""
+        estimate = self._estimate()
+        if estimate is None:
+            return super().native_value
+        return self.description.estimate_fn(estimate)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return whether the value is extrapolated and the expected end."""
+        estimate = self._estimate()
+        return {
+            "estimated": estimate is not None,
+            "charge_ends_at": estimate.ends_at if estimate is not None else None,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Start writing the estimate between refreshes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(self.hass, self._async_tick, ESTIMATE_INTERVAL)
+        )
+
+    @callback
+    def _async_tick(self, _now: datetime) -> None:
+        if self._estimate() is not None:
+            self.async_write_ha_state()
+
+
+class ToyotaTelemetrySensor(ToyotaBaseEntity, SensorEntity):
+    """Rate derived from the car's telemetry ring (telemetry_ring.py).
+
+    Consumption and range per percent follow the battery of an electric car
+    and the fuel tank of any other; the attribute says which.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        coordinator: DataUpdateCoordinator[list[VehicleData]],
+        entry_id: str,
+        vehicle_index: int,
+        description: ToyotaTelemetryEntityDescription,
+        native_unit: UnitOfLength | str,
+        suggested_unit: UnitOfLength | str | None,
+    ) -> None:
+        """Initialise the ToyotaTelemetrySensor class."""
+        super().__init__(coordinator, entry_id, vehicle_index, description)
+        self.description = description
+        self._attr_native_unit_of_measurement = native_unit
+        self._attr_suggested_unit_of_measurement = suggested_unit
+
+    @property
+    def _electric(self) -> bool:
+        return self.vehicle.type == "electric"
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the rate over the car's recent readings."""
+        vin = getattr(self.vehicle, "vin", None)
+        telemetry = getattr(self.coordinator, "_telemetry", None)
+        if not vin or telemetry is None:
+            return None
+        rates = telemetry.rates(vin, dt_util.now(), electric=self._electric)
+        return self.description.rate_fn(rates)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the level the rate follows and the readings behind it."""
+        vin = getattr(self.vehicle, "vin", None)
+        telemetry = getattr(self.coordinator, "_telemetry", None)
+        ring = telemetry.ring(vin) if vin and telemetry is not None else None
+        return {
+            "level": "battery" if self._electric else "fuel",
+            "samples": len(ring) if ring is not None else 0,
+        }
+
+
 LAST_SUCCESSFUL_FETCH_ENTITY_DESCRIPTION = SensorEntityDescription(
     key="last_successful_fetch",
     translation_key="last_successful_fetch",
@@ -500,6 +757,14 @@ STATUS_REFRESH_STATE_ENTITY_DESCRIPTION = SensorEntityDescription(
     ],
     entity_category=EntityCategory.DIAGNOSTIC,
 )
+HISTORY_BACKFILL_ENTITY_DESCRIPTION = SensorEntityDescription(
+    key="history_backfill",
+    translation_key="history_backfill",
+    name="Trip history backfill",
+    icon="mdi:history",
+    native_unit_of_measurement=UnitOfTime.DAYS,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
 
 
 class ToyotaCoordinatorStateSensor(ToyotaBaseEntity, SensorEntity):
@@ -520,9 +785,9 @@ class ToyotaCoordinatorStateSensor(ToyotaBaseEntity, SensorEntity):
     2. `native_value` reads from the per-VIN dicts attached to the
        coordinator (`_diag_last_fetch_per_vin`, `_diag_last_error_per_vin`)
        instead of `coordinator.data`. With retain_on_transient=False and a
-       full-fleet 429, `async_get_vehicle_data` raises UpdateFailed before
-       appending any VehicleData, so coordinator.data stays frozen at the
-       last SUCCESSFUL refresh (where the error fields were None). Reading
+       429, the car's coordinator raises UpdateFailed without new
+       VehicleData, so coordinator.data stays frozen at the last
+       SUCCESSFUL refresh (where the error fields were None). Reading
        from the per-VIN dicts instead means error info appears as soon as
        it's known, regardless of retain toggle or UpdateFailed.
     """
@@ -559,10 +824,53 @@ class ToyotaCoordinatorStateSensor(ToyotaBaseEntity, SensorEntity):
         return value if tuple_idx is None else value[tuple_idx]
 
 
+class ToyotaBackfillSensor(ToyotaCoordinatorStateSensor):
+    """Days of trip history backfilled into long-term statistics.
+
+    Reads the car's backfill checkpoint (`_diag_backfill_progress_per_vin`);
+    the request count and the oldest day reached are attributes.
+    """
+
+    def _checkpoint(self) -> dict[str, Any] | None:
+        vin = getattr(self.vehicle, "vin", None)
+        progress = getattr(self.coordinator, "_diag_backfill_progress_per_vin", None)
+        if not vin or progress is None:
+            return None
+        return progress.get(vin)
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the number of days walked back so far."""
+        checkpoint = self._checkpoint()
+        return checkpoint["days_covered"] if checkpoint else 0
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return requests spent, the oldest day reached and completion."""
+        checkpoint = self._checkpoint()
+        if checkpoint is None:
+            return None
+        return {
+            "calls": checkpoint["calls"],
+            "oldest_day": checkpoint["oldest_day"],
+            "done": checkpoint["done"],
+        }
+
+
 class ToyotaStatisticsSensor(ToyotaBaseEntity, SensorEntity):
     """Representation of a Toyota statistics sensor."""
 
+    # Period bounds and the country list only describe the current period;
+    # recording them makes every cycle a new attributes row.
+    _unrecorded_attributes = frozenset({"Countries", "From_date", "To_date"})
+
     statistics: StatisticsData
+    # (summary, vehicle_info, attributes) of the last extra_state_attributes
+    # call. The summary object is only replaced when a fetch succeeds, so the
+    # attributes are rebuilt once per new summary rather than per write.
+    _attributes_memo: (
+        tuple[Summary | PeriodAggregate, VehicleGuidModel, dict[str, Any]] | None
+    ) = None
 
     def __init__(  # noqa: PLR0913
         self,
@@ -593,11 +901,18 @@ class ToyotaStatisticsSensor(ToyotaBaseEntity, SensorEntity):
         if self.statistics is None:
             return None
         data = self.statistics[self.period]
-        return (
-            format_statistics_attributes(data, self.vehicle._vehicle_info)  # noqa : SLF001
-            if data
-            else None
-        )
+        if not data:
+            return None
+        vehicle_info = self.vehicle._vehicle_info  # noqa : SLF001
+        memo = self._attributes_memo
+        if memo is None or memo[0] is not data or memo[1] is not vehicle_info:
+            memo = (
+                data,
+                vehicle_info,
+                format_statistics_attributes(data, vehicle_info),
+            )
+            self._attributes_memo = memo
+        return memo[2]
 
 
 async def async_setup_entry(
@@ -610,7 +925,7 @@ async def async_setup_entry(
         entry.entry_id
     ]
 
-    sensors: list[ToyotaSensor | ToyotaStatisticsSensor] = []
+    sensors: list[ToyotaSensor | ToyotaStatisticsSensor | ToyotaTelemetrySensor] = []
     for index, vehicle_data in enumerate(coordinator.data):
         vehicle = vehicle_data["data"]
         metric_values = vehicle_data["metric_values"]
@@ -618,7 +933,11 @@ async def async_setup_entry(
         sensor_configs = create_sensor_configurations(metric_values)
 
         sensors.extend(
-            ToyotaSensor(
+            (
+                ToyotaVinSensor
+                if config["description"] is VIN_ENTITY_DESCRIPTION
+                else ToyotaSensor
+            )(
                 coordinator=coordinator,
                 entry_id=entry.entry_id,
                 vehicle_index=index,
@@ -628,6 +947,37 @@ async def async_setup_entry(
             )
             for config in sensor_configs
             if not config["description"].key.startswith("current_")
+            and not isinstance(
+                config["description"],
+                ToyotaChargeEstimateEntityDescription
+                | ToyotaTelemetryEntityDescription,
+            )
+            and config["capability_check"](vehicle)
+        )
+        sensors.extend(
+            ToyotaChargeEstimateSensor(
+                coordinator=coordinator,
+                entry_id=entry.entry_id,
+                vehicle_index=index,
+                description=config["description"],
+                native_unit=config["native_unit"],
+                suggested_unit=config["suggested_unit"],
+            )
+            for config in sensor_configs
+            if isinstance(config["description"], ToyotaChargeEstimateEntityDescription)
+            and config["capability_check"](vehicle)
+        )
+        sensors.extend(
+            ToyotaTelemetrySensor(
+                coordinator=coordinator,
+                entry_id=entry.entry_id,
+                vehicle_index=index,
+                description=config["description"],
+                native_unit=config["native_unit"],
+                suggested_unit=config["suggested_unit"],
+            )
+            for config in sensor_configs
+            if isinstance(config["description"], ToyotaTelemetryEntityDescription)
             and config["capability_check"](vehicle)
         )
 
@@ -663,5 +1013,13 @@ async def async_setup_entry(
                 STATUS_REFRESH_STATE_ENTITY_DESCRIPTION,
             )
         )
+        sensors.append(
+            ToyotaBackfillSensor(
+                coordinator=coordinator,
+                entry_id=entry.entry_id,
+                vehicle_index=index,
+                description=HISTORY_BACKFILL_ENTITY_DESCRIPTION,
+            )
+        )
 
     async_add_devices(sensors)
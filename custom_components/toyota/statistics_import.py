@@ -0,0 +1,329 @@
+"""Import daily trip summaries into Home Assistant's long-term statistics.
+
+``ToyotaStatisticsSensor`` only exposes the running day/week/month/year
+totals, so history has to be reconstructed by the recorder from sampled
+states. Toyota already reports a summary per day, so this module writes
+those days straight into the long-term statistics tables as external
+statistics (``toyota:<vin>_<metric>``), one row per completed local day.
+
+Imports are incremental: each statistic resumes after the last day already
+in the database and continues its running ``sum``, so a day is never written
+twice. The current day is never imported because its totals are still
+changing.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+import httpcore
+import httpx
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfLength, UnitOfTime, UnitOfVolume
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+from pydantic import ValidationError
+from pytoyoda.exceptions import ToyotaApiError, ToyotaInternalError
+from pytoyoda.models.summary import SummaryType
+
+from .const import DOMAIN
+from .trip_store import DayRow
+
+try:  # Home Assistant 2025.6+ replaces has_mean with mean_type.
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # pragma: no cover - older cores
+    StatisticMeanType = None  # type: ignore[assignment, misc]
+
+if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Callable, Iterable
+
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from pytoyoda.models.summary import Summary
+    from pytoyoda.models.vehicle import Vehicle
+
+    from .trip_store import TripStore
+
+_LOGGER = logging.getLogger(__name__)
+
+# How far back the first import for a car reaches. Older history is left to
+# the backfill (which walks further back in bounded windows).
+IMPORT_INITIAL_DAYS = 30
+# Longest summary window requested in one call; the year summary already
+# asks for up to a year at once.
+IMPORT_MAX_WINDOW_DAYS = 365
+
+
+@dataclass(frozen=True, slots=True)
+class DailyMetric:
+    """One per-day value taken from a pytoyoda Summary."""
+
+    key: str
+    name: str
+    value_fn: Callable[[Summary], float | None]
+    unit_fn: Callable[[bool], str]
+    capability_check: Callable[[Vehicle], bool]
+
+
+def _has_ev_distance(vehicle: Vehicle) -> bool:
+    capabilities = getattr(vehicle._vehicle_info, "extended_capabilities", None)  # noqa: SLF001
+    return bool(
+        getattr(capabilities, "hybrid_pulse", False)
+        or getattr(capabilities, "econnect_vehicle_status_capable", False)
+    )
+
+
+def _hours(duration: timedelta | None) -> float | None:
+    return round(duration.total_seconds() / 3600, 3) if duration else None
+
+
+DAILY_METRICS: tuple[DailyMetric, ...] = (
+    DailyMetric(
+        key="distance",
+        name="distance",
+        value_fn=lambda summary: summary.distance,
+        unit_fn=lambda metric: (
+            UnitOfLength.KILOMETERS if metric else UnitOfLength.MILES
+        ),
+        capability_check=lambda vehicle: True,  # noqa: ARG005
+    ),
+    DailyMetric(
+        key="fuel_consumed",
+        name="fuel consumed",
+        value_fn=lambda summary: summary.fuel_consumed,
+        unit_fn=lambda metric: UnitOfVolume.LITERS if metric else UnitOfVolume.GALLONS,
+        capability_check=lambda vehicle: (
+            vehicle._vehicle_info.fuel_type is not None  # noqa: SLF001
+        ),
+    ),
+    DailyMetric(
+        key="ev_distance",
+        name="EV distance",
+        value_fn=lambda summary: summary.ev_distance,
+        unit_fn=lambda metric: (
+            UnitOfLength.KILOMETERS if metric else UnitOfLength.MILES
+        ),
+        capability_check=_has_ev_distance,
+    ),
+    DailyMetric(
+        key="duration",
+        name="driving time",
+        value_fn=lambda summary: _hours(summary.duration),
+        unit_fn=lambda metric: UnitOfTime.HOURS,  # noqa: ARG005
+        capability_check=lambda vehicle: True,  # noqa: ARG005
+    ),
+)
+
+
+def statistic_id(vin: str, key: str) -> str:
+    """Return the external statistic id of one metric of one car."""
+    return f"{DOMAIN}:{vin.lower()}_{key}"
+
+
+def daily_rows(
+    summaries: Iterable[Summary],
+    value_fn: Callable[[Summary], float | None],
+    *,
+    after: date | None,
+    before: date,
+    start_sum: float,
+) -> list[tuple[date, float, float]]:
+    """Turn daily summaries into ``(day, state, sum)`` rows.
+
+    Only days strictly after ``after`` and strictly before ``before`` are
+    kept, in date order, with ``sum`` running on from ``start_sum``. Days
+    without trips have no summary and produce no row.
+    """
+    rows: list[tuple[date, float, float]] = []
+    running = start_sum
+    for summary in sorted(summaries, key=lambda s: s.from_date):
+        day = summary.from_date
+        if (after is not None and day <= after) or day >= before:
+            continue
+        value = value_fn(summary) or 0.0
+        running = round(running + value, 3)
+        rows.append((day, value, running))
+    return rows
+
+
+class TripStatisticsImporter:
+    """Keep one account's external trip statistics up to date."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        metric_values: bool,
+        trip_store: TripStore | None = None,
+    ) -> None:
+        """Initialise the importer; nothing runs until a car is scheduled."""
+        self._hass = hass
+        self._metric_values = metric_values
+        self._trip_store = trip_store
+        # Last completed day known to be imported for every metric of a car.
+        # Saves the recorder round-trip on every refresh once a car is done
+        # for the day.
+        self._imported_through: dict[str, date] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._stats: Counter[str] = Counter()
+
+    @callback
+    def async_schedule(self, entry: ConfigEntry, vehicle: Vehicle) -> None:
+        """Import the car's missing days in the background, if any are due."""
+        vin = vehicle.vin
+        if vin is None or "recorder" not in self._hass.config.components:
+            return
+        yesterday = dt_util.now().date() - timedelta(days=1)
+        if self._imported_through.get(vin) == yesterday:
+            return
+        task = self._tasks.get(vin)
+        if task is not None and not task.done():
+            return
+        self._tasks[vin] = entry.async_create_background_task(
+            self._hass,
+            self.async_import(vehicle),
+            f"{DOMAIN} statistics import ...{vin[-6:]}",
+        )
+
+    async def async_import(self, vehicle: Vehicle) -> None:
+        """Import every completed day missing from the car's statistics."""
+        vin = vehicle.vin
+        if vin is None:
+            return
+        today = dt_util.now().date()
+        metrics = [m for m in DAILY_METRICS if m.capability_check(vehicle)]
+        last = {
+            m.key: await self._async_last_row(statistic_id(vin, m.key)) for m in metrics
+        }
+        resume_after = {
+            key: row[0] if row else today - timedelta(days=IMPORT_INITIAL_DAYS + 1)
+            for key, row in last.items()
+        }
+        from_day = min(resume_after.values()) + timedelta(days=1)
+        to_day = today - timedelta(days=1)
+        if from_day > to_day:
+            self._imported_through[vin] = to_day
+            return
+        from_day = max(from_day, to_day - timedelta(days=IMPORT_MAX_WINDOW_DAYS - 1))
+
+        try:
+            summaries = await vehicle.get_summary(
+                from_day, to_day, summary_type=SummaryType.DAILY
+            )
+        except (
+            ToyotaApiError,
+            ToyotaInternalError,
+            httpx.ConnectTimeout,
+            httpcore.ConnectTimeout,
+            httpx.ReadTimeout,
+            TimeoutError,
+            ValidationError,
+        ) as ex:
+            # Nothing was written; the next refresh retries the same days.
+            self._stats["failures"] += 1
+            _LOGGER.warning(
+                "Toyota statistics import for vin=...%s failed (%s)",
+                vin[-6:],
+                type(ex).__name__,
+            )
+            return
+
+        await self.async_record_days(vin, summaries, (from_day, to_day))
+        for metric in metrics:
+            last_row = last[metric.key]
+            rows = daily_rows(
+                summaries,
+                metric.value_fn,
+                after=resume_after[metric.key],
+                before=today,
+                start_sum=last_row[1] if last_row else 0.0,
+            )
+            if rows:
+                self.add_statistics(vehicle, metric, rows)
+        self._imported_through[vin] = to_day
+        self._stats["imports"] += 1
+
+    async def _async_last_row(self, stat_id: str) -> tuple[date, float] | None:
+        """Return the day and running sum of the newest imported row."""
+        result = await get_instance(self._hass).async_add_executor_job(
+            partial(
+                get_last_statistics,
+                self._hass,
+                1,
+                stat_id,
+                convert_units=True,
+                types={"sum"},
+            )
+        )
+        if not result.get(stat_id):
+            return None
+        row = result[stat_id][0]
+        start = dt_util.as_local(dt_util.utc_from_timestamp(row["start"]))
+        return start.date(), row.get("sum") or 0.0
+
+    async def async_record_days(
+        self, vin: str, summaries: list[Summary], covered: tuple[date, date]
+    ) -> None:
+        """Keep daily summaries fetched for ``covered`` in the trip store, if any."""
+        if self._trip_store is None:
+            return
+        await self._hass.async_add_executor_job(
+            self._trip_store.add_days,
+            vin,
+            [DayRow.from_summary(s) for s in summaries],
+            covered,
+        )
+
+    def imported_through(self, vin: str) -> date | None:
+        """Return the last day known to be imported for every metric of a car."""
+        return self._imported_through.get(vin)
+
+    def add_statistics(
+        self,
+        vehicle: Vehicle,
+        metric: DailyMetric,
+        rows: list[tuple[date, float, float]],
+    ) -> None:
+        """Write ``(day, state, sum)`` rows of one metric of one car."""
+        vin = vehicle.vin or ""
+        metadata: dict[str, Any] = {
+            "source": DOMAIN,
+            "statistic_id": statistic_id(vin, metric.key),
+            "name": f"{vehicle.alias or vin[-6:]} daily {metric.name}",
+            "unit_of_measurement": metric.unit_fn(self._metric_values),
+            "has_mean": False,
+            "has_sum": True,
+        }
+        if StatisticMeanType is not None:
+            metadata["mean_type"] = StatisticMeanType.NONE
+        statistics = [
+            StatisticData(
+                start=dt_util.start_of_local_day(day), state=state, sum=running
+            )
+            for day, state, running in rows
+        ]
+        async_add_external_statistics(
+            self._hass, StatisticMetaData(**metadata), statistics
+        )
+        self._stats["rows"] += len(statistics)
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return import counters for the diagnostics download."""
+        return {
+            "imported_through": {
+                f"...{vin[-6:]}": day.isoformat()
+                for vin, day in self._imported_through.items()
+            },
+            **dict(self._stats),
+        }
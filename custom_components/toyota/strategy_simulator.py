@@ -0,0 +1,514 @@
+"""Offline scoring of refresh policies against a driving timeline.
+
+Replays a sequence of ``TraceCycle`` (what the car did at each polling
+cycle) through ``decide()`` and the ``on_*`` mutators, exactly as the
+coordinator's caller contract prescribes, against a small model of
+Toyota's status cache:
+
+- the car reports its status while driving and once when it parks, so
+  the cache's occurrence date follows ``TraceCycle.car_report_at``;
+- a GET answers 200 only while that occurrence is younger than
+  ``server_cache_ttl``, otherwise 429 (stale cache, see Addendum 4);
+- a wake POST makes the car report, with probability ``wake_success``.
+
+Each cycle the data shown is stale if the car's door/lock state changed
+after the newest occurrence we have read. The result counts the requests
+spent, the GETs the model expects Toyota to answer 429 and the minutes
+shown stale, so policies (or option sets) can be ranked by calls versus
+staleness without touching a real car.
+
+Traces are either ``synthetic_trace()`` or recorded: the coordinator keeps
+each car's recent cycles in the diagnostics download ("cycle_traces"), and
+``load_trace()`` reads them back from NDJSON. A recorded cycle only knows
+the newest occurrence we read, so it stands in for both the car's report
+and its last state change; the replay then measures how soon each option
+set would have read what the running one did.
+
+``sweep()`` replays one trace for every ``StrategyOptions`` in a grid
+across a process pool, for tuning ``max_cache_age_minutes``,
+``post_count_per_stop`` and ``idle_wake_hours`` from data::
+
+    python -m custom_components.toyota.strategy_simulator \
+        --trace traces.ndjson --max-cache-age 15,30,60 --post-count 1,2,3
+
+Pure module: no hass, deterministic for a given seed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields, replace
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from .refresh_strategy import (
+    POLICIES,
+    CycleSnapshot,
+    RefreshAction,
+    RefreshTrigger,
+    StrategyOptions,
+    VinState,
+    decide,
+    on_occurrence_advanced,
+    on_post_attempt,
+    on_post_layer1_success,
+    on_wake_failed,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+# The car locks (or is locked) this long after it parks: the state change a
+# single wake POST right at the stop misses.
+LOCK_DELAY = timedelta(minutes=3)
+
+
+@dataclass(frozen=True, slots=True)
+class TraceCycle:
+    """What one polling cycle observed of the car."""
+
+    at: datetime
+    odometer_km: float | None
+    # Newest status the car has reported on its own (driving or parking).
+    car_report_at: datetime | None
+    # When the car's door/lock state last changed.
+    state_changed_at: datetime | None
+    service_call: bool = False
+
+
+@dataclass(slots=True)
+class SimulationResult:
+    """Requests spent and staleness seen over one replay."""
+
+    policy: str
+    cycles: int = 0
+    posts: int = 0
+    gets: int = 0
+    # GETs answered 429 because Toyota's cache was older than its TTL.
+    rate_limited: int = 0
+    # Minutes the shown status lagged the car, one entry per cycle.
+    stale_minutes: list[float] = field(default_factory=list)
+
+    @property
+    def calls(self) -> int:
+        """Return the /status and /refresh-status requests spent."""
+        return self.posts + self.gets
+
+    @property
+    def stale_fraction(self) -> float:
+        """Return the share of cycles that showed stale data."""
+        if not self.stale_minutes:
+            return 0.0
+        return sum(1 for m in self.stale_minutes if m > 0) / len(self.stale_minutes)
+
+    @property
+    def mean_stale_minutes(self) -> float:
+        """Return the average staleness per cycle."""
+        if not self.stale_minutes:
+            return 0.0
+        return math.fsum(self.stale_minutes) / len(self.stale_minutes)
+
+    def stale_percentile(self, percent: float) -> float:
+        """Return the nearest-rank ``percent`` percentile of per-cycle staleness."""
+        if not self.stale_minutes:
+            return 0.0
+        ordered = sorted(self.stale_minutes)
+        rank = math.ceil(percent / 100 * len(ordered))
+        return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+    def score(self, minutes_per_call: float = 30.0) -> float:
+        """Rank replays of the same trace; lower is better.
+
+        Total stale minutes plus ``minutes_per_call`` for every request:
+        how many minutes of staleness one request is worth avoiding.
+        """
+        return math.fsum(self.stale_minutes) + minutes_per_call * self.calls
+
+
+@dataclass(frozen=True, slots=True)
+class SweepRow:
+    """One option set's replay, reduced to what tuning compares."""
+
+    options: StrategyOptions
+    posts: int
+    gets: int
+    rate_limited: int
+    stale_p50: float
+    stale_p90: float
+    stale_p99: float
+    stale_max: float
+    score: float
+
+    @classmethod
+    def from_result(
+        cls, options: StrategyOptions, result: SimulationResult
+    ) -> SweepRow:
+        """Summarise ``result`` (the percentiles need the per-cycle list)."""
+        return cls(
+            options=options,
+            posts=result.posts,
+            gets=result.gets,
+            rate_limited=result.rate_limited,
+            stale_p50=result.stale_percentile(50),
+            stale_p90=result.stale_percentile(90),
+            stale_p99=result.stale_percentile(99),
+            stale_max=result.stale_percentile(100),
+            score=result.score(),
+        )
+
+
+def synthetic_trace(
+    days: int = 7,
+    *,
+    seed: int = 0,
+    interval: timedelta = timedelta(minutes=6),
+    trips_per_day: int = 3,
+    start: datetime = datetime(2026, 1, 5, tzinfo=UTC),
+) -> list[TraceCycle]:
+    """Generate a commuter-like week: trips around 8:00, 13:00 and 18:00."""
+    rng = random.Random(seed)  # noqa: S311
+    trips: list[tuple[datetime, datetime]] = []
+    for day in range(days):
+        midnight = start + timedelta(days=day)
+        for hour in rng.sample([8, 13, 18, 10, 21], k=min(trips_per_day, 5)):
+            departure = midnight + timedelta(hours=hour, minutes=rng.randrange(60))
+            trips.append(
+                (departure, departure + timedelta(minutes=rng.randrange(10, 60)))
+            )
+    trips.sort()
+
+    cycles: list[TraceCycle] = []
+    now = start
+    end = start + timedelta(days=days)
+    while now < end:
+        report_at: datetime | None = None
+        changed_at: datetime | None = None
+        # The latest trip that has started; trips never overlap.
+        for departure, arrival in trips:
+            if departure > now:
+                break
+            if now < arrival:
+                # Driving: the car's own reports keep the cache warm.
+                report_at, changed_at = now, departure
+            else:
+                # Parked: one report on arrival, then the doors lock.
+                report_at = arrival
+                changed_at = (
+                    arrival + LOCK_DELAY if now >= arrival + LOCK_DELAY else arrival
+                )
+        cycles.append(TraceCycle(now, _odometer_at(trips, now), report_at, changed_at))
+        now += interval
+    return cycles
+
+
+def trace_to_json(cycle: TraceCycle) -> dict[str, Any]:
+    """Return ``cycle`` as one JSON-serialisable trace record."""
+
+    def iso(value: datetime | None) -> str | None:
+        return value.isoformat() if value is not None else None
+
+    return {
+        "at": iso(cycle.at),
+        "odometer_km": cycle.odometer_km,
+        "car_report_at": iso(cycle.car_report_at),
+        "state_changed_at": iso(cycle.state_changed_at),
+        "service_call": cycle.service_call,
+    }
+
+
+def trace_from_json(record: dict[str, Any]) -> TraceCycle:
+    """Parse a record written by ``trace_to_json``.
+
+    Raises:
+        ValueError: ``at`` is missing or a timestamp does not parse.
+
+    """
+
+    def parse(key: str) -> datetime | None:
+        value = record.get(key)
+        return datetime.fromisoformat(value) if value else None
+
+    at = parse("at")
+    if at is None:
+        msg = "trace record has no 'at'"
+        raise ValueError(msg)
+    odometer = record.get("odometer_km")
+    return TraceCycle(
+        at=at,
+        odometer_km=float(odometer) if odometer is not None else None,
+        car_report_at=parse("car_report_at"),
+        state_changed_at=parse("state_changed_at"),
+        service_call=bool(record.get("service_call", False)),
+    )
+
+
+def load_trace(lines: Iterable[str]) -> list[TraceCycle]:
+    """Read an NDJSON trace (blank lines skipped), ordered by ``at``."""
+    trace = [trace_from_json(json.loads(line)) for line in lines if line.strip()]
+    trace.sort(key=lambda cycle: cycle.at)
+    return trace
+
+
+def dump_trace(trace: Iterable[TraceCycle]) -> str:
+    """Return ``trace`` as NDJSON, one cycle per line."""
+    return "".join(json.dumps(trace_to_json(cycle)) + "\n" for cycle in trace)
+
+
+def _odometer_at(trips: list[tuple[datetime, datetime]], now: datetime) -> float:
+    """Return the odometer at ``now`` for a car driving 40 km/h on each trip."""
+    hours = math.fsum(
+        (min(now, arrival) - departure).total_seconds() / 3600
+        for departure, arrival in trips
+        if departure <= now
+    )
+    return round(10_000.0 + 40.0 * hours, 1)
+
+
+@dataclass(slots=True)
+class _Replay:
+    """One replay's car state, Toyota cache model and tallies."""
+
+    options: StrategyOptions
+    rng: random.Random
+    wake_success: float
+    server_cache_ttl: timedelta
+    state: VinState = field(default_factory=VinState)
+    # Newest occurrence Toyota's cache holds, counting our wakes.
+    server_occurrence: datetime | None = None
+    result: SimulationResult = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.result = SimulationResult(policy=self.options.policy)
+
+    def run_cycle(self, cycle: TraceCycle) -> None:
+        """Decide and enact one cycle, then update the caller-owned state."""
+        now, state = cycle.at, self.state
+        if cycle.car_report_at is not None and (
+            self.server_occurrence is None
+            or cycle.car_report_at > self.server_occurrence
+        ):
+            self.server_occurrence = cycle.car_report_at
+        state.has_cached_response = state.last_status_occurrence_date is not None
+        decision = decide(
+            CycleSnapshot(
+                now=now,
+                current_odometer_km=cycle.odometer_km,
+                state=state,
+                options=self.options,
+                user_service_call_pending=cycle.service_call,
+            )
+        )
+        if decision.action is RefreshAction.POST_THEN_GET:
+            self._post(now, decision.trigger)
+        elif decision.action is RefreshAction.GET_ONLY:
+            self._get(now)
+
+        moving = (
+            state.last_odometer_km is not None
+            and cycle.odometer_km is not None
+            and cycle.odometer_km != state.last_odometer_km
+        )
+        state.last_odometer_km = cycle.odometer_km
+        state.was_moving_last_cycle = moving
+
+        self.result.cycles += 1
+        known = state.last_status_occurrence_date
+        changed = cycle.state_changed_at
+        self.result.stale_minutes.append(
+            (now - changed).total_seconds() / 60
+            if changed is not None and (known is None or known < changed)
+            else 0.0
+        )
+
+    def _post(self, now: datetime, trigger: RefreshTrigger) -> None:
+        state = self.state
+        if trigger is RefreshTrigger.JUST_STOPPED:
+            state.remaining_post_cycles = max(0, self.options.post_count_per_stop - 1)
+        elif trigger is RefreshTrigger.JUST_STOPPED_FOLLOWUP:
+            state.remaining_post_cycles = max(0, state.remaining_post_cycles - 1)
+        self.result.posts += 1
+        on_post_attempt(state, now)
+        on_post_layer1_success(state)
+        if self.rng.random() < self.wake_success:
+            # The woken car reports; the poll loop's GET reads it.
+            self.server_occurrence = now
+            self.result.gets += 1
+            state.last_status_fetch_at = now
+            on_occurrence_advanced(state, now)
+        else:
+            on_wake_failed(state, self.options)
+
+    def _get(self, now: datetime) -> None:
+        self.result.gets += 1
+        occurrence = self.server_occurrence
+        if occurrence is None or now - occurrence > self.server_cache_ttl:
+            self.result.rate_limited += 1
+            return  # 429: stale cache, state left alone
+        state = self.state
+        state.last_status_fetch_at = now
+        if (
+            state.last_status_occurrence_date is None
+            or occurrence > state.last_status_occurrence_date
+        ):
+            on_occurrence_advanced(state, occurrence)
+
+
+def simulate(
+    trace: list[TraceCycle],
+    options: StrategyOptions,
+    *,
+    seed: int = 0,
+    wake_success: float = 0.9,
+    server_cache_ttl: timedelta = timedelta(minutes=30),
+) -> SimulationResult:
+    """Replay ``trace`` through the strategy configured by ``options``."""
+    replay = _Replay(
+        options=options,
+        rng=random.Random(seed),  # noqa: S311
+        wake_success=wake_success,
+        server_cache_ttl=server_cache_ttl,
+    )
+    for cycle in trace:
+        replay.run_cycle(cycle)
+    return replay.result
+
+
+def compare_policies(
+    trace: list[TraceCycle],
+    options: StrategyOptions | None = None,
+    *,
+    seed: int = 0,
+) -> dict[str, SimulationResult]:
+    """Replay ``trace`` once per registered policy with otherwise equal options."""
+    options = options or StrategyOptions()
+    return {
+        name: simulate(trace, replace(options, policy=name), seed=seed)
+        for name in POLICIES
+    }
+
+
+def option_grid(
+    base: StrategyOptions | None = None, **values: Iterable[Any]
+) -> list[StrategyOptions]:
+    """Return ``base`` with every combination of the given field values.
+
+    ``option_grid(max_cache_age_minutes=[15, 30], post_count_per_stop=[1, 2])``
+    yields four option sets; fields not named keep ``base``'s value.
+
+    Raises:
+        ValueError: a keyword is not a ``StrategyOptions`` field.
+
+    """
+    base = base or StrategyOptions()
+    known = {f.name for f in fields(StrategyOptions)}
+    if unknown := sorted(set(values) - known):
+        msg = f"not StrategyOptions fields: {', '.join(unknown)}"
+        raise ValueError(msg)
+    names = list(values)
+    return [
+        replace(base, **dict(zip(names, combination, strict=True)))
+        for combination in itertools.product(*(list(v) for v in values.values()))
+    ]
+
+
+# Set once per pool process by _init_worker, so the trace is pickled once
+# per worker instead of once per option set.
+_worker_trace: list[TraceCycle] = []
+_worker_kwargs: dict[str, Any] = {}
+
+
+def _init_worker(trace: list[TraceCycle], kwargs: dict[str, Any]) -> None:
+    global _worker_trace, _worker_kwargs
+    _worker_trace, _worker_kwargs = trace, kwargs
+
+
+def _sweep_one(options: StrategyOptions) -> SweepRow:
+    return SweepRow.from_result(
+        options, simulate(_worker_trace, options, **_worker_kwargs)
+    )
+
+
+def sweep(
+    trace: list[TraceCycle],
+    grid: Sequence[StrategyOptions],
+    *,
+    workers: int | None = None,
+    seed: int = 0,
+    **model: float | timedelta,
+) -> list[SweepRow]:
+    """Replay ``trace`` once per option set, in ``grid`` order.
+
+    Replays are independent and CPU-bound, so they run in a process pool
+    of ``workers`` processes (``None``: one per CPU). ``workers=0`` runs
+    them in this process, which is simpler to debug and faster for a
+    handful of option sets. Every replay uses the same ``seed`` and cache
+    ``model`` (``wake_success``, ``server_cache_ttl``; see ``simulate``),
+    so rows differ only by their options.
+    """
+    kwargs: dict[str, Any] = {"seed": seed, **model}
+    if workers == 0:
+        return [
+            SweepRow.from_result(options, simulate(trace, options, **kwargs))
+            for options in grid
+        ]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(trace, kwargs)
+    ) as pool:
+        chunksize = max(1, len(grid) // (4 * workers))
+        return list(pool.map(_sweep_one, grid, chunksize=chunksize))
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Sweep option sets over a trace and print one row per set, best first."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trace", help="NDJSON trace; a synthetic week if omitted")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--policy", default="default")
+    parser.add_argument("--max-cache-age", type=_int_list, default=[30])
+    parser.add_argument("--post-count", type=_int_list, default=[2])
+    parser.add_argument("--idle-wake", type=_int_list, default=[0])
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        with open(args.trace, encoding="utf-8") as handle:  # noqa: PTH123
+            trace = load_trace(handle)
+    else:
+        trace = synthetic_trace(args.days, seed=args.seed)
+    grid = option_grid(
+        StrategyOptions(policy=args.policy),
+        max_cache_age_minutes=args.max_cache_age,
+        post_count_per_stop=args.post_count,
+        idle_wake_hours=args.idle_wake,
+    )
+    rows = sweep(trace, grid, workers=args.workers, seed=args.seed)
+    sys.stdout.write(
+        "cache_age post_count idle_wake  posts  gets  429s"
+        "    p50    p90    p99      score\n"
+    )
+    for row in sorted(rows, key=lambda row: row.score):
+        o = row.options
+        sys.stdout.write(
+            f"{o.max_cache_age_minutes:9d} {o.post_count_per_stop:10d} "
+            f"{o.idle_wake_hours:9d} {row.posts:6d} {row.gets:5d} "
+            f"{row.rate_limited:5d} {row.stale_p50:6.1f} {row.stale_p90:6.1f} "
+            f"{row.stale_p99:6.1f} {row.score:10.1f}\n"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Service-call refreshes of single cars, for toyota.refresh_vehicle_status.
+
+A service call (or a car's refresh button) should wake and fetch only the
+cars it names. ``TargetedRefreshes`` marks each such car in
+``pending_service_calls``, which the refresh strategy reads as a pending
+service call, and refreshes that car's own coordinator; the rest of the
+fleet keeps its schedule. A call for a car whose targeted refresh is still
+running joins that refresh, so repeated presses and overlapping automations
+cost one wake per car.
+"""
+
+from __future__ import annotations
+
+import logging
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Awaitable, Callable, Coroutine, Iterable, Mapping
+
+    from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TargetedRefreshes:
+    """Start, join and track the targeted refreshes of one entry's cars."""
+
+    def __init__(
+        self,
+        *,
+        coordinators: Mapping[str, DataUpdateCoordinator[Any]],
+        lock_for: Callable[[str], asyncio.Lock],
+        pending: dict[str, int],
+        request_fleet_refresh: Callable[[], Awaitable[None]],
+        create_task: Callable[[Coroutine[Any, Any, None], str], asyncio.Task[None]],
+    ) -> None:
+        """Refresh the cars of ``coordinators``, each under its ``lock_for`` lock.
+
+        ``pending`` maps a VIN to the wake-poll budget of its service call;
+        ``request_fleet_refresh`` handles cars not on the roster yet.
+        """
+        self._coordinators = coordinators
+        self._lock_for = lock_for
+        self._pending = pending
+        self._request_fleet_refresh = request_fleet_refresh
+        self._create_task = create_task
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+
+    @property
+    def busy(self) -> bool:
+        """Return whether any targeted refresh is still running."""
+        return any(not task.done() for task in self._tasks.values())
+
+    @callback
+    def async_start(
+        self, vins: Iterable[str], timeout_s: int
+    ) -> list[asyncio.Task[None]]:
+        """Start (or join) a targeted refresh for each VIN; return their tasks."""
+        tasks: list[asyncio.Task[None]] = []
+        for vin in dict.fromkeys(vins):
+            task = self._tasks.get(vin)
+            if task is not None and not task.done():
+                _LOGGER.debug(
+                    "Toyota refresh for vin=...%s already in flight, joining it",
+                    vin[-6:],
+                )
+                tasks.append(task)
+                continue
+            self._pending[vin] = timeout_s
+            task = self._create_task(
+                self._async_refresh(vin), f"{DOMAIN} targeted refresh ...{vin[-6:]}"
+            )
+            self._tasks[vin] = task
+            task.add_done_callback(partial(self._forget, vin))
+            tasks.append(task)
+        return tasks
+
+    async def _async_refresh(self, vin: str) -> None:
+        """Wake and fetch one car, leaving the fleet alone."""
+        coordinator = self._coordinators.get(vin)
+        if coordinator is None:
+            # Not on the roster yet; the pending flag is honoured by the car's
+            # first refresh once the account refresh adds it.
+            await self._request_fleet_refresh()
+            return
+        lock = self._lock_for(vin)
+        if lock.locked():
+            # The car's scheduled refresh is running and may already have
+            # consumed the pending flag and woken it on our behalf.
+            async with lock:
+                pass
+            if vin not in self._pending:
+                return
+        await coordinator.async_refresh()
+
+    def _forget(self, vin: str, task: asyncio.Task[None]) -> None:
+        if self._tasks.get(vin) is task:
+            del self._tasks[vin]
@@ -0,0 +1,335 @@
+"""Per-car ring buffer of recent dashboard readings and the rates derived from it.
+
+Each refresh replaces the car's odometer, fuel level, battery level and
+range; only the last odometer was kept. ``TelemetryRing`` keeps the car's
+last ``TELEMETRY_SAMPLES`` distinct readings as ``(timestamp, odometer,
+fuel %, battery %, range)`` in fixed-size ``array`` columns, so a car costs
+the same few kB however long it runs. Readings that repeat the newest
+sample (a parked car) are not stored.
+
+Three rates come from the buffer, without another request to Toyota or a
+query of the recorder:
+
+* consumption: the fuel or battery level used per 100 km (or mi) over the
+  buffer. Only steps in which the car moved and the level did not rise
+  count, so a refuel or a charge doesn't read as negative consumption.
+* range per percent: the range the car reports per percentage point of
+  fuel or charge, averaged over the buffer.
+* distance today: the odometer's advance since the last reading of the
+  previous day.
+
+The sums behind the first two are updated as a sample enters and as the
+oldest one leaves, and recomputed each time the buffer wraps so float
+error can't pile up. ``TelemetryHistory`` holds an entry's rings and
+persists them in one ``.storage`` file.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+TELEMETRY_STORAGE_VERSION = 1
+TELEMETRY_SAVE_DELAY_S = 60
+TELEMETRY_SAMPLES = 256
+# Distance (km or mi) the buffer must cover before consumption is reported.
+MIN_CONSUMPTION_DISTANCE = 20.0
+
+_NAN = math.nan
+_FIELDS = ("at", "odometer", "fuel", "battery", "range")
+
+
+def telemetry_store_key(entry_id: str) -> str:
+    """Return the ``.storage`` key holding one entry's telemetry rings."""
+    return f"{DOMAIN}.{entry_id}.telemetry"
+
+
+def _known(value: float | None) -> float:
+    return _NAN if value is None else float(value)
+
+
+def _value(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+@dataclass(frozen=True, slots=True)
+class TelemetryRates:
+    """A car's rates over its ring buffer; None where too little is known."""
+
+    consumption: float | None
+    range_per_percent: float | None
+    distance_today: float | None
+
+
+class _LevelSums:
+    """Running sums for one level (fuel or battery) over the buffer."""
+
+    __slots__ = ("distance", "level", "range", "used")
+
+    def __init__(self) -> None:
+        self.distance = 0.0
+        self.used = 0.0
+        self.range = 0.0
+        self.level = 0.0
+
+    def add_step(self, distance: float, used: float, sign: float) -> None:
+        self.distance += sign * distance
+        self.used += sign * used
+
+    def add_reading(self, range_: float, level: float, sign: float) -> None:
+        self.range += sign * range_
+        self.level += sign * level
+
+
+class TelemetryRing:
+    """Fixed-size circular buffer of one car's distinct readings."""
+
+    __slots__ = (
+        "_capacity",
+        "_columns",
+        "_count",
+        "_day",
+        "_day_start",
+        "_start",
+        "_sums",
+    )
+
+    def __init__(self, capacity: int = TELEMETRY_SAMPLES) -> None:
+        """Create an empty buffer of ``capacity`` samples."""
+        self._capacity = capacity
+        self._columns = {name: array("d", [_NAN]) * capacity for name in _FIELDS}
+        self._start = 0
+        self._count = 0
+        self._sums = {"fuel": _LevelSums(), "battery": _LevelSums()}
+        # Local day of the newest sample and the odometer it started from.
+        self._day: date | None = None
+        self._day_start = _NAN
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return self._count
+
+    def _slot(self, age: int) -> int:
+        """Return the slot of the sample ``age`` steps before the newest."""
+        return (self._start + self._count - 1 - age) % self._capacity
+
+    def _row(self, slot: int) -> tuple[float, ...]:
+        return tuple(self._columns[name][slot] for name in _FIELDS)
+
+    def _account(self, previous: int | None, slot: int, sign: float) -> None:
+        """Add (``sign`` 1) or remove (-1) one sample's share of the sums."""
+        _at, odometer, *levels, range_ = self._row(slot)
+        before = None if previous is None else self._row(previous)
+        for index, sums in enumerate(self._sums.values()):
+            level = levels[index]
+            if not math.isnan(range_) and level > 0:
+                sums.add_reading(range_, level, sign)
+            if before is None:
+                continue
+            distance = odometer - before[1]
+            used = before[2 + index] - level
+            # NaN fails both comparisons, so unknown values drop out too.
+            if distance > 0 and used >= 0:
+                sums.add_step(distance, used, sign)
+
+    def append(
+        self,
+        now: datetime,
+        *,
+        odometer: float | None,
+        fuel: float | None,
+        battery: float | None,
+        range_: float | None,
+    ) -> bool:
+        """Add a reading taken at ``now`` (local); return False if it repeats."""
+        values = (_known(odometer), _known(fuel), _known(battery), _known(range_))
+        newest = self._slot(0) if self._count else None
+        if newest is not None:
+            row = self._row(newest)
+            if all(
+                a == b or (math.isnan(a) and math.isnan(b))
+                for a, b in zip(values, row[1:], strict=True)
+            ):
+                return False
+        self._roll_day(now.date(), newest, values[0])
+        if self._count == self._capacity:
+            # The second-oldest sample loses its step from the oldest.
+            self._account(None, self._start, -1)
+            self._account(self._start, self._slot(self._count - 2), -1)
+            self._account(None, self._slot(self._count - 2), 1)
+            self._start = (self._start + 1) % self._capacity
+            self._count -= 1
+            if self._start == 0:
+                self._resum()
+        slot = (self._start + self._count) % self._capacity
+        for name, value in zip(_FIELDS, (now.timestamp(), *values), strict=True):
+            self._columns[name][slot] = value
+        self._count += 1
+        self._account(newest, slot, 1)
+        return True
+
+    def _roll_day(self, today: date, newest: int | None, odometer: float) -> None:
+        """Start a new day from the last odometer read before it."""
+        if self._day == today and not math.isnan(self._day_start):
+            return
+        if self._day != today and newest is not None:
+            self._day_start = self._columns["odometer"][newest]
+        if math.isnan(self._day_start):
+            self._day_start = odometer
+        self._day = today
+
+    def _resum(self) -> None:
+        """Recompute the running sums from the stored samples."""
+        self._sums = {"fuel": _LevelSums(), "battery": _LevelSums()}
+        previous = None
+        for age in range(self._count - 1, -1, -1):
+            slot = self._slot(age)
+            self._account(previous, slot, 1)
+            previous = slot
+
+    def rates(self, now: datetime, *, electric: bool) -> TelemetryRates:
+        """Return the rates of the car's battery (``electric``) or fuel."""
+        sums = self._sums["battery" if electric else "fuel"]
+        consumption = (
+            100 * sums.used / sums.distance
+            if sums.distance >= MIN_CONSUMPTION_DISTANCE
+            else None
+        )
+        range_per_percent = sums.range / sums.level if sums.level > 0 else None
+        distance_today: float | None = None
+        if self._count:
+            if self._day != now.date():
+                distance_today = 0.0
+            else:
+                newest = self._columns["odometer"][self._slot(0)]
+                distance_today = _value(max(newest - self._day_start, 0.0))
+        return TelemetryRates(
+            consumption=consumption,
+            range_per_percent=range_per_percent,
+            distance_today=distance_today,
+        )
+
+    def samples(self) -> list[tuple[float | None, ...]]:
+        """Return the stored samples, oldest first (unknown values None)."""
+        return [
+            tuple(_value(value) for value in self._row(self._slot(age)))
+            for age in range(self._count - 1, -1, -1)
+        ]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the samples and the day's start for ``.storage``."""
+        return {
+            "samples": [list(sample) for sample in self.samples()],
+            "day": self._day.isoformat() if self._day else None,
+            "day_start": _value(self._day_start),
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], capacity: int = TELEMETRY_SAMPLES
+    ) -> TelemetryRing:
+        """Rebuild a buffer saved by ``as_dict``."""
+        ring = cls(capacity)
+        for sample in data["samples"][-capacity:]:
+            if len(sample) != len(_FIELDS):
+                msg = f"expected {len(_FIELDS)} fields, got {len(sample)}"
+                raise ValueError(msg)
+            for name, value in zip(_FIELDS, sample, strict=True):
+                ring._columns[name][ring._count] = _known(value)
+            ring._count += 1
+        ring._resum()
+        day = data.get("day")
+        ring._day = date.fromisoformat(day) if day else None
+        ring._day_start = _known(data.get("day_start"))
+        return ring
+
+
+class TelemetryHistory:
+    """Keep one entry's telemetry rings and persist them."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, *, metric: bool) -> None:
+        """Initialise empty rings; ``async_load`` restores saved ones."""
+        self._metric = metric
+        self._store: Store[dict[str, Any]] = Store(
+            hass, TELEMETRY_STORAGE_VERSION, telemetry_store_key(entry_id)
+        )
+        self._rings: dict[str, TelemetryRing] = {}
+        self._stats: Counter[str] = Counter()
+
+    async def async_load(self) -> None:
+        """Restore the rings of a previous run."""
+        data = await self._store.async_load()
+        # Rings read in the other unit system would mix km and mi.
+        if not data or data.get("metric") != self._metric:
+            return
+        for vin, encoded in data.get("vehicles", {}).items():
+            try:
+                self._rings[vin] = TelemetryRing.from_dict(encoded)
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.debug("Discarding unreadable telemetry for vin=...%s", vin[-6:])
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "metric": self._metric,
+            "vehicles": {vin: ring.as_dict() for vin, ring in self._rings.items()},
+        }
+
+    def ring(self, vin: str) -> TelemetryRing | None:
+        """Return the car's buffer, None before its first reading."""
+        return self._rings.get(vin)
+
+    @callback
+    def record(  # noqa: PLR0913
+        self,
+        vin: str,
+        now: datetime,
+        *,
+        odometer: float | None,
+        fuel: float | None,
+        battery: float | None,
+        range_: float | None,
+    ) -> bool:
+        """Add one refresh's readings of the car; return whether they were new."""
+        ring = self._rings.get(vin)
+        if ring is None:
+            ring = self._rings[vin] = TelemetryRing()
+        if not ring.append(
+            now, odometer=odometer, fuel=fuel, battery=battery, range_=range_
+        ):
+            return False
+        self._stats["samples"] += 1
+        self._store.async_delay_save(self._data_to_save, TELEMETRY_SAVE_DELAY_S)
+        return True
+
+    def rates(self, vin: str, now: datetime, *, electric: bool) -> TelemetryRates:
+        """Return the car's rates (all None before its first reading)."""
+        ring = self._rings.get(vin)
+        if ring is None:
+            return TelemetryRates(None, None, None)
+        return ring.rates(now, electric=electric)
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return buffer sizes and sample counters for the diagnostics download."""
+        return {
+            "capacity": TELEMETRY_SAMPLES,
+            "vehicles": {
+                f"...{vin[-6:]}": {"samples": len(ring)}
+                for vin, ring in self._rings.items()
+            },
+            **dict(self._stats),
+        }
@@ -0,0 +1,315 @@
+"""Integration-wide HTTP transport shared by every Toyota config entry.
+
+Each ``MyT`` client used to build its own ``httpx.AsyncClient`` (and the
+config flow another one inside a throwaway event loop), so several accounts
+meant several connection pools, repeated TLS handshakes and duplicate DNS
+lookups against the same two Toyota hosts. The registry below owns exactly
+one keep-alive client per Home Assistant instance, stored in
+``hass.data[DOMAIN][TRANSPORT]``, and hands it to every pytoyoda Controller
+through the ``controller_class`` hook of ``MyT``.
+
+The registry is reference-counted by config entry: the last entry to unload
+closes the pool. Connection-reuse counters are collected through httpcore's
+``trace`` extension and surfaced in the config-entry diagnostics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager
+from functools import partial
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import callback
+from homeassistant.util.ssl import get_default_context
+from pytoyoda.client import MyT
+from pytoyoda.controller import Controller
+
+from .const import DOMAIN, TRANSPORT
+from .rate_limit import RequestPacer
+
+if TYPE_CHECKING:
+    import ssl
+    from collections.abc import AsyncGenerator, Callable, Mapping
+
+    from homeassistant.core import Event, HomeAssistant
+    from pytoyoda.controller import TokenInfo
+
+_LOGGER = logging.getLogger(__name__)
+
+# Pool sizing. Toyota traffic is two hosts (auth + API) with requests that are
+# deliberately serialised per account, so a handful of keep-alive sockets per
+# host covers several accounts without holding idle sockets open forever.
+TRANSPORT_MAX_CONNECTIONS = 16
+TRANSPORT_MAX_KEEPALIVE_CONNECTIONS = 8
+# Longer than the default polling interval's inter-request gaps inside one
+# cycle, shorter than the gap between cycles: connections survive a fleet
+# sweep and are recycled before the gateway drops them from under us.
+TRANSPORT_KEEPALIVE_EXPIRY_S = 120
+# Matches pytoyoda's Controller default so request semantics are unchanged.
+TRANSPORT_TIMEOUT_S = 60
+TRANSPORT_CONNECT_TIMEOUT_S = 15
+
+# HTTP/2 needs the optional ``h2`` package. Fall back to HTTP/1.1 keep-alive
+# rather than failing setup when it isn't installed.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class _PacedClient:
+    """The shared client as one controller sees it: one pacer slot per request.
+
+    pytoyoda's ``request_raw`` retries 429s and 5xx responses after sleeping
+    2, 4 and 8 s. Pacing each HTTP attempt here, not the whole call,
+    keeps those sleeps from holding a slot that the account's other
+    requests are queued on.
+    """
+
+    __slots__ = ("_client", "_pacer")
+
+    def __init__(self, client: httpx.AsyncClient, pacer: RequestPacer) -> None:
+        self._client = client
+        self._pacer = pacer
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def request(self, *args: Any, **kwargs: Any) -> httpx.Response:  # noqa: ANN401
+        async with self._pacer.slot():
+            return await self._client.request(*args, **kwargs)
+
+
+class PooledController(Controller):
+    """pytoyoda Controller that borrows the integration-wide HTTP client.
+
+    Data requests go through the shared pool. The login/refresh flow keeps a
+    short-lived client per call (pytoyoda's own behaviour) so cookies set by
+    the identity provider never leak between accounts, but it reuses the
+    preloaded Home Assistant SSL context instead of reading the CA bundle.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        brand: str = "T",
+        timeout: int = TRANSPORT_TIMEOUT_S,
+        *,
+        transport: ToyotaTransport,
+    ) -> None:
+        """Initialise the controller against the shared transport."""
+        super().__init__(
+            username=username, password=password, brand=brand, timeout=timeout
+        )
+        self._transport = transport
+        self._ssl_ctx = transport.ssl_context
+        self._client = transport.client
+        # Single-flight guard for login and token refresh. Every coroutine
+        # that finds the token expired queues on this lock; whoever gets it
+        # first renews, the rest see a valid token and return. See auth.py.
+        self.auth_lock = asyncio.Lock()
+        self.auth_stats: Counter[str] = Counter()
+        # Called with the new TokenInfo whenever pytoyoda stores tokens, so
+        # the auth manager can persist them across restarts.
+        self.token_listener: Callable[[TokenInfo], None] | None = None
+        # Every data request of this account (all its cars, all lanes of a
+        # pipelined refresh) is spaced through one pacer. See rate_limit.py.
+        self.pacer = RequestPacer()
+
+    async def request_raw(  # noqa: PLR0913
+        self,
+        method: str,
+        endpoint: str,
+        vin: str | None = None,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, Any] | None = None,
+    ) -> httpx.Response:
+        """Send a request through the shared pool, paced per account.
+
+        Re-borrows the client on every call so a controller created before a
+        pool rebuild never holds on to a closed client. Each attempt takes
+        its own pacer slot (see ``_PacedClient``).
+        """
+        self._client = _PacedClient(self._transport.client, self.pacer)  # type: ignore[assignment]
+        return await super().request_raw(method, endpoint, vin, body, params, headers)
+
+    async def _update_token(self) -> None:
+        """Renew the token at most once for any number of concurrent callers."""
+        if self.auth_lock.locked():
+            self.auth_stats["coalesced"] += 1
+        async with self.auth_lock:
+            if self._is_token_valid():
+                return
+            self.auth_stats["renewals"] += 1
+            await super()._update_token()
+
+    def _update_tokens(self, response_data: dict[str, Any]) -> None:
+        """Store the new tokens and notify the persistence listener."""
+        super()._update_tokens(response_data)
+        if self.token_listener is not None and self._token_info is not None:
+            self.token_listener(self._token_info)
+
+    async def _get_ssl_context(self) -> ssl.SSLContext:
+        """Return the shared, already-loaded SSL context."""
+        return self._transport.ssl_context
+
+    @asynccontextmanager
+    async def _get_http_client(self) -> AsyncGenerator[httpx.AsyncClient]:
+        """Yield a short-lived client for the OAuth flow.
+
+        Replaces pytoyoda's hishel cache client: the auth flow is POSTs and
+        redirects that are never cached, and dropping hishel removes the need
+        for a writable working directory during login.
+        """
+        async with httpx.AsyncClient(
+            timeout=self._timeout, verify=self._transport.ssl_context
+        ) as client:
+            yield client
+
+    async def aclose(self) -> None:
+        """Release the borrowed client reference; the registry owns the pool."""
+        self._client = None
+
+
+class ToyotaTransport:
+    """Reference-counted owner of the shared ``httpx.AsyncClient``."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise the registry. The pool itself is built lazily."""
+        self._hass = hass
+        self._client: httpx.AsyncClient | None = None
+        self._entries: set[str] = set()
+        self.ssl_context: ssl.SSLContext = get_default_context()
+        self._stats: Counter[str] = Counter()
+        self._requests_per_host: Counter[str] = Counter()
+        self._http_versions: Counter[str] = Counter()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return the pooled client, rebuilding it if it was closed."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        self._stats["pools_created"] += 1
+        return httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            verify=self.ssl_context,
+            timeout=httpx.Timeout(
+                TRANSPORT_TIMEOUT_S, connect=TRANSPORT_CONNECT_TIMEOUT_S
+            ),
+            limits=httpx.Limits(
+                max_connections=TRANSPORT_MAX_CONNECTIONS,
+                max_keepalive_connections=TRANSPORT_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=TRANSPORT_KEEPALIVE_EXPIRY_S,
+            ),
+            # Data requests authenticate with a bearer token. Refuse every
+            # cookie so gateway cookies from one account are never replayed
+            # on another account's requests.
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=())),
+            event_hooks={
+                "request": [self._on_request],
+                "response": [self._on_response],
+            },
+        )
+
+    def create_client(
+        self,
+        username: str,
+        password: str,
+        brand: str = "T",
+        *,
+        use_metric: bool = True,
+    ) -> MyT:
+        """Build a ``MyT`` whose controller uses the shared pool."""
+        return MyT(
+            username=username,
+            password=password,
+            use_metric=use_metric,
+            brand=brand,
+            controller_class=partial(PooledController, transport=self),  # type: ignore[arg-type]
+        )
+
+    @callback
+    def async_acquire(self, entry_id: str) -> None:
+        """Register a config entry as a user of the pool."""
+        self._entries.add(entry_id)
+
+    async def async_release(self, entry_id: str) -> None:
+        """Drop a config entry; close the pool when the last one leaves."""
+        self._entries.discard(entry_id)
+        if self._entries:
+            return
+        if self._hass.data.get(DOMAIN, {}).get(TRANSPORT) is self:
+            self._hass.data[DOMAIN].pop(TRANSPORT)
+        await self.async_close()
+
+    async def async_close(self) -> None:
+        """Close the pooled client. Safe to call multiple times."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self._stats["requests"] += 1
+        self._requests_per_host[request.url.host] += 1
+        request.extensions["trace"] = self._trace
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        self._http_versions[response.http_version] += 1
+
+    async def _trace(self, event_name: str, _info: Mapping[str, Any]) -> None:
+        """Count the httpcore events that mean a socket was (re)established."""
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+        elif event_name == "connection.start_tls.complete":
+            self._stats["tls_handshakes"] += 1
+        elif event_name == "connection.connect_tcp.failed":
+            self._stats["connect_failures"] += 1
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return connection-reuse statistics for the diagnostics download."""
+        requests = self._stats["requests"]
+        opened = self._stats["connections_opened"]
+        return {
+            "http2_available": _HTTP2_AVAILABLE,
+            "entries": len(self._entries),
+            "pools_created": self._stats["pools_created"],
+            "requests": requests,
+            "connections_opened": opened,
+            "tls_handshakes": self._stats["tls_handshakes"],
+            "connect_failures": self._stats["connect_failures"],
+            "reused_requests": max(0, requests - opened),
+            "reuse_ratio": round(1 - opened / requests, 3) if requests else None,
+            "requests_per_host": dict(self._requests_per_host),
+            "http_versions": dict(self._http_versions),
+            "limits": {
+                "max_connections": TRANSPORT_MAX_CONNECTIONS,
+                "max_keepalive_connections": TRANSPORT_MAX_KEEPALIVE_CONNECTIONS,
+                "keepalive_expiry_s": TRANSPORT_KEEPALIVE_EXPIRY_S,
+            },
+        }
+
+
+@callback
+def async_get_transport(hass: HomeAssistant) -> ToyotaTransport:
+    """Return the integration-wide transport, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    transport: ToyotaTransport | None = domain_data.get(TRANSPORT)
+    if transport is None:
+        transport = ToyotaTransport(hass)
+        domain_data[TRANSPORT] = transport
+
+        async def _async_close(_event: Event) -> None:
+            await transport.async_close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+    return transport
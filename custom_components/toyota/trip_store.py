@@ -0,0 +1,557 @@
+"""Local per-entry trip database.
+
+Toyota only hands out trips and summaries on request, and every request
+counts against the account's rate limit, so questions like "distance driven
+on weekdays last quarter" can't be answered by calling the API each time.
+``TripStore`` keeps what the integration has already fetched in a SQLite
+file under the config directory:
+
+- ``trips``: one row per trip from ``/v1/trips``, clustered on
+  ``(vin, start_ts)``. ``TripCollector`` keeps it current incrementally.
+- ``days``: one row per daily summary. Fed by the statistics importer and
+  the history backfill, which fetch those summaries anyway, so it reaches as
+  far back as the backfill has walked at no extra request cost.
+
+Weekday, ISO week and hour are stored in local time when a row is written,
+so aggregates group and filter on indexed integers and strings instead of
+recomputing calendar fields per query. All SQLite access runs in the
+executor; the connection is shared behind a lock.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import astuple, dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import httpcore
+import httpx
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+from pydantic import ValidationError
+from pytoyoda.exceptions import ToyotaApiError, ToyotaInternalError
+
+from .aggregation import COLUMNS, DailyColumns
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Iterable
+
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from pytoyoda.models.summary import Summary
+    from pytoyoda.models.trips import Trip
+    from pytoyoda.models.vehicle import Vehicle
+
+_LOGGER = logging.getLogger(__name__)
+
+TRIP_DB_SCHEMA_VERSION = 1
+# Trips fetched for a car the store has never seen. /v1/trips pages five
+# trips per request, so the first sync is kept short; older history is
+# answered from the daily table.
+TRIP_SYNC_INITIAL_DAYS = 7
+# How often a car's new trips are fetched at most.
+TRIP_SYNC_INTERVAL = timedelta(hours=1)
+
+QUERY_GROUPS = ("none", "day", "week", "month", "weekday", "hour")
+QUERY_SOURCES = ("trips", "days")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS trips (
+        vin TEXT NOT NULL,
+        start_ts INTEGER NOT NULL,
+        end_ts INTEGER,
+        local_day TEXT NOT NULL,
+        iso_week TEXT NOT NULL,
+        weekday INTEGER NOT NULL,
+        hour INTEGER NOT NULL,
+        distance REAL,
+        ev_distance REAL,
+        fuel_consumed REAL,
+        duration_s INTEGER,
+        ev_duration_s INTEGER,
+        score REAL,
+        PRIMARY KEY (vin, start_ts)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS days (
+        vin TEXT NOT NULL,
+        local_day TEXT NOT NULL,
+        iso_week TEXT NOT NULL,
+        weekday INTEGER NOT NULL,
+        distance REAL,
+        ev_distance REAL,
+        fuel_consumed REAL,
+        duration_s INTEGER,
+        ev_duration_s INTEGER,
+        countries TEXT,
+        PRIMARY KEY (vin, local_day)
+    ) WITHOUT ROWID
+    """,
+    # The contiguous span of days whose summaries were fetched. Days without
+    # trips have no row in ``days``, so rows alone can't tell "not driven"
+    # from "not fetched".
+    """
+    CREATE TABLE IF NOT EXISTS day_coverage (
+        vin TEXT PRIMARY KEY,
+        first_day TEXT NOT NULL,
+        last_day TEXT NOT NULL
+    )
+    """,
+)
+_DAY_COLUMNS = (
+    "vin, local_day, iso_week, weekday, distance, ev_distance, fuel_consumed, "
+    "duration_s, ev_duration_s, countries"
+)
+
+# Column each source is paged on, oldest first.
+_PAGE_KEY = {"trips": "start_ts", "days": "local_day"}
+TRIP_PAGE_ROWS = 500
+
+# Group expressions per group_by; never built from user input.
+_GROUP_EXPR = {
+    "none": "''",
+    "day": "local_day",
+    "week": "iso_week",
+    "month": "substr(local_day, 1, 7)",
+    "weekday": "weekday",
+    "hour": "hour",
+}
+
+
+def trip_db_path(hass: HomeAssistant, entry_id: str) -> Path:
+    """Return the SQLite file holding one entry's trips."""
+    return Path(hass.config.path(".storage", f"{DOMAIN}.{entry_id}.trips.db"))
+
+
+def _iso_week(day: date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _seconds(duration: timedelta | None) -> int | None:
+    return int(duration.total_seconds()) if duration else None
+
+
+@dataclass(frozen=True, slots=True)
+class TripRow:
+    """One trip as stored in the ``trips`` table."""
+
+    start_ts: int
+    end_ts: int | None
+    local_day: str
+    iso_week: str
+    weekday: int
+    hour: int
+    distance: float | None
+    ev_distance: float | None
+    fuel_consumed: float | None
+    duration_s: int | None
+    ev_duration_s: int | None
+    score: float | None
+
+    @classmethod
+    def from_trip(cls, trip: Trip) -> TripRow | None:
+        """Convert a pytoyoda Trip; trips without a start time are dropped."""
+        start = trip.start_time
+        if start is None:
+            return None
+        local = dt_util.as_local(start)
+        end = trip.end_time
+        return cls(
+            start_ts=int(start.timestamp()),
+            end_ts=int(end.timestamp()) if end else None,
+            local_day=local.date().isoformat(),
+            iso_week=_iso_week(local.date()),
+            weekday=local.weekday(),
+            hour=local.hour,
+            distance=trip.distance,
+            ev_distance=trip.ev_distance,
+            fuel_consumed=trip.fuel_consumed,
+            duration_s=_seconds(trip.duration),
+            ev_duration_s=_seconds(trip.ev_duration),
+            score=trip.score,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class DayRow:
+    """One daily summary as stored in the ``days`` table."""
+
+    local_day: str
+    iso_week: str
+    weekday: int
+    distance: float | None
+    ev_distance: float | None
+    fuel_consumed: float | None
+    duration_s: int | None
+    ev_duration_s: int | None
+    countries: str | None
+
+    @classmethod
+    def from_summary(cls, summary: Summary) -> DayRow:
+        """Convert a pytoyoda daily Summary."""
+        day = summary.from_date
+        return cls(
+            local_day=day.isoformat(),
+            iso_week=_iso_week(day),
+            weekday=day.weekday(),
+            distance=summary.distance,
+            ev_distance=summary.ev_distance,
+            fuel_consumed=summary.fuel_consumed,
+            duration_s=_seconds(summary.duration),
+            ev_duration_s=_seconds(summary.ev_duration),
+            countries=",".join(summary.countries) if summary.countries else None,
+        )
+
+
+def merge_span(
+    span: tuple[date, date] | None, new: tuple[date, date]
+) -> tuple[date, date]:
+    """Merge a newly fetched range into the contiguous coverage span.
+
+    Overlapping or adjacent ranges extend the span. A range past a gap
+    replaces it (the newest days matter most); an older one past a gap is
+    ignored.
+    """
+    if span is None:
+        return new
+    first, last = span
+    one_day = timedelta(days=1)
+    if new[0] <= last + one_day and new[1] >= first - one_day:
+        return min(first, new[0]), max(last, new[1])
+    return new if new[0] > last else span
+
+
+class TripStore:
+    """SQLite-backed trips and daily summaries of one config entry.
+
+    Every method blocks; call them through the executor.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Bind the store to a database file; ``open`` creates it."""
+        self._path = str(path)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        # Bumped whenever a car's days change, so readers can cache columns.
+        self._generations: Counter[str] = Counter()
+
+    def open(self) -> None:
+        """Open (and if needed create) the database."""
+        with self._lock:
+            if self._conn is not None:
+                return
+            if self._path != ":memory:":
+                Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version={TRIP_DB_SCHEMA_VERSION}")
+            conn.commit()
+            self._conn = conn
+
+    def close(self) -> None:
+        """Close the database; ``open`` reopens it."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            msg = "Trip store is not open"
+            raise RuntimeError(msg)
+        return self._conn
+
+    def add_trips(self, vin: str, rows: Iterable[TripRow]) -> int:
+        """Insert or replace trips; returns the number of rows written."""
+        values = [(vin, *astuple(row)) for row in rows]
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO trips VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                values,
+            )
+            conn.commit()
+        return len(values)
+
+    def add_days(
+        self,
+        vin: str,
+        rows: Iterable[DayRow],
+        covered: tuple[date, date] | None = None,
+    ) -> int:
+        """Insert or replace daily summaries; returns the rows written.
+
+        ``covered`` is the full range that was fetched, including days
+        without trips, and extends the car's coverage span.
+        """
+        values = [(vin, *astuple(row)) for row in rows]
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                f"INSERT OR REPLACE INTO days ({_DAY_COLUMNS}) "  # noqa: S608
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                values,
+            )
+            if covered is not None:
+                first, last = merge_span(self._span(conn, vin), covered)
+                conn.execute(
+                    "INSERT OR REPLACE INTO day_coverage VALUES (?, ?, ?)",
+                    (vin, first.isoformat(), last.isoformat()),
+                )
+            conn.commit()
+            self._generations[vin] += 1
+        return len(values)
+
+    @staticmethod
+    def _span(conn: sqlite3.Connection, vin: str) -> tuple[date, date] | None:
+        row = conn.execute(
+            "SELECT first_day, last_day FROM day_coverage WHERE vin = ?", (vin,)
+        ).fetchone()
+        return (date.fromisoformat(row[0]), date.fromisoformat(row[1])) if row else None
+
+    def generation(self, vin: str) -> int:
+        """Return a counter that changes whenever the car's days change.
+
+        Kept in memory, so it can be read from the event loop.
+        """
+        return self._generations[vin]
+
+    def daily_columns(self, vin: str) -> tuple[DailyColumns, tuple[date, date] | None]:
+        """Return the car's days as columns, with the covered span."""
+        columns = DailyColumns()
+        with self._lock:
+            conn = self._connection()
+            span = self._span(conn, vin)
+            cursor = conn.execute(
+                "SELECT local_day, distance, duration_s, ev_distance, "
+                "ev_duration_s, fuel_consumed, countries FROM days "
+                "WHERE vin = ? ORDER BY local_day",
+                (vin,),
+            )
+            for day, *values, countries in cursor:
+                columns.append(
+                    date.fromisoformat(day),
+                    countries.split(",") if countries else (),
+                    **dict(zip(COLUMNS, values, strict=True)),
+                )
+        return columns, span
+
+    def latest_trip_start(self, vin: str) -> datetime | None:
+        """Return the start of the newest stored trip of a car."""
+        with self._lock:
+            row = (
+                self._connection()
+                .execute("SELECT MAX(start_ts) FROM trips WHERE vin = ?", (vin,))
+                .fetchone()
+            )
+        return dt_util.utc_from_timestamp(row[0]) if row and row[0] else None
+
+    def query(  # noqa: PLR0913
+        self,
+        vin: str,
+        start: datetime,
+        end: datetime,
+        *,
+        weekdays: Iterable[int] | None = None,
+        group_by: str = "none",
+        source: str = "trips",
+    ) -> dict[str, Any]:
+        """Aggregate a car's trips (or days) in ``[start, end)``.
+
+        ``weekdays`` are ``date.weekday()`` numbers (0 = Monday) in local
+        time. The ``days`` source compares local dates, so partial days at
+        either end count as whole days, and it can't group by hour.
+        """
+        if source not in QUERY_SOURCES:
+            msg = f"Unknown source {source!r}"
+            raise ValueError(msg)
+        if group_by not in QUERY_GROUPS or (source == "days" and group_by == "hour"):
+            msg = f"Cannot group {source} by {group_by!r}"
+            raise ValueError(msg)
+        if source == "trips":
+            where = "vin = ? AND start_ts >= ? AND start_ts < ?"
+            params: list[Any] = [vin, int(start.timestamp()), int(end.timestamp())]
+            count = "COUNT(*)"
+        else:
+            where = "vin = ? AND local_day >= ? AND local_day < ?"
+            params = [
+                vin,
+                dt_util.as_local(start).date().isoformat(),
+                dt_util.as_local(end).date().isoformat(),
+            ]
+            count = "SUM(distance > 0)"
+        weekday_list = sorted(set(weekdays or ()))
+        if weekday_list:
+            where += f" AND weekday IN ({', '.join('?' * len(weekday_list))})"
+            params.extend(weekday_list)
+        group = _GROUP_EXPR[group_by]
+        sql = (
+            f"SELECT {group}, {count}, TOTAL(distance), TOTAL(ev_distance), "  # noqa: S608
+            f"TOTAL(fuel_consumed), TOTAL(duration_s) FROM {source} "
+            f"WHERE {where} GROUP BY 1 ORDER BY 1"
+        )
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+
+        total = _aggregate(
+            (None, *(sum(row[i] or 0 for row in rows) for i in range(1, 6)))
+        )
+        result: dict[str, Any] = {"source": source, "total": total}
+        if group_by != "none":
+            result["groups"] = [{"key": row[0], **_aggregate(row)} for row in rows]
+        return result
+
+    def coverage(self, vin: str) -> dict[str, Any]:
+        """Return the oldest and newest stored day of each table for a car."""
+        coverage: dict[str, Any] = {}
+        with self._lock:
+            conn = self._connection()
+            for table in QUERY_SOURCES:
+                first, last, count = conn.execute(
+                    f"SELECT MIN(local_day), MAX(local_day), COUNT(*) FROM {table} "  # noqa: S608
+                    "WHERE vin = ?",
+                    (vin,),
+                ).fetchone()
+                coverage[table] = {"first": first, "last": last, "rows": count}
+        return coverage
+
+    def page(
+        self,
+        vin: str,
+        source: str,
+        after: int | str | None = None,
+        limit: int = TRIP_PAGE_ROWS,
+    ) -> list[dict[str, Any]]:
+        """Return up to ``limit`` of a car's trips (or days), oldest first.
+
+        Pages are keyed on ``start_ts`` (trips) or ``local_day`` (days):
+        pass the last row's key as ``after`` for the next page, so a reader
+        holds one page at a time however large the table is.
+        """
+        if source not in QUERY_SOURCES:
+            msg = f"Unknown source {source!r}"
+            raise ValueError(msg)
+        key = _PAGE_KEY[source]
+        where = "vin = ?" if after is None else f"vin = ? AND {key} > ?"
+        params = (vin,) if after is None else (vin, after)
+        with self._lock:
+            cursor = self._connection().execute(
+                f"SELECT * FROM {source} WHERE {where} "  # noqa: S608
+                f"ORDER BY {key} LIMIT ?",
+                (*params, limit),
+            )
+            names = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+        return [
+            {
+                name: value
+                for name, value in zip(names, row, strict=True)
+                if name != "vin"
+            }
+            for row in rows
+        ]
+
+
+def _aggregate(row: tuple[Any, ...]) -> dict[str, Any]:
+    _, count, distance, ev_distance, fuel_consumed, duration_s = row
+    return {
+        "count": int(count or 0),
+        "distance": round(distance, 2),
+        "ev_distance": round(ev_distance, 2),
+        "fuel_consumed": round(fuel_consumed, 2),
+        "duration_h": round(duration_s / 3600, 2),
+    }
+
+
+class TripCollector:
+    """Fetch each car's new trips into the entry's ``TripStore``."""
+
+    def __init__(self, hass: HomeAssistant, store: TripStore) -> None:
+        """Initialise the collector; nothing runs until a car is scheduled."""
+        self._hass = hass
+        self._store = store
+        self._synced_at: dict[str, datetime] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._stats: Counter[str] = Counter()
+
+    @callback
+    def async_schedule(self, entry: ConfigEntry, vehicle: Vehicle) -> None:
+        """Fetch the car's new trips in the background, at most hourly."""
+        vin = vehicle.vin
+        if vin is None:
+            return
+        synced_at = self._synced_at.get(vin)
+        if synced_at is not None and dt_util.now() - synced_at < TRIP_SYNC_INTERVAL:
+            return
+        task = self._tasks.get(vin)
+        if task is not None and not task.done():
+            return
+        self._tasks[vin] = entry.async_create_background_task(
+            self._hass,
+            self.async_sync(vehicle),
+            f"{DOMAIN} trip sync ...{vin[-6:]}",
+        )
+
+    async def async_sync(self, vehicle: Vehicle) -> None:
+        """Fetch trips since the newest stored one (inclusive of its day)."""
+        vin = vehicle.vin
+        if vin is None:
+            return
+        now = dt_util.now()
+        latest = await self._hass.async_add_executor_job(
+            self._store.latest_trip_start, vin
+        )
+        today = now.date()
+        from_day = (
+            dt_util.as_local(latest).date()
+            if latest is not None
+            else today - timedelta(days=TRIP_SYNC_INITIAL_DAYS)
+        )
+        try:
+            trips = await vehicle.get_trips(from_day, today) or []
+        except (
+            ToyotaApiError,
+            ToyotaInternalError,
+            httpx.ConnectTimeout,
+            httpcore.ConnectTimeout,
+            httpx.ReadTimeout,
+            TimeoutError,
+            ValidationError,
+        ) as ex:
+            self._stats["failures"] += 1
+            _LOGGER.debug(
+                "Toyota trip sync for vin=...%s failed (%s)",
+                vin[-6:],
+                type(ex).__name__,
+            )
+            return
+        rows = [row for row in map(TripRow.from_trip, trips) if row is not None]
+        written = await self._hass.async_add_executor_job(
+            self._store.add_trips, vin, rows
+        )
+        self._synced_at[vin] = now
+        self._stats["syncs"] += 1
+        self._stats["trips"] += written
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return sync counters for the diagnostics download."""
+        return {
+            "synced_at": {
+                f"...{vin[-6:]}": synced_at.isoformat()
+                for vin, synced_at in self._synced_at.items()
+            },
+            **dict(self._stats),
+        }
@@ -14,6 +14,8 @@ if TYPE_CHECKING:
     from pytoyoda.models.endpoints.vehicle_guid import VehicleGuidModel
     from pytoyoda.models.summary import Summary
 
+    from .aggregation import PeriodAggregate
+
 
 def td_to_hoursminutes(td: timedelta | None) -> str | None:
     """Convert a timedelta to hours and minutes string."""
@@ -93,7 +95,7 @@ def format_vin_sensor_attributes(
 
 
 def format_statistics_attributes(
-    statistics: Summary, vehicle_info: VehicleGuidModel
+    statistics: Summary | PeriodAggregate, vehicle_info: VehicleGuidModel
 ) -> dict[str, list[str] | float | str | None]:
     """Format and returns statistics attributes."""
     attr = {
@@ -0,0 +1,141 @@
+"""Per-car wake latency, learned from our own wake POSTs.
+
+After ``POST /refresh-status`` the car's modem wakes, reports, and the
+report shows up as a newer ``occurrence_date`` on ``/status``. How long
+that takes differs a lot between cars (modem generation, reception where
+the car usually parks). ``WakeLatencyHistogram`` keeps one car's
+latencies in fixed buckets and ``poll_offsets()`` turns them into that
+car's poll schedule: the first ``/status`` poll at its median latency,
+the last at its 95th percentile. A fast car is then read with one poll,
+and a slow car is given the time it needs before a wake counts as failed
+towards soft-disable.
+
+Counts decay by ``WAKE_LATENCY_DECAY`` per observation, so the schedule
+follows a car whose behaviour changes (new parking spot, modem update)
+within a few dozen wakes. A wake that times out is recorded as taking
+longer than the last poll, which lets a too-short schedule grow; the
+schedule never exceeds ``MAX_WAKE_POLL_S``.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from typing import Any
+
+# Upper bucket edges in seconds; one more bucket holds everything slower.
+BUCKET_EDGES_S: tuple[float, ...] = (5, 10, 15, 20, 25, 30, 40, 50, 60, 75, 90, 120)
+# Weight kept by the existing counts per new observation: the histogram
+# reflects roughly the last 1 / (1 - decay) = 20 wakes.
+WAKE_LATENCY_DECAY = 0.95
+# Wakes observed before the learned schedule replaces the default one.
+MIN_WAKE_SAMPLES = 5
+# Schedule used until a car has MIN_WAKE_SAMPLES: first poll after this many
+# seconds, the last at the caller's default timeout.
+DEFAULT_FIRST_POLL_S = 10.0
+# At most this long between two polls of one wake.
+MAX_POLL_SPACING_S = 10.0
+# Learned schedules never poll later than this after the POST.
+MAX_WAKE_POLL_S = BUCKET_EDGES_S[-1]
+
+
+class WakeLatencyHistogram:
+    """Exponentially decayed histogram of one car's wake latencies."""
+
+    __slots__ = ("_counts", "_samples")
+
+    def __init__(self) -> None:
+        """Create an empty histogram."""
+        self._counts = [0.0] * (len(BUCKET_EDGES_S) + 1)
+        self._samples = 0
+
+    @property
+    def samples(self) -> int:
+        """Return the number of wakes recorded, timeouts included."""
+        return self._samples
+
+    def record(self, latency_s: float, *, timed_out: bool = False) -> None:
+        """Add one wake; ``timed_out`` means it took longer than ``latency_s``."""
+        if timed_out:
+            bucket = bisect_left(BUCKET_EDGES_S, latency_s)
+            # Strictly beyond the last poll, even when it sat on an edge.
+            if bucket < len(BUCKET_EDGES_S) and BUCKET_EDGES_S[bucket] <= latency_s:
+                bucket += 1
+        else:
+            bucket = bisect_left(BUCKET_EDGES_S, max(0.0, latency_s))
+        self._counts = [count * WAKE_LATENCY_DECAY for count in self._counts]
+        self._counts[bucket] += 1.0
+        self._samples += 1
+
+    def quantile(self, fraction: float) -> float | None:
+        """Return the bucket edge below which ``fraction`` of wakes completed.
+
+        Wakes in the overflow bucket count as ``MAX_WAKE_POLL_S``; None
+        until anything was recorded.
+        """
+        total = math.fsum(self._counts)
+        if total <= 0:
+            return None
+        target = fraction * total
+        cumulative = 0.0
+        for edge, count in zip(BUCKET_EDGES_S, self._counts, strict=False):
+            cumulative += count
+            if cumulative >= target:
+                return float(edge)
+        return float(MAX_WAKE_POLL_S)
+
+    def poll_offsets(
+        self, default_timeout_s: float, *, budget_s: float | None = None
+    ) -> tuple[float, ...]:
+        """Return when to poll ``/status``, in seconds after the wake POST.
+
+        Polls run from the learned median to the learned 95th percentile
+        (``DEFAULT_FIRST_POLL_S`` to ``default_timeout_s`` while fewer than
+        ``MIN_WAKE_SAMPLES`` wakes are known), at most
+        ``MAX_POLL_SPACING_S`` apart. ``budget_s``, a service call's own
+        timeout, replaces the last poll: the user asked to wait that long.
+        """
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        if self._samples < MIN_WAKE_SAMPLES or p50 is None or p95 is None:
+            first, last = DEFAULT_FIRST_POLL_S, float(default_timeout_s)
+        else:
+            first, last = p50, p95
+        if budget_s is not None:
+            last = float(budget_s)
+        first = min(first, last)
+        steps = max(1, math.ceil((last - first) / MAX_POLL_SPACING_S))
+        if last == first:
+            return (first,)
+        return tuple(first + (last - first) * step / steps for step in range(steps + 1))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable form for ``.storage``."""
+        return {
+            "counts": [round(count, 4) for count in self._counts],
+            "samples": self._samples,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> WakeLatencyHistogram:
+        """Restore a histogram saved by ``as_dict``.
+
+        Raises:
+            ValueError: the saved buckets don't match ``BUCKET_EDGES_S``.
+
+        """
+        counts = [float(count) for count in data["counts"]]
+        if len(counts) != len(BUCKET_EDGES_S) + 1:
+            msg = "wake latency buckets changed"
+            raise ValueError(msg)
+        histogram = cls()
+        histogram._counts = counts
+        histogram._samples = int(data["samples"])
+        return histogram
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the sample count and the learned percentiles."""
+        return {
+            "samples": self._samples,
+            "p50_s": self.quantile(0.5),
+            "p95_s": self.quantile(0.95),
+        }
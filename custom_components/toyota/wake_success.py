@@ -0,0 +1,139 @@
+"""Per-car probability that a wake POST gets the car to report.
+
+Whether a car answers a wake depends on how deeply it sleeps: how long it
+has been parked, the hour (some cars drop off the network at night), and
+why we wake it (right after a stop the modem is still up). The fixed
+soft-disable counter only sees consecutive failures. ``WakeSuccessModel``
+keeps one car's wake outcomes per feature and predicts the success of the
+next wake from those that match it.
+
+Each feature value ("idle_wake", "hours 0-5", "parked 2-12 h", ...) holds
+time-decayed success and failure counts. The prediction starts from the
+car's overall rate, and each feature moves its log-odds by how far that
+feature's rate differs from the overall one (naive Bayes). Counts halve
+every ``WAKE_SUCCESS_HALF_LIFE``. A car that the strategy stops waking
+therefore drifts back towards the prior and is tried again later: a
+sleeping car costs a few POSTs a week instead of being given up on.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Any
+
+WAKE_SUCCESS_HALF_LIFE = timedelta(days=3)
+# Prior belief about a car never woken: three in four wakes succeed.
+PRIOR_SUCCESSES = 3.0
+PRIOR_FAILURES = 1.0
+# Pseudo-wakes at the overall rate added to every feature value, so one
+# outcome does not swing a prediction.
+FEATURE_PRIOR_WEIGHT = 2.0
+# Hours of the day per time-of-day bucket.
+HOURS_PER_BUCKET = 6
+# Upper edges of the "parked for" buckets.
+PARKED_EDGES: tuple[timedelta, ...] = (
+    timedelta(minutes=15),
+    timedelta(hours=2),
+    timedelta(hours=12),
+)
+# Predictions stay in [_MIN_P, 1 - _MIN_P] so log-odds stay finite.
+_MIN_P = 1e-3
+
+
+def _logit(p: float) -> float:
+    p = min(max(p, _MIN_P), 1 - _MIN_P)
+    return math.log(p / (1 - p))
+
+
+class WakeSuccessModel:
+    """Decayed wake outcomes of one car, per feature value."""
+
+    __slots__ = ("_cells", "_last_drive_at")
+
+    def __init__(self) -> None:
+        """Create a model that only knows the prior."""
+        # feature key -> [successes, failures, updated_at epoch seconds]
+        self._cells: dict[str, list[float]] = {}
+        self._last_drive_at: datetime | None = None
+
+    def note_moving(self, now: datetime) -> None:
+        """Record that the car was driving at ``now``."""
+        self._last_drive_at = now
+
+    def _features(self, trigger: str, now: datetime) -> tuple[str, ...]:
+        if self._last_drive_at is None or now < self._last_drive_at:
+            parked = "unknown"
+        else:
+            parked = str(bisect_right(PARKED_EDGES, now - self._last_drive_at))
+        return (
+            f"trigger:{trigger}",
+            f"hour:{now.hour // HOURS_PER_BUCKET}",
+            f"parked:{parked}",
+        )
+
+    def _counts(self, key: str, now: datetime) -> tuple[float, float]:
+        cell = self._cells.get(key)
+        if cell is None:
+            return 0.0, 0.0
+        successes, failures, updated_at = cell
+        age = max(0.0, now.timestamp() - updated_at)
+        weight = 0.5 ** (age / WAKE_SUCCESS_HALF_LIFE.total_seconds())
+        return successes * weight, failures * weight
+
+    def record(self, trigger: str, now: datetime, *, success: bool) -> None:
+        """Add the outcome of a wake sent at ``now`` for ``trigger``."""
+        for key in ("all", *self._features(trigger, now)):
+            successes, failures = self._counts(key, now)
+            self._cells[key] = [
+                successes + success,
+                failures + (not success),
+                now.timestamp(),
+            ]
+
+    def predict(self, trigger: str, now: datetime) -> float:
+        """Return the probability that a wake sent now for ``trigger`` succeeds."""
+        successes, failures = self._counts("all", now)
+        base = (successes + PRIOR_SUCCESSES) / (
+            successes + failures + PRIOR_SUCCESSES + PRIOR_FAILURES
+        )
+        log_odds = _logit(base)
+        for key in self._features(trigger, now):
+            successes, failures = self._counts(key, now)
+            rate = (successes + FEATURE_PRIOR_WEIGHT * base) / (
+                successes + failures + FEATURE_PRIOR_WEIGHT
+            )
+            log_odds += _logit(rate) - _logit(base)
+        return 1 / (1 + math.exp(-log_odds))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable form for ``.storage``."""
+        return {
+            "cells": {
+                key: [round(cell[0], 4), round(cell[1], 4), round(cell[2])]
+                for key, cell in self._cells.items()
+            },
+            "last_drive_at": (
+                self._last_drive_at.isoformat() if self._last_drive_at else None
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> WakeSuccessModel:
+        """Restore a model saved by ``as_dict``."""
+        model = cls()
+        model._cells = {
+            str(key): [float(cell[0]), float(cell[1]), float(cell[2])]
+            for key, cell in data["cells"].items()
+        }
+        last_drive_at = data.get("last_drive_at")
+        model._last_drive_at = (
+            datetime.fromisoformat(last_drive_at) if last_drive_at else None
+        )
+        return model
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the overall decayed outcome counts."""
+        cell = self._cells.get("all", [0.0, 0.0, 0.0])
+        return {"successes": round(cell[0], 2), "failures": round(cell[1], 2)}
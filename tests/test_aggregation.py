@@ -0,0 +1,209 @@
+"""Unit tests for locally aggregated period statistics."""
+
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.toyota import aggregation
+from custom_components.toyota.aggregation import (
+    Calendar,
+    DailyColumns,
+    period_bounds,
+)
+from custom_components.toyota.trip_store import DayRow, TripStore, merge_span
+from custom_components.toyota.utils import format_statistics_attributes
+
+
+@pytest.mark.parametrize(
+    ("day", "period", "calendar", "expected"),
+    [
+        # 2026-01-01 is a Thursday in ISO week 2026-W01.
+        (date(2026, 1, 1), "week", Calendar(), (date(2025, 12, 29), date(2026, 1, 4))),
+        (
+            date(2026, 1, 1),
+            "week",
+            Calendar(week_start=6),
+            (date(2025, 12, 28), date(2026, 1, 3)),
+        ),
+        (date(2026, 2, 14), "month", Calendar(), (date(2026, 2, 1), date(2026, 2, 28))),
+        (
+            date(2026, 3, 10),
+            "month",
+            Calendar(month_start_day=15),
+            (date(2026, 2, 15), date(2026, 3, 14)),
+        ),
+        (
+            date(2026, 1, 20),
+            "month",
+            Calendar(month_start_day=15),
+            (date(2026, 1, 15), date(2026, 2, 14)),
+        ),
+        (date(2026, 7, 1), "year", Calendar(), (date(2026, 1, 1), date(2026, 12, 31))),
+        (
+            date(2026, 2, 1),
+            "year",
+            Calendar(year_start_month=4),
+            (date(2025, 4, 1), date(2026, 3, 31)),
+        ),
+    ],
+)
+def test_period_bounds(day, period, calendar, expected):
+    assert period_bounds(day, period, calendar) == expected
+
+
+def _columns(days: dict[date, float]) -> DailyColumns:
+    columns = DailyColumns()
+    for day in sorted(days):
+        columns.append(
+            day,
+            ("NL",) if day.day == 1 else (),
+            distance=days[day],
+            duration_s=days[day] * 60,
+            ev_distance=days[day] / 2,
+            fuel_consumed=days[day] / 20,
+        )
+    return columns
+
+
+def test_totals_reproduce_summary_attributes():
+    columns = _columns({date(2026, 3, 1): 30.0, date(2026, 3, 3): 10.0})
+
+    aggregate = columns.totals(date(2026, 3, 1), date(2026, 3, 7))
+
+    vehicle_info = SimpleNamespace(
+        fuel_type="G", extended_capabilities=SimpleNamespace(hybrid_pulse=True)
+    )
+    assert format_statistics_attributes(aggregate, vehicle_info) == {
+        "Average_speed": 60.0,
+        "Countries": ["NL"],
+        "Duration": "0:40:00",
+        "Total_fuel_consumed": 2.0,
+        "Average_fuel_consumed": 5.0,
+        "EV_distance": 20.0,
+        "EV_duration": None,
+        "From_date": "2026-03-01",
+        "To_date": "2026-03-07",
+    }
+    assert columns.totals(date(2026, 3, 4), date(2026, 3, 7)) is None
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_period_totals_match_naive_sums(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(aggregation, "np", None)
+    elif aggregation.np is None:
+        pytest.skip("numpy not installed")
+    rng = random.Random(36)
+    first = date(2025, 1, 1)
+    days = {
+        first + timedelta(days=n): round(rng.uniform(0, 80), 1)
+        for n in range(400)
+        if rng.random() < 0.6
+    }
+    columns = _columns(days)
+    calendar = Calendar(week_start=6, month_start_day=15)
+
+    for period in ("week", "month", "year"):
+        aggregates = columns.period_totals(period, calendar)
+        assert sum(
+            len([d for d in days if a.from_date <= d <= a.to_date]) for a in aggregates
+        ) == len(days)
+        for aggregate in aggregates:
+            assert (aggregate.from_date, aggregate.to_date) == period_bounds(
+                aggregate.from_date, period, calendar
+            )
+            expected = sum(
+                v
+                for d, v in days.items()
+                if aggregate.from_date <= d <= aggregate.to_date
+            )
+            assert aggregate.distance == pytest.approx(expected or None)
+
+
+def test_merge_span():
+    span = (date(2026, 3, 1), date(2026, 3, 31))
+    assert merge_span(None, span) == span
+    # Adjacent older window extends it, as the backfill does.
+    assert merge_span(span, (date(2026, 2, 1), date(2026, 2, 28))) == (
+        date(2026, 2, 1),
+        date(2026, 3, 31),
+    )
+    # A newer range past a gap wins; an older one past a gap is ignored.
+    assert merge_span(span, (date(2026, 4, 5), date(2026, 4, 6))) == (
+        date(2026, 4, 5),
+        date(2026, 4, 6),
+    )
+    assert merge_span(span, (date(2026, 1, 1), date(2026, 1, 2))) == span
+
+
+def test_store_round_trips_days_into_columns():
+    store = TripStore(":memory:")
+    store.open()
+    summary = SimpleNamespace(
+        from_date=date(2026, 3, 2),
+        distance=12.5,
+        ev_distance=None,
+        fuel_consumed=0.8,
+        duration=timedelta(minutes=20),
+        ev_duration=None,
+        countries=["BE", "NL"],
+    )
+    generation = store.generation("VIN")
+
+    store.add_days(
+        "VIN", [DayRow.from_summary(summary)], (date(2026, 3, 1), date(2026, 3, 3))
+    )
+
+    assert store.generation("VIN") != generation
+    columns, span = store.daily_columns("VIN")
+    assert span == (date(2026, 3, 1), date(2026, 3, 3))
+    aggregate = columns.totals(date(2026, 3, 1), date(2026, 3, 3))
+    assert aggregate.distance == 12.5
+    assert aggregate.duration == timedelta(minutes=20)
+    assert aggregate.countries == ["BE", "NL"]
+    store.close()
+
+
+async def test_current_periods_are_served_only_when_covered(hass):
+    store = TripStore(":memory:")
+    store.open()
+    local = aggregation.LocalPeriodSummaries(hass, store, metric_values=True)
+    today = date(2026, 3, 18)  # Wednesday
+    rows = [
+        DayRow.from_summary(
+            SimpleNamespace(
+                from_date=date(2026, 3, day),
+                distance=10.0,
+                ev_distance=None,
+                fuel_consumed=None,
+                duration=timedelta(minutes=10),
+                ev_duration=None,
+                countries=None,
+            )
+        )
+        for day in (2, 16, 17)
+    ]
+    store.add_days("VIN", rows, (date(2026, 3, 1), date(2026, 3, 17)))
+    today_summary = SimpleNamespace(
+        to_date=today,
+        distance=5.0,
+        duration=timedelta(minutes=5),
+        ev_distance=None,
+        ev_duration=None,
+        fuel_consumed=0.0,
+        countries=None,
+    )
+
+    result = await local.async_current("VIN", today, today_summary)
+
+    # The year starts before the covered span, so it still needs Toyota.
+    assert set(result) == {"week", "month"}
+    assert result["week"].distance == 25.0
+    assert result["week"].from_date == date(2026, 3, 16)
+    assert result["month"].distance == 35.0
+    assert result["month"].to_date == today
+    store.close()
@@ -0,0 +1,86 @@
+"""Unit tests for the memoised VIN-sensor attributes."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from custom_components.toyota.sensor import VIN_ENTITY_DESCRIPTION, ToyotaVinSensor
+
+
+class _Capabilities:
+    def __init__(self, **flags: bool) -> None:
+        self.flags = flags
+        self.dumps = 0
+
+    def model_dump(self) -> dict[str, bool]:
+        self.dumps += 1
+        return dict(self.flags)
+
+
+def _vehicle_info(vin: str, features: _Capabilities) -> SimpleNamespace:
+    return SimpleNamespace(
+        vin=vin,
+        contract_id="CONTRACT123456",
+        imei="IMEI123456",
+        katashiki_code=None,
+        asi_code=None,
+        brand=None,
+        car_line_name="Yaris",
+        car_model_year="2024",
+        car_model_name="Yaris Cross",
+        color=None,
+        generation=None,
+        manufactured_date=None,
+        date_of_first_use=None,
+        transmission_type=None,
+        fuel_type="H",
+        electrical_platform_code=None,
+        ev_vehicle=False,
+        features=features,
+        extended_capabilities=None,
+        remote_service_capabilities=None,
+    )
+
+
+def _vin_sensor(vehicle_info: SimpleNamespace) -> ToyotaVinSensor:
+    # Only the attributes path is under test; skip the coordinator wiring.
+    sensor = ToyotaVinSensor.__new__(ToyotaVinSensor)
+    sensor.description = VIN_ENTITY_DESCRIPTION
+    sensor.vehicle = SimpleNamespace(vin=vehicle_info.vin, _vehicle_info=vehicle_info)
+    return sensor
+
+
+def test_vin_attributes_reused_while_vehicle_info_is_unchanged():
+    features = _Capabilities(climate=True, door_lock=False)
+    sensor = _vin_sensor(_vehicle_info("VINMEMO1", features))
+
+    first = sensor.extra_state_attributes
+    second = sensor.extra_state_attributes
+
+    assert first is second
+    assert first["Features"] == {"climate": True}
+    assert features.dumps == 1
+
+
+def test_vin_attributes_rebuilt_for_new_vehicle_info():
+    sensor = _vin_sensor(_vehicle_info("VINMEMO2", _Capabilities(climate=True)))
+    first = sensor.extra_state_attributes
+    refetched = _vehicle_info("VINMEMO2", _Capabilities(climate=False, lights=True))
+    sensor.vehicle = SimpleNamespace(vin="VINMEMO2", _vehicle_info=refetched)
+
+    second = sensor.extra_state_attributes
+
+    assert second is not first
+    assert second["Features"] == {"lights": True}
+
+
+def test_vin_attributes_are_not_shared_between_entities():
+    features = _Capabilities(climate=True)
+    info = _vehicle_info("VINMEMO3", features)
+
+    # Two entries with the same car keep their own memo.
+    first = _vin_sensor(info).extra_state_attributes
+    second = _vin_sensor(info).extra_state_attributes
+
+    assert first is not second
+    assert features.dumps == 2
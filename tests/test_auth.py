@@ -0,0 +1,192 @@
+"""Unit tests for single-flight authentication and token persistence."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from homeassistant.util import dt as dt_util
+from pytoyoda.controller import Controller, TokenInfo
+from pytoyoda.exceptions import ToyotaLoginError
+
+from custom_components.toyota.auth import (
+    TOKEN_RENEW_MARGIN,
+    TOKEN_STORAGE_VERSION,
+    ToyotaAuthManager,
+    token_store_key,
+)
+from custom_components.toyota.transport import ToyotaTransport
+
+USERNAME = "driver@example.com"
+
+
+def _token(minutes: float, access: str = "access") -> TokenInfo:
+    return TokenInfo(
+        access_token=access,
+        refresh_token="refresh",
+        uuid="uuid",
+        expiration=dt_util.utcnow() + timedelta(minutes=minutes),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _empty_token_cache(monkeypatch):
+    # pytoyoda caches tokens per username on the class.
+    monkeypatch.setattr(Controller, "_TOKEN_CACHE", {})
+
+
+@pytest.fixture
+def renewals(monkeypatch):
+    """Replace the OAuth round-trips and record which ones ran."""
+    calls: list[str] = []
+
+    def _install(manager: ToyotaAuthManager, *, refresh_fails: bool = False) -> None:
+        controller = manager._controller
+
+        async def _refresh_tokens() -> None:
+            calls.append("refresh")
+            await asyncio.sleep(0.01)
+            if refresh_fails:
+                msg = "refresh rejected"
+                raise ToyotaLoginError(msg)
+            controller._token_info = _token(60, access="refreshed")
+
+        async def _authenticate() -> None:
+            calls.append("login")
+            controller._token_info = _token(60, access="logged_in")
+
+        # raising=True (the default): a renamed pytoyoda private fails here.
+        monkeypatch.setattr(controller, "_refresh_tokens", _refresh_tokens)
+        monkeypatch.setattr(controller, "_authenticate", _authenticate)
+
+    _install.calls = calls
+    return _install
+
+
+def _manager(hass) -> ToyotaAuthManager:
+    client = ToyotaTransport(hass).create_client(USERNAME, "secret")
+    return ToyotaAuthManager(hass, "entry", client)
+
+
+def test_pytoyoda_privates_are_still_there():
+    for name in (
+        "_TOKEN_CACHE",
+        "_refresh_tokens",
+        "_authenticate",
+        "_update_tokens",
+        "_update_token",
+        "_is_token_valid",
+        "_token_expiration",
+        "_refresh_token",
+    ):
+        assert hasattr(Controller, name), name
+
+
+async def test_login_reuses_stored_tokens(hass, hass_storage, renewals):
+    stored = _token(60, access="stored")
+    hass_storage[token_store_key("entry")] = {
+        "version": TOKEN_STORAGE_VERSION,
+        "key": token_store_key("entry"),
+        "data": {
+            "username": USERNAME,
+            "access_token": stored.access_token,
+            "refresh_token": stored.refresh_token,
+            "uuid": stored.uuid,
+            "expiration": stored.expiration.isoformat(),
+        },
+    }
+    manager = _manager(hass)
+    renewals(manager)
+
+    await manager.async_login()
+
+    assert renewals.calls == []
+    assert manager._controller._token == "stored"
+    assert Controller._TOKEN_CACHE[USERNAME].access_token == "stored"
+    assert manager.diagnostics()["restored_from_storage"]
+
+
+async def test_tokens_of_another_account_are_not_restored(hass, hass_storage, renewals):
+    hass_storage[token_store_key("entry")] = {
+        "version": TOKEN_STORAGE_VERSION,
+        "key": token_store_key("entry"),
+        "data": {
+            "username": "someone.else@example.com",
+            "access_token": "theirs",
+            "refresh_token": "theirs",
+            "uuid": "uuid",
+            "expiration": _token(60).expiration.isoformat(),
+        },
+    }
+    manager = _manager(hass)
+    renewals(manager)
+
+    await manager.async_login()
+
+    assert renewals.calls == ["login"]
+    assert manager._controller._token == "logged_in"
+    assert not manager.diagnostics()["restored_from_storage"]
+
+
+async def test_ensure_fresh_renews_only_within_the_margin(hass, renewals):
+    manager = _manager(hass)
+    renewals(manager)
+    margin_minutes = TOKEN_RENEW_MARGIN / timedelta(minutes=1)
+
+    manager._controller._token_info = _token(margin_minutes + 5)
+    await manager.async_ensure_fresh()
+    assert renewals.calls == []
+
+    manager._controller._token_info = _token(margin_minutes - 5)
+    await manager.async_ensure_fresh()
+    assert renewals.calls == ["refresh"]
+    assert manager._controller._token == "refreshed"
+    assert manager.diagnostics()["proactive_renewals"] == 1
+
+
+async def test_concurrent_renewals_share_one_round_trip(hass, renewals):
+    manager = _manager(hass)
+    renewals(manager)
+    manager._controller._token_info = _token(-1)
+
+    await asyncio.gather(*(manager.async_ensure_fresh() for _ in range(5)))
+
+    assert renewals.calls == ["refresh"]
+    assert manager.diagnostics()["coalesced"] == 4
+
+
+async def test_rejected_refresh_falls_back_to_full_login(hass, renewals):
+    manager = _manager(hass)
+    renewals(manager, refresh_fails=True)
+    manager._controller._token_info = _token(-1)
+
+    await manager.async_ensure_fresh()
+
+    assert renewals.calls == ["refresh", "login"]
+    assert manager._controller._token == "logged_in"
+    assert manager.diagnostics()["full_logins"] == 1
+
+
+async def test_new_tokens_are_persisted(hass, hass_storage, monkeypatch):
+    manager = _manager(hass)
+    controller = manager._controller
+    saved: list[dict] = []
+    monkeypatch.setattr(
+        manager._store,
+        "async_delay_save",
+        lambda data_func, _delay: saved.append(data_func()),
+    )
+    token = _token(60, access="new")
+
+    controller.token_listener(token)
+
+    assert saved == [
+        {
+            "username": USERNAME,
+            "access_token": "new",
+            "refresh_token": "refresh",
+            "uuid": "uuid",
+            "expiration": token.expiration.isoformat(),
+        }
+    ]
@@ -0,0 +1,136 @@
+"""Unit tests for the trip history backfill."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from itertools import pairwise
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.toyota.backfill import (
+    BACKFILL_MAX_EMPTY_DAYS,
+    TripHistoryBackfill,
+    backward_rows,
+)
+from custom_components.toyota.statistics_import import daily_rows
+
+
+def _summary(day: date, distance: float | None) -> SimpleNamespace:
+    return SimpleNamespace(from_date=day, to_date=day, distance=distance, duration=None)
+
+
+def _distance(summary: SimpleNamespace) -> float | None:
+    return summary.distance
+
+
+def test_backward_rows_continue_the_series_downwards():
+    summaries = [
+        _summary(date(2026, 2, 26), 4.0),
+        _summary(date(2026, 2, 28), 10.0),
+        _summary(date(2026, 2, 27), None),
+        # Already imported; must not be written again.
+        _summary(date(2026, 3, 1), 7.0),
+    ]
+
+    rows, sum_before = backward_rows(
+        summaries, _distance, before=date(2026, 3, 1), sum_before=0.0
+    )
+
+    assert rows == [
+        (date(2026, 2, 26), 4.0, -10.0),
+        (date(2026, 2, 27), 0.0, -10.0),
+        (date(2026, 2, 28), 10.0, 0.0),
+    ]
+    assert sum_before == -14.0
+
+
+def test_backfilled_and_imported_rows_form_one_series():
+    days = [date(2026, 3, 1) + timedelta(days=n) for n in range(6)]
+    summaries = [_summary(day, float(n + 1)) for n, day in enumerate(days)]
+    imported = daily_rows(
+        summaries, _distance, after=days[2], before=date(2026, 4, 1), start_sum=0.0
+    )
+    older, _ = backward_rows(summaries, _distance, before=days[3], sum_before=0.0)
+
+    series = older + imported
+    assert [row[0] for row in series] == days
+    # Each day's state is the change of the running sum, across the seam too.
+    for previous, current in pairwise(series):
+        assert round(current[2] - previous[2], 3) == current[1]
+
+
+def _backfill(hass, importer, window_days=10) -> TripHistoryBackfill:
+    return TripHistoryBackfill(
+        hass,
+        "entry",
+        importer,
+        window_days=window_days,
+        is_busy=lambda: False,
+        on_progress=lambda vin: None,
+    )
+
+
+def _importer() -> MagicMock:
+    importer = MagicMock()
+    importer.async_record_days = AsyncMock()
+    return importer
+
+
+def _vehicle(summaries) -> MagicMock:
+    vehicle = MagicMock()
+    vehicle.vin = "JTDABC1234567890"
+    vehicle._vehicle_info = SimpleNamespace(
+        fuel_type=None, extended_capabilities=None, date_of_first_use=None
+    )
+    vehicle.get_summary = AsyncMock(return_value=summaries)
+    return vehicle
+
+
+async def test_step_walks_one_window_back_and_checkpoints(hass):
+    oldest = dt_util.now().date() - timedelta(days=30)
+    importer = _importer()
+    backfill = _backfill(hass, importer)
+    backfill.progress["JTDABC1234567890"] = {
+        "oldest_day": oldest.isoformat(),
+        "sums": {"distance": 0.0, "duration": 0.0},
+        "days_covered": 0,
+        "calls": 0,
+        "empty_days": 0,
+        "done": False,
+    }
+    vehicle = _vehicle([_summary(oldest - timedelta(days=2), 5.0)])
+
+    await backfill.async_step(vehicle)
+
+    vehicle.get_summary.assert_awaited_once()
+    from_day, to_day = vehicle.get_summary.await_args.args
+    assert to_day == oldest - timedelta(days=1)
+    assert from_day == oldest - timedelta(days=10)
+    checkpoint = backfill.progress["JTDABC1234567890"]
+    assert checkpoint["oldest_day"] == from_day.isoformat()
+    assert checkpoint["days_covered"] == 10
+    assert checkpoint["calls"] == 1
+    assert checkpoint["sums"]["distance"] == -5.0
+    assert not checkpoint["done"]
+    importer.async_record_days.assert_awaited_once()
+    written = {call.args[1].key for call in importer.add_statistics.call_args_list}
+    assert written == {"distance", "duration"}
+
+
+async def test_step_stops_after_a_long_run_without_trips(hass):
+    oldest = dt_util.now().date() - timedelta(days=30)
+    backfill = _backfill(hass, _importer(), window_days=30)
+    backfill.progress["JTDABC1234567890"] = {
+        "oldest_day": oldest.isoformat(),
+        "sums": {"distance": 0.0, "duration": 0.0},
+        "days_covered": 150,
+        "calls": 5,
+        "empty_days": BACKFILL_MAX_EMPTY_DAYS - 30,
+        "done": False,
+    }
+
+    await backfill.async_step(_vehicle([]))
+
+    assert backfill.progress["JTDABC1234567890"]["done"]
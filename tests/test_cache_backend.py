@@ -0,0 +1,373 @@
+"""Tests for the shared cache backends and fetches shared across instances."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+import pytest
+from homeassistant.util import dt as dt_util
+from pytoyoda.models.endpoints.status import RemoteStatusResponseModel
+
+from custom_components.toyota import fetch_broker as fetch_broker_module
+from custom_components.toyota.cache_backend import (
+    CacheBackendError,
+    FileCacheBackend,
+    MemoryCacheBackend,
+    RespCacheBackend,
+    async_acquire_lease,
+    async_release_lease,
+    create_cache_backend,
+    validate_cache_url,
+)
+from custom_components.toyota.fetch_broker import (
+    SharedFetch,
+    VinFetchBroker,
+    shared_fetch_from_json,
+    shared_fetch_to_json,
+)
+from custom_components.toyota.refresh_strategy import VinState
+
+WINDOW = timedelta(minutes=6)
+
+
+class FakeRespServer:
+    """In-process stand-in for a Redis server: GET, SET (PX, NX), DEL, AUTH."""
+
+    def __init__(self, password=None):
+        self.password = password
+        self.data: dict[bytes, tuple[bytes, float]] = {}
+        self.commands: list[str] = []
+        # Seconds each reply is held back.
+        self.delay = 0.0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._client, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _read_command(self, reader):
+        line = await reader.readuntil(b"\r\n")
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int((await reader.readuntil(b"\r\n"))[1:-2])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    def _get(self, key):
+        item = self.data.get(key)
+        if item is None or item[1] <= time.monotonic():
+            return None
+        return item[0]
+
+    def _reply(self, args, authed):
+        name = args[0].decode().upper()
+        self.commands.append(name)
+        if name == "AUTH":
+            return (
+                b"+OK\r\n" if args[1].decode() == self.password else b"-WRONGPASS\r\n"
+            )
+        if self.password and not authed:
+            return b"-NOAUTH Authentication required.\r\n"
+        if name == "GET":
+            value = self._get(args[1])
+            if value is None:
+                return b"$-1\r\n"
+            return b"$%d\r\n%b\r\n" % (len(value), value)
+        if name == "SET":
+            options = [a.decode().upper() for a in args[3:]]
+            if "NX" in options and self._get(args[1]) is not None:
+                return b"$-1\r\n"
+            ttl_ms = int(options[options.index("PX") + 1])
+            self.data[args[1]] = (args[2], time.monotonic() + ttl_ms / 1000)
+            return b"+OK\r\n"
+        if name == "DEL":
+            return b":%d\r\n" % int(self.data.pop(args[1], None) is not None)
+        return b"-ERR unknown command\r\n"
+
+    async def _client(self, reader, writer):
+        authed = False
+        try:
+            while True:
+                args = await self._read_command(reader)
+                reply = self._reply(args, authed)
+                authed = authed or (args[0].upper() == b"AUTH" and reply == b"+OK\r\n")
+                await asyncio.sleep(self.delay)
+                writer.write(reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+@asynccontextmanager
+async def _resp_server():
+    server = FakeRespServer(password="s3cret")
+    port = await server.start()
+    try:
+        yield server, port
+    finally:
+        await server.stop()
+
+
+def _shared(entry_id="a", state=None):
+    status = RemoteStatusResponseModel.model_validate(
+        {"status": "SUCCESS", "payload": None}
+    )
+    return SharedFetch(
+        entry_id=entry_id,
+        fetched_at=dt_util.now(),
+        endpoint_data={"status": status},
+        statistics=None,
+        metric_values=True,
+        state=state or VinState(),
+    )
+
+
+async def test_resp_backend_ttl_nx_and_leases(socket_enabled):
+    async with _resp_server() as (server, port):
+        backend = RespCacheBackend("127.0.0.1", port, password="s3cret")
+
+        assert await backend.async_set("k", "v", WINDOW)
+        assert await backend.async_get("k") == "v"
+        assert not await backend.async_set("k", "w", WINDOW, only_if_absent=True)
+        await backend.async_delete("k")
+        assert await backend.async_get("k") is None
+        assert await backend.async_set("short", "v", timedelta(milliseconds=1))
+        await asyncio.sleep(0.01)
+        assert await backend.async_get("short") is None
+
+        assert await async_acquire_lease(backend, "lease", "one", WINDOW)
+        assert not await async_acquire_lease(backend, "lease", "two", WINDOW)
+        await async_release_lease(backend, "lease", "two")
+        assert await backend.async_get("lease") == "one"
+        await async_release_lease(backend, "lease", "one")
+        assert await backend.async_get("lease") is None
+
+        # Keys are namespaced; AUTH ran once, on connect.
+        assert all(key.startswith(b"toyota:") for key in server.data)
+        assert server.commands.count("AUTH") == 1
+        await backend.async_close()
+
+
+async def test_resp_backend_errors_and_reconnect(socket_enabled):
+    async with _resp_server() as (server, port):
+        wrong = RespCacheBackend("127.0.0.1", port, password="nope")
+        with pytest.raises(CacheBackendError):
+            await wrong.async_get("k")
+
+        backend = RespCacheBackend("127.0.0.1", port, password="s3cret")
+        await backend.async_set("k", "v", WINDOW)
+        await backend._disconnect()
+        assert await backend.async_get("k") == "v"
+        assert backend.diagnostics()["connections"] == 2
+
+        # Cancelled after sending, before the reply: the reply is not left
+        # on the stream for the next command to read.
+        server.delay = 0.05
+        task = asyncio.ensure_future(backend.async_set("k", "w", WINDOW))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        server.delay = 0.0
+        assert await backend.async_get("missing") is None
+        assert backend.diagnostics()["connections"] == 3
+        await backend.async_close()
+
+        dead = RespCacheBackend("127.0.0.1", 1)
+        with pytest.raises(OSError):
+            await dead.async_get("k")
+
+
+async def test_file_backend_ttl_and_if_absent(hass, tmp_path):
+    backend = FileCacheBackend(hass, tmp_path / "cache")
+
+    assert await backend.async_get("fetch:VIN1") is None
+    assert await backend.async_set("fetch:VIN1", "v", WINDOW)
+    assert await backend.async_get("fetch:VIN1") == "v"
+    assert not await backend.async_set("fetch:VIN1", "w", WINDOW, only_if_absent=True)
+    assert await backend.async_set("old", "v", timedelta(seconds=-1))
+    # An expired key is free for the taking.
+    assert await backend.async_set("old", "w", WINDOW, only_if_absent=True)
+    assert await backend.async_get("old") == "w"
+    await backend.async_delete("old")
+    assert await backend.async_get("old") is None
+    assert not list((tmp_path / "cache").glob("*.tmp"))
+
+
+def test_file_backend_takeover_never_removes_a_rivals_lease(hass, tmp_path):
+    backend = FileCacheBackend(hass, tmp_path)
+    rival = FileCacheBackend(hass, tmp_path)
+    backend._write("lease", "old", -1, only_if_absent=False)
+    check = backend._value
+    rival_won: list[bool] = []
+
+    def _rival_takes_over_meanwhile(text):
+        # Between this instance reading the expired lease and evicting it.
+        result = check(text)
+        if not rival_won:
+            rival_won.append(rival._write("lease", "rival", 60, only_if_absent=True))
+        return result
+
+    backend._value = _rival_takes_over_meanwhile
+
+    assert not backend._write("lease", "mine", 60, only_if_absent=True)
+    assert rival_won == [True]
+    assert rival._read("lease") == "rival"
+    assert not list(tmp_path.glob(".*"))
+
+
+def test_concurrent_takeovers_of_an_expired_lease_have_one_winner(hass, tmp_path):
+    backends = [FileCacheBackend(hass, tmp_path) for _ in range(4)]
+    owners = ["a", "b", "c", "d"]
+    for _round in range(25):
+        backends[0]._write("lease", "old", -1, only_if_absent=False)
+        barrier = threading.Barrier(len(backends))
+
+        def _acquire(backend, owner, barrier=barrier):
+            barrier.wait()
+            return backend._write("lease", owner, 60, only_if_absent=True)
+
+        with ThreadPoolExecutor(len(backends)) as pool:
+            won = list(pool.map(_acquire, backends, owners))
+
+        assert won.count(True) == 1
+        assert backends[0]._read("lease") == owners[won.index(True)]
+
+
+async def test_file_backend_reads_a_malformed_file_as_a_miss(hass, tmp_path):
+    backend = FileCacheBackend(hass, tmp_path)
+    for text in ("{", "[]", '{"value": "v"}', '{"value": "v", "expires_at": "x"}'):
+        backend._path("k").write_text(text, encoding="utf-8")
+        assert await backend.async_get("k") is None
+        # ... and is free for the taking.
+        assert await backend.async_set("k", "w", WINDOW, only_if_absent=True)
+        assert await backend.async_get("k") == "w"
+        await backend.async_delete("k")
+    assert backend.diagnostics()["unreadable"] == 8
+
+
+def test_create_cache_backend_urls(hass):
+    assert isinstance(create_cache_backend(hass, ""), MemoryCacheBackend)
+    assert isinstance(create_cache_backend(hass, "file:///tmp/x"), FileCacheBackend)
+    backend = create_cache_backend(hass, "redis://:pw@cache.lan:6380/2")
+    assert isinstance(backend, RespCacheBackend)
+    assert (backend._host, backend._port, backend._password, backend._db) == (
+        "cache.lan",
+        6380,
+        "pw",
+        2,
+    )
+    for url in ("http://cache.lan", "redis:///0", "redis://cache.lan/x", "file://"):
+        with pytest.raises(ValueError):
+            create_cache_backend(hass, url)
+    # The options flow checks a URL without opening a backend.
+    validate_cache_url("rediss://cache.lan")
+    with pytest.raises(ValueError):
+        validate_cache_url("redis://cache.lan:99999")
+
+
+def test_shared_fetch_round_trip():
+    now = dt_util.now()
+    shared = _shared(
+        state=VinState(
+            last_odometer_km=1200.5,
+            last_status_fetch_at=now,
+            recent_post_attempts=[now - timedelta(hours=1)],
+            soft_disabled=True,
+        )
+    )
+
+    instance, restored = shared_fetch_from_json(shared_fetch_to_json(shared, "me"))
+
+    assert instance == "me"
+    assert restored.remote
+    assert restored.state == shared.state
+    assert restored.endpoint_data == shared.endpoint_data
+    assert restored.fetched_at == shared.fetched_at
+
+
+def test_shared_fetch_refuses_foreign_classes():
+    raw = shared_fetch_to_json(_shared(), "me").replace(
+        "pytoyoda.models.endpoints.status.RemoteStatusResponseModel",
+        "os.system",
+    )
+    with pytest.raises(ValueError):
+        shared_fetch_from_json(raw)
+
+
+async def test_instances_share_a_car_through_the_backend(
+    hass, monkeypatch, socket_enabled
+):
+    async with _resp_server() as (_server, port):
+        monkeypatch.setattr(fetch_broker_module, "SHARED_LEASE_POLL_S", 0.01)
+        production, staging = VinFetchBroker(hass), VinFetchBroker(hass)
+        production.async_acquire("a")
+        staging.async_acquire("b")
+        backend_a = RespCacheBackend("127.0.0.1", port, password="s3cret")
+        backend_b = RespCacheBackend("127.0.0.1", port, password="s3cret")
+        fetching = asyncio.Event()
+        release = asyncio.Event()
+
+        async def _production():
+            async with production.async_claim(
+                "VIN1", "a", window=WINDOW, backend=backend_a
+            ) as shared:
+                assert shared is None
+                fetching.set()
+                await release.wait()
+                published = _shared("a", VinState(last_odometer_km=5.0))
+                production.publish("VIN1", published)
+                await production.async_share("VIN1", published, backend_a, ttl=WINDOW)
+
+        async def _staging():
+            await fetching.wait()
+            async with staging.async_claim(
+                "VIN1", "b", window=WINDOW, backend=backend_b
+            ) as shared:
+                return shared
+
+        task_a = asyncio.create_task(_production())
+        task_b = asyncio.create_task(_staging())
+        await fetching.wait()
+        await asyncio.sleep(0.05)
+        release.set()
+        await task_a
+        shared = await task_b
+
+        assert shared.remote
+        assert shared.state.last_odometer_km == 5.0
+        assert staging.diagnostics()["waited_remote"] == 1
+        # The lease went back with the fetch.
+        assert await backend_a.async_get("lease:VIN1") is None
+        # Production's next cycle does not adopt its own value.
+        async with production.async_claim(
+            "VIN1", "a", window=WINDOW, backend=backend_a
+        ) as shared:
+            assert shared is None
+        await backend_a.async_close()
+        await backend_b.async_close()
+
+
+async def test_unreachable_backend_falls_back_to_fetching(hass, socket_enabled):
+    broker = VinFetchBroker(hass)
+    broker.async_acquire("a")
+    backend = RespCacheBackend("127.0.0.1", 1)
+
+    async with broker.async_claim(
+        "VIN1", "a", window=WINDOW, backend=backend
+    ) as shared:
+        assert shared is None
+    await broker.async_share("VIN1", _shared("a"), backend, ttl=WINDOW)
+
+    assert broker.diagnostics()["backend_errors"] == 2
@@ -0,0 +1,100 @@
+"""Unit tests for the charging-session tracker."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from custom_components.toyota.charging_session import (
+    CHARGE_EDGE_INTERVAL,
+    ChargingSessions,
+)
+
+VIN = "JTXXXXXXXXX123456"
+T0 = datetime(2026, 6, 1, 18, 0, tzinfo=UTC)
+POLLING = timedelta(minutes=6)
+
+
+def _charge(sessions, at, level, remaining_min=None, status="charging"):
+    sessions.observe(
+        VIN,
+        at,
+        status=status,
+        level=level,
+        remaining=None if remaining_min is None else timedelta(minutes=remaining_min),
+    )
+
+
+def test_polls_densely_at_the_edges_and_sparsely_between():
+    sessions = ChargingSessions()
+    assert sessions.poll_interval(VIN, T0, POLLING) == POLLING
+
+    _charge(sessions, T0, 40, remaining_min=120)
+    assert sessions.poll_interval(VIN, T0, POLLING) == CHARGE_EDGE_INTERVAL
+
+    mid = T0 + timedelta(minutes=30)
+    _charge(sessions, mid, 50, remaining_min=90)
+    assert sessions.poll_interval(VIN, mid, POLLING) == POLLING * 4
+
+    # The sparse interval stops at the window before the expected end.
+    late = T0 + timedelta(minutes=100)
+    _charge(sessions, late, 85, remaining_min=20)
+    assert sessions.poll_interval(VIN, late, POLLING) == timedelta(minutes=10)
+    end = T0 + timedelta(minutes=112)
+    _charge(sessions, end, 95, remaining_min=8)
+    assert sessions.poll_interval(VIN, end, POLLING) == CHARGE_EDGE_INTERVAL
+
+    _charge(sessions, end + timedelta(minutes=10), 100, status="chargeComplete")
+    assert sessions.session(VIN) is None
+    assert sessions.poll_interval(VIN, end, POLLING) == POLLING
+    assert sessions.diagnostics()["sessions"] == 1
+
+
+def test_estimate_uses_toyotas_remaining_time_until_the_level_rises():
+    sessions = ChargingSessions()
+    _charge(sessions, T0, 40, remaining_min=120)
+
+    estimate = sessions.estimate(VIN, T0 + timedelta(minutes=30))
+
+    # 60 points in 120 minutes.
+    assert estimate.level == pytest.approx(55)
+    assert estimate.remaining == timedelta(minutes=90)
+    assert estimate.ends_at == T0 + timedelta(minutes=120)
+
+
+def test_estimate_follows_the_measured_rate():
+    sessions = ChargingSessions()
+    _charge(sessions, T0, 40)
+    _charge(sessions, T0 + timedelta(minutes=30), 50)
+
+    # 20 points per hour, capped at full and at an hour past the read.
+    assert sessions.estimate(VIN, T0 + timedelta(minutes=60)).level == (
+        pytest.approx(60)
+    )
+    assert sessions.estimate(VIN, T0 + timedelta(hours=10)).level == (
+        pytest.approx(70)
+    )
+    assert sessions.estimate(VIN, T0 + timedelta(minutes=30)).ends_at == (
+        T0 + timedelta(minutes=30, hours=2.5)
+    )
+
+
+def test_cached_read_does_not_move_the_session():
+    sessions = ChargingSessions()
+    sessions.observe(
+        VIN, T0, status="charging", level=40, remaining=None, read_at=T0
+    )
+    sessions.observe(
+        VIN,
+        T0 + timedelta(minutes=6),
+        status="charging",
+        level=40,
+        remaining=None,
+        read_at=T0,
+    )
+
+    session = sessions.session(VIN)
+    assert session.refreshes == 2
+    assert session.read_at == T0
+    assert sessions.estimate("OTHER", T0) is None
@@ -1,13 +1,15 @@
 """Tests for the Toyota EU community integration config flow."""
 
+from unittest.mock import patch
+
 import pytest
 
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
 from homeassistant.data_entry_flow import FlowResultType
 from homeassistant.helpers.selector import BooleanSelector
 
-from custom_components.toyota.const import CONF_METRIC_VALUES, DOMAIN
-from pytoyoda.exceptions import ToyotaInvalidUsernameError
+from custom_components.toyota.const import CONF_METRIC_VALUES, DOMAIN, TRANSPORT
+from pytoyoda.exceptions import ToyotaInvalidUsernameError, ToyotaLoginError
 
 async def test_form(hass):
     """Assert we get the user form with correct data_schema."""
@@ -42,3 +44,23 @@ async def test_form_no_email(hass):
             CONF_METRIC_VALUES: True
             }
     )
+
+async def test_failed_login_releases_the_transport(hass):
+    """Assert a flow that doesn't create an entry leaves no pooled client."""
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": "user"}
+    )
+
+    with patch("pytoyoda.client.MyT.login", side_effect=ToyotaLoginError("bad")):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_EMAIL: "test@example.com",
+                CONF_PASSWORD: "password",
+                CONF_METRIC_VALUES: True,
+            },
+        )
+
+    assert result["errors"] == {"base": "invalid_auth"}
+    assert TRANSPORT not in hass.data.get(DOMAIN, {})
@@ -0,0 +1,86 @@
+"""Unit tests for the per-car departure model."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from custom_components.toyota.departure_model import DepartureModel
+
+# A Monday.
+MONDAY = datetime(2026, 6, 1, 0, 0, tzinfo=UTC)
+
+
+def _commuter(weeks: int, *, leave_at: int = 7) -> DepartureModel:
+    """Return a car that left every weekday at ``leave_at`` for ``weeks``."""
+    model = DepartureModel()
+    model.observe(MONDAY, moving=False)
+    for day in range(weeks * 7):
+        start = MONDAY + timedelta(days=day)
+        if start.weekday() < 5:
+            model.observe(start.replace(hour=leave_at, minute=5), moving=True)
+            model.observe(start.replace(hour=leave_at, minute=40), moving=False)
+    return model
+
+
+def test_nothing_is_predicted_before_two_weeks():
+    model = _commuter(1)
+    now = MONDAY + timedelta(days=7, hours=6)
+
+    assert model.next_departure(now) is None
+    assert model.departure_probability(now) is None
+
+
+def test_only_a_parked_to_moving_cycle_is_a_departure():
+    model = DepartureModel()
+    assert not model.observe(MONDAY, moving=False)
+    assert model.observe(MONDAY + timedelta(minutes=6), moving=True)
+    assert not model.observe(MONDAY + timedelta(minutes=12), moving=True)
+    assert model.diagnostics()["departures"] == 1
+
+
+def test_commute_is_the_next_departure():
+    model = _commuter(3)
+    # Monday morning of the fourth week, before the commute.
+    now = MONDAY + timedelta(weeks=3, hours=5, minutes=30)
+
+    assert model.next_departure(now) == now.replace(hour=7, minute=0)
+    assert model.slot_probability(now.replace(hour=7), now) > 0.9
+    assert model.departure_probability(now) > 0.9
+    # Friday night: nothing until Monday.
+    friday_night = MONDAY + timedelta(weeks=3, days=4, hours=20)
+    assert model.next_departure(friday_night) is None
+    assert model.departure_probability(friday_night) < 0.1
+
+
+def test_a_changed_routine_takes_over():
+    model = _commuter(6)
+    start = MONDAY + timedelta(weeks=6)
+    for day in range(28):
+        at = start + timedelta(days=day)
+        if at.weekday() < 5:
+            model.observe(at.replace(hour=9, minute=5), moving=True)
+            model.observe(at.replace(hour=9, minute=40), moving=False)
+    now = start + timedelta(weeks=4, hours=5)
+
+    assert model.next_departure(now) == now.replace(hour=9, minute=0)
+
+
+@pytest.mark.parametrize("data", [{"counts": [1.0]}, {}])
+def test_unreadable_data_is_refused(data):
+    with pytest.raises((KeyError, ValueError)):
+        DepartureModel.from_dict(data)
+
+
+def test_round_trip():
+    model = _commuter(3)
+    now = MONDAY + timedelta(weeks=3, hours=5)
+
+    restored = DepartureModel.from_dict(model.as_dict())
+
+    assert restored.next_departure(now) == model.next_departure(now)
+    assert restored.departure_probability(now) == pytest.approx(
+        model.departure_probability(now), abs=1e-3
+    )
+    assert restored.diagnostics() == model.diagnostics()
@@ -0,0 +1,89 @@
+"""Unit tests for the streaming data export."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from collections import deque
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from custom_components.toyota.export import (
+    async_export_records,
+    async_write_export,
+    export_path,
+)
+from custom_components.toyota.strategy_simulator import TraceCycle
+from custom_components.toyota.trip_store import DayRow, TripRow, TripStore
+
+VIN = "JTDABC1234567890"
+T0 = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+
+
+def test_export_path_takes_plain_file_names_only(hass):
+    assert export_path(hass, "cars.ndjson").name == "cars.ndjson"
+    for name in ("", "../secrets.yaml", "sub/cars.ndjson", ".storage"):
+        with pytest.raises(ValueError, match="plain file name"):
+            export_path(hass, name)
+
+
+async def test_gzip_export_streams_traces_trips_and_days(hass):
+    store = TripStore(":memory:")
+    store.open()
+    store.add_trips(
+        VIN,
+        [
+            TripRow(
+                start_ts=int((T0 + timedelta(hours=hour)).timestamp()),
+                end_ts=None,
+                local_day="2026-03-02",
+                iso_week="2026-W10",
+                weekday=0,
+                hour=12 + hour,
+                distance=10.0,
+                ev_distance=None,
+                fuel_consumed=None,
+                duration_s=None,
+                ev_duration_s=None,
+                score=None,
+            )
+            for hour in range(3)
+        ],
+    )
+    store.add_days(
+        VIN,
+        [DayRow("2026-03-02", "2026-W10", 0, 30.0, None, None, None, None, "NL")],
+    )
+    traces = {
+        VIN: deque(
+            [
+                TraceCycle(
+                    at=T0, odometer_km=1000.0, car_report_at=None, state_changed_at=None
+                )
+            ]
+        )
+    }
+    path = export_path(hass, "cars.ndjson.gz")
+
+    count = await async_write_export(
+        hass,
+        path,
+        async_export_records(hass, [VIN], cycle_traces=traces, trip_store=store),
+        compress=True,
+    )
+    store.close()
+
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        records = [json.loads(line) for line in handle]
+    assert count == len(records) == 5
+    assert [record["type"] for record in records] == [
+        "trace",
+        "trip",
+        "trip",
+        "trip",
+        "day",
+    ]
+    assert records[0]["odometer_km"] == 1000.0
+    assert records[-1]["countries"] == "NL"
+    assert not path.with_name(f"{path.name}.part").exists()
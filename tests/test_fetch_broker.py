@@ -0,0 +1,114 @@
+"""Unit tests for sharing one car's fetches between config entries."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.toyota.const import DOMAIN, FETCH_BROKER
+from custom_components.toyota.fetch_broker import SharedFetch, async_get_fetch_broker
+from custom_components.toyota.refresh_strategy import VinState
+
+WINDOW = timedelta(minutes=6)
+
+
+def _fetch(entry_id: str, age: timedelta = timedelta(0)) -> SharedFetch:
+    return SharedFetch(
+        entry_id=entry_id,
+        fetched_at=dt_util.now() - age,
+        endpoint_data={"status": object()},
+        statistics=None,
+        metric_values=True,
+        state=VinState(last_odometer_km=1000.0),
+    )
+
+
+def _broker(hass, *entry_ids):
+    broker = async_get_fetch_broker(hass)
+    for entry_id in entry_ids:
+        broker.async_acquire(entry_id)
+    return broker
+
+
+async def test_other_entry_adopts_a_fetch_within_the_window(hass):
+    broker = _broker(hass, "a", "b")
+    async with broker.async_claim("VIN1", "a", window=WINDOW) as shared:
+        assert shared is None
+        broker.publish("VIN1", _fetch("a"))
+
+    async with broker.async_claim("VIN1", "b", window=WINDOW) as shared:
+        assert shared is not None
+        assert shared.entry_id == "a"
+    # The fetching entry's own next cycle fetches again.
+    async with broker.async_claim("VIN1", "a", window=WINDOW) as shared:
+        assert shared is None
+
+    assert broker.diagnostics()["fetched"] == 2
+    assert broker.diagnostics()["shared"] == 1
+
+
+async def test_old_fetch_and_service_call_fetch_again(hass):
+    broker = _broker(hass, "a", "b")
+    broker.publish("VIN1", _fetch("a", age=WINDOW * 2))
+    async with broker.async_claim("VIN1", "b", window=WINDOW) as shared:
+        assert shared is None
+
+    broker.publish("VIN1", _fetch("a"))
+    async with broker.async_claim("VIN1", "b", window=WINDOW, force=True) as shared:
+        assert shared is None
+
+
+async def test_waiting_entry_adopts_the_in_flight_fetch(hass):
+    broker = _broker(hass, "a", "b")
+    fetching = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _entry_a():
+        async with broker.async_claim("VIN1", "a", window=WINDOW) as shared:
+            assert shared is None
+            fetching.set()
+            await release.wait()
+            broker.publish("VIN1", _fetch("a"))
+
+    async def _entry_b():
+        await fetching.wait()
+        async with broker.async_claim("VIN1", "b", window=WINDOW) as shared:
+            return shared
+
+    task_a = asyncio.create_task(_entry_a())
+    task_b = asyncio.create_task(_entry_b())
+    await fetching.wait()
+    await asyncio.sleep(0)
+    release.set()
+    await task_a
+
+    assert (await task_b).entry_id == "a"
+    assert broker.diagnostics()["waited"] == 1
+
+
+async def test_failed_fetch_leaves_the_car_to_the_next_entry(hass):
+    broker = _broker(hass, "a", "b")
+    with pytest.raises(TimeoutError):
+        async with broker.async_claim("VIN1", "a", window=WINDOW):
+            raise TimeoutError
+
+    async with broker.async_claim("VIN1", "b", window=WINDOW) as shared:
+        assert shared is None
+
+
+async def test_release_drops_fetches_and_the_last_removes_the_broker(hass):
+    broker = _broker(hass, "a", "b")
+    broker.publish("VIN1", _fetch("a"))
+
+    broker.async_release("a")
+    async with broker.async_claim("VIN1", "b", window=WINDOW) as shared:
+        assert shared is None
+    # Late publish from an unloaded entry is ignored.
+    broker.publish("VIN1", _fetch("a"))
+    assert broker.diagnostics()["fetch_age_s"] == {}
+
+    broker.async_release("b")
+    assert FETCH_BROKER not in hass.data[DOMAIN]
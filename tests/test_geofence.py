@@ -0,0 +1,102 @@
+"""Unit tests for the zone enter/exit engine."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+from homeassistant.util import location as location_util
+
+from custom_components.toyota.const import EVENT_ZONE_ENTER, EVENT_ZONE_EXIT
+from custom_components.toyota.geofence import GeofenceEngine, Zone, ZoneIndex
+
+HOME = Zone("zone.home", 52.3702, 4.8952, 200.0)
+WORK = Zone("zone.work", 52.0907, 5.1214, 150.0)
+CITY = Zone("zone.city", 52.3676, 4.9041, 3000.0)
+
+
+def test_lookup_matches_a_linear_scan():
+    rng = random.Random(38)
+    zones = [
+        Zone(
+            f"zone.z{n}",
+            rng.uniform(50, 54),
+            rng.uniform(3, 7),
+            rng.choice([100.0, 500.0, 5000.0]),
+        )
+        for n in range(300)
+    ]
+    index = ZoneIndex(zones)
+
+    for _ in range(500):
+        lat, lon = rng.uniform(50, 54), rng.uniform(3, 7)
+        expected = {
+            zone.entity_id
+            for zone in zones
+            if location_util.distance(lat, lon, zone.latitude, zone.longitude)
+            <= zone.radius
+        }
+        assert {zone.entity_id for zone in index.containing(lat, lon)} == expected
+
+
+def test_nested_zones_are_returned_smallest_first():
+    index = ZoneIndex([CITY, WORK, HOME])
+
+    assert [zone.entity_id for zone in index.containing(52.3702, 4.8952)] == [
+        "zone.home",
+        "zone.city",
+    ]
+    assert index.containing(51.0, 4.0) == []
+    assert ZoneIndex([]).containing(52.0, 4.0) == []
+
+
+@pytest.fixture
+def zones(hass):
+    for zone in (HOME, WORK):
+        hass.states.async_set(
+            zone.entity_id,
+            "0",
+            {
+                "latitude": zone.latitude,
+                "longitude": zone.longitude,
+                "radius": zone.radius,
+            },
+        )
+
+
+async def test_engine_fires_enter_and_exit(hass, zones):
+    events = []
+    for event_type in (EVENT_ZONE_ENTER, EVENT_ZONE_EXIT):
+        hass.bus.async_listen(event_type, events.append)
+    engine = GeofenceEngine(hass)
+    unsubscribe = engine.async_start()
+
+    # The first location only seeds the membership.
+    assert not engine.evaluate("VIN", WORK.latitude, WORK.longitude)
+    assert engine.evaluate("VIN", HOME.latitude, HOME.longitude)
+    assert not engine.evaluate("VIN", HOME.latitude, HOME.longitude)
+    await hass.async_block_till_done()
+
+    assert [(e.event_type, e.data["zone"]) for e in events] == [
+        (EVENT_ZONE_EXIT, "zone.work"),
+        (EVENT_ZONE_ENTER, "zone.home"),
+    ]
+    # The car is identified by its device, never by the full VIN.
+    assert "device_id" in events[1].data
+    assert "VIN" not in events[1].data.values()
+    unsubscribe()
+
+
+async def test_index_follows_zone_changes(hass, zones):
+    engine = GeofenceEngine(hass)
+    unsubscribe = engine.async_start()
+    engine.evaluate("VIN", 48.8566, 2.3522)
+
+    hass.states.async_set(
+        "zone.paris", "0", {"latitude": 48.8566, "longitude": 2.3522, "radius": 500}
+    )
+    await hass.async_block_till_done()
+
+    assert engine.evaluate("VIN", 48.8566, 2.3522)
+    assert engine.diagnostics()["zones"] == 3
+    unsubscribe()
@@ -0,0 +1,102 @@
+"""Unit tests for the parked-location history."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.toyota import location_history
+from custom_components.toyota.location_history import LocationHistory, LocationTrack
+
+T0 = 1_780_000_000
+
+
+def test_points_round_trip_through_deltas():
+    track = LocationTrack()
+    points = [(T0, 52.37403, 4.88969), (T0 + 600, 52.09074, 5.12142)]
+    for point in points:
+        assert track.append(*point)
+
+    assert track.points() == points
+    assert track.as_dict()["dlat"] == [0, -28329]
+    assert LocationTrack.from_dict(track.as_dict()).points() == points
+
+
+def test_repeated_or_older_positions_are_ignored():
+    track = LocationTrack()
+    track.append(T0, 52.0, 4.0)
+
+    # Same spot re-acquired later, and an out-of-order report.
+    assert not track.append(T0 + 60, 52.0, 4.0)
+    assert not track.append(T0 - 60, 51.0, 4.0)
+    assert len(track) == 1
+    # Returning to an earlier spot is a new point.
+    assert track.append(T0 + 120, 51.0, 4.0)
+    assert track.append(T0 + 180, 52.0, 4.0)
+    assert len(track) == 3
+
+
+def test_capacity_drops_the_oldest_points(monkeypatch):
+    monkeypatch.setattr(location_history, "LOCATION_HISTORY_MAX_POINTS", 3)
+    track = LocationTrack()
+    for n in range(5):
+        track.append(T0 + n, 50 + n / 10, -n / 10)
+
+    assert track.points() == [(T0 + n, 50 + n / 10, -n / 10) for n in (2, 3, 4)]
+    restored = LocationTrack.from_dict(track.as_dict())
+    assert restored.append(T0 + 5, 50.5, -0.5)
+    assert restored.points()[-1] == (T0 + 5, 50.5, -0.5)
+
+
+def test_trim_keeps_the_newest_point():
+    track = LocationTrack()
+    for n in range(3):
+        track.append(T0 + n * 3600, 50.0 + n, 4.0)
+
+    track.trim(T0 + 3600)
+    assert [ts for ts, _, _ in track.points()] == [T0 + 3600, T0 + 7200]
+    track.trim(T0 + 10**6)
+    assert track.points() == [(T0 + 7200, 52.0, 4.0)]
+
+
+def test_points_are_filtered_by_range():
+    track = LocationTrack()
+    for n in range(4):
+        track.append(T0 + n * 60, 50.0 + n, 4.0)
+
+    assert [ts for ts, _, _ in track.points(T0 + 60, T0 + 180)] == [
+        T0 + 60,
+        T0 + 120,
+    ]
+
+
+def _location(acquired: datetime, latitude: float | None) -> SimpleNamespace:
+    return SimpleNamespace(latitude=latitude, longitude=4.9, timestamp=acquired)
+
+
+async def test_history_records_new_positions_only(hass):
+    history = LocationHistory(hass, "entry", retention_days=7)
+    await history.async_load()
+    now = dt_util.utcnow().replace(microsecond=0)
+
+    assert history.record("VIN", _location(now - timedelta(hours=2), 52.3))
+    assert not history.record("VIN", _location(now - timedelta(hours=2), 52.3))
+    assert not history.record("VIN", _location(now, None))
+    assert history.record("VIN", _location(now, 52.1))
+
+    points = history.points("VIN", start=now - timedelta(hours=1))
+    assert points == [
+        {"time": now.astimezone(UTC).isoformat(), "latitude": 52.1, "longitude": 4.9}
+    ]
+    assert history.points("OTHER") == []
+    assert history.diagnostics()["vehicles"]["...VIN"]["points"] == 2
+
+
+async def test_zero_retention_records_nothing(hass):
+    history = LocationHistory(hass, "entry", retention_days=0)
+    await history.async_load()
+
+    assert not history.record("VIN", _location(dt_util.utcnow(), 52.3))
+    assert history.points("VIN") == []
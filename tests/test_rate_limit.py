@@ -0,0 +1,56 @@
+"""Unit tests for the per-account request pacer."""
+
+from __future__ import annotations
+
+import asyncio
+from itertools import pairwise
+
+from custom_components.toyota.rate_limit import RequestPacer
+
+
+async def _request(pacer: RequestPacer, starts: list[float], hold_s: float) -> None:
+    async with pacer.slot():
+        starts.append(asyncio.get_running_loop().time())
+        await asyncio.sleep(hold_s)
+
+
+async def test_request_starts_are_spaced():
+    pacer = RequestPacer(min_interval_s=0.05, max_concurrent=4)
+    starts: list[float] = []
+
+    await asyncio.gather(*(_request(pacer, starts, 0) for _ in range(4)))
+
+    gaps = [b - a for a, b in pairwise(starts)]
+    assert all(gap >= 0.045 for gap in gaps)
+    assert pacer.diagnostics()["spaced"] == 3
+
+
+async def test_concurrency_is_capped():
+    pacer = RequestPacer(min_interval_s=0, max_concurrent=2)
+    in_flight = 0
+    peak = 0
+
+    async def _tracked() -> None:
+        nonlocal in_flight, peak
+        async with pacer.slot():
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(_tracked() for _ in range(6)))
+
+    assert peak == 2
+    assert pacer.diagnostics()["requests"] == 6
+
+
+async def test_slow_response_does_not_delay_next_start_beyond_spacing():
+    pacer = RequestPacer(min_interval_s=0.01, max_concurrent=2)
+    starts: list[float] = []
+
+    await asyncio.gather(
+        _request(pacer, starts, 0.2),
+        _request(pacer, starts, 0),
+    )
+
+    assert starts[1] - starts[0] < 0.1
@@ -0,0 +1,135 @@
+"""Equivalence tests for the columnar refresh decision tree."""
+
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from custom_components.toyota import refresh_batch
+from custom_components.toyota.refresh_batch import FleetColumns, decide_batch
+from custom_components.toyota.refresh_strategy import (
+    POLICIES,
+    CycleSnapshot,
+    RefreshAction,
+    RefreshTrigger,
+    StrategyOptions,
+    VinState,
+    decide,
+)
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+
+
+def _maybe_time(rng: random.Random, now: datetime) -> datetime | None:
+    if rng.random() < 0.2:
+        return None
+    # Whole and fractional minutes, so the exact boundaries get hit too.
+    minutes = rng.choice([0, 15, 30, 60, 120, 240, 360, rng.uniform(0, 2000)])
+    return now - timedelta(minutes=minutes)
+
+
+def _random_state(rng: random.Random, now: datetime) -> VinState:
+    return VinState(
+        last_odometer_km=rng.choice([None, 1000.0, 1000.5, 2000.0]),
+        was_moving_last_cycle=rng.random() < 0.3,
+        last_status_occurrence_date=_maybe_time(rng, now),
+        last_status_fetch_at=_maybe_time(rng, now),
+        last_post_attempt_at=_maybe_time(rng, now),
+        soft_disabled=rng.random() < 0.2,
+        remaining_post_cycles=rng.choice([0, 0, 0, 1, 2]),
+        recent_post_attempts=[
+            now - timedelta(hours=rng.uniform(0, 30)) for _ in range(rng.randrange(8))
+        ],
+    )
+
+
+def _random_options(rng: random.Random) -> StrategyOptions:
+    return StrategyOptions(
+        enable_status_refresh=rng.random() < 0.95,
+        auto_disabled_status_refresh=rng.random() < 0.05,
+        idle_wake_hours=rng.choice([0, 1, 4, 6]),
+        max_cache_age_minutes=rng.choice([5, 15, 30, 45]),
+        post_count_per_stop=rng.choice([1, 2, 3]),
+        policy=rng.choice([*POLICIES, "unknown"]),
+        wake_success_floor=rng.choice([0.0, 0.0, 0.3, 0.6]),
+        daily_wake_budget=rng.choice([1, 3, 6]),
+        quiet_hours_start=rng.choice([0, 22]),
+        quiet_hours_end=rng.choice([7, 13]),
+        pre_departure=rng.random() < 0.5,
+    )
+
+
+def _maybe_departure(rng: random.Random, now: datetime) -> datetime | None:
+    if rng.random() < 0.3:
+        return None
+    # Inside, at the edges of and past the pre-departure lead.
+    minutes = rng.choice([0, 10, 15, 30, rng.uniform(0, 20)])
+    return now + timedelta(minutes=minutes)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_batch_matches_scalar_decide(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(refresh_batch, "np", None)
+    elif refresh_batch.np is None:
+        pytest.skip("numpy not installed")
+    rng = random.Random(41)
+    seen: set[tuple[RefreshAction, RefreshTrigger]] = set()
+
+    for _ in range(300):
+        now = NOW + timedelta(hours=rng.randrange(24))
+        options = _random_options(rng)
+        snapshots = [
+            CycleSnapshot(
+                now=now,
+                current_odometer_km=rng.choice([None, 1000.0, 1000.5, 2000.0]),
+                state=_random_state(rng, now),
+                options=options,
+                user_service_call_pending=rng.random() < 0.1,
+                expected_report_at=_maybe_time(rng, now),
+                wake_success={
+                    trigger: rng.random()
+                    for trigger in (
+                        RefreshTrigger.JUST_STOPPED,
+                        RefreshTrigger.IDLE_WAKE,
+                        RefreshTrigger.PRE_DEPARTURE,
+                    )
+                    if rng.random() < 0.7
+                },
+                departure_at=_maybe_departure(rng, now),
+                departure_likelihood=rng.choice([None, 0.05, 0.5, rng.random()]),
+            )
+            for _ in range(40)
+        ]
+
+        batch = decide_batch(FleetColumns.from_snapshots(snapshots), now, options)
+
+        for row, snapshot in enumerate(snapshots):
+            expected = decide(snapshot)
+            assert batch.decision(row) == expected, (row, snapshot)
+            seen.add((expected.action, expected.trigger))
+
+    # The random inputs reach most branches of the tree.
+    assert len(seen) >= 16
+
+
+def test_custom_policy_falls_back_to_rows(monkeypatch):
+    class NeverPolicy(POLICIES["default"].__class__):
+        def post_trigger(self, snapshot, **_kwargs):
+            return False, RefreshTrigger.NONE
+
+    monkeypatch.setitem(POLICIES, "never", NeverPolicy())
+    options = StrategyOptions(policy="never")
+    snapshots = [
+        CycleSnapshot(NOW, None, VinState(remaining_post_cycles=1), options),
+        CycleSnapshot(NOW, None, VinState(), options),
+    ]
+
+    batch = decide_batch(FleetColumns.from_snapshots(snapshots), NOW, options)
+
+    assert [batch.decision(row).action for row in range(len(batch))] == [
+        RefreshAction.GET_ONLY,
+        RefreshAction.GET_ONLY,
+    ]
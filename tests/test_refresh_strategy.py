@@ -22,6 +22,7 @@ from custom_components.toyota.refresh_strategy import (
     VinState,
     decide,
     on_occurrence_advanced,
+    on_post_attempt,
     on_post_layer1_failure,
     on_post_layer1_success,
     on_wake_failed,
@@ -41,6 +42,10 @@ def _snap(**overrides) -> CycleSnapshot:
         state=state,
         options=options,
         user_service_call_pending=overrides.pop("user_service_call_pending", False),
+        expected_report_at=overrides.pop("expected_report_at", None),
+        wake_success=overrides.pop("wake_success", {}),
+        departure_at=overrides.pop("departure_at", None),
+        departure_likelihood=overrides.pop("departure_likelihood", None),
     )
 
 
@@ -350,3 +355,309 @@ def test_no_telemetry_this_cycle_does_not_crash():
     # No movement detected (current_odometer_km is None -> not moving).
     # Cache fresh, no other triggers -> serve from cache.
     assert d.action is RefreshAction.SERVE_FROM_CACHE
+
+
+# ---------------------------------------------------------------------------
+# Policies
+# ---------------------------------------------------------------------------
+
+
+def _stopped_state(**overrides) -> VinState:
+    """A car that moved last cycle and stands still now, with a fresh cache."""
+    return VinState(
+        last_odometer_km=1000.0,
+        was_moving_last_cycle=True,
+        last_status_occurrence_date=NOW,
+        last_status_fetch_at=NOW,
+        has_cached_response=True,
+        **overrides,
+    )
+
+
+def test_unknown_policy_falls_back_to_default():
+    s = _snap(state=_stopped_state(), options=StrategyOptions(policy="nope"))
+    assert decide(s).trigger is RefreshTrigger.JUST_STOPPED
+
+
+def test_on_post_attempt_keeps_one_day_of_attempts():
+    state = VinState(recent_post_attempts=[NOW - timedelta(hours=25)])
+    on_post_attempt(state, NOW)
+    assert state.last_post_attempt_at == NOW
+    assert state.recent_post_attempts == [NOW]
+
+
+@pytest.mark.parametrize(("used", "posts"), [(4, True), (5, False)])
+def test_quota_admits_a_stop_only_if_all_its_posts_fit(used, posts):
+    # Budget 6, post_count_per_stop 2: a stop needs two free slots.
+    attempts = [NOW - timedelta(hours=h + 1) for h in range(used)]
+    s = _snap(
+        state=_stopped_state(recent_post_attempts=attempts),
+        options=StrategyOptions(policy="quota", daily_wake_budget=6),
+    )
+    d = decide(s)
+    assert (d.action is RefreshAction.POST_THEN_GET) is posts
+    assert d.trigger is RefreshTrigger.JUST_STOPPED
+    if not posts:
+        # Still reads the park-time status.
+        assert d.action is RefreshAction.GET_ONLY
+
+
+def test_quota_never_refuses_service_calls_or_followups():
+    attempts = [NOW - timedelta(minutes=m + 1) for m in range(10)]
+    options = StrategyOptions(policy="quota", daily_wake_budget=2)
+    service = _snap(
+        state=VinState(recent_post_attempts=attempts),
+        options=options,
+        user_service_call_pending=True,
+    )
+    followup = _snap(
+        state=VinState(recent_post_attempts=attempts, remaining_post_cycles=1),
+        options=options,
+    )
+    assert decide(service).action is RefreshAction.POST_THEN_GET
+    assert decide(followup).action is RefreshAction.POST_THEN_GET
+
+
+@pytest.mark.parametrize(
+    ("hour", "posts"), [(23, False), (3, False), (7, True), (21, True)]
+)
+def test_time_of_day_skips_automatic_wakes_at_night(hour, posts):
+    s = _snap(
+        now=NOW.replace(hour=hour),
+        state=_stopped_state(),
+        options=StrategyOptions(policy="time_of_day"),
+    )
+    assert (decide(s).action is RefreshAction.POST_THEN_GET) is posts
+
+
+def test_time_of_day_lets_the_cache_age_longer_at_night():
+    state = VinState(
+        last_odometer_km=1000.0,
+        last_status_occurrence_date=NOW - timedelta(minutes=45),
+        last_status_fetch_at=NOW - timedelta(minutes=45),
+        has_cached_response=True,
+    )
+    options = StrategyOptions(policy="time_of_day", max_cache_age_minutes=30)
+    night = _snap(now=NOW.replace(hour=2), state=state, options=options)
+    day = _snap(now=NOW.replace(hour=12), state=state, options=options)
+    assert decide(night).action is RefreshAction.SERVE_FROM_CACHE
+    assert decide(day).action is RefreshAction.GET_ONLY
+
+
+def test_aggressive_gets_every_cycle_while_moving():
+    state = VinState(
+        last_odometer_km=1000.0,
+        last_post_attempt_at=NOW,
+        last_status_occurrence_date=NOW,
+        last_status_fetch_at=NOW - timedelta(minutes=1),
+        has_cached_response=True,
+    )
+    s = _snap(
+        state=state,
+        current_odometer_km=1005.0,
+        options=StrategyOptions(policy="aggressive"),
+    )
+    d = decide(s)
+    assert d.action is RefreshAction.GET_ONLY
+    assert d.trigger is RefreshTrigger.CURRENTLY_MOVING
+
+
+def test_aggressive_wakes_idle_car_without_idle_wake_option():
+    state = VinState(
+        last_odometer_km=1000.0,
+        last_post_attempt_at=NOW - timedelta(hours=5),
+        last_status_occurrence_date=NOW,
+        last_status_fetch_at=NOW,
+        has_cached_response=True,
+    )
+    options = StrategyOptions(policy="aggressive", idle_wake_hours=0)
+    d = decide(_snap(state=state, options=options))
+    assert d.action is RefreshAction.POST_THEN_GET
+    assert d.trigger is RefreshTrigger.IDLE_WAKE
+
+
+@pytest.mark.parametrize(
+    ("report_minutes_ago", "fetched_minutes_ago", "action"),
+    [
+        # No report since our last read: the GET would hit a cold cache.
+        (50, 45, RefreshAction.SERVE_FROM_CACHE),
+        # The car has reported since: read it now.
+        (5, 45, RefreshAction.GET_ONLY),
+        # Deferred too long (4x max age): GET even without a report.
+        (130, 125, RefreshAction.GET_ONLY),
+    ],
+)
+def test_stale_get_waits_for_the_expected_report(
+    report_minutes_ago, fetched_minutes_ago, action
+):
+    state = VinState(
+        last_odometer_km=1000.0,
+        last_status_occurrence_date=NOW - timedelta(minutes=fetched_minutes_ago),
+        last_status_fetch_at=NOW - timedelta(minutes=fetched_minutes_ago),
+        has_cached_response=True,
+    )
+    s = _snap(
+        state=state, expected_report_at=NOW - timedelta(minutes=report_minutes_ago)
+    )
+    assert decide(s).action is action
+
+
+@pytest.mark.parametrize(
+    ("floor", "predicted", "action"),
+    [
+        (0.0, 0.05, RefreshAction.POST_THEN_GET),
+        (0.3, 0.05, RefreshAction.SERVE_FROM_CACHE),
+        (0.3, 0.5, RefreshAction.POST_THEN_GET),
+    ],
+)
+def test_wake_success_floor_skips_unlikely_idle_wakes(floor, predicted, action):
+    state = VinState(
+        last_odometer_km=1000.0,
+        last_post_attempt_at=NOW - timedelta(hours=7),
+        last_status_occurrence_date=NOW,
+        last_status_fetch_at=NOW,
+        has_cached_response=True,
+    )
+    s = _snap(
+        state=state,
+        options=StrategyOptions(idle_wake_hours=6, wake_success_floor=floor),
+        wake_success={RefreshTrigger.IDLE_WAKE: predicted},
+    )
+    assert decide(s).action is action
+
+
+def test_wake_success_floor_never_skips_service_calls():
+    s = _snap(
+        user_service_call_pending=True,
+        options=StrategyOptions(wake_success_floor=0.9),
+        wake_success={RefreshTrigger.SERVICE_CALL: 0.0},
+    )
+    assert decide(s).action is RefreshAction.POST_THEN_GET
+
+
+def test_predictor_replaces_the_soft_disable_threshold():
+    state = VinState()
+    options = StrategyOptions(failed_wake_threshold=1, wake_success_floor=0.3)
+    on_wake_failed(state, options)
+    assert not state.soft_disabled
+    assert state.consecutive_failed_wakes == 1
+
+
+def test_predictor_lifts_an_earlier_soft_disable():
+    # Soft-disabled before the predictor was switched on.
+    state = VinState(
+        last_odometer_km=1000.0,
+        was_moving_last_cycle=True,
+        consecutive_failed_wakes=5,
+        soft_disabled=True,
+        has_cached_response=True,
+    )
+    options = StrategyOptions(wake_success_floor=0.3)
+    # The car wakes again without waiting for a failed wake to clear the flag.
+    d = decide(_snap(state=state, options=options))
+    assert d.action is RefreshAction.POST_THEN_GET
+    assert d.refresh_state is RefreshState.ACTIVE
+
+    on_wake_failed(state, options)
+    assert not state.soft_disabled
+
+
+@pytest.mark.parametrize(
+    ("report_minutes_ago", "action"),
+    [
+        # No report since the last read: wake the car.
+        (None, RefreshAction.POST_THEN_GET),
+        (90, RefreshAction.POST_THEN_GET),
+        # The car has reported since: a GET reads it.
+        (5, RefreshAction.GET_ONLY),
+    ],
+)
+def test_pre_departure_reads_the_car_before_a_likely_departure(
+    report_minutes_ago, action
+):
+    state = VinState(
+        last_odometer_km=1000.0,
+        last_status_occurrence_date=NOW - timedelta(minutes=60),
+        last_status_fetch_at=NOW - timedelta(minutes=20),
+        has_cached_response=True,
+    )
+    expected = (
+        None
+        if report_minutes_ago is None
+        else NOW - timedelta(minutes=report_minutes_ago)
+    )
+    s = _snap(
+        state=state,
+        options=StrategyOptions(pre_departure=True),
+        expected_report_at=expected,
+        departure_at=NOW + timedelta(minutes=10),
+    )
+    d = decide(s)
+    assert d.action is action
+    assert d.trigger is RefreshTrigger.PRE_DEPARTURE
+
+
+@pytest.mark.parametrize(
+    ("departure_in", "fetched_minutes_ago", "enabled"),
+    [
+        # Option off.
+        (10, 20, False),
+        # Too early, or the departure hour has begun.
+        (30, 20, True),
+        (0, 20, True),
+        # Already read inside the lead.
+        (10, 3, True),
+    ],
+)
+def test_pre_departure_reads_only_once_inside_the_lead(
+    departure_in, fetched_minutes_ago, enabled
+):
+    state = VinState(
+        last_odometer_km=1000.0,
+        last_status_occurrence_date=NOW - timedelta(minutes=60),
+        last_status_fetch_at=NOW - timedelta(minutes=fetched_minutes_ago),
+        has_cached_response=True,
+    )
+    s = _snap(
+        state=state,
+        options=StrategyOptions(pre_departure=enabled),
+        departure_at=NOW + timedelta(minutes=departure_in),
+    )
+    assert decide(s).trigger is RefreshTrigger.NONE
+
+
+def test_pre_departure_wake_respects_quiet_hours():
+    night = NOW.replace(hour=5, minute=50)
+    s = _snap(
+        now=night,
+        options=StrategyOptions(policy="time_of_day", pre_departure=True),
+        departure_at=night + timedelta(minutes=10),
+    )
+    d = decide(s)
+    # The wake is refused, the read still goes out.
+    assert d.action is RefreshAction.GET_ONLY
+    assert d.trigger is RefreshTrigger.PRE_DEPARTURE
+
+
+@pytest.mark.parametrize(
+    ("likelihood", "action"),
+    [
+        (None, RefreshAction.POST_THEN_GET),
+        (0.05, RefreshAction.SERVE_FROM_CACHE),
+        (0.5, RefreshAction.POST_THEN_GET),
+    ],
+)
+def test_idle_wake_waits_while_no_departure_is_likely(likelihood, action):
+    state = VinState(
+        last_odometer_km=1000.0,
+        last_post_attempt_at=NOW - timedelta(hours=7),
+        last_status_occurrence_date=NOW,
+        last_status_fetch_at=NOW,
+        has_cached_response=True,
+    )
+    s = _snap(
+        state=state,
+        options=StrategyOptions(idle_wake_hours=6, pre_departure=True),
+        departure_likelihood=likelihood,
+    )
+    assert decide(s).action is action
@@ -0,0 +1,65 @@
+"""Unit tests for the auto-report cadence estimator."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from custom_components.toyota.report_cadence import ReportCadence
+
+START = datetime(2026, 5, 1, tzinfo=UTC)
+PERIOD = timedelta(hours=2)
+
+
+def _observed(periods: list[int]) -> ReportCadence:
+    """Return a cadence that read reports at these multiples of PERIOD."""
+    cadence = ReportCadence()
+    for n in periods:
+        cadence.observe(START + n * PERIOD + timedelta(seconds=n % 3 * 20))
+    return cadence
+
+
+def test_period_survives_missed_reports():
+    # Reads skipped some reports: intervals of 1, 2 and 3 periods.
+    cadence = _observed([0, 1, 3, 4, 7, 8, 10])
+
+    period = cadence.period()
+
+    assert period is not None
+    assert abs(period - PERIOD) < timedelta(minutes=1)
+    now = START + 11 * PERIOD + timedelta(minutes=30)
+    assert abs(cadence.expected_report_at(now) - (START + 11 * PERIOD)) < timedelta(
+        minutes=2
+    )
+    assert cadence.next_report_at(now) > now
+
+
+def test_no_estimate_without_enough_regular_intervals():
+    assert _observed([0, 1, 2, 3]).period() is None
+
+    irregular = ReportCadence()
+    for minutes in (0, 37, 170, 201, 420, 433, 700):
+        irregular.observe(START + timedelta(minutes=minutes))
+    assert irregular.period() is None
+    assert irregular.expected_report_at(START + timedelta(days=1)) is None
+
+
+def test_drives_and_wakes_start_a_new_interval():
+    cadence = _observed([0, 1, 2])
+    cadence.note_moving()
+    # The drive's reports don't make intervals...
+    assert cadence.observe(START + 2 * PERIOD + timedelta(minutes=50))
+    # ...nor does a report caused by our wake.
+    assert cadence.observe(START + 3 * PERIOD, woken=True)
+    assert not cadence.observe(START, woken=False)
+
+    assert cadence.diagnostics() == {"intervals": 2, "period_s": None}
+
+
+def test_round_trip():
+    cadence = _observed([0, 1, 2, 4, 5])
+
+    restored = ReportCadence.from_dict(cadence.as_dict())
+
+    assert restored.diagnostics() == cadence.diagnostics()
+    now = START + 6 * PERIOD
+    assert restored.expected_report_at(now) == cadence.expected_report_at(now)
@@ -0,0 +1,94 @@
+"""Unit tests for the cached fleet roster."""
+
+from __future__ import annotations
+
+import contextlib
+from datetime import UTC, datetime, timedelta
+
+from pytoyoda.exceptions import ToyotaApiError
+
+from custom_components.toyota.roster import ROSTER_TTL, FleetRoster
+
+NOW = datetime(2026, 4, 25, 10, 0, 0, tzinfo=UTC)
+
+
+class _FakeVehicle:
+    def __init__(self, vin: str | None) -> None:
+        self.vin = vin
+        self._endpoint_data: dict = {}
+
+
+class _FakeClient:
+    def __init__(self, vins: list[str | None]) -> None:
+        self.vins = vins
+        self.calls = 0
+
+    async def get_vehicles(self) -> list[_FakeVehicle]:
+        self.calls += 1
+        return [_FakeVehicle(vin) for vin in self.vins]
+
+
+async def test_roster_fetches_once_within_ttl():
+    client = _FakeClient(["VIN1", "VIN2"])
+    roster = FleetRoster(client)  # type: ignore[arg-type]
+
+    first = await roster.async_get(NOW)
+    second = await roster.async_get(NOW + timedelta(minutes=30))
+
+    assert client.calls == 1
+    assert [v.vin for v in first] == ["VIN1", "VIN2"]
+    assert first[0] is second[0]
+
+
+async def test_roster_refetches_after_ttl_and_keeps_endpoint_data():
+    client = _FakeClient(["VIN1"])
+    roster = FleetRoster(client)  # type: ignore[arg-type]
+    (vehicle,) = await roster.async_get(NOW)
+    vehicle._endpoint_data["status"] = "cached-status"
+
+    (refetched,) = await roster.async_get(NOW + ROSTER_TTL)
+
+    assert client.calls == 2
+    assert refetched is not vehicle
+    assert refetched._endpoint_data["status"] == "cached-status"
+
+
+async def test_roster_invalidate_forces_refetch_and_drops_removed_vins():
+    client = _FakeClient(["VIN1", "VIN2", None])
+    roster = FleetRoster(client)  # type: ignore[arg-type]
+    await roster.async_get(NOW)
+    client.vins = ["VIN1"]
+
+    roster.invalidate("404 for vin=...VIN2")
+    assert roster.needs_refresh(NOW)
+    vehicles = await roster.async_get(NOW)
+
+    assert client.calls == 2
+    assert [v.vin for v in vehicles] == ["VIN1"]
+    assert roster.get("VIN2") is None
+
+
+async def test_swallowed_404_on_a_get_still_drops_the_car():
+    client = _FakeClient(["VIN1", "VIN2"])
+    roster = FleetRoster(client)  # type: ignore[arg-type]
+    await roster.async_get(NOW)
+    client.vins = ["VIN1"]
+    scheduled: list[bool] = []
+
+    async def _get_status(error: ToyotaApiError) -> None:
+        # As the coordinator's GET /status: errors are noted, then swallowed.
+        with contextlib.suppress(ToyotaApiError):
+            try:
+                raise error
+            except ToyotaApiError as ex:
+                scheduled.append(roster.note_error("VIN2", ex))
+                raise
+
+    await _get_status(ToyotaApiError("Request Failed. 429, {}."))
+    assert not roster.needs_refresh(NOW)
+    await _get_status(ToyotaApiError("Request Failed. 404, {}."))
+    await _get_status(ToyotaApiError("Request Failed. 404, {}."))
+
+    # One account re-read is scheduled, however many calls 404.
+    assert scheduled == [False, True, False]
+    assert [v.vin for v in await roster.async_get(NOW)] == ["VIN1"]
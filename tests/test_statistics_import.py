@@ -0,0 +1,56 @@
+"""Unit tests for turning daily trip summaries into statistics rows."""
+
+from __future__ import annotations
+
+from datetime import date
+from types import SimpleNamespace
+
+from custom_components.toyota.statistics_import import daily_rows, statistic_id
+
+
+def _summary(day: date, distance: float | None) -> SimpleNamespace:
+    return SimpleNamespace(from_date=day, to_date=day, distance=distance)
+
+
+def _distance(summary: SimpleNamespace) -> float | None:
+    return summary.distance
+
+
+def test_rows_are_sorted_and_sum_runs_on_from_last_import():
+    summaries = [
+        _summary(date(2026, 3, 3), 12.5),
+        _summary(date(2026, 3, 1), 10.0),
+        _summary(date(2026, 3, 2), None),
+    ]
+
+    rows = daily_rows(
+        summaries, _distance, after=None, before=date(2026, 3, 10), start_sum=100.0
+    )
+
+    assert rows == [
+        (date(2026, 3, 1), 10.0, 110.0),
+        (date(2026, 3, 2), 0.0, 110.0),
+        (date(2026, 3, 3), 12.5, 122.5),
+    ]
+
+
+def test_already_imported_days_and_today_are_skipped():
+    summaries = [
+        _summary(date(2026, 3, 1), 5.0),
+        _summary(date(2026, 3, 2), 6.0),
+        _summary(date(2026, 3, 3), 7.0),
+    ]
+
+    rows = daily_rows(
+        summaries,
+        _distance,
+        after=date(2026, 3, 1),
+        before=date(2026, 3, 3),
+        start_sum=5.0,
+    )
+
+    assert rows == [(date(2026, 3, 2), 6.0, 11.0)]
+
+
+def test_statistic_id_is_lowercase_external_id():
+    assert statistic_id("JTDABC123", "ev_distance") == "toyota:jtdabc123_ev_distance"
@@ -0,0 +1,105 @@
+"""Unit tests for the offline refresh-policy simulator."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.toyota.refresh_strategy import POLICIES, StrategyOptions
+from custom_components.toyota.strategy_simulator import (
+    SimulationResult,
+    compare_policies,
+    dump_trace,
+    load_trace,
+    option_grid,
+    simulate,
+    sweep,
+    synthetic_trace,
+)
+
+
+def test_synthetic_trace_is_deterministic():
+    assert synthetic_trace(2, seed=5) == synthetic_trace(2, seed=5)
+    assert synthetic_trace(2, seed=5) != synthetic_trace(2, seed=6)
+    odometers = [cycle.odometer_km for cycle in synthetic_trace(3, seed=1)]
+    assert odometers == sorted(odometers)
+    assert odometers[-1] > odometers[0]
+
+
+def test_disabled_refresh_spends_nothing():
+    trace = synthetic_trace(2, seed=1)
+
+    result = simulate(trace, StrategyOptions(enable_status_refresh=False))
+
+    assert result.calls == 0
+    assert result.cycles == len(trace)
+    assert result.stale_fraction > 0
+
+
+def test_policies_trade_calls_for_freshness():
+    trace = synthetic_trace(7, seed=3)
+
+    results = compare_policies(trace, StrategyOptions(daily_wake_budget=4))
+
+    assert set(results) == set(POLICIES)
+    default, quota, aggressive = (
+        results["default"],
+        results["quota"],
+        results["aggressive"],
+    )
+    assert quota.posts <= 4 * 7 < default.posts
+    assert aggressive.posts >= default.posts
+    assert aggressive.mean_stale_minutes <= default.mean_stale_minutes
+    # Replays are deterministic for a given seed.
+    assert simulate(trace, StrategyOptions(), seed=0).score() == default.score()
+
+
+def test_trace_round_trips_through_ndjson():
+    trace = synthetic_trace(1, seed=2)
+
+    text = dump_trace(trace)
+
+    assert len(text.splitlines()) == len(trace)
+    assert load_trace(["", *reversed(text.splitlines())]) == trace
+    with pytest.raises(ValueError, match="'at'"):
+        load_trace(['{"odometer_km": 1}'])
+
+
+def test_stale_percentiles_use_nearest_rank():
+    result = SimulationResult("default", stale_minutes=[0.0] * 8 + [10.0, 40.0])
+
+    assert result.stale_percentile(50) == 0.0
+    assert result.stale_percentile(90) == 10.0
+    assert result.stale_percentile(99) == 40.0
+    assert result.stale_percentile(100) == 40.0
+    assert SimulationResult("default").stale_percentile(50) == 0.0
+
+
+def test_option_grid_covers_every_combination():
+    grid = option_grid(max_cache_age_minutes=[15, 30, 60], post_count_per_stop=[1, 2])
+
+    assert len(grid) == 6
+    assert {(o.max_cache_age_minutes, o.post_count_per_stop) for o in grid} == {
+        (age, count) for age in (15, 30, 60) for count in (1, 2)
+    }
+    with pytest.raises(ValueError, match="max_cache_age"):
+        option_grid(max_cache_age=[15])
+
+
+def test_sweep_in_a_process_pool_matches_serial_replays():
+    trace = synthetic_trace(2, seed=4)
+    grid = option_grid(max_cache_age_minutes=[5, 60], idle_wake_hours=[0, 6])
+
+    pooled = sweep(trace, grid, workers=2, seed=1)
+
+    assert pooled == sweep(trace, grid, workers=0, seed=1)
+    assert [row.options for row in pooled] == grid
+    for row in pooled:
+        result = simulate(trace, row.options, seed=1)
+        assert (row.posts, row.gets, row.rate_limited) == (
+            result.posts,
+            result.gets,
+            result.rate_limited,
+        )
+        assert row.stale_p50 <= row.stale_p90 <= row.stale_p99 <= row.stale_max
+    # A short cache age GETs more often, so hits Toyota's stale cache more.
+    assert pooled[0].rate_limited > pooled[2].rate_limited
@@ -0,0 +1,108 @@
+"""Unit tests for service-call refreshes of single cars."""
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.toyota.targeted_refresh import TargetedRefreshes
+
+VIN_A = "JTDKB3FU000000001"
+VIN_B = "JTDKB3FU000000002"
+
+
+class _FakeCoordinator:
+    """Count refreshes; each one waits until ``release`` is set."""
+
+    def __init__(self, release: asyncio.Event) -> None:
+        self.refreshes = 0
+        self._release = release
+
+    async def async_refresh(self) -> None:
+        self.refreshes += 1
+        await self._release.wait()
+
+
+def _refreshes(coordinators, pending, locks=None, fleet_refreshes=None):
+    locks = {} if locks is None else locks
+    fleet_refreshes = [] if fleet_refreshes is None else fleet_refreshes
+
+    async def _fleet_refresh() -> None:
+        fleet_refreshes.append(True)
+
+    return TargetedRefreshes(
+        coordinators=coordinators,
+        lock_for=lambda vin: locks.setdefault(vin, asyncio.Lock()),
+        pending=pending,
+        request_fleet_refresh=_fleet_refresh,
+        create_task=lambda coro, name: asyncio.get_running_loop().create_task(
+            coro, name=name
+        ),
+    )
+
+
+async def test_service_call_refreshes_only_the_targeted_car():
+    release = asyncio.Event()
+    release.set()
+    coordinators = {VIN_A: _FakeCoordinator(release), VIN_B: _FakeCoordinator(release)}
+    pending: dict[str, int] = {}
+    targeted = _refreshes(coordinators, pending)
+
+    tasks = targeted.async_start([VIN_A], 90)
+    assert pending == {VIN_A: 90}
+    await asyncio.gather(*tasks)
+
+    assert coordinators[VIN_A].refreshes == 1
+    assert coordinators[VIN_B].refreshes == 0
+    assert not targeted.busy
+
+
+async def test_second_call_joins_the_running_refresh():
+    release = asyncio.Event()
+    coordinators = {VIN_A: _FakeCoordinator(release)}
+    targeted = _refreshes(coordinators, {})
+
+    first = targeted.async_start([VIN_A, VIN_A], 60)
+    await asyncio.sleep(0)
+    assert len(first) == 1
+    assert targeted.busy
+    second = targeted.async_start([VIN_A], 60)
+    assert second == first
+
+    release.set()
+    await asyncio.gather(*first)
+    assert coordinators[VIN_A].refreshes == 1
+    assert not targeted.busy
+    # Once finished, the next call starts a new refresh.
+    await asyncio.gather(*targeted.async_start([VIN_A], 60))
+    assert coordinators[VIN_A].refreshes == 2
+
+
+async def test_scheduled_refresh_that_served_the_call_is_not_repeated():
+    release = asyncio.Event()
+    release.set()
+    coordinators = {VIN_A: _FakeCoordinator(release)}
+    pending: dict[str, int] = {}
+    locks = {VIN_A: asyncio.Lock()}
+    targeted = _refreshes(coordinators, pending, locks)
+
+    await locks[VIN_A].acquire()
+    tasks = targeted.async_start([VIN_A], 60)
+    await asyncio.sleep(0)
+    # The car's scheduled refresh consumes the pending flag.
+    pending.pop(VIN_A)
+    locks[VIN_A].release()
+    await asyncio.gather(*tasks)
+
+    assert coordinators[VIN_A].refreshes == 0
+
+
+async def test_car_not_on_the_roster_refreshes_the_fleet():
+    fleet_refreshes: list[bool] = []
+    pending: dict[str, int] = {}
+    targeted = _refreshes({}, pending, fleet_refreshes=fleet_refreshes)
+
+    await asyncio.gather(*targeted.async_start([VIN_B], 60))
+
+    assert fleet_refreshes == [True]
+    # The car's first refresh picks the flag up.
+    assert pending == {VIN_B: 60}
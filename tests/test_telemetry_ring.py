@@ -0,0 +1,85 @@
+"""Unit tests for the telemetry ring buffer and its rates."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from custom_components.toyota.telemetry_ring import TelemetryRing
+
+T0 = datetime(2026, 6, 1, 8, 0, tzinfo=UTC)
+
+
+def _read(ring, at, odometer, fuel=None, battery=None, range_=None):
+    return ring.append(at, odometer=odometer, fuel=fuel, battery=battery, range_=range_)
+
+
+def _brute_consumption(samples, index):
+    """Consumption over consecutive samples, recomputed from scratch."""
+    distance = used = 0.0
+    for before, after in zip(samples, samples[1:], strict=False):
+        step, drop = after[1] - before[1], before[index] - after[index]
+        if step > 0 and drop >= 0:
+            distance += step
+            used += drop
+    return 100 * used / distance
+
+
+def test_consumption_skips_refuels_and_repeats():
+    ring = TelemetryRing()
+    assert _read(ring, T0, 1000, fuel=80, range_=600)
+    # A parked car repeats its reading.
+    assert not _read(ring, T0 + timedelta(minutes=6), 1000, fuel=80, range_=600)
+    _read(ring, T0 + timedelta(hours=1), 1050, fuel=76, range_=570)
+    # Refuelled: the step counts neither distance nor fuel.
+    _read(ring, T0 + timedelta(hours=2), 1060, fuel=100, range_=750)
+    _read(ring, T0 + timedelta(hours=3), 1110, fuel=96, range_=720)
+
+    rates = ring.rates(T0 + timedelta(hours=3), electric=False)
+    assert len(ring) == 4
+    assert rates.consumption == pytest.approx(100 * 8 / 100)
+    assert rates.range_per_percent == pytest.approx(
+        (600 + 570 + 750 + 720) / (80 + 76 + 100 + 96)
+    )
+    assert ring.rates(T0, electric=True).consumption is None
+
+
+def test_eviction_keeps_running_sums_exact():
+    ring = TelemetryRing(capacity=8)
+    for step in range(30):
+        # Every fourth step charges; the others drive and use battery.
+        battery = 90 - (step % 4) * 5
+        _read(ring, T0 + timedelta(hours=step), 100 + step * 15, battery=battery)
+        samples = ring.samples()
+        assert len(samples) == min(step + 1, 8)
+        if step >= 2:
+            rates = ring.rates(T0, electric=True)
+            assert rates.consumption == pytest.approx(_brute_consumption(samples, 3))
+
+
+def test_distance_today_starts_from_the_last_reading_before_midnight():
+    ring = TelemetryRing()
+    evening = T0.replace(hour=22)
+    _read(ring, evening, 5000)
+    _read(ring, evening + timedelta(hours=1), 5020)
+    assert ring.rates(evening, electric=False).distance_today == 20
+
+    morning = evening + timedelta(hours=10)
+    # No reading yet today.
+    assert ring.rates(morning, electric=False).distance_today == 0
+    _read(ring, morning, 5035)
+    assert ring.rates(morning, electric=False).distance_today == 15
+
+
+def test_round_trip_through_storage():
+    ring = TelemetryRing(capacity=4)
+    for step in range(6):
+        _read(ring, T0 + timedelta(hours=step), 100 + step * 10, fuel=90 - step)
+
+    restored = TelemetryRing.from_dict(ring.as_dict(), capacity=4)
+
+    assert restored.samples() == ring.samples()
+    assert restored.rates(T0, electric=False) == ring.rates(T0, electric=False)
+    with pytest.raises(ValueError, match="expected 5 fields"):
+        TelemetryRing.from_dict({"samples": [[1, 2]]})
@@ -0,0 +1,147 @@
+"""Unit tests for the shared HTTP transport and its pytoyoda controller."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+from pytoyoda import controller as pytoyoda_controller
+from pytoyoda.controller import TokenInfo
+
+from custom_components.toyota.const import DOMAIN, TRANSPORT
+from custom_components.toyota.rate_limit import RequestPacer
+from custom_components.toyota.transport import (
+    PooledController,
+    ToyotaTransport,
+    async_get_transport,
+)
+
+
+def _mock_pool(transport: ToyotaTransport, handler) -> httpx.AsyncClient:
+    """Build the transport's real client, answering requests with ``handler``."""
+    client = transport.client
+    client._transport = httpx.MockTransport(handler)
+    return client
+
+
+def _controller(transport: ToyotaTransport, username: str) -> PooledController:
+    controller = transport.create_client(username, "secret")._api.controller
+    controller._token_info = TokenInfo(
+        access_token="access",
+        refresh_token="refresh",
+        uuid="uuid",
+        expiration=datetime.now(UTC) + timedelta(hours=1),
+    )
+    return controller
+
+
+async def test_pool_closes_on_the_last_release_only(hass):
+    transport = async_get_transport(hass)
+    assert async_get_transport(hass) is transport
+    transport.async_acquire("entry_a")
+    transport.async_acquire("entry_b")
+    client = transport.client
+
+    await transport.async_release("entry_a")
+    assert not client.is_closed
+    assert hass.data[DOMAIN][TRANSPORT] is transport
+
+    await transport.async_release("entry_b")
+    assert client.is_closed
+    assert TRANSPORT not in hass.data[DOMAIN]
+    # A client borrowed after the close gets a fresh pool.
+    assert transport.client is not client
+    assert transport.diagnostics()["pools_created"] == 2
+    await transport.async_close()
+
+
+async def test_pool_refuses_cookies(hass):
+    transport = ToyotaTransport(hass)
+    client = _mock_pool(
+        transport,
+        lambda request: httpx.Response(200, headers={"set-cookie": "gw=1; Path=/"}),
+    )
+
+    await client.get("https://ctpa-oneapi.tceu-ctp-prd.toyotaconnectedeurope.io/")
+
+    assert len(client.cookies) == 0
+    assert transport.diagnostics()["requests"] == 1
+    await transport.async_close()
+
+
+async def test_controller_borrows_the_shared_pool(hass):
+    transport = ToyotaTransport(hass)
+    seen: list[str] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["authorization"])
+        return httpx.Response(200, json={})
+
+    _mock_pool(transport, _handler)
+    controller = _controller(transport, "borrow@example.com")
+
+    assert await controller._get_ssl_context() is transport.ssl_context
+    await controller.request_raw("GET", "/v2/vehicle/guid")
+    # Releasing the controller leaves the pool to the registry.
+    await controller.aclose()
+    assert not transport.client.is_closed
+
+    assert seen == ["Bearer access"]
+    assert controller.pacer.diagnostics()["requests"] == 1
+    await transport.async_close()
+
+
+async def test_controller_reports_new_tokens(hass, monkeypatch):
+    transport = ToyotaTransport(hass)
+    controller = _controller(transport, "tokens@example.com")
+    stored: list[TokenInfo] = []
+    controller.token_listener = stored.append
+    monkeypatch.setattr(
+        pytoyoda_controller.jwt, "decode", lambda *_args, **_kwargs: {"uuid": "u2"}
+    )
+
+    controller._update_tokens(
+        {
+            "access_token": "a2",
+            "id_token": "jwt",
+            "refresh_token": "r2",
+            "expires_in": 3600,
+        }
+    )
+
+    assert [token.access_token for token in stored] == ["a2"]
+    assert stored[0].uuid == "u2"
+
+
+async def test_backoff_sleeps_do_not_hold_a_pacer_slot(hass, monkeypatch):
+    transport = ToyotaTransport(hass)
+    statuses = iter((429, 503, 200))
+    _mock_pool(transport, lambda request: httpx.Response(next(statuses), json={}))
+    controller = _controller(transport, "backoff@example.com")
+    controller.pacer = RequestPacer(min_interval_s=0, max_concurrent=1)
+    slot_free_while_sleeping: list[bool] = []
+
+    async def _sleep(_seconds: float) -> None:
+        slot_free_while_sleeping.append(not controller.pacer._slots.locked())
+
+    monkeypatch.setattr(pytoyoda_controller.asyncio, "sleep", _sleep)
+
+    response = await controller.request_raw("GET", "/v1/global/remote/status")
+
+    assert response.status_code == 200
+    assert slot_free_while_sleeping == [True, True]
+    # Each attempt took its own slot.
+    assert controller.pacer.diagnostics()["requests"] == 3
+    await transport.async_close()
+
+
+@pytest.mark.parametrize("method", ["PATCH"])
+async def test_invalid_method_never_takes_a_slot(hass, method):
+    transport = ToyotaTransport(hass)
+    controller = _controller(transport, "invalid@example.com")
+
+    with pytest.raises(pytoyoda_controller.ToyotaInternalError):
+        await controller.request_raw(method, "/v1/anything")
+
+    assert controller.pacer.diagnostics()["requests"] == 0
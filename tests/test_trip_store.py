@@ -0,0 +1,150 @@
+"""Unit tests for the local trip database."""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.toyota.trip_store import DayRow, TripRow, TripStore
+
+VIN = "JTDABC1234567890"
+
+
+def _trip(start: datetime, distance: float, minutes: int = 30) -> SimpleNamespace:
+    return SimpleNamespace(
+        start_time=start,
+        end_time=start + timedelta(minutes=minutes),
+        distance=distance,
+        ev_distance=distance / 2,
+        fuel_consumed=1.0,
+        duration=timedelta(minutes=minutes),
+        ev_duration=None,
+        score=80.0,
+    )
+
+
+@pytest.fixture
+def store():
+    store = TripStore(":memory:")
+    store.open()
+    yield store
+    store.close()
+
+
+def test_trips_are_deduplicated_on_vin_and_start(store):
+    start = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)  # Monday
+    rows = [TripRow.from_trip(_trip(start, 10.0))]
+
+    store.add_trips(VIN, rows)
+    store.add_trips(VIN, rows)
+
+    result = store.query(VIN, start - timedelta(days=1), start + timedelta(days=1))
+    assert result["total"]["count"] == 1
+    assert store.latest_trip_start(VIN) == start
+
+
+def test_weekday_filter_and_grouping(store):
+    monday = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+    trips = [
+        _trip(monday, 10.0),
+        _trip(monday + timedelta(hours=9), 12.0),
+        _trip(monday + timedelta(days=1), 20.0),
+        _trip(monday + timedelta(days=5), 100.0),  # Saturday
+    ]
+    store.add_trips(VIN, [TripRow.from_trip(t) for t in trips])
+    store.add_trips("OTHERVIN00000000", [TripRow.from_trip(_trip(monday, 5.0))])
+
+    result = store.query(
+        VIN,
+        monday - timedelta(days=1),
+        monday + timedelta(days=7),
+        weekdays=range(5),
+        group_by="day",
+    )
+
+    assert result["total"]["count"] == 3
+    assert result["total"]["distance"] == 42.0
+    assert result["total"]["duration_h"] == 1.5
+    assert [(g["key"], g["count"]) for g in result["groups"]] == [
+        ("2026-03-02", 2),
+        ("2026-03-03", 1),
+    ]
+
+
+def test_range_end_is_exclusive(store):
+    start = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+    store.add_trips(VIN, [TripRow.from_trip(_trip(start, 10.0))])
+
+    result = store.query(VIN, start - timedelta(hours=1), start)
+
+    assert result["total"]["count"] == 0
+    assert result["total"]["distance"] == 0.0
+
+
+def test_daily_summaries_count_days_driven(store):
+    summaries = [
+        SimpleNamespace(
+            from_date=date(2026, 1, 5) + timedelta(days=n),
+            distance=float(n),
+            ev_distance=None,
+            fuel_consumed=None,
+            duration=None,
+            ev_duration=None,
+            countries=None,
+        )
+        for n in range(3)
+    ]
+    store.add_days(VIN, [DayRow.from_summary(s) for s in summaries])
+
+    result = store.query(
+        VIN,
+        datetime(2026, 1, 1, tzinfo=UTC),
+        datetime(2026, 2, 1, tzinfo=UTC),
+        group_by="week",
+        source="days",
+    )
+
+    assert result["total"] == {
+        "count": 2,
+        "distance": 3.0,
+        "ev_distance": 0.0,
+        "fuel_consumed": 0.0,
+        "duration_h": 0.0,
+    }
+    assert [g["key"] for g in result["groups"]] == ["2026-W02"]
+    assert store.coverage(VIN)["days"] == {
+        "first": "2026-01-05",
+        "last": "2026-01-07",
+        "rows": 3,
+    }
+
+
+def test_days_cannot_be_grouped_by_hour(store):
+    with pytest.raises(ValueError, match="hour"):
+        store.query(
+            VIN,
+            datetime(2026, 1, 1, tzinfo=UTC),
+            datetime(2026, 2, 1, tzinfo=UTC),
+            group_by="hour",
+            source="days",
+        )
+
+
+def test_pages_follow_the_key_oldest_first(store):
+    start = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+    trips = [_trip(start + timedelta(hours=hour), 10.0 + hour) for hour in range(5)]
+    store.add_trips(VIN, [TripRow.from_trip(t) for t in reversed(trips)])
+    store.add_trips("OTHERVIN00000000", [TripRow.from_trip(trips[0])])
+
+    pages = []
+    after = None
+    while page := store.page(VIN, "trips", after, limit=2):
+        pages.append([row["distance"] for row in page])
+        after = page[-1]["start_ts"]
+
+    assert pages == [[10.0, 11.0], [12.0, 13.0], [14.0]]
+    assert "vin" not in store.page(VIN, "trips")[0]
+    with pytest.raises(ValueError, match="Unknown source"):
+        store.page(VIN, "trips; DROP TABLE trips")
@@ -0,0 +1,101 @@
+"""Unit tests for the learned wake-latency poll schedule."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.toyota.learned_state import (
+    LEARNED_STATE_STORAGE_VERSION,
+    LearnedState,
+    learned_state_store_key,
+)
+from custom_components.toyota.wake_latency import (
+    MAX_WAKE_POLL_S,
+    MIN_WAKE_SAMPLES,
+    WakeLatencyHistogram,
+)
+
+
+def test_unlearned_car_uses_the_default_schedule():
+    histogram = WakeLatencyHistogram()
+    for _ in range(MIN_WAKE_SAMPLES - 1):
+        histogram.record(4)
+
+    assert histogram.poll_offsets(25) == (10.0, 17.5, 25.0)
+    # A service call's budget is the last poll.
+    assert histogram.poll_offsets(25, budget_s=60)[-1] == 60.0
+
+
+def test_fast_car_is_read_with_one_poll():
+    histogram = WakeLatencyHistogram()
+    for _ in range(10):
+        histogram.record(7.5)
+
+    assert histogram.quantile(0.5) == histogram.quantile(0.95) == 10.0
+    assert histogram.poll_offsets(25) == (10.0,)
+
+
+def test_slow_car_polls_from_median_to_p95():
+    histogram = WakeLatencyHistogram()
+    for latency in [18, 19, 22, 24, 28, 33, 38, 45, 55, 58]:
+        histogram.record(latency)
+
+    offsets = histogram.poll_offsets(25)
+
+    assert offsets[0] == histogram.quantile(0.5)
+    assert offsets[-1] == histogram.quantile(0.95) == 60.0
+    assert all(b - a <= 10 for a, b in zip(offsets, offsets[1:], strict=False))
+
+
+def test_timeouts_stretch_the_schedule_up_to_the_cap():
+    histogram = WakeLatencyHistogram()
+    last = 25.0
+    for _ in range(60):
+        histogram.record(last, timed_out=True)
+        last = histogram.poll_offsets(25)[-1]
+
+    assert last == MAX_WAKE_POLL_S
+
+
+def test_old_observations_decay():
+    histogram = WakeLatencyHistogram()
+    for _ in range(20):
+        histogram.record(50)
+    for _ in range(30):
+        histogram.record(8)
+
+    assert histogram.quantile(0.5) == 10.0
+
+
+def test_round_trip_and_bucket_mismatch():
+    histogram = WakeLatencyHistogram()
+    for latency in (8, 12, 30):
+        histogram.record(latency)
+
+    restored = WakeLatencyHistogram.from_dict(histogram.as_dict())
+
+    assert restored.diagnostics() == histogram.diagnostics()
+    with pytest.raises(ValueError, match="buckets"):
+        WakeLatencyHistogram.from_dict({"counts": [1.0], "samples": 1})
+
+
+async def test_learned_state_restores_saved_models(hass, hass_storage):
+    saved = LearnedState(hass, "entry")
+    for _ in range(MIN_WAKE_SAMPLES):
+        saved.record_wake("VIN1", 7)
+    saved.record_wake("VIN2", 25, timed_out=True)
+    hass_storage[learned_state_store_key("entry")] = {
+        "version": LEARNED_STATE_STORAGE_VERSION,
+        "key": learned_state_store_key("entry"),
+        "data": saved._data_to_save(),
+    }
+
+    learned = LearnedState(hass, "entry")
+    await learned.async_load()
+
+    assert learned.wake_latency("VIN1").poll_offsets(25) == (10.0,)
+    assert learned.diagnostics()["vehicles"]["...VIN2"]["wake_latency"] == {
+        "samples": 1,
+        "p50_s": 30.0,
+        "p95_s": 30.0,
+    }
@@ -0,0 +1,75 @@
+"""Unit tests for the wake-success predictor."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from custom_components.toyota.wake_success import (
+    PRIOR_FAILURES,
+    PRIOR_SUCCESSES,
+    WakeSuccessModel,
+)
+
+NOON = datetime(2026, 6, 1, 12, 0, tzinfo=UTC)
+NIGHT = NOON.replace(hour=3)
+
+
+def test_unknown_car_predicts_the_prior():
+    prior = PRIOR_SUCCESSES / (PRIOR_SUCCESSES + PRIOR_FAILURES)
+
+    assert abs(WakeSuccessModel().predict("idle_wake", NOON) - prior) < 1e-9
+
+
+def test_features_separate_night_idle_wakes_from_stops():
+    model = WakeSuccessModel()
+    for day in range(6):
+        model.record("idle_wake", NIGHT + timedelta(days=day), success=False)
+        model.record("just_stopped", NOON + timedelta(days=day), success=True)
+    now = NOON + timedelta(days=6)
+
+    night_idle = model.predict("idle_wake", now.replace(hour=3))
+    noon_stop = model.predict("just_stopped", now)
+
+    assert night_idle < 0.2 < 0.8 < noon_stop
+
+
+def test_time_since_drive_matters():
+    model = WakeSuccessModel()
+    for day in range(6):
+        parked_at = NOON + timedelta(days=day)
+        model.note_moving(parked_at)
+        model.record("idle_wake", parked_at + timedelta(minutes=5), success=True)
+        model.record("idle_wake", parked_at + timedelta(hours=20), success=False)
+    model.note_moving(NOON + timedelta(days=7))
+
+    fresh = model.predict("idle_wake", NOON + timedelta(days=7, minutes=5))
+    stale = model.predict("idle_wake", NOON + timedelta(days=7, hours=20))
+
+    assert fresh > stale
+
+
+def test_failures_fade_so_the_car_is_tried_again():
+    model = WakeSuccessModel()
+    for hour in range(8):
+        model.record("idle_wake", NOON + timedelta(hours=hour), success=False)
+    now = NOON + timedelta(hours=8)
+
+    assert model.predict("idle_wake", now) < 0.1
+    assert model.predict("idle_wake", now + timedelta(days=21)) > 0.5
+
+
+def test_round_trip():
+    model = WakeSuccessModel()
+    model.note_moving(NOON)
+    model.record("just_stopped", NOON + timedelta(minutes=2), success=True)
+    model.record("idle_wake", NIGHT + timedelta(days=1), success=False)
+
+    restored = WakeSuccessModel.from_dict(model.as_dict())
+
+    now = NOON + timedelta(days=2)
+    assert restored.predict("idle_wake", now) == pytest.approx(
+        model.predict("idle_wake", now), abs=1e-4
+    )
+    assert restored.diagnostics() == model.diagnostics()